@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""Deploy every ready issue as one batch: one test run, one commit, one push.
+
+The orchestrator's deploy step (Orchestrator-Owns-Deploy in SKILL.md),
+automated. It takes the branches or patch files of issues reported "ready
+for deployment" and adds each to the remote branch's tip, in order, in
+a scratch worktree. It runs the test suite once on the combined tree. If that
+fails, it bisects to the issue that breaks it, leaves that issue out (and any
+branch built on it) and tests the rest again. The passing batch is pushed as a
+single commit that references every issue in it (hooklib/deployqueue.py).
+
+Items default to the done issues of the last dispatch-queue.py run, in queue
+order. Test runs count for the dev-loop push gate, and a tree that already
+passed is not tested again. The caller's checkout is never touched: pull
+afterwards to pick up the batch.
+
+Usage:
+  python ~/.claude/skills/autonomous-issue-dispatch/scripts/deploy-queue.py --test "npm test"
+  python .../deploy-queue.py issue/71-role-dropdown fix-68.patch --test "npm test" --setup "npm ci"
+  python .../deploy-queue.py --test "pytest -q" --branch main --no-push    # build + test only
+
+Exit codes:
+  0 = batch pushed (or, with --no-push, built and passing)
+  1 = nothing deployable, or the push was rejected (remote moved: run again)
+  2 = bad arguments, not a git repository, target branch failing its tests
+"""
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.expanduser("~/.claude/skills/hook-runtime/scripts"))
+from hooklib import deployqueue, scheduler  # noqa: E402
+
+
+def dispatched_items(cwd):
+    """Items for the done issues of the last dispatch-queue.py run."""
+    state = scheduler.load_state(cwd) or {}
+    return [deployqueue.Item(i["branch"], f"#{i['number']}: {i['title']}" if i["title"]
+                             else f"#{i['number']}")
+            for i in state.get("issues", []) if i.get("status") == "done" and i.get("branch")]
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    ap.add_argument("items", nargs="*", help="branches or patch files (relative to --cwd),"
+                    " in deploy order (default: done issues of the last dispatch-queue.py run)")
+    ap.add_argument("--test", required=True, help="test command, run in the candidate worktree")
+    ap.add_argument("--setup", help="run once in the candidate worktree first (e.g. npm ci)")
+    ap.add_argument("--remote", default="origin")
+    ap.add_argument("--branch", help="branch to deploy to (default: the remote's HEAD)")
+    ap.add_argument("--no-push", action="store_true", help="build and test, do not push")
+    ap.add_argument("--cwd", default=os.getcwd())
+    ap.add_argument("--json", action="store_true", help="machine-readable output")
+    args = ap.parse_args()
+
+    items = [deployqueue.Item(ref) for ref in args.items] or dispatched_items(args.cwd)
+    if not items:
+        print("nothing to deploy: no items given and no done issues from dispatch-queue.py",
+              file=sys.stderr)
+        sys.exit(1)
+    try:
+        dq = deployqueue.DeployQueue(args.cwd, items, args.test, args.remote, args.branch,
+                                     args.setup)
+        print(f"{len(items)} item(s) onto {args.remote}/{dq.branch}", file=sys.stderr)
+        result = dq.run(push=not args.no_push)
+    except ValueError as exc:
+        print(f"deploy-queue: {exc}", file=sys.stderr)
+        sys.exit(2)
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        for item in result["items"]:
+            note = f"  ({item['note']})" if item["note"] else ""
+            print(f"{item['status']:<9} {item['label']}{note}")
+        ran = [t for t in result["tests"] if not t["cached"]]
+        print(f"{len(ran)} test run(s), {sum(t['seconds'] for t in ran):.0f}s"
+              f" ({len(result['tests']) - len(ran)} tree(s) already passing)")
+        if not result["commit"]:
+            print("nothing deployed")
+        elif result["unchanged"]:
+            print(f"nothing new: every item is already in {args.remote}/{result['branch']}")
+        elif result["pushed"]:
+            print(f"pushed {result['commit'][:12]} to {args.remote}/{result['branch']}")
+        elif args.no_push:
+            print(f"batch {result['commit'][:12]} passes; not pushed (--no-push)")
+        else:
+            print(f"push of {result['commit'][:12]} to {args.remote}/{result['branch']}"
+                  " rejected: the remote moved, run again")
+    done = result["pushed"] or result["unchanged"] or args.no_push
+    sys.exit(0 if result["commit"] and done else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""Full-text search over every Claude Code session on this machine.
+
+Keeps an incremental SQLite FTS5 index of all session JSONLs under
+~/.claude/projects/ (subagent sessions included): user prompts, assistant
+text, and tool calls (tool name, command, file path, other string inputs).
+Tool results are not indexed (nor decoded: hooklib.transcript skips them).
+
+Each run first brings the index up to date: files unchanged in mtime and
+size are skipped, grown files are read from where the last run stopped
+(hooklib.transcript cursor), rewritten files are re-indexed, and the
+parsing is spread over a process pool. Then the query runs against the
+index (milliseconds).
+
+Usage:
+  python ~/.claude/skills/claude-code-session-extraction/scripts/session-search.py migration bug
+  python .../session-search.py "drizzle migrate" --project myapp --since 2025-01-01
+  python .../session-search.py --tool Bash --path src/db "db:migrate"
+  python .../session-search.py fixed migration --sessions    # one line per session
+  python .../session-search.py --reindex                     # rebuild from scratch
+
+Index: %TEMP%/claude-session-search/index.sqlite (--index to relocate)
+"""
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.expanduser("~/.claude/skills/hook-runtime/scripts"))
+from hooklib.transcript import IncrementalReader  # noqa: E402
+
+PROJECTS_DIR = os.path.expanduser("~/.claude/projects")
+INDEX_PATH = os.path.join(tempfile.gettempdir(), "claude-session-search", "index.sqlite")
+SCHEMA_VERSION = "2"
+MAX_TEXT = 20000     # chars indexed per text block
+MAX_INPUT = 4000     # chars indexed per tool call
+PATH_KEYS = ("file_path", "path", "notebook_path")
+ENTRY_TYPES = ("user", "assistant", "summary")
+BLOCK_TYPES = ("text", "tool_use")
+SKIP_KEYS = ("command", "old_string", "content") + PATH_KEYS  # indexed separately / too bulky
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY, path TEXT UNIQUE, project TEXT, session TEXT,
+    mtime REAL, size INTEGER, cursor TEXT, seq INTEGER, title TEXT);
+CREATE TABLE IF NOT EXISTS docs (
+    id INTEGER PRIMARY KEY, file INTEGER, seq INTEGER, ts TEXT,
+    role TEXT, tool TEXT, file_path TEXT);
+CREATE INDEX IF NOT EXISTS docs_file ON docs (file);
+CREATE INDEX IF NOT EXISTS docs_ts ON docs (ts);
+CREATE VIRTUAL TABLE IF NOT EXISTS fts USING fts5(text, tokenize = 'unicode61');
+"""
+
+
+# -- parsing (pool workers) --
+
+
+def _input_text(inp):
+    """Searchable text of a tool call: command first, then other string inputs."""
+    parts = [inp.get("command")] if isinstance(inp.get("command"), str) else []
+    parts += [v for k, v in inp.items()
+              if isinstance(v, str) and k not in SKIP_KEYS]
+    return "\n".join(parts)[:MAX_INPUT]
+
+
+def entry_docs(entry, seq):
+    """(seq, ts, role, tool, file_path, text) rows for one transcript entry."""
+    etype = entry.get("type")
+    ts = (entry.get("timestamp") or "")[:19]
+    content = (entry.get("message") or {}).get("content")
+    rows = []
+    if etype == "user":
+        if isinstance(content, str) and content:
+            rows.append((seq, ts, "user", None, None, content[:MAX_TEXT]))
+        elif isinstance(content, list):
+            for block in content:
+                if isinstance(block, dict) and block.get("type") == "text" and block.get("text"):
+                    rows.append((seq, ts, "user", None, None, block["text"][:MAX_TEXT]))
+    elif etype == "assistant" and isinstance(content, list):
+        for block in content:
+            if not isinstance(block, dict):
+                continue
+            if block.get("type") == "text" and block.get("text"):
+                rows.append((seq, ts, "assistant", None, None, block["text"][:MAX_TEXT]))
+            elif block.get("type") == "tool_use":
+                inp = block.get("input") if isinstance(block.get("input"), dict) else {}
+                path = next((inp[k] for k in PATH_KEYS if isinstance(inp.get(k), str)), None)
+                name = block.get("name", "")
+                rows.append((seq, ts, "tool", name, path,
+                             " ".join(filter(None, (name, path, _input_text(inp))))))
+    return rows
+
+
+def parse_file(task):
+    """Worker: index rows appended to one session since ``cursor``."""
+    path, cursor, seq = task
+    reader = IncrementalReader(path, json.loads(cursor) if cursor else None)
+    if reader.reset:
+        seq = 0
+    rows, title, start = [], None, seq
+    for entry in reader.entries(ENTRY_TYPES, BLOCK_TYPES, ("toolUseResult",)):
+        seq = start + reader.count
+        if entry.get("type") == "summary" and isinstance(entry.get("summary"), str):
+            title = entry["summary"]
+        rows.extend(entry_docs(entry, seq))
+    return path, reader.reset, json.dumps(reader.cursor()), start + reader.count, title, rows
+
+
+# -- index --
+
+
+def session_files(projects_dir):
+    """{path: (project, session, mtime, size)} for every session JSONL."""
+    out = {}
+    for root, _, files in os.walk(projects_dir):
+        rel = os.path.relpath(root, projects_dir)
+        if rel == ".":
+            continue
+        project = rel.split(os.sep)[0]
+        for fname in files:
+            if fname.endswith(".jsonl"):
+                path = os.path.join(root, fname)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                out[path] = (project, fname[:-6], st.st_mtime, st.st_size)
+    return out
+
+
+class SessionIndex:
+    def __init__(self, path=INDEX_PATH):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.db = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        version = self.db.execute(
+            "SELECT name FROM sqlite_master WHERE name = 'meta'").fetchone() and self.db.execute(
+            "SELECT value FROM meta WHERE key = 'schema'").fetchone()
+        if version and version[0] != SCHEMA_VERSION:
+            self.drop()
+        self.db.executescript(_SCHEMA)
+        self.db.execute("INSERT OR REPLACE INTO meta VALUES ('schema', ?)", (SCHEMA_VERSION,))
+
+    def drop(self):
+        for table in ("fts", "docs", "files", "meta"):
+            self.db.execute(f"DROP TABLE IF EXISTS {table}")
+
+    def _delete_docs(self, file_id):
+        self.db.execute("DELETE FROM fts WHERE rowid IN (SELECT id FROM docs WHERE file = ?)",
+                        (file_id,))
+        self.db.execute("DELETE FROM docs WHERE file = ?", (file_id,))
+
+    def update(self, projects_dir=PROJECTS_DIR, workers=None, verbose=False):
+        """Bring the index up to date; returns (files parsed, files removed)."""
+        on_disk = session_files(projects_dir)
+        known = {row[0]: row[1:] for row in self.db.execute(
+            "SELECT path, id, mtime, size, cursor, seq FROM files")}
+        tasks = []
+        for path, (project, session, mtime, size) in on_disk.items():
+            old = known.get(path)
+            if old and old[1] == mtime and old[2] == size:
+                continue
+            tasks.append((path, old[3] if old else None, old[4] if old else 0))
+        gone = [known[p][0] for p in known if p not in on_disk]
+
+        db = self.db
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            for file_id in gone:
+                self._delete_docs(file_id)
+                db.execute("DELETE FROM files WHERE id = ?", (file_id,))
+            if tasks:
+                # biggest files first so the pool stays busy to the end
+                tasks.sort(key=lambda t: -on_disk[t[0]][3])
+                if len(tasks) == 1 or workers == 1:
+                    results = map(parse_file, tasks)
+                    pool = None
+                else:
+                    pool = ProcessPoolExecutor(workers)
+                    results = pool.map(parse_file, tasks, chunksize=4)
+                try:
+                    for done, (path, reset, cursor, seq, title, rows) in enumerate(results, 1):
+                        self._store(path, on_disk[path], known.get(path), reset, cursor,
+                                    seq, title, rows)
+                        if verbose:
+                            print(f"\rindexing {done}/{len(tasks)}", end="", file=sys.stderr)
+                finally:
+                    if pool:
+                        pool.shutdown()
+                if verbose:
+                    print(file=sys.stderr)
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        return len(tasks), len(gone)
+
+    def _store(self, path, stat, old, reset, cursor, seq, title, rows):
+        project, session, mtime, size = stat
+        db = self.db
+        if old:
+            file_id = old[0]
+            if reset:
+                self._delete_docs(file_id)
+            db.execute("UPDATE files SET mtime = ?, size = ?, cursor = ?, seq = ?,"
+                       " title = COALESCE(?, title) WHERE id = ?",
+                       (mtime, size, cursor, seq, title, file_id))
+        else:
+            file_id = db.execute(
+                "INSERT INTO files (path, project, session, mtime, size, cursor, seq, title)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (path, project, session, mtime, size, cursor, seq, title)).lastrowid
+        for r_seq, ts, role, tool, file_path, text in rows:
+            doc_id = db.execute(
+                "INSERT INTO docs (file, seq, ts, role, tool, file_path) VALUES (?, ?, ?, ?, ?, ?)",
+                (file_id, r_seq, ts, role, tool, file_path)).lastrowid
+            db.execute("INSERT INTO fts (rowid, text) VALUES (?, ?)", (doc_id, text))
+
+    def search(self, query, project=None, since=None, until=None, tool=None, path=None,
+               role=None, limit=20, raw=False):
+        where, params = ["fts MATCH ?"], [query if raw else fts_query(query)]
+        if project:
+            where.append("f.project LIKE ?")
+            params.append(f"%{project}%")
+        if since:
+            where.append("d.ts >= ?")
+            params.append(since)
+        if until:
+            where.append("d.ts < ?")
+            params.append(until)
+        if tool:
+            where.append("d.tool = ?")
+            params.append(tool)
+        if path:
+            where.append("d.file_path LIKE ?")
+            params.append(f"%{path}%")
+        if role:
+            where.append("d.role = ?")
+            params.append(role)
+        sql = (
+            "SELECT f.project, f.session, f.title, f.path, d.seq, d.ts, d.role, d.tool,"
+            " d.file_path, snippet(fts, 0, '[', ']', ' ... ', 16), bm25(fts) AS rank"
+            " FROM fts JOIN docs d ON d.id = fts.rowid JOIN files f ON f.id = d.file"
+            f" WHERE {' AND '.join(where)} ORDER BY rank LIMIT ?")
+        return self.db.execute(sql, params + [limit]).fetchall()
+
+
+def fts_query(text):
+    """Plain words -> FTS5 query: every word must match (quoted, so '-' or ':' are literal)."""
+    words = [w.replace('"', '""') for w in text.split()]
+    return " ".join(f'"{w}"' for w in words)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    ap.add_argument("query", nargs="*", help="words that must all occur (or FTS5 syntax with --raw)")
+    ap.add_argument("--project", help="project folder name contains this text")
+    ap.add_argument("--since", help="on/after this date (YYYY-MM-DD[THH:MM])")
+    ap.add_argument("--until", help="before this date")
+    ap.add_argument("--tool", help="only tool calls of this tool (Bash, Edit, ...)")
+    ap.add_argument("--path", help="only tool calls whose file path contains this text")
+    ap.add_argument("--role", choices=("user", "assistant", "tool"))
+    ap.add_argument("--limit", type=int, default=20)
+    ap.add_argument("--sessions", action="store_true", help="group hits by session")
+    ap.add_argument("--raw", action="store_true", help="pass the query to FTS5 unchanged")
+    ap.add_argument("--projects", default=PROJECTS_DIR)
+    ap.add_argument("--index", default=INDEX_PATH)
+    ap.add_argument("--no-update", action="store_true", help="query the index as it is")
+    ap.add_argument("--reindex", action="store_true", help="drop and rebuild the index")
+    ap.add_argument("--workers", type=int)
+    args = ap.parse_args()
+
+    if hasattr(sys.stdout, "reconfigure"):
+        sys.stdout.reconfigure(encoding="utf-8")
+    index = SessionIndex(os.path.expanduser(args.index))
+    if args.reindex:
+        index.drop()
+        index = SessionIndex(os.path.expanduser(args.index))
+    if not args.no_update:
+        start = time.perf_counter()
+        parsed, removed = index.update(args.projects, args.workers, verbose=sys.stderr.isatty())
+        if parsed or removed:
+            print(f"index: {parsed} file(s) updated, {removed} removed"
+                  f" in {time.perf_counter() - start:.1f} s", file=sys.stderr)
+    if not args.query:
+        if not args.reindex:
+            ap.print_usage()
+        return
+
+    start = time.perf_counter()
+    try:
+        hits = index.search(" ".join(args.query), args.project, args.since, args.until,
+                            args.tool, args.path, args.role,
+                            args.limit * (20 if args.sessions else 1), args.raw)
+    except sqlite3.OperationalError as e:
+        print(f"bad query: {e}", file=sys.stderr)
+        sys.exit(1)
+    elapsed = (time.perf_counter() - start) * 1000
+
+    if args.sessions:
+        seen = {}
+        for hit in hits:
+            seen.setdefault(hit[3], []).append(hit)
+        for path, group in list(seen.items())[:args.limit]:
+            project, session, title, _, seq, ts, role, tool, fp, snip, _ = group[0]
+            print(f"{ts[:16]}  {project}  {session}  ({len(group)} hit(s))  {title or ''}")
+            print(f"    {' '.join(snip.split())}")
+            print(f"    {path}")
+    else:
+        for project, session, title, path, seq, ts, role, tool, fp, snip, _ in hits:
+            what = f"{tool}" + (f" {fp}" if fp else "") if role == "tool" else role
+            print(f"{ts[:16]}  {project}  {session[:8]}#{seq}  {what}")
+            print(f"    {' '.join(snip.split())}")
+    print(f"{len(hits)} hit(s) in {elapsed:.0f} ms", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
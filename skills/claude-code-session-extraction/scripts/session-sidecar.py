@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""Build and read columnar sidecars of Claude Code session transcripts.
+
+Each ``<session-uuid>.jsonl`` gets a ``<session-uuid>.cols`` next to it
+(hooklib.sidecar): one row per prompt, text block, tool call and tool
+result with entry type, timestamp, tool name, file path, command and text,
+plus the byte range of the JSONL line for everything else. Tools that only
+need that metadata map the sidecar instead of parsing the JSONL.
+
+Updating is incremental: a sidecar already covering its JSONL costs two
+small reads, a grown session has only its new lines parsed, a rewritten one
+is rebuilt. Files are spread over a process pool.
+
+Usage:
+  python ~/.claude/skills/claude-code-session-extraction/scripts/session-sidecar.py
+  python .../session-sidecar.py --project myapp --rebuild
+  python .../session-sidecar.py --show ~/.claude/projects/<PROJECT>/<SESSION>.jsonl
+  python .../session-sidecar.py --show <SESSION>.jsonl --kind tool_use --tool Bash
+  python .../session-sidecar.py --remove          # delete every sidecar
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.expanduser("~/.claude/skills/hook-runtime/scripts"))
+from hooklib import sidecar  # noqa: E402
+
+PROJECTS_DIR = os.path.expanduser("~/.claude/projects")
+
+
+def session_files(projects_dir, project=None):
+    """Every session JSONL (subagent sessions included), biggest first."""
+    out = []
+    for root, _, files in os.walk(projects_dir):
+        rel = os.path.relpath(root, projects_dir)
+        if rel == "." or (project and project.lower() not in rel.split(os.sep)[0].lower()):
+            continue
+        for fname in files:
+            if fname.endswith(".jsonl"):
+                path = os.path.join(root, fname)
+                try:
+                    out.append((os.path.getsize(path), path))
+                except OSError:
+                    continue
+    return [p for _, p in sorted(out, reverse=True)]
+
+
+def convert(task):
+    """Worker: (path, rows written, error)."""
+    path, rebuild = task
+    try:
+        if rebuild and os.path.exists(sidecar.sidecar_path(path)):
+            os.unlink(sidecar.sidecar_path(path))
+        return path, sidecar.update(path), None
+    except (OSError, ValueError) as e:
+        return path, 0, str(e)
+
+
+def show(path, kind=None, tool=None, limit=None):
+    where = {k: v for k, v in (("kind", kind), ("tool", tool)) if v is not None}
+    start = time.perf_counter()
+    with sidecar.load(path) as sc:
+        for n, row in enumerate(sc.rows(**where)):
+            if limit is not None and n >= limit:
+                break
+            what = row.command or row.file_path or row.text
+            label = f"{row.kind or row.type} {row.tool}".strip()
+            print(f"{row.seq:>6}  {row.ts[:19]:<19}  {label:<24}  {' '.join(what.split())[:120]}")
+        total = len(sc)
+    print(f"{total} row(s), loaded in {(time.perf_counter() - start) * 1000:.0f} ms",
+          file=sys.stderr)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    ap.add_argument("paths", nargs="*", help="session JSONL files (default: every session)")
+    ap.add_argument("--project", help="project folder name contains this text")
+    ap.add_argument("--projects", default=PROJECTS_DIR)
+    ap.add_argument("--rebuild", action="store_true", help="rewrite sidecars from scratch")
+    ap.add_argument("--remove", action="store_true", help="delete the sidecars instead")
+    ap.add_argument("--show", metavar="JSONL", help="print one session's rows")
+    ap.add_argument("--kind", help="with --show: prompt, text, tool_use, tool_result, tool_error")
+    ap.add_argument("--tool", help="with --show: only rows of this tool")
+    ap.add_argument("--limit", type=int)
+    ap.add_argument("--workers", type=int)
+    args = ap.parse_args()
+
+    if hasattr(sys.stdout, "reconfigure"):
+        sys.stdout.reconfigure(encoding="utf-8")
+    if args.show:
+        show(os.path.expanduser(args.show), args.kind, args.tool, args.limit)
+        return
+    paths = [os.path.expanduser(p) for p in args.paths] or session_files(
+        os.path.expanduser(args.projects), args.project)
+    if args.remove:
+        removed = 0
+        for path in paths:
+            try:
+                os.unlink(sidecar.sidecar_path(path))
+                removed += 1
+            except OSError:
+                pass
+        print(f"{removed} sidecar(s) removed")
+        return
+
+    start = time.perf_counter()
+    tasks = [(path, args.rebuild) for path in paths]
+    if len(tasks) <= 1 or args.workers == 1:
+        results, pool = map(convert, tasks), None
+    else:
+        pool = ProcessPoolExecutor(args.workers)
+        results = pool.map(convert, tasks, chunksize=4)
+    updated = rows = failed = 0
+    try:
+        for path, written, error in results:
+            if error:
+                failed += 1
+                print(f"{path}: {error}", file=sys.stderr)
+            elif written:
+                updated += 1
+                rows += written
+    finally:
+        if pool:
+            pool.shutdown()
+    source = sum(os.path.getsize(p) for p in paths if os.path.exists(p))
+    cols = sum(os.path.getsize(sidecar.sidecar_path(p)) for p in paths
+               if os.path.exists(sidecar.sidecar_path(p)))
+    print(f"{len(paths)} session(s), {updated} sidecar(s) written ({rows} rows), {failed} failed"
+          f" in {time.perf_counter() - start:.1f} s; {source / 1048576:.1f} MB JSONL ->"
+          f" {cols / 1048576:.1f} MB sidecars")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
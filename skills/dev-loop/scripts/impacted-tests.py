@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""Print the narrowed test commands for the files changed on this branch.
+
+Maps changed files to the test files that import them, directly or through
+other modules (hooklib/impact.py: import graph of the repo, cached in the
+git dir and rebuilt only for files changed since the last run), and prints
+one vitest / jest / playwright / pytest command per runner and package.
+
+Run the printed commands as they are: the dev-loop push gate accepts a
+passing narrowed run when it covers every test the files the pushed branch
+changes against its upstream affect. When the edits cannot be narrowed (a config or manifest changed, a
+file was deleted, no test reaches them) the full suite is needed and the
+reason is printed instead.
+
+Changed files default to everything that differs from the upstream branch
+(else origin's default branch), committed or not, plus untracked files.
+
+Usage:
+  python ~/.claude/skills/dev-loop/scripts/impacted-tests.py
+  python .../impacted-tests.py src/auth.ts src/session.ts
+  python .../impacted-tests.py --base main --json
+
+Exit codes:
+  0 = printed narrowed commands, or the reason the full suite is needed
+  1 = not a git repository
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.expanduser("~/.claude/skills/hook-runtime/scripts"))
+from hooklib import impact  # noqa: E402
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    ap.add_argument("files", nargs="*", help="changed files (default: git diff, see above)")
+    ap.add_argument("--base", help="compare against this ref instead of the upstream")
+    ap.add_argument("--cwd", default=os.getcwd())
+    ap.add_argument("--json", action="store_true", help="machine-readable output")
+    args = ap.parse_args()
+
+    start = time.perf_counter()
+    files = args.files or impact.changed_files(args.cwd, args.base)
+    sel = impact.select(args.cwd, files)
+    if sel.graph is None:
+        print(f"{args.cwd}: not a git repository", file=sys.stderr)
+        sys.exit(1)
+    commands = sel.commands()
+    if args.json:
+        print(json.dumps({"edited": sel.edited, "full": sel.full, "tests": sel.tests,
+                          "uncovered": sel.uncovered, "commands": commands}, indent=2))
+        return
+    print(f"{len(sel.edited)} changed file(s) -> {len(sel.tests)} test file(s)"
+          f" (graph: {len(sel.graph.files)} files, {sel.graph.rescanned} rescanned,"
+          f" {(time.perf_counter() - start) * 1000:.0f} ms)", file=sys.stderr)
+    for rel in sel.uncovered:
+        print(f"  not reached by any test: {rel}", file=sys.stderr)
+    if sel.full:
+        print(f"full suite needed: {sel.full}")
+        return
+    print("\n".join(commands))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,25 +1,32 @@
 #!/usr/bin/env python3
 """PostToolUse hook: Mark that code files were edited in this session.
 
-Fires after Edit/Write/MultiEdit. If the edited file is a code file
-(not doc/config), creates a per-repo marker. The push blocker uses this
-to distinguish code sessions from doc-only sessions.
+Fires after Edit/Write/MultiEdit. Appends an "edit" event for the file to
+the session ledger (hooklib/ledger.py). If the edited file is a code file
+(not doc/config), adds it to this session's set of edited code files for
+the repo. The push blocker uses this to distinguish code sessions from
+doc-only sessions.
 
 Uses the same doc/code classification as stop-verify-pipeline.py.
 
-Marker location: %TEMP%/claude-tdd-markers/code-edits-<cwd_hash>
+Marker location: hooklib/state.py store, set "code-edits" (session, repo);
+ledger event kind "edit"
+
+Reads only the fields below (listed for it in hooks.json too), so a Write
+of a large file is not decoded.
 
 Exit code: Always 0 (informational).
 """
-import json
 import sys
 import os
-import tempfile
-import hashlib
 
-try:
-    data = json.load(sys.stdin)
-except (json.JSONDecodeError, EOFError):
+sys.path.insert(0, os.path.expanduser("~/.claude/skills/hook-runtime/scripts"))
+from hooklib import ledger, read_fields
+from hooklib.state import open_store, repo_key, session_key
+
+data = read_fields("session_id", "transcript_path", "hook_event_name", "tool_name",
+                   "tool_input.file_path")
+if data is None:
     sys.exit(0)
 
 tool_name = data.get("tool_name", "")
@@ -30,6 +37,10 @@ file_path = data.get("tool_input", {}).get("file_path", "")
 if not file_path:
     sys.exit(0)
 
+# Every edit (doc or code) goes to the session ledger; the Stop hook counts
+# doc/config edits separately.
+ledger.record(data)
+
 fp = file_path.replace("\\", "/").lower()
 
 # Doc/config extensions (aligned with stop-verify-pipeline.py)
@@ -42,15 +53,7 @@ if any(fp.endswith(ext) for ext in DOC_EXTENSIONS):
 if any(seg in fp for seg in DOC_PATHS):
     sys.exit(0)
 
-# This is a code file edit — create marker
-cwd = os.getcwd()
-cwd_hash = hashlib.md5(cwd.replace("\\", "/").lower().encode()).hexdigest()[:12]
-
-marker_dir = os.path.join(tempfile.gettempdir(), "claude-tdd-markers")
-os.makedirs(marker_dir, exist_ok=True)
-marker_file = os.path.join(marker_dir, f"code-edits-{cwd_hash}")
-
-with open(marker_file, "w") as f:
-    f.write(file_path)
+# This is a code file edit — record it
+open_store().add(session_key(data), repo_key(), "code-edits", file_path)
 
 sys.exit(0)
@@ -1,61 +1,52 @@
 #!/usr/bin/env python3
-"""PostToolUse hook: Mark that tests were run for the current repo.
+"""PostToolUse hook: Record a test run against the tree it ran on.
 
-Fires after every Bash command. If the command matches known test patterns,
-creates a session marker file keyed to the repo's CWD. This marker is
-checked by preToolUse-block-push-without-tests.py before allowing git push.
+Fires after every Bash command. Appends the command's classified events to
+the session ledger (hooklib/ledger.py). If the command matches known test
+patterns (ledger.TEST_PATTERNS), also records the run -- command, exit status,
+the hash of the working tree and the test files it was narrowed to, if any
+(hooklib/impact.py) -- for the repo (hooklib/testruns.py). It is
+checked by preToolUse-block-push-without-tests.py before allowing git push:
+a push goes through when the tree it publishes has a passing run, from this
+session or an earlier one.
 
-Marker location: %TEMP%/claude-tdd-markers/tests-run-<cwd_hash>
+PostToolUse only fires for commands that exited 0; a test piped into another
+program without pipefail, or sent to the background, is recorded with status
+None (not passing).
+
+Record location: hooklib/state.py store, key "test-run:<tree>" (repo-wide);
+ledger events: kinds test / commit / push / deploy / migration_* / signal
 
 Exit code: Always 0 (PostToolUse hooks are informational, never block).
 """
-import json
 import sys
 import os
-import tempfile
-import hashlib
 
-try:
-    data = json.load(sys.stdin)
-except (json.JSONDecodeError, EOFError):
+sys.path.insert(0, os.path.expanduser("~/.claude/skills/hook-runtime/scripts"))
+from hooklib import impact, ledger, read_input, testruns
+from hooklib.state import session_key
+
+data = read_input()
+if data is None:
     sys.exit(0)
 
 tool_name = data.get("tool_name", "")
 if tool_name != "Bash":
     sys.exit(0)
 
-tool_input = data.get("tool_input", {})
-command = tool_input.get("command", "").lower()
-
-# Test command patterns (aligned with stop-verify-pipeline.py)
-TEST_PATTERNS = [
-    "npm test",
-    "npm run test",
-    "npx vitest",
-    "npx jest",
-    "npx playwright",
-    "test:free",
-    "test:all",
-    "test:e2e",
-    "test:unit",
-    "pytest",
-    "go test",
-    "cargo test",
-    "phpunit",
-    "playwright test",
-]
-
-if not any(pattern in command for pattern in TEST_PATTERNS):
+# Append the classified command (test / commit / push / deploy / migration)
+# to the session ledger (hooklib/ledger.py); Stop hooks read it from there.
+events = ledger.record(data)
+if not any(kind == "test" for kind, _ in events):
     sys.exit(0)
 
+tool_input = data.get("tool_input", {})
+command = tool_input.get("command", "")
+if "shard-tests" in command:
+    sys.exit(0)  # shard-tests.py records its own runs, with the scope it ran
 cwd = os.getcwd()
-cwd_hash = hashlib.md5(cwd.replace("\\", "/").lower().encode()).hexdigest()[:12]
-
-marker_dir = os.path.join(tempfile.gettempdir(), "claude-tdd-markers")
-os.makedirs(marker_dir, exist_ok=True)
-marker_file = os.path.join(marker_dir, f"tests-run-{cwd_hash}")
-
-with open(marker_file, "w") as f:
-    f.write(command)
+testruns.record(cwd, testruns.worktree_tree(cwd), command,
+                testruns.vouched_status(command, tool_input), session_key(data),
+                impact.run_scope(command, cwd))
 
 sys.exit(0)
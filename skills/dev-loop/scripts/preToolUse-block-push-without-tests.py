@@ -1,31 +1,40 @@
 #!/usr/bin/env python3
-"""PreToolUse hook: Block git push if tests haven't been run this session.
+"""PreToolUse hook: Block git push unless the pushed tree passed its tests.
 
-Fires before every Bash command. If the command contains 'git push',
-checks for a per-repo session marker created by postToolUse-mark-tests-run.py.
+Fires before every Bash command. If the command runs 'git push', resolves
+the tree of every ref it publishes and looks for a passing test run of that
+exact tree (hooklib/testruns.py), recorded by postToolUse-mark-tests-run.py
+in this session or an earlier one. A run from before later edits does not
+count; a run on a byte-identical tree does, whichever session made it.
+A run narrowed to some test files counts when they include every test the
+files the pushed ref changes against its upstream affect (hooklib/impact.py,
+impacted-tests.py).
 
 Uses the same doc/code distinction as stop-verify-pipeline.py:
 if only doc/config files were edited (no code edits), push is allowed.
 
+Verdicts are cached by the dispatcher (hooklib/verdicts.py), which is what
+keeps the common case -- a command that is not a push -- cheap. A real push
+reads the session's markers, so its verdict is never cached.
+
 Exclusions:
 - Context-engineering repos (no test suites)
 - Dry-run pushes
 - Doc/config-only changes (no code files edited)
 
 Exit codes:
-  0 = allow (not a push, tests were run, excluded repo, or doc-only session)
-  2 = block (push without tests when code was edited)
+  0 = allow (not a push, pushed tree passed, excluded repo, or doc-only session)
+  2 = block (push of an untested tree when code was edited)
 """
-import json
 import sys
 import os
-import tempfile
-import hashlib
-import re
 
-try:
-    data = json.load(sys.stdin)
-except (json.JSONDecodeError, EOFError):
+sys.path.insert(0, os.path.expanduser("~/.claude/skills/hook-runtime/scripts"))
+from hooklib import impact, read_input, shell, testruns, verdicts
+from hooklib.state import open_store, repo_key, session_key
+
+data = read_input()
+if data is None:
     sys.exit(0)
 
 tool_name = data.get("tool_name", "")
@@ -34,16 +43,21 @@ if tool_name != "Bash":
 
 tool_input = data.get("tool_input", {})
 command = tool_input.get("command", "")
-command_lower = command.lower()
 
-# Only care about git push commands
-if not re.search(r'\bgit\s+push\b', command_lower):
+# Only care about commands that actually run git push (hooklib/shell.py tokenizer:
+# "git -C repo push" counts, "git commit -m 'then git push'" does not)
+GIT_VALUE_OPTIONS = ("-C", "-c", "--git-dir", "--work-tree", "--namespace")
+pushes = shell.parse(command).find("git", "push", GIT_VALUE_OPTIONS)
+if not pushes:
     sys.exit(0)
 
 # Allow dry-run pushes
-if "--dry-run" in command_lower:
+if all("--dry-run" in inv.args or "-n" in inv.args for inv in pushes):
     sys.exit(0)
 
+# From here the verdict depends on the session's markers, not just the command
+verdicts.uncacheable()
+
 cwd = os.getcwd()
 cwd_normalized = cwd.replace("\\", "/").lower()
 
@@ -57,31 +71,69 @@ EXCLUDED_REPO_PATTERNS = [
 if any(pattern in cwd_normalized for pattern in EXCLUDED_REPO_PATTERNS):
     sys.exit(0)
 
-cwd_hash = hashlib.md5(cwd_normalized.encode()).hexdigest()[:12]
-
-marker_dir = os.path.join(tempfile.gettempdir(), "claude-tdd-markers")
-marker_file = os.path.join(marker_dir, f"tests-run-{cwd_hash}")
-
-# If tests were run, allow
-if os.path.exists(marker_file):
-    sys.exit(0)
+store = open_store()
+session, repo = session_key(data), repo_key(cwd)
 
 # Check if only doc/config files were edited (same logic as stop-verify-pipeline.py)
-# If a code-edits marker exists, block. If not, allow (doc-only session).
-code_marker = os.path.join(marker_dir, f"code-edits-{cwd_hash}")
-if not os.path.exists(code_marker):
+# If code edits were recorded, check the tests. If not, allow (doc-only session).
+if not store.has_members(session, repo, "code-edits"):
     # No code edits detected — doc/config-only session, push is fine
     sys.exit(0)
 
+# Allow when every pushed tree has a passing test run. A run narrowed to some
+# test files (hooklib/impact.py) counts if it covers every test that the files
+# the pushed ref changes against its upstream can affect -- whoever changed
+# them (Edit, sed, codegen, another session).
+trees = testruns.pushed_trees(cwd, pushes)
+untested, narrowed = {}, None
+if trees is not None:
+    for tree, ref in trees.items():
+        run = testruns.passing(cwd, tree, store)
+        if run is not None and run.get("scope", "full") != "full":
+            narrowed = impact.select(cwd, impact.changed_files(cwd, head=ref))
+            if not impact.covers(run["scope"], narrowed):
+                run = None
+        if run is None:
+            untested[tree] = ref
+    if not untested:
+        sys.exit(0)
+
 repo_name = os.path.basename(cwd)
-content = (
-    f"BLOCKED: git push attempted but no tests were run this session "
-    f"for {repo_name}.\n\n"
-    "Dev-loop SOP requires running the test suite BEFORE pushing code changes.\n"
-    "Run the project's test command first (e.g., npm test, pytest).\n\n"
-    "If this repo has no tests, add it to EXCLUDED_REPO_PATTERNS in\n"
-    "~/.claude/skills/dev-loop/scripts/preToolUse-block-push-without-tests.py"
-)
+if trees is None:
+    problem = f"could not resolve the tree being pushed in {repo_name}."
+else:
+    problem = "no passing test run covering " + ", ".join(
+        f"{ref} (tree {tree[:12]})" for tree, ref in untested.items()) + f" in {repo_name}."
+lines = [f"BLOCKED: git push attempted but {problem}", ""]
+for tree in untested:
+    last = testruns.last_run(cwd, tree, store)
+    if last is None:
+        continue
+    if last.get("status") != 0:
+        lines.append(f"The last test run on this tree ({last['command'][:60]}) did not show"
+                     " its exit status: it was piped into another program or backgrounded.")
+        lines.append("Re-run it in the foreground, unpiped (or with set -o pipefail).")
+    elif last.get("scope") == []:
+        lines.append(f"The passing run ({last['command'][:60]}) was filtered by test name, tag,"
+                     " shard or test id, or named no test file: it proves no whole test file.")
+        lines.append("Run the test files, or the suite, without filters.")
+    elif narrowed is not None and narrowed.full:
+        lines.append(f"The passing run was narrowed to some test files, but the edits need"
+                     f" the full suite ({narrowed.full}).")
+    elif narrowed is not None:
+        lines.append("The passing run was narrowed to test files that miss some of the tests"
+                     " your edits affect. Run:")
+        lines.extend(f"  {command}" for command in narrowed.commands())
+    lines.append("")
+    break
+content = "\n".join(lines + [
+    "Dev-loop SOP requires running the test suite BEFORE pushing code changes.",
+    "Tests count for the exact tree they ran on: commit, then run the project's",
+    "test command (e.g., npm test, pytest) on the tree you push.",
+    "",
+    "If this repo has no tests, add it to EXCLUDED_REPO_PATTERNS in",
+    "~/.claude/skills/dev-loop/scripts/preToolUse-block-push-without-tests.py",
+])
 
 border = "=" * 70
 boxed = "\n".join(f"| {line}" for line in content.split("\n"))
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""Run the test suite as timing-balanced shards in parallel worker processes.
+
+Splits the repository's test files (vitest, jest, Playwright, pytest; found
+by the import graph of hooklib/impact.py) into N shards of about equal
+expected duration, from per-file timings of earlier runs kept in the git
+dir, runs the shards in parallel and merges their reports
+(hooklib/shards.py). Wall-clock time is about the longest shard instead
+of the whole suite.
+
+When the working tree did not change while the shards ran, the run is
+recorded for that tree (hooklib/testruns.py) exactly as a foreground test
+command is, with the test files it ran as its scope: the dev-loop push gate
+accepts it for changes whose tests are among them. It is never recorded as
+the full suite, since test files outside the runners' naming conventions
+are not found here; for a suite-wide config change, run the runner itself.
+
+Playwright: each shard starts the config's webServer. With a fixed port,
+start the server once yourself (reuseExistingServer) or derive the port
+from CLAUDE_SHARD (1..CLAUDE_SHARDS) in the config.
+
+Usage:
+  python ~/.claude/skills/dev-loop/scripts/shard-tests.py         # one shard per core
+  python .../shard-tests.py --shards 4 --runner playwright
+  python .../shard-tests.py --runner vitest,jest,pytest --plan    # show shards, run nothing
+  python .../shard-tests.py --impacted                            # only tests the branch affects
+  python .../shard-tests.py src/auth.test.ts e2e/login.spec.ts
+
+Exit codes:
+  0 = every shard passed
+  1 = a shard failed (failing files and the log tail are printed)
+  2 = nothing to run (not a git repository, no test files)
+"""
+import argparse
+import json
+import os
+import posixpath
+import shlex
+import shutil
+import sys
+
+sys.path.insert(0, os.path.expanduser("~/.claude/skills/hook-runtime/scripts"))
+from hooklib import impact, shards, testruns  # noqa: E402
+
+LOG_TAIL = 30
+
+
+def select_tests(graph, args):
+    """The test files to run for the command line."""
+    tests = graph.tests
+    if args.runner:
+        wanted = set(args.runner.split(","))
+        tests = [rel for rel in tests if graph.runner(rel)[0] in wanted]
+    if args.impacted:
+        sel = impact.select(args.cwd, impact.changed_files(args.cwd, args.base))
+        if sel.full:
+            print(f"full suite needed: {sel.full}", file=sys.stderr)
+        else:
+            tests = [rel for rel in tests if rel in set(sel.tests)]
+    if args.files:
+        named = set()
+        for path in args.files:
+            rel = posixpath.relpath(os.path.abspath(os.path.join(args.cwd, path))
+                                    .replace("\\", "/"), graph.root)
+            if rel not in graph.tests:
+                print(f"{path}: not a test file", file=sys.stderr)
+                sys.exit(2)
+            named.add(rel)
+        tests = [rel for rel in tests if rel in named]
+    return tests
+
+
+def tail(path, lines=LOG_TAIL):
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            return f.read().splitlines()[-lines:]
+    except OSError:
+        return []
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    ap.add_argument("files", nargs="*", help="run only these test files")
+    ap.add_argument("--shards", type=int, default=os.cpu_count() or 1,
+                    help="parallel shards (default: one per core)")
+    ap.add_argument("--runner", help="comma-separated: vitest,jest,playwright,pytest")
+    ap.add_argument("--impacted", action="store_true",
+                    help="only the tests the branch's changes affect (impacted-tests.py)")
+    ap.add_argument("--base", help="with --impacted: compare against this ref")
+    ap.add_argument("--plan", action="store_true", help="print the shards and exit")
+    ap.add_argument("--cwd", default=os.getcwd())
+    ap.add_argument("--json", action="store_true", help="print the merged report as JSON")
+    args = ap.parse_args()
+
+    graph = impact.Graph.load(args.cwd)
+    history = shards.History.load(args.cwd)
+    if graph is None or history is None:
+        print(f"{args.cwd}: not a git repository", file=sys.stderr)
+        sys.exit(2)
+    tests = select_tests(graph, args)
+    if not tests:
+        print("no test files to run", file=sys.stderr)
+        sys.exit(2)
+    planned = shards.plan(graph, tests, history, args.shards)
+
+    if args.plan:
+        for shard in planned:
+            print(f"shard {shard.index}: {len(shard.files)} file(s), ~{shard.estimate:.1f}s")
+            for group, files in sorted(shard.groups.items()):
+                _, argv, _ = shards.command(graph, group, files, "<report>", 1)
+                print("  " + " ".join(shlex.quote(a) for a in argv)[:200])
+        return
+
+    tree = testruns.worktree_tree(args.cwd)
+    workdir = os.path.join(args.cwd, testruns.git(args.cwd, "rev-parse", "--git-path",
+                                                  "claude-shards"))
+    shutil.rmtree(workdir, ignore_errors=True)
+    print(f"{len(tests)} test file(s) in {len(planned)} shard(s), expected"
+          f" ~{max(s.estimate for s in planned):.0f}s", file=sys.stderr)
+    results = shards.run(graph, planned, workdir)
+    history.update(results)
+    report = shards.merge(results)
+    with open(os.path.join(workdir, "report.json"), "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    # Same record a foreground test command gets, unless files changed meanwhile;
+    # scoped to the files it ran, never "full" (see the module docstring)
+    recorded = tree is not None and testruns.worktree_tree(args.cwd) == tree
+    if recorded:
+        command = "shard-tests.py " + " ".join(shlex.quote(a) for a in sys.argv[1:])
+        testruns.record(args.cwd, tree, command.strip(), report["status"], scope=list(tests))
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"{'shard':<6} {'files':>6} {'expected':>9} {'took':>8}  status")
+        for shard, result in zip(planned, report["shards"]):
+            status = "passed" if result["status"] == 0 else f"FAILED ({result['status']})"
+            print(f"{shard.index:<6} {len(shard.files):>6} {result['estimate']:>8.1f}s"
+                  f" {result['seconds']:>7.1f}s  {status}")
+        speedup = report["serial"] / report["wall"] if report["wall"] else 1.0
+        print(f"{report['passed']} passed, {report['failed']} failed in {report['wall']:.1f}s"
+              f" ({report['serial']:.1f}s of work, {speedup:.1f}x)")
+    for rel, outcome in report["files"].items():
+        if outcome["failed"]:
+            print(f"FAIL {rel} (shard {outcome['shard']})", file=sys.stderr)
+    for result in report["shards"]:
+        if result["status"] != 0:
+            print(f"\n-- shard {result['shard']}: {result['log']} --", file=sys.stderr)
+            print("\n".join(tail(result["log"])), file=sys.stderr)
+    if tree is None:
+        print("not recorded for the push gate: could not hash the working tree",
+              file=sys.stderr)
+    elif not recorded:
+        print("not recorded for the push gate: files changed while the tests ran",
+              file=sys.stderr)
+    else:
+        print(f"recorded for tree {tree[:12]} ({'passing' if report['status'] == 0 else 'failing'},"
+              f" scope {len(tests)} file(s))",
+              file=sys.stderr)
+    sys.exit(0 if report["status"] == 0 else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,414 @@
+#!/usr/bin/env python3
+"""Latency benchmark for every hook script under skills/*/scripts/.
+
+Runs each script the way settings.json does (``python -c "exec(open(...))"``)
+against generated inputs sized like real traffic:
+
+  Bash      commands from a one-liner up to 50 KB heredocs
+  Write     payloads from 1 KB up to 10 MB (.ts, so prod-bypass scans them)
+  Edit      small and 1 MB new_string; MultiEdit with 20 edits
+  gmail     one send/draft call
+  prompts   UserPromptSubmit, one line and 10 KB
+  Stop      synthetic transcripts, 1 MB .. 1 GB (--transcript-mb), and session
+            ledgers of 1k .. 100k events (--ledger-events)
+
+Per (script, case) it records cold-start time (same script, trivial input),
+stdin parse time, peak RSS of the hook process and p50/p99/max wall time,
+and writes everything to a JSON results file. ``--compare old.json`` diffs
+two result files and exits 1 on regressions, or when a p99 gets within 80%
+of the hook's settings.json timeout.
+
+Hooks run against THIS tree: HOME points at a scratch dir whose .claude
+links here, and TEMP points at a scratch dir so markers/indexes from real
+sessions are neither read nor touched. Stop hooks get a fresh TEMP per run
+(no incremental index) -- the worst case; for ledger cases it starts with a
+copy of the seeded state store.
+
+Usage:
+  python bench_hooks.py                          # default corpus -> bench-results.json
+  python bench_hooks.py --transcript-mb 1 10 100 1024 --runs 5
+  python bench_hooks.py --only rules --out new.json --compare old.json
+"""
+import argparse
+import glob
+import json
+import os
+import platform
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+TREE = os.path.abspath(os.path.join(HERE, "..", "..", ".."))  # the ~/.claude tree
+sys.path.insert(0, os.path.join(HERE, "..", "scripts"))
+sys.path.insert(0, HERE)
+
+import synth  # noqa: E402
+
+TIMEOUTS = {"UserPromptSubmit": 5.0, "PreToolUse": 5.0, "PostToolUse": 5.0, "Stop": 15.0}
+GMAIL_TOOL = "mcp__gmail__send_email"
+REGRESSION = 1.2   # --compare: flag p99 more than 20% slower
+TIMEOUT_RATIO = 0.8
+
+# -- input corpus --
+
+
+def _heredoc(size):
+    body = ("INSERT INTO audit_log (id, note) VALUES (1, 'row'); -- filler\n"
+            * (size // 60 + 1))[:size]
+    return f"cat <<'EOF' > /tmp/bench.sql\n{body}\nEOF\ngit add -A && git commit -m 'bench'"
+
+
+def bash_cases():
+    return [
+        ("bash-short", {"command": "git status"}),
+        ("bash-chain", {"command": "npm run build && npm test -- --run && git push origin main"}),
+        ("bash-1KB", {"command": _heredoc(1024)}),
+        ("bash-10KB-heredoc", {"command": _heredoc(10 * 1024)}),
+        ("bash-50KB-heredoc", {"command": _heredoc(50 * 1024)}),
+    ]
+
+
+def _ts_source(size):
+    chunk = ("import { db } from './db';\n"
+             "export async function handler(req: Request) {\n"
+             "  const rows = await db.select().from(users).where(eq(users.id, req.id));\n"
+             "  return Response.json(rows);\n}\n")
+    return (chunk * (size // len(chunk) + 1))[:size]
+
+
+def write_cases():
+    sizes = (("1KB", 1024), ("100KB", 100 * 1024), ("1MB", 1 << 20), ("10MB", 10 << 20))
+    return [(f"write-{label}", {"file_path": "/repo/scripts/generated.ts",
+                                "content": _ts_source(size)})
+            for label, size in sizes]
+
+
+def edit_cases():
+    return [
+        ("edit-small", {"file_path": "/repo/src/app.ts", "old_string": "a", "new_string": "b"}),
+        ("edit-1MB", {"file_path": "/repo/src/app.ts", "old_string": "a",
+                      "new_string": _ts_source(1 << 20)}),
+    ]
+
+
+def multiedit_cases():
+    edits = [{"old_string": f"x{i}", "new_string": _ts_source(2048)} for i in range(20)]
+    return [("multiedit-20", {"file_path": "/repo/src/app.ts", "edits": edits})]
+
+
+def gmail_cases():
+    return [("gmail-send", {"to": "me@example.com", "subject": "bench", "body": "hello " * 200})]
+
+
+def prompt_cases():
+    return [
+        ("prompt-short", "fix the login bug, no qa needed"),
+        ("prompt-10KB", ("paste of a stack trace, then: what went wrong? " * 220)[:10 * 1024]),
+    ]
+
+
+TOOL_CASES = {
+    "Bash": bash_cases,
+    "Write": write_cases,
+    "Edit": edit_cases,
+    "MultiEdit": multiedit_cases,
+    GMAIL_TOOL: gmail_cases,
+}
+
+# -- hook discovery --
+
+
+def event_of(script):
+    name = os.path.basename(script)
+    for prefix, event in (("preToolUse", "PreToolUse"), ("postToolUse", "PostToolUse"),
+                          ("userPromptSubmit", "UserPromptSubmit"), ("stop", "Stop")):
+        if name.startswith(prefix):
+            return event
+    return None
+
+
+def registry_matchers():
+    """script path (relative to the tree) -> (event, matcher) from hooks.json."""
+    path = os.path.join(TREE, "skills", "hook-runtime", "hooks.json")
+    out = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for event, hooks in json.load(f).items():
+            for hook in hooks:
+                rel = hook["script"].replace("~/.claude/", "", 1)
+                out[os.path.normpath(rel)] = (event, hook.get("matcher", ""))
+    return out
+
+
+def discover(only=None):
+    """Yield (rel_path, event, tools, argv) for every benchmarkable hook."""
+    registered = registry_matchers()
+    for script in sorted(glob.glob(os.path.join(TREE, "skills", "*", "scripts", "*.py"))):
+        rel = os.path.relpath(script, TREE)
+        if only and only not in rel:
+            continue
+        if os.path.basename(script) == "hook-dispatch.py":
+            for event, tools in (("PreToolUse", ["Bash", "Write"]),
+                                 ("PostToolUse", ["Bash", "Edit"]),
+                                 ("UserPromptSubmit", []), ("Stop", [])):
+                yield rel, event, tools, [event]
+            continue
+        event, matcher = registered.get(os.path.normpath(rel), (event_of(script), None))
+        if event is None:
+            continue
+        if event in ("Stop", "UserPromptSubmit"):
+            yield rel, event, [], []
+            continue
+        if matcher is None:  # unregistered tool hook: guess from its name
+            matcher = "Bash" if "bash" in rel.lower() else ".*"
+        tools = [t for t in TOOL_CASES if re.fullmatch(matcher or ".*", t)]
+        yield rel, event, tools, []
+
+
+# -- running --
+
+
+class Sandbox:
+    """Scratch HOME (with .claude -> TREE) and TEMP for hook processes."""
+
+    def __init__(self):
+        self.root = tempfile.mkdtemp(prefix="hook-bench-")
+        self.home = os.path.join(self.root, "home")
+        os.makedirs(self.home)
+        try:
+            os.symlink(TREE, os.path.join(self.home, ".claude"), target_is_directory=True)
+        except OSError:  # no symlink privilege (Windows): bench the installed tree
+            self.home = os.path.expanduser("~")
+            print("warning: could not link tree, benchmarking ~/.claude", file=sys.stderr)
+        self.cwd = os.path.join(self.root, "repo")
+        os.makedirs(self.cwd)
+        self._n = 0
+
+    def temp_dir(self):
+        self._n += 1
+        path = os.path.join(self.root, f"tmp{self._n}")
+        os.makedirs(path)
+        return path
+
+    def env(self, temp):
+        env = dict(os.environ)
+        env.update(HOME=self.home, USERPROFILE=self.home, TMPDIR=temp, TEMP=temp, TMP=temp)
+        return env
+
+    def close(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+
+def hook_command(rel, argv):
+    path = "~/.claude/" + rel.replace(os.sep, "/")
+    code = f"import os;exec(open(os.path.expanduser('{path}'),encoding='utf-8').read())"
+    return [sys.executable, "-c", code] + argv
+
+
+def run_once(cmd, payload_file, env, cwd):
+    """Return (seconds, exit code, peak RSS KB or None) for one hook run."""
+    with open(payload_file, "rb") as stdin:
+        start = time.perf_counter()
+        proc = subprocess.Popen(cmd, stdin=stdin, stdout=subprocess.DEVNULL,
+                                stderr=subprocess.DEVNULL, env=env, cwd=cwd)
+        if hasattr(os, "wait4"):
+            _, status, usage = os.wait4(proc.pid, 0)
+            elapsed = time.perf_counter() - start
+            proc.returncode = os.waitstatus_to_exitcode(status) if hasattr(
+                os, "waitstatus_to_exitcode") else status >> 8
+            rss = usage.ru_maxrss // 1024 if sys.platform == "darwin" else usage.ru_maxrss
+        else:
+            proc.wait()
+            elapsed = time.perf_counter() - start
+            rss = None
+    return elapsed, proc.returncode, rss
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))]
+
+
+def parse_seconds(raw, repeat=5):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        json.loads(raw)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def bench_case(sandbox, rel, event, argv, case, payload, runs, fresh_temp, cold_file,
+               seed=None):
+    cmd = hook_command(rel, argv)
+    payload_file = os.path.join(sandbox.root, "payload.json")
+    raw = json.dumps(payload)
+    with open(payload_file, "w", encoding="utf-8") as f:
+        f.write(raw)
+    shared_temp = sandbox.temp_dir()
+    cold = [run_once(cmd, cold_file, sandbox.env(shared_temp), sandbox.cwd)[0]
+            for _ in range(3)]
+    times, codes, rss = [], set(), []
+    for _ in range(runs):
+        temp = sandbox.temp_dir() if fresh_temp else shared_temp
+        if seed:
+            for name in os.listdir(seed):
+                shutil.copy(os.path.join(seed, name), temp)
+        elapsed, code, peak = run_once(cmd, payload_file, sandbox.env(temp), sandbox.cwd)
+        times.append(elapsed)
+        codes.add(code)
+        if peak is not None:
+            rss.append(peak)
+        if fresh_temp:
+            shutil.rmtree(temp, ignore_errors=True)
+    ms = lambda s: round(s * 1000, 2)  # noqa: E731
+    return {
+        "script": rel.replace(os.sep, "/"), "event": event, "case": case,
+        "input_bytes": len(raw.encode("utf-8")), "runs": runs,
+        "cold_start_ms": ms(percentile(cold, 50)),
+        "parse_ms": ms(parse_seconds(raw)),
+        "p50_ms": ms(percentile(times, 50)), "p99_ms": ms(percentile(times, 99)),
+        "max_ms": ms(max(times)),
+        "peak_rss_kb": max(rss) if rss else None,
+        "exit_codes": sorted(codes),
+        "timeout_s": TIMEOUTS[event],
+    }
+
+
+def transcript_cases(sandbox, sizes_mb):
+    for mb in sizes_mb:
+        path = os.path.join(sandbox.root, f"transcript-{mb}MB.jsonl")
+        if not os.path.exists(path):
+            print(f"  generating {mb} MB transcript...", file=sys.stderr)
+            synth.write_transcript(path, mb * 1024 * 1024)
+        yield f"transcript-{mb}MB", {"session_id": "bench", "transcript_path": path,
+                                      "cwd": sandbox.cwd, "stop_hook_active": False}, None
+
+
+def ledger_cases(sandbox, counts):
+    """Stop payloads for a session whose ledger already holds ``count`` events."""
+    from hooklib.state import StateStore, repo_key
+    kinds = (("edit", "/repo/src/app.ts"), ("edit", "/repo/README.md"),
+             ("test", "npm test"), ("signal", "tests_run"), ("skill", "frontend-design"),
+             ("agent", "integration-tester"), ("commit", "git commit -m wip"))
+    for count in counts:
+        seed = os.path.join(sandbox.root, f"ledger-{count}")
+        os.makedirs(seed)
+        store = StateStore(os.path.join(seed, "claude-hook-state.sqlite"))
+        store.append_many("bench", repo_key(sandbox.cwd),
+                          [kinds[i % len(kinds)] for i in range(count)])
+        store.close()
+        yield f"ledger-{count}", {"session_id": "bench", "transcript_path": "",
+                                  "cwd": sandbox.cwd, "stop_hook_active": False}, seed
+
+
+def run(args):
+    sandbox = Sandbox()
+    results = []
+    try:
+        cold_file = os.path.join(sandbox.root, "cold.json")
+        with open(cold_file, "w") as f:
+            f.write("{}")
+        stops = (list(transcript_cases(sandbox, args.transcript_mb))
+                 + list(ledger_cases(sandbox, args.ledger_events)))
+        for rel, event, tools, argv in discover(args.only):
+            if event == "Stop":
+                cases = stops
+            elif event == "UserPromptSubmit":
+                cases = [(name, {"session_id": "bench", "hook_event_name": event,
+                                 "cwd": sandbox.cwd, "prompt": prompt}, None)
+                         for name, prompt in prompt_cases()]
+            else:
+                cases = [(name, {"session_id": "bench", "hook_event_name": event,
+                                 "cwd": sandbox.cwd, "tool_name": tool, "tool_input": inp}, None)
+                         for tool in tools for name, inp in TOOL_CASES[tool]()]
+            for case, payload, seed in cases:
+                runs = args.runs
+                if event == "Stop":
+                    runs = max(1, min(runs, args.stop_runs))
+                r = bench_case(sandbox, rel, event, argv, case, payload, runs,
+                               fresh_temp=(event == "Stop"), cold_file=cold_file, seed=seed)
+                results.append(r)
+                print(f"{r['script']:<72} {case:<22} p50 {r['p50_ms']:>9.1f} ms"
+                      f"  p99 {r['p99_ms']:>9.1f} ms", file=sys.stderr)
+    finally:
+        sandbox.close()
+    return {
+        "meta": {
+            "commit": _git_head(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+
+
+def _git_head():
+    try:
+        return subprocess.run(["git", "-C", TREE, "rev-parse", "--short", "HEAD"],
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# -- comparison --
+
+
+def compare(old, new):
+    """Print per-case deltas; return the number of problems found."""
+    key = lambda r: (r["script"], r["event"], r["case"])  # noqa: E731
+    before = {key(r): r for r in old["results"]}
+    problems = 0
+    print(f"{'script':<60} {'case':<22} {'p99 old':>10} {'p99 new':>10}  change")
+    for r in new["results"]:
+        o = before.get(key(r))
+        flag = ""
+        if r["p99_ms"] >= r["timeout_s"] * 1000 * TIMEOUT_RATIO:
+            flag = "  NEAR TIMEOUT"
+            problems += 1
+        if o is None:
+            print(f"{r['script'][-60:]:<60} {r['case']:<22} {'-':>10} {r['p99_ms']:>10.1f}  new{flag}")
+            continue
+        ratio = r["p99_ms"] / max(o["p99_ms"], 0.01)
+        if ratio > REGRESSION and r["p99_ms"] - o["p99_ms"] > 5:
+            flag = "  REGRESSION" + flag
+            problems += 1
+        print(f"{r['script'][-60:]:<60} {r['case']:<22} {o['p99_ms']:>10.1f} "
+              f"{r['p99_ms']:>10.1f}  {ratio:5.2f}x{flag}")
+    return problems
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    ap.add_argument("--out", default="bench-results.json")
+    ap.add_argument("--runs", type=int, default=20, help="runs per tool-hook case")
+    ap.add_argument("--stop-runs", type=int, default=3, help="runs per transcript case")
+    ap.add_argument("--transcript-mb", type=int, nargs="*", default=[1, 10, 100])
+    ap.add_argument("--ledger-events", type=int, nargs="*", default=[1000, 10000, 100000],
+                    help="session ledger sizes for Stop hooks")
+    ap.add_argument("--only", help="substring filter on script path")
+    ap.add_argument("--compare", metavar="OLD_JSON", help="diff against an earlier results file")
+    ap.add_argument("--compare-only", nargs=2, metavar=("OLD_JSON", "NEW_JSON"),
+                    help="diff two existing results files without running")
+    args = ap.parse_args()
+
+    if args.compare_only:
+        with open(args.compare_only[0]) as f0, open(args.compare_only[1]) as f1:
+            sys.exit(1 if compare(json.load(f0), json.load(f1)) else 0)
+
+    report = run(args)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"wrote {len(report['results'])} results to {args.out}", file=sys.stderr)
+    if args.compare:
+        with open(args.compare) as f:
+            sys.exit(1 if compare(json.load(f), report) else 0)
+
+
+if __name__ == "__main__":
+    main()
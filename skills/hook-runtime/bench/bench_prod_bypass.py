@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""Benchmark: prod-bypass check, legacy full-copy scan vs windowed scanner.
+
+legacy   -- what the prod-bypass hook script did before: one lowercase
+            copy of the whole Write content, then one substring scan per
+            pattern (nine passes). Edit/MultiEdit were not checked at all.
+windowed -- the "prod-bypass" rule in rules.json (hooklib.rules): the added
+            text scanned in 64 KB lowercase windows, stopping as soon as
+            both a prod reference and a DB client call have been seen.
+
+Payloads are generated minified-JS bundles. Per case and size, the table
+shows the check's wall time and the peak memory it allocates on top of the
+payload (tracemalloc), which is what stays flat for the windowed scanner.
+
+Usage:
+  python bench_prod_bypass.py                    # 1, 5 and 20 MB bundles
+  python bench_prod_bypass.py --size-mb 20 50
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "scripts"))
+
+from hooklib import rules  # noqa: E402
+
+RULE = rules.load(os.path.join(HERE, "..", "rules.json")).rule("prod-bypass")
+
+IDENTS = ("a", "b", "e", "t", "n", "r", "i", "o", "fn", "cb", "ctx", "req", "res", "el")
+SNIPPETS = (
+    "function {0}({1},{2}){{return {1}&&{2}.{0}({1})}}",
+    "var {0}=Object.assign({{}},{1},{{key:'{2}'}});",
+    "if(!{0}){{throw new Error('{1} missing')}}",
+    "{0}.forEach(function({1}){{{2}.push({1}*2)}});",
+    "const {0}=await fetch('/api/{1}').then(r=>r.json());",
+    "export const {0}={1}?.{2}??null;",
+)
+
+
+def bundle(size, seed=0):
+    """Deterministic minified-JS-looking text of ``size`` chars."""
+    rng = random.Random(seed)
+    parts, n = [], 0
+    while n < size:
+        snippet = rng.choice(SNIPPETS).format(*(rng.choice(IDENTS) + str(rng.randrange(999))
+                                                for _ in range(3)))
+        parts.append(snippet)
+        n += len(snippet)
+    return "".join(parts)[:size]
+
+
+def legacy(tool_input):
+    content_lower = tool_input.get("content", "").lower()
+    has_prod_ref = any(p.lower() in content_lower for p in RULE.groups["prod_ref"])
+    has_db_client = any(p.lower() in content_lower for p in RULE.groups["db_client"])
+    return has_prod_ref and has_db_client
+
+
+def windowed(tool, tool_input):
+    data = {"tool_name": tool, "tool_input": tool_input}
+    return bool(RULE.find(rules.EXTRACTORS[RULE.extract]("", data), data))
+
+
+def cases(size):
+    body = bundle(size)
+    prod, client = "const u=process.env.PROD_DATABASE_URL;", "const db=neon(u);"
+    yield "Write clean", "Write", {"file_path": "/r/dist/app.js", "content": body}
+    yield "Write bypass at start", "Write", {"file_path": "/r/dist/app.js",
+                                             "content": prod + client + body}
+    yield "Write bypass at end", "Write", {"file_path": "/r/dist/app.js",
+                                           "content": prod + body + client}
+    yield "Edit clean", "Edit", {"file_path": "/nonexistent/app.js", "old_string": "x",
+                                 "new_string": body}
+    chunk = size // 100
+    yield "MultiEdit 100 clean", "MultiEdit", {
+        "file_path": "/nonexistent/app.js",
+        "edits": [{"old_string": "x", "new_string": body[i:i + chunk]}
+                  for i in range(0, size, chunk)]}
+
+
+def measure(fn, *args):
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    base = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    result = fn(*args)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] - base
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    ap.add_argument("--size-mb", type=float, nargs="+", default=[1, 5, 20])
+    args = ap.parse_args()
+
+    print(f"{'case':<24} {'size':>6} {'legacy ms':>10} {'legacy mem':>11}"
+          f" {'windowed ms':>12} {'windowed mem':>13}  verdict")
+    for size_mb in args.size_mb:
+        for label, tool, tool_input in cases(int(size_mb * 1024 * 1024)):
+            new, new_s, new_peak = measure(windowed, tool, tool_input)
+            if tool == "Write":
+                old, old_s, old_peak = measure(legacy, tool_input)
+                old_cols = f"{old_s * 1000:>10.1f} {old_peak / 1048576:>9.2f} MB"
+                if old != new:
+                    print(f"VERDICT MISMATCH in {label}: legacy {old}, windowed {new}",
+                          file=sys.stderr)
+                    sys.exit(1)
+            else:
+                old_cols = f"{'unchecked':>10} {'-':>12}"
+            print(f"{label:<24} {size_mb:>4g}MB {old_cols}"
+                  f" {new_s * 1000:>12.1f} {new_peak / 1048576:>10.2f} MB  "
+                  f"{'BLOCK' if new else 'allow'}")
+
+
+if __name__ == "__main__":
+    main()
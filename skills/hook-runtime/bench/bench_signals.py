@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""Benchmark: dev-loop SOP signal detection, legacy vs compiled matcher.
+
+legacy   -- what stop-verify-pipeline.py did before: parse every line, join
+            all text blocks into one lowercase string, then one substring
+            scan per phrase over the whole string.
+compiled -- hooklib.devloop.SOP: one combined regex pass per text block as
+            it streams past, no concatenated copy.
+
+Both variants do a full scan (no checkpoint) of the same transcript, each in
+its own process so peak RSS is comparable. Flags must come out identical.
+
+Usage:
+  python bench_signals.py                      # 200 MB synthetic transcript
+  python bench_signals.py --size-mb 20
+  python bench_signals.py --transcript ~/.claude/projects/<proj>/<uuid>.jsonl
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "scripts"))
+sys.path.insert(0, HERE)
+
+from hooklib.devloop import SOP, SOP_SIGNALS  # noqa: E402
+
+
+def _blocks(path):
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if entry.get("type") != "assistant":
+                continue
+            for block in entry.get("message", {}).get("content", []):
+                btype = block.get("type")
+                if btype == "tool_use":
+                    inp = block.get("input", {})
+                    if inp.get("file_path"):
+                        yield inp["file_path"]
+                    if inp.get("command"):
+                        yield inp["command"]
+                elif btype == "text":
+                    yield block.get("text", "")
+
+
+def run_legacy(path):
+    transcript_lower = " ".join(_blocks(path)).lower()
+    return {name: any(all(p in transcript_lower for p in ((alt,) if isinstance(alt, str) else alt))
+                      for alt in alternatives)
+            for name, alternatives in SOP_SIGNALS.items()}
+
+
+def run_compiled(path):
+    scanner = SOP.scanner()
+    for text in _blocks(path):
+        scanner.scan(text)
+    return scanner.flags()
+
+
+def peak_rss_kb():
+    try:  # Linux: this process image only (ru_maxrss survives exec from the parent)
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == "darwin" else rss
+
+
+def child(variant, path):
+    start = time.perf_counter()
+    flags = (run_legacy if variant == "legacy" else run_compiled)(path)
+    elapsed = time.perf_counter() - start
+    print(json.dumps({"variant": variant, "seconds": round(elapsed, 3),
+                      "peak_rss_kb": peak_rss_kb(), "flags": flags}))
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    ap.add_argument("--size-mb", type=int, default=200)
+    ap.add_argument("--transcript", help="use an existing transcript instead")
+    ap.add_argument("--variant", choices=("legacy", "compiled"), help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.variant:
+        child(args.variant, args.transcript)
+        return
+
+    path = args.transcript and os.path.expanduser(args.transcript)
+    tmp = None
+    if not path:
+        import synth
+        fd, tmp = tempfile.mkstemp(suffix=".jsonl")
+        os.close(fd)
+        print(f"generating {args.size_mb} MB synthetic transcript...", file=sys.stderr)
+        path = synth.write_transcript(tmp, args.size_mb * 1024 * 1024)
+    try:
+        size_mb = os.path.getsize(path) / 1024 / 1024
+        results = {}
+        for variant in ("legacy", "compiled"):
+            out = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--variant", variant,
+                 "--transcript", path],
+                check=True, capture_output=True, text=True).stdout
+            results[variant] = json.loads(out)
+    finally:
+        if tmp:
+            os.remove(tmp)
+
+    legacy, compiled = results["legacy"], results["compiled"]
+    print(f"transcript: {size_mb:.1f} MB")
+    for r in (legacy, compiled):
+        rss = f"{r['peak_rss_kb'] / 1024:.0f} MB" if r["peak_rss_kb"] else "n/a"
+        print(f"  {r['variant']:<9} {r['seconds']:>8.2f} s   peak RSS {rss}")
+    print(f"  speedup   {legacy['seconds'] / max(compiled['seconds'], 1e-9):.2f}x")
+    if legacy["flags"] != compiled["flags"]:
+        print("FLAG MISMATCH:", legacy["flags"], compiled["flags"], file=sys.stderr)
+        sys.exit(1)
+    print("  flags identical")
+
+
+if __name__ == "__main__":
+    main()
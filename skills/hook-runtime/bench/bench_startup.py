@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""Benchmark: hook startup time, exec() pattern vs the bytecode-caching loader.
+
+For every script under skills/*/scripts/ (and the dispatcher), with an empty
+payload so the hook exits right after startup:
+
+  exec      -- python -c "import os;exec(open(...).read())"   (old settings.json)
+  loader    -- python -c "...from hooklib.loader import main;main()" <name>
+  loader-S  -- the same with -S (no site import)                (settings.json)
+
+Each variant gets one warm-up run (fills the bytecode cache), then --runs
+timed runs interleaved across variants; median, p90 and min wall time are
+recorded per script (the table shows medians).
+
+Usage:
+  python bench_startup.py
+  python bench_startup.py --runs 50 --only dev-loop --out startup.json
+"""
+import argparse
+import glob
+import json
+import os
+import statistics
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+
+from bench_hooks import TREE, Sandbox, hook_command, percentile, run_once  # noqa: E402
+
+LOADER = ("import os,sys;sys.path.insert(0,os.path.expanduser("
+          "'~/.claude/skills/hook-runtime/scripts'));from hooklib.loader import main;main()")
+NOT_HOOKS = ("hook-telemetry.py", "hook-replay.py", "session-search.py", "session-sidecar.py",
+             "sop-facts.py", "impacted-tests.py", "shard-tests.py",
+             "dispatch-queue.py", "deploy-queue.py")  # CLIs
+
+
+def variants(rel, argv):
+    name = os.path.splitext(os.path.basename(rel))[0]
+    return {
+        "exec": hook_command(rel, argv),
+        "loader": [sys.executable, "-c", LOADER, name] + argv,
+        "loader-S": [sys.executable, "-S", "-c", LOADER, name] + argv,
+    }
+
+
+def scripts(only=None):
+    for script in sorted(glob.glob(os.path.join(TREE, "skills", "*", "scripts", "*.py"))):
+        rel = os.path.relpath(script, TREE)
+        if only and only not in rel:
+            continue
+        if os.path.basename(script) in NOT_HOOKS:
+            continue
+        argv = ["PreToolUse"] if os.path.basename(script) == "hook-dispatch.py" else []
+        yield rel, argv
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    ap.add_argument("--runs", type=int, default=20)
+    ap.add_argument("--only", help="substring filter on script path")
+    ap.add_argument("--out", help="also write results as JSON")
+    args = ap.parse_args()
+
+    sandbox = Sandbox()
+    payload = os.path.join(sandbox.root, "payload.json")
+    with open(payload, "w") as f:
+        f.write("{}")
+    env = sandbox.env(sandbox.temp_dir())
+    env.pop("PYTHONDONTWRITEBYTECODE", None)  # the loader honours it
+    env["CLAUDE_HOOK_TELEMETRY"] = "0"
+
+    results = []
+    try:
+        print(f"{'script':<60} {'exec':>9} {'loader':>9} {'loader-S':>9}  speedup (median ms)")
+        for rel, argv in scripts(args.only):
+            row = {"script": rel}
+            cmds = variants(rel, argv)
+            times = {variant: [] for variant in cmds}
+            for cmd in cmds.values():
+                run_once(cmd, payload, env, sandbox.cwd)  # warm-up / fill cache
+            for _ in range(args.runs):  # interleaved, so machine noise hits all variants
+                for variant, cmd in cmds.items():
+                    times[variant].append(run_once(cmd, payload, env, sandbox.cwd)[0] * 1000)
+            for variant, values in times.items():
+                values.sort()
+                row[variant] = {"median_ms": round(statistics.median(values), 2),
+                                "p90_ms": round(percentile(values, 90), 2),
+                                "min_ms": round(values[0], 2)}
+            results.append(row)
+            base, best = row["exec"]["median_ms"], row["loader-S"]["median_ms"]
+            print(f"{rel[-60:]:<60} {base:>9.1f} {row['loader']['median_ms']:>9.1f}"
+                  f" {best:>9.1f}  {base / max(best, 1e-9):.2f}x")
+    finally:
+        sandbox.close()
+    if results:
+        total = {v: sum(r[v]["median_ms"] for r in results) for v in ("exec", "loader", "loader-S")}
+        print(f"{'total':<60} {total['exec']:>9.1f} {total['loader']:>9.1f}"
+              f" {total['loader-S']:>9.1f}  {total['exec'] / max(total['loader-S'], 1e-9):.2f}x")
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump({"python": sys.version.split()[0], "runs": args.runs,
+                       "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Synthetic session transcripts for hook benchmarks.
+
+Produces JSONL shaped like real Claude Code sessions: assistant text and
+tool_use blocks (Bash, Edit, Write, Read) interleaved with user entries
+carrying tool_result payloads, which make up most of the bytes. Output is
+deterministic for a given seed.
+"""
+import json
+import random
+
+# Filler vocabulary chosen not to contain any SOP signal phrase, so scans
+# cannot finish early -- the worst case for the Stop hook.
+WORDS = (
+    "the function returns a value from cache when key exists otherwise we "
+    "load row from disk and parse header fields then build index over the "
+    "column data so lookup stays fast under load this file handles request "
+    "routing for api endpoints and maps errors into response codes with "
+    "retry logic around network calls plus logging of timing info"
+).split()
+
+# Signal phrases sprinkled in rarely, so flags do get set along the way.
+SIGNALS = (
+    "npm test", "git commit -m 'fix'", "pushed to main", "vercel --prod",
+    "qa submitted", "refactor", "db:migrate",
+)
+
+PATHS = ("src/app.ts", "src/lib/db.ts", "src/components/Grid.tsx",
+         "api/routes/users.ts", "README.md", "docs/notes.md")
+
+
+def _text(rng, n_words):
+    words = [rng.choice(WORDS) for _ in range(n_words)]
+    if rng.random() < 0.02:
+        words.insert(rng.randrange(len(words) + 1), rng.choice(SIGNALS))
+    return " ".join(words)
+
+
+def _assistant(rng, i):
+    kind = rng.random()
+    if kind < 0.4:
+        block = {"type": "text", "text": _text(rng, rng.randint(20, 200))}
+    elif kind < 0.7:
+        block = {"type": "tool_use", "id": f"toolu_{i}", "name": "Bash",
+                 "input": {"command": _text(rng, rng.randint(3, 30))}}
+    elif kind < 0.9:
+        block = {"type": "tool_use", "id": f"toolu_{i}", "name": "Edit",
+                 "input": {"file_path": "/repo/" + rng.choice(PATHS),
+                           "old_string": _text(rng, 20),
+                           "new_string": _text(rng, 25)}}
+    else:
+        block = {"type": "tool_use", "id": f"toolu_{i}", "name": "Read",
+                 "input": {"file_path": "/repo/" + rng.choice(PATHS)}}
+    return {"type": "assistant", "uuid": f"a{i}",
+            "timestamp": "2026-01-01T00:00:00.000Z",
+            "message": {"role": "assistant", "content": [block]}}
+
+
+def _tool_result(rng, i, result_kb, pool):
+    size = rng.randint(result_kb // 4, result_kb) * 1024
+    body = " ".join(rng.choice(pool) for _ in range(size // 4096 + 1))[:size]
+    return {"type": "user", "uuid": f"u{i}",
+            "timestamp": "2026-01-01T00:00:01.000Z",
+            "message": {"role": "user", "content": [
+                {"type": "tool_result", "tool_use_id": f"toolu_{i - 1}",
+                 "content": body}]}}
+
+
+def _user_prompt(rng, i):
+    return {"type": "user", "uuid": f"p{i}",
+            "timestamp": "2026-01-01T00:00:00.000Z",
+            "message": {"role": "user", "content": _text(rng, rng.randint(5, 60))}}
+
+
+def write_transcript(path, size_bytes, seed=0, result_kb=32):
+    """Write a synthetic transcript of roughly ``size_bytes`` to ``path``."""
+    rng = random.Random(seed)
+    pool = [_text(rng, 800) for _ in range(64)]  # ~4 KB chunks for tool results
+    written = 0
+    i = 0
+    with open(path, "w", encoding="utf-8") as f:
+        while written < size_bytes:
+            if i % 25 == 0:
+                entry = _user_prompt(rng, i)
+            elif i % 2:
+                entry = _tool_result(rng, i, result_kb, pool)
+            else:
+                entry = _assistant(rng, i)
+            line = json.dumps(entry) + "\n"
+            f.write(line)
+            written += len(line)
+            i += 1
+    return path
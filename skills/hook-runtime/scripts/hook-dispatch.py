@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""Hook dispatcher: one process per hook event instead of one per hook.
+
+Registered once per event in settings.json through the bytecode-caching
+loader (hooklib/loader.py); the event name is passed as the first argument:
+
+  python -S -c "import os,sys;sys.path.insert(0,os.path.expanduser('~/.claude/skills/hook-runtime/scripts'));from hooklib.loader import main;main()" hook-dispatch PreToolUse
+
+Reads stdin once, parses the event JSON once, and runs every hook listed for
+the event in ~/.claude/skills/hook-runtime/hooks.json in-process (see
+hooklib/dispatch.py for the exit-code contract).
+
+Exit codes:
+  0 = all hooks allowed
+  1 = a hook failed (non-blocking error, stderr shown to the user)
+  2 = a hook blocked (stderr fed to Claude)
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.expanduser("~/.claude/skills/hook-runtime/scripts"))
+from hooklib import dispatch
+
+if len(sys.argv) < 2:
+    print("usage: hook-dispatch.py <HookEvent>", file=sys.stderr)
+    sys.exit(1)
+
+raw = sys.stdin.read()
+code, out, err = dispatch.combine(dispatch.run_event(sys.argv[1], raw))
+if out:
+    sys.stdout.write(out)
+if err:
+    sys.stderr.write(err)
+sys.exit(code)
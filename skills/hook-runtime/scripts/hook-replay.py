@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""Replay recorded sessions through the hooks, offline.
+
+Rebuilds the UserPromptSubmit / PreToolUse / PostToolUse / Stop payloads of
+the prompts and tool calls in the session JSONLs under ~/.claude/projects/
+(hooklib/replay.py), runs them
+through the hooks registered in a hook tree, and reports every decision and
+its latency. With a baseline tree, reports the decisions that changed.
+
+Each session is one task in a process pool; every worker has its own scratch
+HOME (".claude" -> the hook tree) and temp dir, so hook state (markers,
+fire-once flags, ledgers) and telemetry never touch the live ones.
+
+Usage:
+  python ~/.claude/skills/hook-runtime/scripts/hook-replay.py --project myapp --since 30d
+  # Before/after a hook change (working tree vs last commit):
+  python .../hook-replay.py --tree ~/.claude --baseline-rev HEAD --hook preToolUse-rules
+  python .../hook-replay.py --baseline /path/to/old/tree --out decisions.jsonl
+
+Exit code: 0, or 1 when --fail-on-change is given and a decision changed.
+"""
+import argparse
+import io
+import json
+import multiprocessing
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+from collections import defaultdict
+
+PROJECTS_DIR = os.path.expanduser("~/.claude/projects")
+DEFAULT_TREE = os.path.expanduser("~/.claude")
+EVENTS = ("UserPromptSubmit", "PreToolUse", "PostToolUse", "Stop")  # hooklib/replay.py
+ENGINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "hooklib", "replay.py")
+
+
+# -- worker side (runs in the pool; imports hooklib from the tree under test) --
+
+
+def _init_worker(home, scratch_root):
+    os.environ["HOME"] = os.environ["USERPROFILE"] = home
+    os.environ["CLAUDE_HOOK_TELEMETRY"] = "0"
+    scratch = tempfile.mkdtemp(prefix="worker-", dir=scratch_root)
+    for var in ("TMPDIR", "TEMP", "TMP"):
+        os.environ[var] = scratch
+    tempfile.tempdir = scratch
+    sys.path.insert(0, os.path.join(home, ".claude", "skills", "hook-runtime", "scripts"))
+    os.chdir(scratch)
+
+
+_engine = None
+
+
+def _load_engine():
+    """This tool's hooklib/replay.py, loaded by path (the tree may be older)."""
+    global _engine
+    if _engine is None:
+        import importlib.util
+        spec = importlib.util.spec_from_file_location("hook_replay_engine", ENGINE_PATH)
+        _engine = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(_engine)
+    return _engine
+
+
+def _replay(task):
+    path, wanted, hook_filter = task
+    replay = _load_engine()
+    start = time.perf_counter()
+    try:
+        decisions = replay.replay_session(path, tempfile.gettempdir(), wanted, hook_filter)
+    except Exception as e:  # one unreadable session must not stop the run
+        return path, [], f"{type(e).__name__}: {e}", 0.0
+    return path, decisions, None, time.perf_counter() - start
+
+
+# -- parent side --
+
+
+def hook_home(tree, root, label):
+    """A HOME directory whose .claude is ``tree``."""
+    tree = os.path.abspath(os.path.expanduser(tree))
+    if os.path.basename(tree) == ".claude":
+        return os.path.dirname(tree)
+    home = os.path.join(root, f"home-{label}")
+    os.makedirs(home)
+    os.symlink(tree, os.path.join(home, ".claude"), target_is_directory=True)
+    return home
+
+
+def export_rev(tree, rev, dest):
+    """Extract ``rev`` of the git repo at ``tree`` into ``dest``."""
+    data = subprocess.run(["git", "-C", os.path.expanduser(tree), "archive", rev],
+                          check=True, capture_output=True).stdout
+    with tarfile.open(fileobj=io.BytesIO(data)) as tar:
+        tar.extractall(dest)
+    return dest
+
+
+def run_tree(label, home, sessions, args, root):
+    scratch = os.path.join(root, f"scratch-{label}")
+    os.makedirs(scratch)
+    wanted = tuple(args.events)
+    tasks = [(path, wanted, args.hook) for path in sessions]
+    decisions, failures = [], []
+    ctx = multiprocessing.get_context("spawn")  # fresh interpreter per worker
+    start = time.perf_counter()
+    with ctx.Pool(args.workers, initializer=_init_worker, initargs=(home, scratch)) as pool:
+        for done, (path, result, error, _) in enumerate(
+                pool.imap_unordered(_replay, tasks), 1):
+            decisions.extend(result)
+            if error:
+                failures.append((path, error))
+            if not args.quiet:
+                print(f"\r[{label}] {done}/{len(tasks)} sessions", end="", file=sys.stderr)
+    if not args.quiet:
+        print(f"\r[{label}] {len(tasks)} sessions, {len(decisions)} hook runs"
+              f" in {time.perf_counter() - start:.1f} s", file=sys.stderr)
+    for path, error in failures:
+        print(f"[{label}] skipped {path}: {error}", file=sys.stderr)
+    return decisions
+
+
+def summarize(decisions):
+    by_hook = defaultdict(list)
+    for d in decisions:
+        by_hook[(d["event"], d["hook"])].append(d)
+    rows = []
+    for (event, hook), ds in sorted(by_hook.items()):
+        times = sorted(d["ms"] for d in ds)
+        rows.append({
+            "event": event, "hook": hook, "runs": len(ds),
+            "blocked": sum(1 for d in ds if d["exit_code"] == 2),
+            "errors": sum(1 for d in ds if d["exit_code"] not in (0, 2)),
+            "p50_ms": round(statistics.median(times), 2),
+            "p99_ms": round(times[min(len(times) - 1, int(len(times) * 0.99))], 2),
+        })
+    return rows
+
+
+def print_summary(title, rows):
+    print(f"\n{title}")
+    print(f"  {'event':<16} {'hook':<45} {'runs':>7} {'blocked':>8} {'errors':>7}"
+          f" {'p50 ms':>8} {'p99 ms':>8}")
+    for r in rows:
+        print(f"  {r['event']:<16} {r['hook'][:45]:<45} {r['runs']:>7} {r['blocked']:>8}"
+              f" {r['errors']:>7} {r['p50_ms']:>8.2f} {r['p99_ms']:>8.2f}")
+
+
+def diff(new, old):
+    """Decisions whose exit code differs between the two runs."""
+    key = lambda d: (d["session"], d["seq"], d["hook"])  # noqa: E731
+    old_by_key = {key(d): d for d in old}
+    changes = []
+    for d in new:
+        before = old_by_key.pop(key(d), None)
+        before_code = before["exit_code"] if before else None
+        if before_code != d["exit_code"]:
+            changes.append((before, d))
+    changes.extend((d, None) for d in old_by_key.values())  # hook removed
+    return changes
+
+
+def _verdict(code):
+    return {None: "-", 0: "allow", 2: "BLOCK"}.get(code, f"error({code})")
+
+
+def print_changes(changes, limit):
+    counts = defaultdict(int)
+    for before, after in changes:
+        d = after or before
+        counts[(d["hook"], _verdict(before and before["exit_code"]),
+                _verdict(after and after["exit_code"]))] += 1
+    print(f"\nchanged decisions: {len(changes)}")
+    for (hook, was, now), n in sorted(counts.items()):
+        print(f"  {hook:<45} {was:>10} -> {now:<10} {n:>6}")
+    for before, after in changes[:limit]:
+        d = after or before
+        print(f"  {d['session'][:8]}#{d['seq']:<5} {d['event']:<11} {d['hook'][:40]:<40}"
+              f" {_verdict(before and before['exit_code'])} -> {_verdict(after and after['exit_code'])}"
+              f"  {d['tool']}: {d['detail'][:80]!r}")
+    if len(changes) > limit:
+        print(f"  ... {len(changes) - limit} more (use --out for all)")
+
+
+def parse_since(value):
+    units = {"h": 3600, "d": 86400}
+    if not value or value[-1] not in units:
+        raise argparse.ArgumentTypeError("use e.g. 12h, 30d")
+    return time.time() - float(value[:-1]) * units[value[-1]]
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    ap.add_argument("--projects", default=PROJECTS_DIR, help="sessions root")
+    ap.add_argument("--project", help="only project folders containing this text")
+    ap.add_argument("--session", action="append", help="replay this JSONL file (repeatable)")
+    ap.add_argument("--since", type=parse_since, help="only sessions modified within e.g. 30d")
+    ap.add_argument("--limit", type=int, help="at most N (newest) sessions")
+    ap.add_argument("--events", nargs="+", default=list(EVENTS), choices=EVENTS,
+                    help="events to report (all are run: Stop hooks read the ledger)")
+    ap.add_argument("--hook", help="only report hooks whose name contains this text")
+    ap.add_argument("--tree", default=DEFAULT_TREE, help="hook tree under test (a .claude dir)")
+    ap.add_argument("--baseline", help="hook tree to compare against")
+    ap.add_argument("--baseline-rev", help="git revision of --tree to compare against")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    ap.add_argument("--show", type=int, default=30, help="changed decisions to list")
+    ap.add_argument("--out", help="write every decision as JSONL (field 'tree')")
+    ap.add_argument("--fail-on-change", action="store_true")
+    ap.add_argument("--quiet", action="store_true")
+    args = ap.parse_args()
+
+    sessions = args.session or _load_engine().session_files(
+        args.projects, args.project, args.since)
+    if args.limit:
+        sessions = sessions[:args.limit]
+    if not sessions:
+        print("no sessions found", file=sys.stderr)
+        sys.exit(1)
+
+    root = tempfile.mkdtemp(prefix="hook-replay-")
+    try:
+        decisions = run_tree("tree", hook_home(args.tree, root, "tree"), sessions, args, root)
+        baseline = None
+        if args.baseline or args.baseline_rev:
+            base_tree = args.baseline or export_rev(
+                args.tree, args.baseline_rev, os.path.join(root, "baseline", ".claude"))
+            baseline = run_tree("baseline", hook_home(base_tree, root, "baseline"),
+                                sessions, args, root)
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    print_summary(f"tree: {args.tree}", summarize(decisions))
+    changes = []
+    if baseline is not None:
+        print_summary(f"baseline: {args.baseline or args.baseline_rev}", summarize(baseline))
+        changes = diff(decisions, baseline)
+        print_changes(changes, args.show)
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            for label, ds in (("tree", decisions), ("baseline", baseline or [])):
+                for d in ds:
+                    f.write(json.dumps(dict(d, tree=label)) + "\n")
+    sys.exit(1 if args.fail_on_change and changes else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""Report on hook telemetry: per-hook latency histograms and block rates.
+
+Reads the log the dispatcher writes (hooklib/telemetry.py) and prints, per
+hook: runs, p50/p95/p99/max run time, block (exit 2), error and verdict
+cache hit rates, a latency histogram, the most common block reasons and the
+exceptions the hook crashed with.
+Also prints how much hook time a session accumulates.
+
+Usage:
+  python ~/.claude/skills/hook-runtime/scripts/hook-telemetry.py
+  python .../hook-telemetry.py --since 24h --event PreToolUse
+  python .../hook-telemetry.py --hook raw-sql --reasons 5
+  python .../hook-telemetry.py --json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from collections import Counter, defaultdict
+
+sys.path.insert(0, os.path.expanduser("~/.claude/skills/hook-runtime/scripts"))
+from hooklib import telemetry
+
+# Upper bounds (ms) of the histogram buckets; the last bucket is open-ended.
+BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 5000)
+BAR_WIDTH = 40
+
+
+def parse_since(value):
+    """'90m' / '24h' / '7d' -> epoch seconds."""
+    units = {"m": 60, "h": 3600, "d": 86400}
+    if not value or value[-1] not in units:
+        raise argparse.ArgumentTypeError("use e.g. 30m, 24h, 7d")
+    return time.time() - float(value[:-1]) * units[value[-1]]
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[k]
+
+
+def histogram(values):
+    counts = [0] * (len(BUCKETS) + 1)
+    for v in values:
+        for i, bound in enumerate(BUCKETS):
+            if v < bound:
+                counts[i] += 1
+                break
+        else:
+            counts[-1] += 1
+    return counts
+
+
+def bucket_label(i):
+    if i == len(BUCKETS):
+        return f">={BUCKETS[-1]}ms"
+    return f"<{BUCKETS[i]}ms"
+
+
+def aggregate(records, top_reasons):
+    hooks = defaultdict(list)
+    sessions = defaultdict(float)
+    events = defaultdict(float)  # (session, event, ts) -> summed hook time
+    for r in records:
+        hooks[(r.get("event", ""), r.get("hook", ""))].append(r)
+        ms = float(r.get("total_ms", 0))
+        sessions[r.get("session", "")] += ms
+        events[(r.get("session", ""), r.get("event", ""), r.get("ts"))] += ms
+
+    report = {"hooks": [], "sessions": {}}
+    for (event, hook), recs in sorted(hooks.items()):
+        times = sorted(float(r.get("total_ms", 0)) for r in recs)
+        n = len(recs)
+        blocked = sum(1 for r in recs if r.get("exit_code") == 2)
+        errors = sum(1 for r in recs if r.get("exit_code") not in (0, 2))
+        cached = sum(1 for r in recs if r.get("cached"))
+        reasons = Counter(r.get("reason", "") for r in recs if r.get("exit_code") == 2)
+        crashes = Counter(r["error"] for r in recs if r.get("error"))
+        report["hooks"].append({
+            "event": event,
+            "hook": hook,
+            "runs": n,
+            "p50_ms": round(percentile(times, 50), 2),
+            "p95_ms": round(percentile(times, 95), 2),
+            "p99_ms": round(percentile(times, 99), 2),
+            "max_ms": round(times[-1], 2),
+            "total_ms": round(sum(times), 1),
+            "block_rate": round(blocked / n, 4),
+            "error_rate": round(errors / n, 4),
+            "cache_hit_rate": round(cached / n, 4),
+            "histogram": dict(zip((bucket_label(i) for i in range(len(BUCKETS) + 1)),
+                                  histogram(times))),
+            "top_reasons": reasons.most_common(top_reasons),
+            "crashes": crashes.most_common(top_reasons),
+        })
+    per_session = sorted(sessions.values())
+    per_event = sorted(events.values())
+    report["sessions"] = {
+        "count": len(per_session),
+        "hook_ms_p50": round(percentile(per_session, 50), 1),
+        "hook_ms_max": round(per_session[-1], 1) if per_session else 0.0,
+        "events": len(per_event),
+        "event_ms_p50": round(percentile(per_event, 50), 2),
+        "event_ms_p99": round(percentile(per_event, 99), 2),
+    }
+    return report
+
+
+def print_report(report):
+    for h in report["hooks"]:
+        print(f"{h['event']} / {h['hook']}")
+        print(f"  runs {h['runs']}   p50 {h['p50_ms']:.1f} ms   p95 {h['p95_ms']:.1f} ms"
+              f"   p99 {h['p99_ms']:.1f} ms   max {h['max_ms']:.1f} ms")
+        print(f"  blocked {h['block_rate']:.1%}   errors {h['error_rate']:.1%}"
+              f"   cached {h['cache_hit_rate']:.1%}   total {h['total_ms'] / 1000:.1f} s")
+        peak = max(h["histogram"].values()) or 1
+        for label, count in h["histogram"].items():
+            if count:
+                bar = "#" * max(1, round(count / peak * BAR_WIDTH))
+                print(f"    {label:>9} {count:>7}  {bar}")
+        for reason, count in h["top_reasons"]:
+            print(f"    [{count}x] {reason}")
+        for error, count in h["crashes"]:
+            print(f"    [{count}x crashed] {error}")
+        print()
+    s = report["sessions"]
+    print(f"sessions {s['count']}   hook time per session: p50 {s['hook_ms_p50'] / 1000:.2f} s,"
+          f" max {s['hook_ms_max'] / 1000:.2f} s")
+    print(f"tool calls/stops {s['events']}   hook time per event: p50 {s['event_ms_p50']:.1f} ms,"
+          f" p99 {s['event_ms_p99']:.1f} ms")
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    ap.add_argument("--log", help="log file (default: the active telemetry log)")
+    ap.add_argument("--since", type=parse_since, help="only records newer than e.g. 24h, 7d")
+    ap.add_argument("--event", help="only this hook event (PreToolUse, PostToolUse, Stop)")
+    ap.add_argument("--hook", help="only hooks whose name contains this text")
+    ap.add_argument("--reasons", type=int, default=3, help="block reasons listed per hook")
+    ap.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = ap.parse_args()
+
+    files = telemetry.log_files(args.log and os.path.expanduser(args.log))
+    if not files:
+        print("no telemetry recorded yet", file=sys.stderr)
+        sys.exit(1)
+    records = [
+        r for r in telemetry.read(files)
+        if (args.since is None or r.get("ts", 0) >= args.since)
+        and (args.event is None or r.get("event") == args.event)
+        and (args.hook is None or args.hook in r.get("hook", ""))
+    ]
+    if not records:
+        print("no matching records", file=sys.stderr)
+        sys.exit(1)
+    report = aggregate(records, args.reasons)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
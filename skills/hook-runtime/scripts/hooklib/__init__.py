@@ -0,0 +1,55 @@
+"""Shared runtime for Claude Code hook scripts.
+
+Hook scripts run as ``python -c "import os;exec(open(...).read())"`` (see
+settings.json), so ``__file__`` is not available to them. Each script puts
+this directory on ``sys.path`` via ``os.path.expanduser`` and imports from
+here:
+
+    sys.path.insert(0, os.path.expanduser("~/.claude/skills/hook-runtime/scripts"))
+    from hooklib import read_input
+
+ASCII only in this package -- exec() on Windows reads source as cp1252.
+"""
+import json
+import os
+import sys
+
+CLAUDE_DIR = os.path.expanduser("~/.claude")
+RUNTIME_DIR = os.path.join(CLAUDE_DIR, "skills", "hook-runtime")
+
+# Set by the dispatcher so the event JSON is parsed once per event, not once
+# per hook. Standalone scripts fall back to reading stdin themselves.
+_payload = None
+
+
+def set_input(payload):
+    """Pre-load the parsed event payload (used by the dispatcher)."""
+    global _payload
+    _payload = payload
+
+
+def read_input():
+    """Return the hook event payload as a dict, or None if stdin is not JSON."""
+    if _payload is not None:
+        return _payload
+    try:
+        data = json.load(sys.stdin)
+    except (json.JSONDecodeError, EOFError):
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def read_fields(*paths):
+    """``read_input()`` for a hook that reads only the dotted ``paths``
+    ("tool_name", "tool_input.file_path"): standalone, nothing else is decoded
+    (hooklib.fields). Under the dispatcher the payload it prepared, which holds
+    at least the ``fields`` listed for the hook in hooks.json."""
+    if _payload is not None:
+        return _payload
+    from hooklib import fields
+    return fields.extract(sys.stdin.read(), paths)
+
+
+def expand(path):
+    """Expand ``~`` in a registry/script path."""
+    return os.path.normpath(os.path.expanduser(path))
@@ -0,0 +1,302 @@
+"""Batch deploy: many ready issues, one test run, one pushed commit.
+
+In the orchestrator-owns-deploy model every issue reported "ready for
+deployment" used to cost its own commit, test run and push. ``DeployQueue``
+coalesces them:
+
+  candidate  -- a scratch worktree at the remote branch's tip. Every item
+                (a branch, or a patch file) is added to it in order as one
+                commit: a merge for a branch, a commit for a patch. An item
+                that does not apply is left out ("conflict")
+  test       -- the test command runs once on the combined tree. Trees that
+                already have a passing run (hooklib/testruns.py) are not
+                run again, and every run is recorded, so the push gate sees it
+  bisect     -- when the combined tree fails, the item commits are bisected
+                to the first one whose prefix fails. That item is left out
+                ("failing"), together with branches built on top of it
+                ("depends"). The rest is rebuilt and tested again
+  push       -- the passing candidate is collapsed into one commit, which
+                references every included item, and pushed without force.
+                If the remote moved meanwhile the push is rejected and
+                nothing is lost
+
+The scratch worktree never touches the caller's checkout, and every run
+has its own (deploy-* under <repo>.worktrees), so concurrent deploys do not
+disturb each other. Test logs are kept in the git common dir, one directory
+per run (LOG_DIR/<run>); directories older than LOG_KEEP are pruned.
+
+    from hooklib import deployqueue
+
+    items = [deployqueue.Item("issue/71-role-dropdown", "#71: Role dropdown"), ...]
+    dq = deployqueue.DeployQueue(cwd, items, "npm test", setup="npm ci")
+    result = dq.run(push=True)      # {"commit", "pushed", "unchanged", "tests", "items"}
+"""
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+
+from hooklib import testruns
+
+LOG_DIR = "claude-deploy"
+LOG_KEEP = 7 * 86400     # seconds a run's log directory is kept
+WORKTREE = "deploy-"     # prefix, under <repo>.worktrees next to the dispatch worktrees
+SUBJECT_LIMIT = 72
+
+
+class Item:
+    def __init__(self, ref, label=""):
+        self.ref = ref                  # branch / commit-ish, or a patch file path
+        self.path = ""                  # absolute path of a patch file (resolve)
+        self.label = label
+        self.status = "pending"         # included / conflict / failing / depends
+        self.note = ""
+        self.commit = ""                # its commit on the candidate
+
+    @property
+    def patch(self):
+        return bool(self.path)
+
+    def resolve(self, cwd):
+        """Tell a patch file from a branch, with relative paths taken from
+        ``cwd`` rather than the process's working directory."""
+        path = os.path.join(cwd, os.path.expanduser(self.ref))
+        self.path = os.path.abspath(path) if os.path.isfile(path) else ""
+        self.label = self.label or (os.path.basename(self.ref) if self.path else self.ref)
+
+    def to_json(self):
+        return {"ref": self.ref, "label": self.label, "status": self.status,
+                "note": self.note}
+
+
+class DeployQueue:
+    def __init__(self, cwd, items, test, remote="origin", branch=None, setup=None):
+        self.cwd = cwd
+        self.root = testruns.git(cwd, "rev-parse", "--show-toplevel")
+        common = testruns.git(cwd, "rev-parse", "--git-common-dir")
+        if self.root is None or common is None:
+            raise ValueError(f"{cwd}: not a git repository")
+        self.log_root = os.path.join(cwd, common, LOG_DIR)
+        self.log_dir = ""               # per run, made by prepare()
+        self.worktrees = self.root.rstrip("/") + ".worktrees"
+        self.worktree = ""              # per run, made by prepare()
+        self.items = list(items)
+        for item in self.items:
+            item.resolve(cwd)
+        self.test_command = test
+        self.remote = remote
+        self.branch = branch or self._default_branch()
+        self.setup = setup
+        self.base = ""
+        self.tests = []                 # [{"tree", "status", "cached", "seconds", "log"}]
+
+    def _default_branch(self):
+        head = testruns.git(self.cwd, "symbolic-ref", "--short",
+                            f"refs/remotes/{self.remote}/HEAD")
+        if head:
+            return head.split("/", 1)[1]
+        return testruns.git(self.cwd, "rev-parse", "--abbrev-ref", "HEAD") or "main"
+
+    def _git(self, *args):
+        return testruns.git(self.worktree, *args)
+
+    # -- candidate --
+
+    def prepare(self):
+        """Fetch the target branch and check its tip out in a scratch worktree
+        of this run's own."""
+        if testruns.git(self.cwd, "fetch", "-q", self.remote, self.branch) is None:
+            raise ValueError(f"could not fetch {self.branch} from {self.remote}")
+        self.base = testruns.git(self.cwd, "rev-parse", "FETCH_HEAD")
+        for item in self.items:
+            if not item.patch and testruns.git(
+                    self.cwd, "rev-parse", "--verify", "--quiet",
+                    item.ref + "^{commit}") is None:
+                item.status, item.note = "conflict", "unknown branch or revision"
+        os.makedirs(self.worktrees, exist_ok=True)
+        self.worktree = tempfile.mkdtemp(prefix=WORKTREE, dir=self.worktrees)
+        self._prune_logs()
+        self.log_dir = os.path.join(self.log_root, os.path.basename(self.worktree))
+        os.makedirs(self.log_dir)
+        if testruns.git(self.root, "worktree", "add", "--detach", self.worktree,
+                        self.base) is None:
+            os.rmdir(self.worktree)
+            self.worktree = ""
+            raise ValueError(f"could not create a scratch worktree in {self.worktrees}")
+        if self.setup and self._shell(self.setup, "setup") != 0:
+            raise ValueError(f"setup command failed: {self.setup}")
+
+    def _prune_logs(self):
+        cutoff = time.time() - LOG_KEEP
+        try:
+            runs = os.listdir(self.log_root)
+        except OSError:
+            return
+        for name in runs:
+            path = os.path.join(self.log_root, name)
+            try:
+                if os.path.isdir(path) and os.path.getmtime(path) < cutoff:
+                    shutil.rmtree(path, ignore_errors=True)
+            except OSError:
+                pass
+
+    def _apply(self, item):
+        """Add one item to the candidate; its commit, or None if it does not apply."""
+        if item.patch:
+            path = item.path
+            with open(path, "r", encoding="utf-8", errors="replace") as f:
+                mbox = f.readline().startswith("From ")
+            if mbox:
+                before = self._git("rev-parse", "HEAD")
+                if self._git("am", "-q", "-3", path) is None:
+                    self._git("am", "--abort")
+                    return None
+                if self._git("rev-list", "--count", f"{before}..HEAD") != "1":
+                    self._git("reset", "-q", "--soft", before)  # one commit per item
+                    self._git("commit", "-q", "--no-verify", "-m", item.label)
+                return self._git("rev-parse", "HEAD")
+            if self._git("apply", "-3", "--index", path) is None:
+                self._git("reset", "-q", "--hard")
+                return None
+        else:
+            # A real merge, not --squash: a branch stacked on an earlier item
+            # (dispatch-queue.py) then shares its history and merges cleanly
+            before = self._git("rev-parse", "HEAD")
+            if self._git("merge", "-q", "--no-ff", "--no-edit", "-m", item.label,
+                         item.ref) is None:
+                self._git("merge", "--abort")
+                return None
+            if self._git("rev-parse", "HEAD^{tree}") == self._git("rev-parse",
+                                                                 before + "^{tree}"):
+                item.note = "already in the target branch"
+            return self._git("rev-parse", "HEAD")
+        if self._git("diff", "--cached", "--quiet") is not None:
+            item.note = "no changes against the target branch"
+            return self._git("rev-parse", "HEAD")
+        if self._git("commit", "-q", "--no-verify", "-m", item.label) is None:
+            self._git("reset", "-q", "--hard")
+            return None
+        return self._git("rev-parse", "HEAD")
+
+    def build(self, items):
+        """Reset the candidate to the base and apply ``items`` in order; the
+        ones that applied."""
+        self._git("reset", "-q", "--hard", self.base)
+        applied = []
+        for item in items:
+            item.commit = self._apply(item)
+            if item.commit is None:
+                item.status = "conflict"
+                item.note = f"does not apply on {self.remote}/{self.branch}" + (
+                    " with the items before it" if applied else "")
+            else:
+                applied.append(item)
+        return applied
+
+    # -- testing --
+
+    def _shell(self, command, name):
+        log = os.path.join(self.log_dir, f"{name}.log")
+        with open(log, "w", encoding="utf-8") as f:
+            f.write(f"$ {command}\n")
+            f.flush()
+            return subprocess.run(command, shell=True, cwd=self.worktree,
+                                  stdin=subprocess.DEVNULL, stdout=f,
+                                  stderr=subprocess.STDOUT).returncode
+
+    def test(self, commit):
+        """Whether the candidate at ``commit`` passes the test command."""
+        self._git("checkout", "-q", "--detach", commit)
+        tree = self._git("rev-parse", "HEAD^{tree}")
+        if testruns.passing(self.worktree, tree) is not None:
+            self.tests.append({"tree": tree, "status": 0, "cached": True, "seconds": 0.0,
+                               "log": ""})
+            return True
+        start = time.perf_counter()
+        name = f"test-{len(self.tests) + 1}"
+        status = self._shell(self.test_command, name)
+        self.tests.append({"tree": tree, "status": status, "cached": False,
+                           "seconds": round(time.perf_counter() - start, 1),
+                           "log": os.path.join(self.log_dir, f"{name}.log")})
+        testruns.record(self.worktree, tree, self.test_command, status)
+        return status == 0
+
+    def bisect(self, applied):
+        """Index of the first item whose prefix of the candidate fails; the
+        base is taken as passing and the whole candidate as failing."""
+        good, bad = -1, len(applied) - 1
+        while bad - good > 1:
+            mid = (good + bad) // 2
+            if self.test(applied[mid].commit):
+                good = mid
+            else:
+                bad = mid
+        return bad
+
+    def _log(self, item):
+        tree = self._git("rev-parse", item.commit + "^{tree}")
+        return next((t["log"] for t in self.tests if t["tree"] == tree and t["log"]), "")
+
+    def _dependents(self, culprit, items):
+        """Branch items built on top of ``culprit`` (they carry its changes)."""
+        if culprit.patch:
+            return []
+        return [i for i in items if not i.patch and i is not culprit and testruns.git(
+            self.cwd, "merge-base", "--is-ancestor", culprit.ref, i.ref) is not None]
+
+    # -- the whole run --
+
+    def run(self, push=True):
+        """Build, test, bisect and push; returns a summary dict."""
+        try:
+            self.prepare()
+            pending = [i for i in self.items if i.status == "pending"]
+            commit = None
+            while pending:
+                applied = self.build(pending)
+                if not applied:
+                    break
+                if self.test(applied[-1].commit):
+                    commit = self._batch(applied)
+                    break
+                index = self.bisect(applied)
+                if index == 0 and not self.test(self.base):
+                    raise ValueError(f"{self.remote}/{self.branch} itself fails the tests"
+                                     f" (log: {self.tests[-1]['log']})")
+                culprit = applied[index]
+                culprit.status = "failing"
+                culprit.note = f"tests fail once it is added (log: {self._log(culprit)})"
+                for item in self._dependents(culprit, applied):
+                    item.status, item.note = "depends", f"built on {culprit.label}"
+                pending = [i for i in applied if i.status == "pending"]
+            pushed = False
+            if commit and push and commit != self.base:
+                pushed = self._git("push", "-q", self.remote,
+                                   f"{commit}:refs/heads/{self.branch}") is not None
+            return {"base": self.base, "branch": self.branch, "commit": commit or "",
+                    "pushed": pushed, "unchanged": commit == self.base, "tests": self.tests,
+                    "items": [i.to_json() for i in self.items]}
+        finally:
+            if self.worktree:
+                testruns.git(self.root, "worktree", "remove", "--force", self.worktree)
+
+    def _batch(self, applied):
+        """One commit of the passing candidate, referencing every included item."""
+        for item in applied:
+            item.status = "included"
+        labels = [i.label for i in applied]
+        subject = labels[0] if len(labels) == 1 else f"Batch deploy: {', '.join(labels)}"
+        if len(subject) > SUBJECT_LIMIT:
+            subject = f"Batch deploy of {len(labels)} items"
+        body = "\n".join(f"- {label}" for label in labels)
+        left_out = [i for i in self.items if i.status != "included"]
+        if left_out:
+            body += "\n\nLeft out:\n" + "\n".join(
+                f"- {i.label}: {i.status}" for i in left_out)
+        if self._git("rev-parse", "HEAD^{tree}") == self._git("rev-parse", self.base + "^{tree}"):
+            return self.base  # every item was already deployed
+        self._git("reset", "-q", "--soft", self.base)
+        if self._git("commit", "-q", "--no-verify", "-m", f"{subject}\n\n{body}") is None:
+            return None
+        return self._git("rev-parse", "HEAD")
@@ -0,0 +1,126 @@
+"""Dev-loop SOP signal table and the Stop hook's assessment of a session.
+
+Phrases are matched case-insensitively against assistant text blocks, tool
+file paths and Bash commands (see hooklib.signals for the table format).
+
+``Assessment`` is what stop-verify-pipeline.py concludes from a session's
+edits and SOP flags (hooklib.ledger): which edits count as code, whether the
+session is exempt, and which SOP steps are missing. sop-facts.py applies the
+same assessment to recorded sessions.
+
+    from hooklib import devloop
+
+    verdict = devloop.Assessment(session.edits, session.flags())
+    verdict.edit_count, verdict.exempt, verdict.missing   # ["tests", "qa", ...]
+"""
+import os
+
+from hooklib.signals import SignalSet
+
+SOP_SIGNALS = {
+    # Claude writes temporary scripts for one-off automation that don't need dev-loop
+    "temp_script_exempt": [
+        "temporary script", "one-off script", "one-off utility", "scratchpad",
+        "temp script",
+    ],
+    # User explicitly waived dev-loop steps
+    "qa_waived": [
+        "skip qa", "don't bother with qa", "no qa needed",
+        ("one-off", "don't matter"), ("gaps", "don't matter"),
+    ],
+    # Architectural signals (edit count alone does NOT make work non-trivial)
+    "nontrivial": [
+        "migration", ("schema", "change"), "new component", "refactor",
+        "new feature", ("prompt", "update"), ("prompt", "change"), "architecture",
+    ],
+    "tests_run": [
+        "npm test", "test:free", "test:all", "test:e2e", "tests pass",
+        ("passed", "test"), "playwright",
+    ],
+    "qa_submitted": [
+        "qa-submission", "qa submitted", "submitted slack qa", "#cf-qa",
+        "pending-qa", "submit for qa",
+        "skip-qa",                        # Explicitly skipped with label = acknowledged
+        "qa-submission/skill.md",         # Skill file was read/invoked
+        "no qa-submission skill found",   # Sub-agent reported gap
+    ],
+    "committed": ["git commit", "committed"],
+    "deployed": ["deploy", "pushed to", "vercel", "production"],
+    "cto_invoked": [
+        "strategic-cto-planner", "cto agent", ("cto", "agent"), "enterplanmode",
+    ],
+    # Migration work (must run db:migrate)
+    "migration_created": [
+        "drizzle-kit generate", "drizzle/0", "migration file", "new migration",
+    ],
+    "migration_applied": [
+        "db:migrate", "drizzle-kit migrate", "migration applied",
+        "migration complete",
+    ],
+}
+
+SOP = SignalSet(SOP_SIGNALS)
+
+
+# -- Stop-hook assessment --
+
+# File extensions and paths considered documentation/config (not code)
+DOC_EXTENSIONS = (".md", ".txt", ".json", ".yaml", ".yml", ".toml", ".csv")
+DOC_PATHS = ("reference-data/", "references/", ".claude/skills/", ".claude/agents/",
+             ".claude/commands/", ".vscode/")
+# Files in temp paths don't need dev-loop enforcement
+TEMP_PATH_PATTERNS = (
+    "/temp/", "\\temp\\", "/tmp/", "\\tmp\\",
+    "n:\\temp\\", "n:/temp/",  # User's scratchpad drive
+    os.path.join(os.environ.get("LOCALAPPDATA", ""), "temp").lower(),
+)
+# Edit count alone does NOT make work non-trivial: iterative fix/test cycles
+# pile up edits on 1-2 files. Non-trivial needs this many code edits AND an
+# architectural signal (edit_count >= 5 alone caused false positives).
+NONTRIVIAL_EDITS = 10
+STEPS = ("tests", "commit", "deploy", "qa", "planning", "migration")
+
+
+def is_doc_file(fp):
+    fp_normalized = fp.replace("\\", "/").lower()
+    return (any(fp_normalized.endswith(ext) for ext in DOC_EXTENSIONS)
+            or any(seg in fp_normalized for seg in DOC_PATHS))
+
+
+def in_temp_dir(fp):
+    fp_normalized = fp.replace("\\", "/").lower()
+    return any(pattern in fp_normalized for pattern in TEMP_PATH_PATTERNS)
+
+
+class Assessment:
+    """Dev-loop verdict for a session from ``edits`` ({path: count}) and
+    ``flags`` ({SOP signal: bool}).
+
+    ``exempt`` is "" or why nothing is enforced: no_code_edits,
+    temp_script (the session said so) or temp_files (every code edit in a
+    temp dir). ``missing`` lists the STEPS not done, empty when exempt.
+    """
+
+    def __init__(self, edits, flags):
+        self.flags = flags
+        self.all_edit_count = sum(edits.values())
+        self.code_edits = {fp: n for fp, n in edits.items() if not is_doc_file(fp)}
+        self.edit_count = sum(self.code_edits.values())
+        self.nontrivial = self.edit_count >= NONTRIVIAL_EDITS and flags["nontrivial"]
+        if self.edit_count == 0:
+            self.exempt = "no_code_edits"
+        elif flags["temp_script_exempt"]:
+            self.exempt = "temp_script"
+        elif all(in_temp_dir(fp) for fp in self.code_edits):
+            self.exempt = "temp_files"
+        else:
+            self.exempt = ""
+        checks = (
+            ("tests", not flags["tests_run"]),
+            ("commit", not flags["committed"]),
+            ("deploy", not flags["deployed"]),
+            ("qa", not flags["qa_submitted"] and not flags["qa_waived"]),
+            ("planning", self.nontrivial and not flags["cto_invoked"]),
+            ("migration", flags["migration_created"] and not flags["migration_applied"]),
+        )
+        self.missing = [] if self.exempt else [step for step, missing in checks if missing]
@@ -0,0 +1,424 @@
+"""In-process hook dispatcher.
+
+Loads the hook registry (hooks.json), selects the hooks registered for an
+event whose matcher accepts the tool name, and runs each one in this process
+with its own stdin/stdout/stderr. The combined result keeps the contract
+Claude Code applies to separate hook processes:
+
+  any hook exits 2     -> exit 2, stderr of the blocking hooks
+  any other non-zero   -> exit 1, stderr of all hooks (non-blocking error)
+  all hooks exit 0     -> exit 0, stdout/stderr passed through
+
+Hooks that print a JSON object (Claude Code's structured output) are merged
+into one (``merge_outputs``): two objects in one stdout would not parse.
+The most restrictive verdict wins, and the merged result exits 0 so Claude
+Code reads it; the stderr of failed hooks goes into its systemMessage.
+
+A hook that raises (anything but SystemExit) exits 1 like a crashed process.
+So does one that runs past its timeout: the registry entry's ``timeout``
+(seconds), else its event's (TIMEOUTS), which is what settings.json gave
+each hook process. settings.json's own timeout for the dispatcher covers the
+sum, so one slow hook cannot use up the time of the hooks after it. For
+events where exit 2 blocks (BLOCKING_EVENTS) the check of a crashed or timed
+out hook did not run, so the dispatcher says so on stderr ("HOOK ERROR") and
+logs it to telemetry, instead of letting the call through unnoticed.
+
+Each hook's stdin/stdout/stderr are text wrappers over in-memory bytes, so
+``.buffer``, ``.reconfigure()`` and re-wrapping ``sys.stdout.buffer`` work
+as in a separate process. ``fileno()`` does not: there is no OS-level file.
+
+The dispatcher runs under ``python -S`` (no site-packages). A hook whose
+registry entry has ``"process": true`` runs as its own interpreter process
+instead, with site-packages: hooks outside this tree, whose imports nobody
+here checks. An in-process hook that fails to import a module under -S is
+re-run the same way, so a third-party import costs a process, not a crash.
+
+Every hook run is timed and appended to the telemetry log (hooklib.telemetry).
+PreToolUse hooks whose registry entry has a ``cache`` key are looked up in
+the verdict cache first and only run on a miss (hooklib.verdicts).
+
+The event JSON is parsed once for all hooks. When every selected hook lists
+the ``fields`` it reads, only those are decoded (hooklib.fields): a Write
+event's file content is then skipped, not parsed.
+"""
+import _thread
+import builtins
+import contextlib
+import io
+import json
+import os
+import re
+import signal
+import subprocess
+import sys
+import threading
+import time
+import traceback
+from collections import namedtuple
+
+import hooklib
+from hooklib import fields, loader, telemetry
+
+REGISTRY_PATH = os.path.join(hooklib.RUNTIME_DIR, "hooks.json")
+TELEMETRY_FIELDS = ("session_id", "tool_name")
+BLOCKING_EVENTS = ("PreToolUse", "UserPromptSubmit", "Stop")  # exit 2 blocks
+# Seconds per hook, as settings.json gave each hook process
+TIMEOUTS = {"Stop": 15.0}
+DEFAULT_TIMEOUT = 5.0
+# (verdict key, reason key, verdicts most restrictive first) of JSON outputs
+VERDICTS = (("continue", "stopReason", (False, True)),
+            ("decision", "reason", ("block", "approve")),
+            ("permissionDecision", "permissionDecisionReason", ("deny", "ask", "allow")))
+JOINED = ("systemMessage", "additionalContext")
+
+# One selected hook: script path, matcher, verdict cache tables (None: not
+# cached), fields it reads (None: the whole payload), run as a process, seconds
+Hook = namedtuple("Hook", "script matcher tables fields process timeout")
+
+
+class HookTimeout(BaseException):
+    """Raised in a hook past its timeout; not an Exception, so a hook's own
+    ``except Exception`` does not swallow it."""
+
+_code_cache = {}  # path -> code object (loaded once per process)
+
+
+class HookResult:
+    __slots__ = ("script", "exit_code", "stdout", "stderr", "ms", "cached", "error")
+
+    def __init__(self, script, exit_code, stdout, stderr, ms=0.0, cached=False, error=""):
+        self.script = script
+        self.exit_code = exit_code
+        self.stdout = stdout
+        self.stderr = stderr
+        self.ms = ms
+        self.cached = cached
+        self.error = error      # "ExcType: message" when the hook raised
+
+
+class _Capture(io.BytesIO):
+    """Bytes behind a hook's std stream. Survives close(): a hook that wraps
+    sys.stdout.buffer in its own TextIOWrapper closes it when that is dropped."""
+
+    def close(self):
+        pass
+
+
+def _stream(data=b""):
+    return io.TextIOWrapper(_Capture(data), encoding="utf-8", errors="replace",
+                            write_through=True)
+
+
+def _captured(stream):
+    stream.flush()
+    return stream.buffer.getvalue().decode(stream.encoding or "utf-8", "replace")
+
+
+def load_registry(path=REGISTRY_PATH):
+    """Return {event: [{"matcher": str, "script": str}, ...]}."""
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def matches(matcher, tool_name):
+    """Same semantics as settings.json matchers: empty/"*" = all, else regex."""
+    if not matcher or matcher == "*":
+        return True
+    return re.fullmatch(matcher, tool_name or "") is not None
+
+
+def select_hooks(registry, event, tool_name):
+    """[Hook] of the hooks for ``event`` that accept ``tool_name``."""
+    return [
+        Hook(hooklib.expand(h["script"]), h.get("matcher", ""), _cache_tables(h.get("cache")),
+             h.get("fields"), bool(h.get("process")),
+             float(h.get("timeout") or TIMEOUTS.get(event, DEFAULT_TIMEOUT)))
+        for h in registry.get(event, [])
+        if matches(h.get("matcher", ""), tool_name)
+    ]
+
+
+def _cache_tables(spec):
+    if spec is None or spec is False:
+        return None
+    return tuple(hooklib.expand(p) for p in spec) if isinstance(spec, list) else ()
+
+
+def wanted_fields(hooks):
+    """The fields to decode for these hooks (plus telemetry's), or None when
+    one of them needs the whole payload (no ``fields``, or cached)."""
+    wanted = set(TELEMETRY_FIELDS)
+    for hook in hooks:
+        if hook.fields is None or hook.tables is not None:
+            return None
+        wanted.update(hook.fields)
+    return sorted(wanted)
+
+
+def parse_input(raw, wanted=None):
+    """The event payload as a dict (None if ``raw`` is not a JSON object):
+    every field, or just the ``wanted`` dotted paths."""
+    if wanted is not None:
+        return fields.extract(raw, wanted)
+    try:
+        payload = json.loads(raw)
+    except ValueError:
+        return None
+    return payload if isinstance(payload, dict) else None
+
+
+def _compile(path):
+    code = _code_cache.get(path)
+    if code is None:
+        code = _code_cache[path] = loader.load_code(path)  # bytecode-cached
+    return code
+
+
+def _exit_code(exc):
+    if exc.code is None:
+        return 0
+    if isinstance(exc.code, int):
+        return exc.code
+    print(exc.code, file=sys.stderr)
+    return 1
+
+
+@contextlib.contextmanager
+def _deadline(seconds):
+    """Raise HookTimeout in the block after ``seconds`` (main thread only)."""
+    if not seconds or threading.current_thread() is not threading.main_thread():
+        yield
+        return
+    if hasattr(signal, "setitimer"):
+        def expire(signum, frame):
+            raise HookTimeout
+
+        previous = signal.signal(signal.SIGALRM, expire)
+        signal.setitimer(signal.ITIMER_REAL, seconds)
+        try:
+            yield
+        finally:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous)
+        return
+    fired = threading.Event()  # Windows: no SIGALRM, interrupt the main thread
+
+    def interrupt():
+        fired.set()
+        _thread.interrupt_main()
+
+    timer = threading.Timer(seconds, interrupt)
+    timer.daemon = True
+    timer.start()
+    try:
+        yield
+    except KeyboardInterrupt:
+        if fired.is_set():
+            raise HookTimeout from None
+        raise
+    finally:
+        timer.cancel()
+
+
+def run_hook(path, raw, payload, timeout=None):
+    """Execute one hook script in-process against an already-read event,
+    stopped after ``timeout`` seconds (None: no limit)."""
+    saved = sys.stdin, sys.stdout, sys.stderr
+    out, err = _stream(), _stream()
+    sys.stdin, sys.stdout, sys.stderr = _stream(raw.encode("utf-8", "replace")), out, err
+    hooklib.set_input(payload)
+    code, error = 0, ""
+    start = time.perf_counter()
+    try:
+        with _deadline(timeout):
+            exec(_compile(path), {"__name__": "__main__", "__file__": path,
+                                  "__builtins__": builtins})
+    except SystemExit as e:
+        code = _exit_code(e)
+    except HookTimeout:
+        print(f"hook timed out after {timeout:g} s: {path}", file=err)
+        code, error = 1, f"timed out after {timeout:g} s"
+    except ImportError as e:
+        if sys.flags.no_site and e.name:
+            code, error = None, "import under -S"  # re-run below as a process
+        else:
+            traceback.print_exc(file=err)
+            code, error = 1, "".join(traceback.format_exception_only(type(e), e)).strip()
+    except Exception as e:
+        if isinstance(e, FileNotFoundError) and not os.path.exists(path):
+            print(f"hook script not found: {path}", file=err)
+            code, error = 1, "script not found"
+        else:
+            traceback.print_exc(file=err)
+            code, error = 1, "".join(traceback.format_exception_only(type(e), e)).strip()
+    finally:
+        ms = (time.perf_counter() - start) * 1000
+        for stream in (sys.stdout, sys.stderr):  # the hook may have re-wrapped them
+            try:
+                stream.flush()
+            except Exception:
+                pass
+        sys.stdin, sys.stdout, sys.stderr = saved
+        hooklib.set_input(None)
+    if code is None:
+        return run_process(path, raw, timeout)
+    return HookResult(path, code, _captured(out), _captured(err), ms, error=error)
+
+
+def run_process(path, raw, timeout=None):
+    """Execute one hook as a separate interpreter process (site-packages on),
+    killed after ``timeout`` seconds (None: no limit)."""
+    if not os.path.isfile(path):
+        return HookResult(path, 1, "", f"hook script not found: {path}\n",
+                          error="script not found")
+    start = time.perf_counter()
+    try:
+        proc = subprocess.run([sys.executable or "python", path],
+                              input=raw.encode("utf-8", "replace"), capture_output=True,
+                              timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return HookResult(path, 1, "", f"hook timed out after {timeout:g} s: {path}\n",
+                          (time.perf_counter() - start) * 1000,
+                          error=f"timed out after {timeout:g} s")
+    except OSError as e:
+        return HookResult(path, 1, "", f"{e}\n", error=f"{type(e).__name__}: {e}")
+    stdout = proc.stdout.decode("utf-8", "replace")
+    stderr = proc.stderr.decode("utf-8", "replace")
+    error = ""
+    if proc.returncode == 1 and "Traceback (most recent call last)" in stderr:
+        error = stderr.rstrip().splitlines()[-1]  # it raised, like a crash in-process
+    return HookResult(path, proc.returncode, stdout, stderr,
+                      (time.perf_counter() - start) * 1000, error=error)
+
+
+def run_cached(path, raw, payload, tables, lookup, timeout=None):
+    """run_hook() behind the verdict cache: a fresh stored verdict is replayed,
+    otherwise the hook runs and its verdict is stored if it may be."""
+    from hooklib import verdicts
+    start = time.perf_counter()
+    key = lookup.key(path, tables)
+    hit = lookup.get(key) if key else None
+    if hit is not None:
+        code, stdout, stderr = hit
+        return HookResult(path, code, stdout, stderr, (time.perf_counter() - start) * 1000,
+                          cached=True)
+    verdicts.begin()
+    result = run_hook(path, raw, payload, timeout)
+    if key:
+        lookup.put(key, result.exit_code, result.stdout, result.stderr)
+    result.ms = (time.perf_counter() - start) * 1000
+    return result
+
+
+def run_event(event, raw, registry=None):
+    """Run every matching hook for ``event``; return the list of HookResult."""
+    if registry is None:
+        registry = load_registry()
+    start = time.perf_counter()
+    if any("fields" in h for h in registry.get(event, ())):
+        head = fields.extract(raw, ("tool_name",)) or {}
+        hooks = select_hooks(registry, event, head.get("tool_name", ""))
+        payload = parse_input(raw, wanted_fields(hooks))
+    else:
+        payload = parse_input(raw)
+        hooks = select_hooks(registry, event, payload.get("tool_name", "") if payload else "")
+    parse_ms = (time.perf_counter() - start) * 1000
+    lookup = None
+    if any(hook.tables is not None for hook in hooks):
+        from hooklib import verdicts
+        lookup = verdicts.open_lookup(event, raw, payload)
+    results, records = [], []
+    for hook in hooks:
+        path = hook.script
+        if hook.process:
+            result = run_process(path, raw, hook.timeout)
+        elif lookup and hook.tables is not None:
+            result = run_cached(path, raw, payload, hook.tables, lookup, hook.timeout)
+        else:
+            result = run_hook(path, raw, payload, hook.timeout)
+        if result.error and event in BLOCKING_EVENTS:
+            result.stderr = (f"HOOK ERROR: {telemetry.hook_name(path)} failed ({result.error})."
+                             f" Its {event} check did not run for this call (details"
+                             f" below and in the hook telemetry log).\n" + result.stderr)
+        results.append(result)
+        records.append(telemetry.record(payload, event, len(raw), parse_ms,
+                                        result, hook.matcher))
+    telemetry.write(records)
+    return results
+
+
+def json_output(stdout):
+    """A hook's stdout as a JSON object (structured output), or None."""
+    text = stdout.strip()
+    if not text.startswith("{"):
+        return None
+    try:
+        value = json.loads(text)
+    except ValueError:
+        return None
+    return value if isinstance(value, dict) else None
+
+
+def _merge(objects):
+    merged = {}
+    for obj in objects:
+        for key, value in obj.items():
+            if key not in merged:
+                merged[key] = value
+            elif key in JOINED and isinstance(value, str) and value:
+                merged[key] = f"{merged[key]}\n{value}" if merged[key] else value
+    for key, reason, order in VERDICTS:
+        given = [o for o in objects if key in o and o[key] in order]
+        if not given:
+            continue
+        merged[key] = min((o[key] for o in given), key=order.index)
+        reasons = [o[reason] for o in given if o[key] == merged[key]
+                   and isinstance(o.get(reason), str) and o[reason]]
+        if reasons:
+            merged[reason] = "\n".join(reasons)
+        else:
+            merged.pop(reason, None)
+    return merged
+
+
+def merge_outputs(outputs):
+    """One JSON output from several hooks' (in registry order).
+
+    The most restrictive verdict wins (VERDICTS: continue false, decision
+    "block", permissionDecision deny > ask > allow) with the reasons of the
+    hooks that gave it; systemMessage and additionalContext are joined; any
+    other key keeps the first hook's value. Same for hookSpecificOutput.
+    """
+    merged = _merge(outputs)
+    specific = [o["hookSpecificOutput"] for o in outputs
+                if isinstance(o.get("hookSpecificOutput"), dict)]
+    if specific:
+        merged["hookSpecificOutput"] = _merge(specific)
+    return merged
+
+
+def combine(results):
+    """Fold per-hook results into one (exit_code, stdout, stderr).
+
+    With JSON from any hook that exited 0, stdout is the merged object and
+    the exit code 0 (Claude Code ignores JSON otherwise); other hooks' plain
+    stdout moves to stderr, and failed hooks' stderr into systemMessage.
+    """
+    blocking = [r for r in results if r.exit_code == 2]
+    if blocking:
+        return 2, "", "".join(r.stderr for r in blocking)
+    outputs = [json_output(r.stdout) if r.exit_code == 0 else None for r in results]
+    if any(outputs):
+        merged = merge_outputs([o for o in outputs if o])
+        failed = "".join(r.stderr for r in results if r.exit_code != 0).strip()
+        if failed:
+            message = merged.get("systemMessage")
+            merged["systemMessage"] = f"{message}\n{failed}" if message else failed
+        stderr = "".join(r.stdout for r, o in zip(results, outputs) if not o)
+        stderr += "".join(r.stderr for r in results if r.exit_code == 0)
+        return 0, json.dumps(merged), stderr
+    stdout = "".join(r.stdout for r in results)
+    stderr = "".join(r.stderr for r in results)
+    if any(r.exit_code != 0 for r in results):
+        return 1, stdout, stderr
+    return 0, stdout, stderr
@@ -0,0 +1,225 @@
+"""Dev-loop SOP facts of a recorded session, for analytics across sessions.
+
+stop-verify-pipeline.py judges one live session from its ledger and the
+facts are gone afterwards. ``session_facts()`` rebuilds that ledger for a
+recorded session and applies the same assessment, so compliance and hook
+behaviour can be tracked over every session under ~/.claude/projects/:
+
+  * a tool call whose result came back is classified by ``ledger.classify``
+    when a PostToolUse hook in hooks.json sees its tool (that is when the
+    live ledger records it); user prompts by ``ledger.classify_prompt``
+  * the folded ``ledger.Session`` gives the SOP flags and
+    ``devloop.Assessment`` the exemption and missing steps: what the Stop
+    hook would have said at the end of the session
+  * a tool_error carrying a PreToolUse box is a hook block; a later
+    successful call of the same tool on the same input (bypass tokens
+    from rules.json ignored) means the block was overridden -- the closest
+    a transcript gets to a false positive. ``tests_attempted`` next to
+    ``tests_run`` does the same for the Stop hook (a failing test run is
+    no PostToolUse, so the ledger never sees it)
+
+The session is read from its columnar sidecar (hooklib.sidecar), so only
+lines added since the last run are parsed. Inputs the sidecar does not
+hold (Skill names, agent types, MCP arguments, values cut at MAX_VALUE) are
+decoded from the JSONL line on demand.
+
+    from hooklib import facts
+
+    row = facts.session_facts(jsonl_path)   # {name: value} for FIELDS
+    facts.version()                         # changes when the classification does
+"""
+import json
+import os
+from collections import Counter
+
+import hooklib
+from hooklib import devloop, ledger, sidecar, telemetry
+
+FIELDS = (
+    "session", "project", "path", "bytes", "mtime_ns", "version",
+    "started", "ended", "prompts", "tool_calls", "tool_errors",
+    "edits", "code_edits", "code_files",
+    "tests_run", "tests_attempted", "committed", "pushed", "deployed", "qa_submitted",
+    "qa_waived", "cto_invoked", "nontrivial", "migration_created", "migration_applied",
+    "exempt", "missing", "stop_fires", "stop_feedback",
+    "hook_blocks", "hook_overridden", "block_reasons",
+)
+# Sources whose changes change the facts (the fact table is recomputed)
+SOURCES = ("ledger.py", "devloop.py", "signals.py", "shell.py", "sidecar.py", "facts.py")
+TABLES = ("hooks.json", "rules.json")
+
+HOOK_BOX = "HOOK OUTPUT"               # header of every boxed hook message
+PRETOOL_BOX = "PRETOOLUSE HOOK OUTPUT"
+STOP_BOX = "[STOP] HOOK OUTPUT"
+# Tools whose input the sidecar holds in full (else the JSONL line is decoded)
+COLUMN_INPUTS = {"Bash": "command", "Edit": "file_path", "Write": "file_path",
+                 "MultiEdit": "file_path", "NotebookEdit": "notebook_path",
+                 "Read": "file_path"}
+
+
+def version():
+    """Hash of the classification sources and tables (hex)."""
+    from hashlib import blake2b
+    h = blake2b(digest_size=8)
+    paths = [os.path.join(os.path.dirname(os.path.abspath(__file__)), name) for name in SOURCES]
+    paths += [os.path.join(hooklib.RUNTIME_DIR, name) for name in TABLES]
+    for path in paths:
+        try:
+            with open(path, "rb") as f:
+                h.update(f.read())
+        except OSError:
+            h.update(b"-")
+    return h.hexdigest()
+
+
+class _Context:
+    """Per-process lookups shared by every session: ledger tools, bypass tokens."""
+
+    def __init__(self):
+        from hooklib import dispatch, rules
+        try:
+            registry = dispatch.load_registry()
+        except (OSError, ValueError):
+            registry = {}
+        self._matchers = [h.get("matcher", "") for h in registry.get("PostToolUse", [])]
+        self._matches = dispatch.matches
+        self._recorded = {}
+        self.bypass = sorted({r.bypass for r in rules.load().rules if r.bypass},
+                             key=len, reverse=True)
+        self.version = version()
+
+    def recorded(self, tool):
+        """Whether the live ledger sees this tool's calls (a PostToolUse hook matches)."""
+        seen = self._recorded.get(tool)
+        if seen is None:
+            seen = self._recorded[tool] = any(self._matches(m, tool) for m in self._matchers)
+        return seen
+
+    def call_key(self, tool, file_path, command):
+        for token in self.bypass:
+            command = command.replace(token, "")
+        return tool, file_path, " ".join(command.split())
+
+
+_context = None
+
+
+def context():
+    global _context
+    if _context is None:
+        _context = _Context()
+    return _context
+
+
+def _tool_input(sc, i, tool, tool_id, file_path, command):
+    """tool_input of the tool_use in row ``i``, from the columns when they hold it."""
+    field = COLUMN_INPUTS.get(tool)
+    if field and len(command) < sidecar.MAX_VALUE:
+        return {field: command if field == "command" else file_path}
+    content = (sc.payload(i).get("message") or {}).get("content") or []
+    for block in content:
+        if isinstance(block, dict) and block.get("id") == tool_id:
+            inp = block.get("input")
+            return inp if isinstance(inp, dict) else {}
+    return {}
+
+
+def _prompt_text(sc, i, text):
+    if len(text) < sidecar.MAX_VALUE:
+        return text
+    content = (sc.payload(i).get("message") or {}).get("content")
+    if isinstance(content, str):
+        return content
+    return "\n".join(b.get("text") or "" for b in content or ()
+                     if isinstance(b, dict) and b.get("type") == "text")
+
+
+def session_facts(path, ctx=None):
+    """FIELDS of one session JSONL (its sidecar is brought up to date)."""
+    ctx = ctx or context()
+    st = os.stat(path)
+    folded, seq = ledger.Session(), 0
+    counts = Counter()
+    started = ended = ""
+    pending = {}          # tool_use id -> (row, tool, file_path, command)
+    blocked = set()       # call keys of blocked calls not retried yet
+    reasons = Counter()
+
+    def apply(events):
+        nonlocal seq
+        for kind, value in events:
+            seq += 1
+            folded.apply(seq, kind, value)
+
+    with sidecar.load(path) as sc:
+        columns = ("kind", "ts", "tool", "tool_id", "file_path", "command", "text")
+        for i, (kind, ts, tool, tool_id, file_path, command, text) in enumerate(
+                sc.values(*columns)):
+            if ts:
+                started, ended = started or ts, ts
+            if kind == "prompt":
+                if HOOK_BOX in text:  # hook feedback shown as a user turn, not typed
+                    counts["stop_feedback"] += STOP_BOX in text
+                    continue
+                counts["prompts"] += 1
+                apply(ledger.classify_prompt(_prompt_text(sc, i, text)))
+            elif kind == "tool_use":
+                counts["tool_calls"] += 1
+                pending[tool_id] = (i, tool, file_path, command)
+                if tool == "Bash" and any(p in command.lower() for p in ledger.TEST_PATTERNS):
+                    counts["tests_attempted"] = 1
+            elif kind in ("tool_result", "tool_error"):
+                call = pending.pop(tool_id, None)
+                if call is None:
+                    continue
+                row, tool, file_path, command = call
+                key = ctx.call_key(tool, file_path, command)
+                if kind == "tool_error":
+                    counts["tool_errors"] += 1
+                    if PRETOOL_BOX in text:
+                        counts["hook_blocks"] += 1
+                        reasons[telemetry.block_reason(text[text.index(PRETOOL_BOX):])] += 1
+                        blocked.add(key)
+                    continue
+                if key in blocked:
+                    counts["hook_overridden"] += 1
+                    blocked.discard(key)
+                if ctx.recorded(tool):
+                    tool_input = _tool_input(sc, row, tool, tool_id, file_path, command)
+                    apply(ledger.classify({"tool_name": tool, "tool_input": tool_input}))
+
+    flags = folded.flags()
+    verdict = devloop.Assessment(folded.edits, flags)
+    out = {
+        "session": os.path.splitext(os.path.basename(path))[0],
+        "project": os.path.basename(os.path.dirname(path)),
+        "path": path,
+        "bytes": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+        "version": ctx.version,
+        "started": started,
+        "ended": ended,
+        "edits": verdict.all_edit_count,
+        "code_edits": verdict.edit_count,
+        "code_files": len(verdict.code_edits),
+        "tests_run": flags["tests_run"],
+        "committed": flags["committed"],
+        "pushed": folded.has("push"),
+        "deployed": flags["deployed"],
+        "qa_submitted": flags["qa_submitted"],
+        "qa_waived": flags["qa_waived"],
+        "cto_invoked": flags["cto_invoked"],
+        "nontrivial": verdict.nontrivial,
+        "migration_created": flags["migration_created"],
+        "migration_applied": flags["migration_applied"],
+        "exempt": verdict.exempt,
+        "missing": " ".join(verdict.missing),
+        "stop_fires": bool(verdict.missing),
+        "block_reasons": json.dumps(dict(reasons.most_common()), ensure_ascii=False)
+        if reasons else "",
+    }
+    for name in ("prompts", "tool_calls", "tool_errors", "hook_blocks", "hook_overridden",
+                 "stop_feedback"):
+        out[name] = counts[name]
+    out["tests_attempted"] = bool(counts["tests_attempted"]) or flags["tests_run"]
+    return out
@@ -0,0 +1,162 @@
+"""Decode only the named fields of a hook event's JSON.
+
+A Write event carries the whole file (PostToolUse: twice, tool_input and
+tool_response), yet hooks like mark-code-edits only read ``tool_name`` and
+``tool_input.file_path``. ``extract()`` walks the raw JSON text instead of
+decoding it:
+
+  * keys are compared as they come; a wanted value is decoded, any other
+    value is skipped -- strings by a quote search, so a multi-megabyte
+    ``content`` is passed over without being copied, containers by
+    bracket depth
+  * it stops as soon as every wanted field was seen; Claude Code sends the
+    header keys and ``file_path`` before ``content``, so a Write event is
+    done after a few hundred bytes whatever the file's size
+
+The result has the payload's shape with just those keys, so code written
+against the full payload (``data.get("tool_input", {}).get("file_path")``)
+works on it unchanged:
+
+    from hooklib import fields
+
+    fields.extract(raw, ("tool_name", "tool_input.file_path"))
+    # {"tool_name": "Write", "tool_input": {"file_path": "/repo/a.py"}}
+
+Missing fields are absent. The first occurrence of a duplicated key wins
+(json.loads keeps the last), and text after the last wanted field is not
+validated. None when the text does not start with a JSON object or is
+malformed before every field was found.
+"""
+import json
+import re
+from json.decoder import scanstring
+
+_WS = re.compile(r"[ \t\r\n]*")
+_LITERAL = re.compile(r"-?[0-9][-+0-9.eE]*|true|false|null")
+_STRUCTURE = re.compile(r'["{}\[\]]')
+_ESCAPED_QUOTES = 32  # past this many in one string, the C scanner is faster
+_decode = json.JSONDecoder().raw_decode
+
+
+class _Done(Exception):
+    pass
+
+
+def tree(paths):
+    """{"tool_input": {"file_path": None}, ...} for dotted field paths
+    (None marks a wanted value). A path that is a prefix of another wins."""
+    root = {}
+    for path in paths:
+        node, parts = root, path.split(".")
+        for part in parts[:-1]:
+            child = node.setdefault(part, {})
+            if child is None:
+                break
+            node = child
+        else:
+            node[parts[-1]] = None
+    return root
+
+
+def _leaves(node):
+    return sum(1 if sub is None else _leaves(sub) for sub in node.values())
+
+
+def _string_end(raw, start):
+    """Index of the closing quote of the string body starting at ``start``."""
+    scan = start
+    for _ in range(_ESCAPED_QUOTES):
+        quote = raw.index('"', scan)
+        slash = quote
+        while slash > start and raw[slash - 1] == "\\":
+            slash -= 1
+        if (quote - slash) % 2 == 0:
+            return quote
+        scan = quote + 1
+    return scanstring(raw, start)[1] - 1
+
+
+class _Scanner:
+    def __init__(self, raw, want):
+        self.raw = raw
+        self.left = _leaves(want)
+
+    def _ws(self, pos):
+        return _WS.match(self.raw, pos).end()
+
+    def object(self, pos, want, out):
+        """Fill ``out`` from the object at ``pos``; the index after it."""
+        raw = self.raw
+        pos = self._ws(pos + 1)
+        if raw[pos] == "}":
+            return pos + 1
+        while True:
+            if raw[pos] != '"':
+                raise ValueError("expected a key")
+            key, pos = scanstring(raw, pos + 1)
+            pos = self._ws(pos)
+            if raw[pos] != ":":
+                raise ValueError("expected ':'")
+            pos = self._ws(pos + 1)
+            if key not in want or key in out and want[key] is None:
+                pos = self.skip(pos)
+            elif want[key] is None:
+                out[key], pos = _decode(raw, pos)
+                self.left -= 1
+                if not self.left:
+                    raise _Done
+            elif raw[pos] == "{":
+                pos = self.object(pos, want[key], out.setdefault(key, {}))
+            else:
+                out[key], pos = _decode(raw, pos)  # not an object: as json.loads has it
+            pos = self._ws(pos)
+            if raw[pos] == "}":
+                return pos + 1
+            if raw[pos] != ",":
+                raise ValueError("expected ',' or '}'")
+            pos = self._ws(pos + 1)
+
+    def skip(self, pos):
+        """Index after the value at ``pos``, nothing decoded."""
+        raw = self.raw
+        char = raw[pos]
+        if char == '"':
+            return _string_end(raw, pos + 1) + 1
+        if char not in "{[":
+            m = _LITERAL.match(raw, pos)
+            if m is None:
+                raise ValueError("unexpected character")
+            return m.end()
+        depth = 0
+        while True:
+            m = _STRUCTURE.search(raw, pos)
+            if m is None:
+                raise ValueError("unterminated container")
+            char, pos = m.group(), m.end()
+            if char == '"':
+                pos = _string_end(raw, pos) + 1
+            elif char in "{[":
+                depth += 1
+            else:
+                depth -= 1
+                if not depth:
+                    return pos
+
+
+def extract(raw, paths):
+    """{field: value} of the dotted ``paths`` in the JSON object ``raw``
+    (nested like the payload), or None when ``raw`` is not one."""
+    want = tree(paths)
+    out = {}
+    scanner = _Scanner(raw, want)
+    try:
+        pos = scanner._ws(0)
+        if raw[pos:pos + 1] != "{":
+            return None
+        if scanner.left:
+            scanner.object(pos, want, out)
+    except _Done:
+        pass
+    except (ValueError, IndexError):
+        return None
+    return out
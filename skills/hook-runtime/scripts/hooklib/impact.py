@@ -0,0 +1,606 @@
+"""Test-impact selection: the tests a set of edited files can affect.
+
+A one-file fix in a monorepo does not need the whole suite, only the tests
+that import the file, directly or through other modules. ``select()`` walks
+the repository's import graph backwards from the edited files to the test
+files that reach them and groups those by runner:
+
+  vitest / jest   -- *.test.* / *.spec.* / __tests__/ files; the runner from
+                     the test's own import (vitest, @jest/globals), else the
+                     nearest package with a vitest/jest config or dependency
+  playwright      -- test files importing @playwright/test
+  pytest          -- test_*.py / *_test.py; conftest.py counts as imported by
+                     every test below it
+
+Import edges are found by regex, not by a parser: ES imports/exports,
+require(), dynamic import(), vi.mock/jest.mock, Python import / from-import.
+Relative specifiers, tsconfig ``paths`` aliases and workspace package names
+are resolved; anything else (node_modules, stdlib) is outside the graph.
+
+The graph is cached per worktree in the git dir (GRAPH_NAME): each file's
+import specifiers with its mtime and size, so a rebuild re-reads only files
+that changed since the last run (``git ls-files`` gives the file list,
+ignored files excluded).
+
+Doc files (devloop.is_doc_file) are ignored. Some edits cannot be narrowed
+and need the full suite: a config or manifest (FULL_SUITE_NAMES, *.config.*),
+a deleted file, a file type the graph does not know, or no test reaching any
+edited file.
+
+    from hooklib import impact
+
+    sel = impact.select(cwd, ["/repo/packages/api/src/auth.ts"])
+    sel.full            # "" or why the full suite is needed
+    sel.tests           # ["packages/api/src/auth.test.ts", ...] (repo-relative)
+    sel.commands()      # ["cd /repo/packages/api && npx vitest run src/auth.test.ts"]
+    impact.run_scope(command, cwd)   # "full" (bare runner) or the test files a command ran
+"""
+import json
+import os
+import posixpath
+import re
+import shlex
+
+from hooklib.devloop import is_doc_file
+from hooklib.ledger import TEST_PATTERNS
+
+GRAPH_NAME = "claude-impact-graph.json"
+VERSION = 1
+MAX_SOURCE = 1 << 20   # bigger files (bundles, generated code) are not scanned
+
+JS_EXTENSIONS = (".ts", ".tsx", ".js", ".jsx", ".mjs", ".cjs", ".mts", ".cts", ".vue",
+                 ".svelte")
+PY_EXTENSIONS = (".py",)
+# Resolvable import targets that import nothing themselves
+ASSET_EXTENSIONS = (".json", ".css", ".scss", ".sass", ".less", ".svg", ".graphql", ".gql")
+FULL_SUITE_NAMES = ("package.json", "package-lock.json", "pnpm-lock.yaml", "yarn.lock",
+                    "tsconfig.json", "pyproject.toml", "setup.py", "setup.cfg", "pytest.ini",
+                    "tox.ini", "requirements.txt", "poetry.lock", "uv.lock", ".babelrc")
+CONFIG_FILE = re.compile(r"(^|/)[^/]*\.config\.[cm]?[jt]s$|(^|/)\.[^/]*rc(\.json|\.[cm]?js)?$")
+RUNNER_CONFIGS = {
+    "vitest": [f"{n}.config.{e}" for n in ("vitest", "vite") for e in ("ts", "mts", "js", "mjs")],
+    "jest": [f"jest.config.{e}" for e in ("ts", "js", "mjs", "cjs", "json")],
+    "playwright": [f"playwright.config.{e}" for e in ("ts", "js", "mjs")],
+}
+RUNNER_IMPORTS = {"vitest": "vitest", "@jest/globals": "jest", "@playwright/test": "playwright"}
+
+_JS_TEST = re.compile(r"(\.(test|spec)\.[cm]?[jt]sx?$)|(^|/)__tests__/")
+_PY_TEST = re.compile(r"(^|/)(test_[^/]*|[^/]*_test)\.py$")
+_JS_IMPORT = re.compile(
+    r"""(?:\bimport\s*(?:[\w*{}\s,$]+?\s*from\s*)?|\bexport\s*[\w*{}\s,$]*?\s*from\s*"""
+    r"""|\b(?:require|import|vi\.mock|jest\.mock|vi\.importActual|jest\.requireActual)"""
+    r"""\s*\(\s*)(['"`])([^'"`\n]+)\1""")
+_PY_IMPORT = re.compile(
+    r"^[ \t]*(?:from[ \t]+(\.*[\w.]*)[ \t]+import[ \t]+(\([^)]*\)|[^\n#;]+)"
+    r"|import[ \t]+([\w.]+(?:[ \t]*,[ \t]*[\w.]+)*))", re.M)
+_JSONC_JUNK = re.compile(r'("(?:[^"\\]|\\.)*")|//[^\n]*|/\*.*?\*/|,(?=\s*[}\]])', re.S)
+
+
+def is_test(rel):
+    if rel.endswith(PY_EXTENSIONS):
+        return bool(_PY_TEST.search(rel))
+    return rel.endswith(JS_EXTENSIONS) and bool(_JS_TEST.search(rel))
+
+
+def needs_full_suite(rel):
+    name = posixpath.basename(rel)
+    return name in FULL_SUITE_NAMES or bool(CONFIG_FILE.search(rel))
+
+
+def _git(cwd, *args):
+    from hooklib.testruns import git
+    return git(cwd, *args)
+
+
+def _read(path, limit=MAX_SOURCE):
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            return f.read(limit)
+    except OSError:
+        return ""
+
+
+def _jsonc(text):
+    """JSON with comments and trailing commas (tsconfig.json), or {}."""
+    try:
+        value = json.loads(_JSONC_JUNK.sub(lambda m: m.group(1) or "", text))
+    except ValueError:
+        return {}
+    return value if isinstance(value, dict) else {}
+
+
+def scan_imports(rel, text):
+    """Import specifiers of one source file, as stored in the graph cache.
+
+    JS: the module strings. Python: "mod" for ``import mod``, "mod:a,b" for
+    ``from mod import a, b`` (leading dots kept for relative imports).
+    """
+    if rel.endswith(PY_EXTENSIONS):
+        specs = []
+        for m in _PY_IMPORT.finditer(text):
+            if m.group(3):
+                specs.extend(part.strip() for part in m.group(3).split(","))
+            else:
+                names = re.findall(r"\w+", m.group(2).split("#")[0])
+                specs.append(f"{m.group(1)}:{','.join(names)}")
+        return specs
+    return sorted({m.group(2) for m in _JS_IMPORT.finditer(text)})
+
+
+class Graph:
+    """Import graph of one worktree (paths relative to its top level, '/'-separated)."""
+
+    def __init__(self, root, specs):
+        self.root = root
+        self.specs = specs               # rel -> [specifier]
+        self.files = set(specs)
+        self.tests = sorted(r for r in specs if is_test(r))
+        self._aliases = None
+        self._packages = None
+        self._edges = None
+        self._importers = None
+        self._package_json = {}
+        self.rescanned = 0               # files (re)read by load()
+
+    # -- building --
+
+    @classmethod
+    def load(cls, cwd):
+        """The graph of the worktree ``cwd`` is in, refreshed from disk; None
+        outside a git repo. Only files changed since the cached run are read."""
+        root = _git(cwd, "rev-parse", "--show-toplevel")
+        cache_path = _git(cwd, "rev-parse", "--git-path", GRAPH_NAME)
+        listing = _git(root or cwd, "ls-files", "-z", "--cached", "--others",
+                       "--exclude-standard") if root else None
+        if listing is None or cache_path is None:
+            return None
+        cache_path = os.path.join(cwd, cache_path)
+        try:
+            with open(cache_path, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+            if cached.get("version") != VERSION:
+                cached = {}
+        except (OSError, ValueError):
+            cached = {}
+        old = cached.get("files", {})
+        entries, specs, rescanned = {}, {}, 0
+        extensions = JS_EXTENSIONS + PY_EXTENSIONS + ASSET_EXTENSIONS
+        for rel in sorted(set(listing.split("\0")) - {""}):
+            if not rel.endswith(extensions):
+                continue
+            path = os.path.join(root, rel)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue  # deleted but still in the index
+            entry = old.get(rel)
+            if entry is None or entry[:2] != [st.st_mtime_ns, st.st_size]:
+                scanned = [] if rel.endswith(ASSET_EXTENSIONS) or (
+                    st.st_size > MAX_SOURCE) else scan_imports(rel, _read(path))
+                entry = [st.st_mtime_ns, st.st_size, scanned]
+                rescanned += 1
+            entries[rel] = entry
+            specs[rel] = entry[2]
+        if rescanned or len(entries) != len(old):
+            tmp = f"{cache_path}.{os.getpid()}.tmp"
+            try:
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump({"version": VERSION, "files": entries}, f, separators=(",", ":"))
+                os.replace(tmp, cache_path)
+            except OSError:
+                pass
+        graph = cls(root.replace("\\", "/"), specs)
+        graph.rescanned = rescanned
+        return graph
+
+    # -- resolution --
+
+    def _candidates(self, base):
+        yield base
+        stem, ext = posixpath.splitext(base)
+        if ext in (".js", ".jsx", ".mjs", ".cjs"):  # TS ESM: "./x.js" is x.ts
+            for alt in (".ts", ".tsx", ".mts", ".cts"):
+                yield stem + alt
+        for ext in JS_EXTENSIONS:
+            yield base + ext
+        for ext in JS_EXTENSIONS:
+            yield f"{base}/index{ext}"
+
+    def _first(self, base):
+        base = posixpath.normpath(base)
+        if base.startswith("../") or base == "..":
+            return None
+        for candidate in self._candidates(base):
+            if candidate in self.files:
+                return candidate
+        return None
+
+    def _tsconfig_aliases(self):
+        """[(dir, prefix, [target prefixes])] from every tsconfig.json's paths."""
+        if self._aliases is None:
+            self._aliases = []
+            for rel in self.files:
+                if posixpath.basename(rel) != "tsconfig.json":
+                    continue
+                directory = posixpath.dirname(rel)
+                options = _jsonc(_read(os.path.join(self.root, rel))).get(
+                    "compilerOptions") or {}
+                base = posixpath.join(directory, options.get("baseUrl") or ".")
+                for pattern, targets in (options.get("paths") or {}).items():
+                    if isinstance(targets, list):
+                        self._aliases.append((directory, pattern.rstrip("*"), [
+                            posixpath.join(base, t.rstrip("*")) for t in targets
+                            if isinstance(t, str)]))
+            self._aliases.sort(key=lambda a: (-len(a[0]), -len(a[1])))
+        return self._aliases
+
+    def _workspace_packages(self):
+        """{package name: its directory} of the package.json files in the repo."""
+        if self._packages is None:
+            self._packages = {}
+            for rel in self.files:
+                if posixpath.basename(rel) == "package.json":
+                    name = self.package_json(posixpath.dirname(rel)).get("name")
+                    if isinstance(name, str):
+                        self._packages[name] = posixpath.dirname(rel)
+        return self._packages
+
+    def package_json(self, directory):
+        if directory not in self._package_json:
+            rel = posixpath.join(directory, "package.json")
+            data = _jsonc(_read(os.path.join(self.root, rel))) if rel in self.files else {}
+            self._package_json[directory] = data
+        return self._package_json[directory]
+
+    def _resolve_js(self, rel, spec):
+        directory = posixpath.dirname(rel)
+        if spec.startswith("."):
+            return self._first(posixpath.join(directory, spec))
+        for alias_dir, prefix, targets in self._tsconfig_aliases():
+            if (not alias_dir or rel.startswith(alias_dir + "/")) and spec.startswith(prefix) \
+                    and prefix:
+                for target in targets:
+                    found = self._first(target + spec[len(prefix):])
+                    if found:
+                        return found
+        packages = self._workspace_packages()
+        parts = spec.split("/")
+        name = "/".join(parts[:2]) if spec.startswith("@") else parts[0]
+        if name in packages:
+            pkg_dir, rest = packages[name], spec[len(name):].lstrip("/")
+            if rest:
+                return self._first(posixpath.join(pkg_dir, rest)) or self._first(
+                    posixpath.join(pkg_dir, "src", rest))
+            manifest = self.package_json(pkg_dir)
+            for field in ("source", "module", "main", "types"):
+                entry = manifest.get(field)
+                if isinstance(entry, str):
+                    found = self._first(posixpath.join(pkg_dir, entry))
+                    if found:
+                        return found
+            return self._first(posixpath.join(pkg_dir, "src/index")) or self._first(
+                posixpath.join(pkg_dir, "index"))
+        return None
+
+    def _py_module(self, rel, module):
+        roots = ["", "src", posixpath.dirname(rel)]
+        path = module.replace(".", "/")
+        for root in roots:
+            base = posixpath.join(root, path) if root else path
+            for candidate in (base + ".py", base + "/__init__.py"):
+                if candidate in self.files:
+                    return candidate
+        return None
+
+    def _resolve_py(self, rel, spec):
+        found = []
+        module, _, names = spec.partition(":")
+        if module.startswith("."):
+            level = len(module) - len(module.lstrip("."))
+            base = posixpath.dirname(rel)
+            for _ in range(level - 1):
+                base = posixpath.dirname(base)
+            path = posixpath.join(base, module[level:].replace(".", "/")).rstrip("/")
+            candidates = [path + ".py", path + "/__init__.py"]
+            candidates += [f"{path}/{n}.py" for n in names.split(",") if n]
+            return [c for c in candidates if c in self.files]
+        target = self._py_module(rel, module)
+        if target:
+            found.append(target)
+        for name in filter(None, names.split(",")):
+            sub = self._py_module(rel, f"{module}.{name}")
+            if sub and sub != target:
+                found.append(sub)
+        return found
+
+    def edges(self):
+        """{rel: set of rels it imports}."""
+        if self._edges is None:
+            self._edges = {}
+            conftests = [r for r in self.files if posixpath.basename(r) == "conftest.py"]
+            for rel, specs in self.specs.items():
+                targets = set()
+                if rel.endswith(PY_EXTENSIONS):
+                    for spec in specs:
+                        targets.update(self._resolve_py(rel, spec))
+                    if is_test(rel):
+                        targets.update(c for c in conftests if rel.startswith(
+                            posixpath.dirname(c) + "/" if posixpath.dirname(c) else ""))
+                else:
+                    for spec in specs:
+                        target = self._resolve_js(rel, spec)
+                        if target:
+                            targets.add(target)
+                targets.discard(rel)
+                self._edges[rel] = targets
+        return self._edges
+
+    def importers(self):
+        """{rel: set of rels importing it} (the reversed edges)."""
+        if self._importers is None:
+            self._importers = {}
+            for rel, targets in self.edges().items():
+                for target in targets:
+                    self._importers.setdefault(target, set()).add(rel)
+        return self._importers
+
+    def affected_tests(self, rels):
+        """Test files that import any of ``rels``, directly or transitively."""
+        importers = self.importers()
+        seen, stack = set(rels), list(rels)
+        while stack:
+            for parent in importers.get(stack.pop(), ()):
+                if parent not in seen:
+                    seen.add(parent)
+                    stack.append(parent)
+        return sorted(r for r in seen if is_test(r))
+
+    # -- runners --
+
+    def _here(self, directory, name):
+        return (posixpath.join(directory, name) if directory else name) in self.files
+
+    def _depends(self, directory, name):
+        manifest = self.package_json(directory)
+        return any(isinstance(manifest.get(k), dict) and name in manifest[k]
+                   for k in ("dependencies", "devDependencies"))
+
+    def runner(self, rel):
+        """(runner, project directory, config file or "") for one test file."""
+        if rel.endswith(PY_EXTENSIONS):
+            return "pytest", "", ""
+        runner = next((RUNNER_IMPORTS[s] for s in self.specs.get(rel, ())
+                       if s in RUNNER_IMPORTS), None)
+        directory = posixpath.dirname(rel)
+        while True:
+            if runner == "playwright":
+                config = next((n for n in RUNNER_CONFIGS["playwright"]
+                               if self._here(directory, n)), None)
+                if config and directory:
+                    return "playwright", "", posixpath.join(directory, config)
+                if config or not directory:
+                    return "playwright", "", ""
+            else:
+                for name in (runner,) if runner else ("vitest", "jest"):
+                    if any(self._here(directory, n) for n in RUNNER_CONFIGS[name]) \
+                            or self._depends(directory, name):
+                        return name, directory, ""
+                if not directory:
+                    return runner or "vitest", "", ""
+            directory = posixpath.dirname(directory)
+
+
+class Selection:
+    def __init__(self, graph, edited):
+        self.graph = graph
+        self.edited = edited          # repo-relative edited files
+        self.full = ""                # why the full suite is needed ("" = narrowed)
+        self.tests = []
+        self.uncovered = []           # edited source files no test reaches
+
+    def commands(self):
+        """Narrowed test commands, one per runner and project (run from the repo root)."""
+        if self.full or self.graph is None:
+            return []
+        groups = {}
+        for rel in self.tests:
+            runner, project, config = self.graph.runner(rel)
+            groups.setdefault((runner, project, config), []).append(rel)
+        out = []
+        for (runner, project, config), tests in sorted(groups.items()):
+            local = [posixpath.relpath(t, project) if project else t for t in tests]
+            args = " ".join(shlex.quote(t) for t in local)
+            if runner == "vitest":
+                command = f"npx vitest run {args}"
+            elif runner == "jest":
+                command = f"npx jest --runTestsByPath {args}"
+            elif runner == "playwright":
+                flag = f"--config {shlex.quote(config)} " if config else ""
+                command = f"npx playwright test {flag}{args}"
+            else:
+                command = f"pytest {args}"
+            if project:
+                command = f"cd {shlex.quote(self.graph.root + '/' + project)} && {command}"
+            out.append(command)
+        return out
+
+
+def select(cwd, files):
+    """Selection of the tests affected by ``files`` (absolute or cwd-relative)."""
+    graph = Graph.load(cwd)
+    sel = Selection(graph, [])
+    if graph is None:
+        sel.full = "not a git repository"
+        return sel
+    for path in files:
+        rel = posixpath.relpath(os.path.abspath(os.path.join(cwd, path)).replace("\\", "/"),
+                                graph.root)
+        if not rel.startswith("../") and (rel in graph.files or needs_full_suite(rel)
+                                          or not is_doc_file(rel)):
+            sel.edited.append(rel)
+    sel.edited.sort()
+    for rel in sel.edited:
+        if needs_full_suite(rel):
+            sel.full = f"{rel} is a config/manifest file"
+        elif rel not in graph.files:
+            gone = not os.path.exists(os.path.join(graph.root, rel))
+            sel.full = f"{rel} was deleted" if gone else f"{rel}: not a source file the" \
+                " import graph covers"
+        if sel.full:
+            return sel
+    tests = set()
+    for rel in sel.edited:
+        reached = graph.affected_tests([rel])
+        if not reached and not rel.endswith(ASSET_EXTENSIONS):
+            sel.uncovered.append(rel)
+        tests.update(reached)
+    sel.tests = sorted(tests)
+    if not sel.tests:
+        sel.full = "no test imports the edited files"
+    return sel
+
+
+def changed_files(cwd, base=None, head=None):
+    """Files changed against ``base`` (default: the upstream branch of ``head``,
+    else origin's default branch), absolute. Without ``head``: plus uncommitted
+    and untracked ones. With ``head`` (a commit-ish, e.g. a ref being pushed):
+    only the commits base..head, and none when there is no base."""
+    root = _git(cwd, "rev-parse", "--show-toplevel")
+    if root is None:
+        return []
+    if base is None:
+        for ref in (f"{head or ''}@{{upstream}}", "origin/HEAD"):
+            if _git(cwd, "rev-parse", "--verify", "--quiet", ref) is not None:
+                base = _git(cwd, "merge-base", ref, head or "HEAD")
+                break
+    if head is not None:
+        out = _git(root, "diff", "--name-only", base, head, "--") if base else None
+        return [os.path.join(root, n) for n in sorted((out or "").splitlines()) if n]
+    names = set()
+    for args in ((["diff", "--name-only", base, "--"] if base else []),
+                 ["diff", "--name-only", "HEAD", "--"],
+                 ["ls-files", "--others", "--exclude-standard"]):
+        out = _git(root, *args) if args else ""
+        names.update(n for n in (out or "").splitlines() if n)
+    return [os.path.join(root, n) for n in sorted(names)]
+
+
+# -- what a test command covered --
+
+
+# Tokens before a runner's own arguments: launchers, and the subcommand each
+# runner takes (npx is unwrapped by hooklib.shell)
+LAUNCHERS = ("npm", "pnpm", "yarn", "bun", "bunx", "exec", "dlx", "uv", "poetry", "run",
+             "python", "python3", "py", "-m", "go", "cargo", "make", "--")
+RUNNERS = {"pytest": "", "vitest": "run", "jest": "", "playwright": "test", "phpunit": ""}
+# Options that run tests by name, tag, shard or state, or run none: such a
+# run proves no whole test file
+FILTER_OPTIONS = ("-k", "-m", "-t", "-g", "-o", "-f", "-run", "-skip", "--testNamePattern",
+                  "--grep", "--grep-invert", "--project", "--shard", "--testPathPattern",
+                  "--testPathPatterns", "--testPathIgnorePatterns", "--selectProjects",
+                  "--ignoreProjects", "--testMatch", "--ignore", "--ignore-glob",
+                  "--deselect", "--lf", "--last-failed", "--sw", "--stepwise", "--onlyChanged",
+                  "--changedSince", "--changed", "--related", "--findRelatedTests",
+                  "--onlyFailures", "--only-changed", "--failed", "--exclude", "--filter",
+                  "--group", "--exclude-group", "--testsuite", "--co", "--collect-only",
+                  "--setup-plan", "--list", "--listTests")
+# Other options that take a separate value. An unknown one's value is read as
+# a positional argument, which does not resolve: the run then narrows nothing
+VALUE_OPTIONS = ("-c", "-n", "-j", "-p", "--config", "--reporter", "--reporters", "--workers",
+                 "--maxWorkers", "--rootdir", "--outputFile", "--output", "--junitxml",
+                 "--junit-xml", "--timeout", "--retries", "--tb", "--durations", "--pool",
+                 "--environment", "--basetemp", "--dir", "--root")
+
+
+def _runner_args(inv):
+    """The arguments a test invocation passes its runner (after ``npx vitest
+    run``, ``python -m pytest``, ``npm run test:e2e --`` ...), or None when
+    the command line has no shape known here."""
+    tokens = [inv.program or ""] + list(inv.args)
+    i = 0
+    while i < len(tokens) and tokens[i] in LAUNCHERS:
+        i += 1
+    if i == len(tokens):
+        return None
+    word = tokens[i]
+    i += 1
+    if word in RUNNERS:
+        if RUNNERS[word] and i < len(tokens) and tokens[i] == RUNNERS[word]:
+            i += 1
+    elif word == "test" or word.startswith("test:"):   # npm test, go test, npm run test:x
+        if i < len(tokens) and tokens[i] == "--":
+            i += 1
+    else:
+        return None
+    return tokens[i:]
+
+
+def _invocation_scope(args, directory, root):
+    """"full", the test files, or None (filtered, or an argument that is not a
+    test file or a directory of them) for one runner's arguments."""
+    named, whole, skip = [], False, False
+    here = posixpath.relpath(os.path.abspath(directory).replace("\\", "/"), root)
+    for arg in args:
+        if skip:
+            skip = False
+            continue
+        if arg.startswith("-"):
+            name = arg.split("=", 1)[0]
+            if name in FILTER_OPTIONS:
+                return None
+            skip = name in VALUE_OPTIONS and "=" not in arg
+            continue
+        if "::" in arg or re.search(r":\d+$", arg):
+            return None  # one test (pytest node id, playwright file:line)
+        go_all = arg.endswith("/...")
+        path = os.path.abspath(os.path.join(directory, arg[:-4] if go_all else arg))
+        rel = posixpath.relpath(path.replace("\\", "/"), root)
+        if rel.startswith("../"):
+            return None
+        if go_all and rel == here:
+            whole = True    # go test ./...
+        elif os.path.isfile(path) and is_test(rel):
+            named.append(rel)
+        elif os.path.isdir(path):
+            graph = Graph.load(root)
+            inside = [t for t in (graph.tests if graph else [])
+                      if rel == "." or t.startswith(rel + "/")]
+            if not inside:
+                return None
+            named.extend(inside)
+        else:
+            return None
+    return "full" if whole or not named else named
+
+
+def run_scope(command, cwd):
+    """"full" when a test command ran a suite unfiltered (a bare runner
+    invocation), else the sorted repo-relative test files it ran in full:
+    file arguments, and the tests inside directory arguments. A run filtered
+    by name, tag, shard or test id, or given an argument that is neither,
+    adds no file (an empty scope covers nothing)."""
+    from hooklib import shell
+    root = _git(cwd, "rev-parse", "--show-toplevel")
+    if root is None:
+        return "full"
+    root = root.replace("\\", "/")
+    directory, files = cwd, set()
+    for inv in shell.parse(command).invocations:
+        if inv.program == "cd" and inv.args:
+            directory = os.path.join(directory, os.path.expanduser(inv.args[0]))
+            continue
+        if not any(p in " ".join(inv.argv).lower() for p in TEST_PATTERNS):
+            continue
+        args = _runner_args(inv)
+        scope = None if args is None else _invocation_scope(args, directory, root)
+        if scope == "full":
+            return "full"
+        files.update(scope or [])
+    return sorted(files)
+
+
+def covers(scope, selection):
+    """Whether a run of ``scope`` (run_scope) covers the selection's tests."""
+    if scope == "full":
+        return True
+    return not selection.full and set(selection.tests) <= set(scope)
@@ -0,0 +1,221 @@
+"""Per-session event ledger: what happened, recorded as it happens.
+
+PostToolUse and UserPromptSubmit hooks see every tool call and prompt as it
+happens. ``record()`` classifies the payload and appends the result to the
+state store's event log (hooklib.state). Stop hooks ``replay()`` the
+session's events instead of re-reading the transcript, so their cost grows
+with the number of events, not with transcript size.
+
+  kind                  value
+  edit                  file path (Edit/Write/MultiEdit/NotebookEdit)
+  test                  Bash command running a test suite (TEST_PATTERNS)
+  commit, push          Bash command running git commit / git push
+  deploy                Bash command running a deploy (DEPLOY_PROGRAMS, "deploy")
+  migration_generate    Bash command generating a migration
+  migration_apply       Bash command applying migrations
+  skill                 Skill name
+  agent                 Task/Agent subagent type
+  plan                  EnterPlanMode / ExitPlanMode
+  signal                SOP signal name (hooklib.devloop) raised by a tool call's
+                        command, path, skill or agent, or waived in a user prompt
+  retro_requested       user prompt asked for a retrospective
+
+Bash commands with none of the structured kinds above are logged only
+through the SOP signals they raise. Read and MCP calls are not recorded at
+all (no PostToolUse hook matches them: they settle no SOP step).
+
+    from hooklib import ledger
+
+    ledger.record(data)                          # PostToolUse / UserPromptSubmit
+    session = ledger.replay(session_key(data))   # Stop
+    session.edits, session.flags()["committed"], session.skills
+"""
+import re
+
+from hooklib import shell
+from hooklib.devloop import SOP, SOP_SIGNALS
+from hooklib.state import open_store, repo_key, session_key
+
+EDIT_TOOLS = ("Edit", "Write", "MultiEdit", "NotebookEdit")
+AGENT_TOOLS = ("Task", "Agent")
+PLAN_TOOLS = ("EnterPlanMode", "ExitPlanMode")
+
+# Substrings of the lowercased command (postToolUse-mark-tests-run.py marker)
+TEST_PATTERNS = (
+    "npm test",
+    "npm run test",
+    "npx vitest",
+    "npx jest",
+    "npx playwright",
+    "test:free",
+    "test:all",
+    "test:e2e",
+    "test:unit",
+    "pytest",
+    "go test",
+    "cargo test",
+    "phpunit",
+    "playwright test",
+    "shard-tests",
+)
+GIT_VALUE_OPTIONS = ("-C", "-c", "--git-dir", "--work-tree", "--namespace")
+DEPLOY_PROGRAMS = ("vercel", "netlify", "wrangler", "flyctl", "railway")
+NOT_DEPLOYS = ("git", "echo", "printf", "cat", "grep", "rg", "gh")
+MIGRATION_GENERATE = ("drizzle-kit generate", "db:generate")
+MIGRATION_APPLY = ("db:migrate", "drizzle-kit migrate")
+
+# Structured kinds that settle an SOP signal on their own
+KIND_SIGNALS = {
+    "test": "tests_run",
+    "commit": "committed",
+    "push": "deployed",     # pushing is the SOP's deploy step (it triggers CI/CD)
+    "deploy": "deployed",
+    "migration_generate": "migration_created",
+    "migration_apply": "migration_applied",
+    "plan": "cto_invoked",
+}
+# Only waivers count from user prompts ("deploy it" is a request, not a deploy)
+PROMPT_SIGNALS = ("qa_waived", "temp_script_exempt")
+RETRO_TRIGGERS = re.compile(
+    r"\b(retrospective|retro|introspect|context audit|what went wrong)\b", re.IGNORECASE)
+
+MAX_SCAN = 64 * 1024  # chars of one tool input scanned for SOP signals
+
+
+# -- classification --
+
+
+def command_kinds(command):
+    """Structured kinds of one Bash command, in table order."""
+    lower = command.lower()
+    script = shell.parse(command)
+    kinds = []
+    if any(p in lower for p in TEST_PATTERNS):
+        kinds.append("test")
+    if script.find("git", "commit", GIT_VALUE_OPTIONS):
+        kinds.append("commit")
+    if script.find("git", "push", GIT_VALUE_OPTIONS):
+        kinds.append("push")
+    if any(inv.program in DEPLOY_PROGRAMS
+           or (inv.program not in NOT_DEPLOYS
+               and any("deploy" in w.lower() for w in [inv.program or ""] + inv.args))
+           for inv in script.invocations):
+        kinds.append("deploy")
+    if any(p in lower for p in MIGRATION_GENERATE):
+        kinds.append("migration_generate")
+    if any(p in lower for p in MIGRATION_APPLY):
+        kinds.append("migration_apply")
+    return kinds
+
+
+def _scan_text(tool_input):
+    """The tool input's string values, as the SOP scanner sees them."""
+    parts = [v for v in tool_input.values() if isinstance(v, str)]
+    return " ".join(parts)[:MAX_SCAN]
+
+
+def classify(data):
+    """[(kind, value)] for one PostToolUse or UserPromptSubmit payload."""
+    if data.get("hook_event_name") == "UserPromptSubmit" or (
+            "prompt" in data and "tool_name" not in data):
+        return classify_prompt(data.get("prompt") or "")
+    tool_name = data.get("tool_name") or ""
+    tool_input = data.get("tool_input")
+    if not isinstance(tool_input, dict):
+        tool_input = {}
+    events, texts = [], []
+    if tool_name in EDIT_TOOLS:
+        path = tool_input.get("file_path") or tool_input.get("notebook_path") or ""
+        if path:
+            events.append(("edit", path))
+            texts.append(path)
+    elif tool_name == "Bash":
+        command = tool_input.get("command") or ""
+        events.extend((kind, command) for kind in command_kinds(command))
+        texts.append(command[:MAX_SCAN])
+    elif tool_name == "Skill":
+        skill = tool_input.get("skill") or ""
+        if skill:
+            events.append(("skill", skill))
+            texts.append(skill)
+    elif tool_name in AGENT_TOOLS:
+        agent = tool_input.get("subagent_type") or ""
+        events.append(("agent", agent))
+        texts.append(agent)
+    elif tool_name in PLAN_TOOLS:
+        events.append(("plan", tool_name))
+    else:
+        texts.append(_scan_text(tool_input))
+    if texts:
+        scanner = SOP.scanner()
+        for text in texts:
+            scanner.scan(text)
+        events.extend(("signal", name) for name, on in scanner.flags().items() if on)
+    return events
+
+
+def classify_prompt(prompt):
+    scanner = SOP.scanner()
+    scanner.scan(prompt)
+    flags = scanner.flags()
+    events = [("signal", name) for name in PROMPT_SIGNALS if flags[name]]
+    if RETRO_TRIGGERS.search(prompt):
+        events.append(("retro_requested", ""))
+    return events
+
+
+def record(data, store=None):
+    """Classify a hook payload and append it to the session's ledger.
+
+    Returns the recorded [(kind, value)] (possibly empty).
+    """
+    events = classify(data)
+    if events:
+        store = store or open_store()
+        store.append_many(session_key(data), repo_key(), events)
+    return events
+
+
+# -- replay --
+
+
+class Session:
+    """Everything the Stop hooks need, folded from a session's events."""
+
+    def __init__(self):
+        self.last_seq = 0
+        self.edits = {}       # file path -> edit count
+        self.kinds = {}       # kind -> event count
+        self.skills = set()
+        self.agents = set()
+        self.signals = set()  # SOP signal names
+
+    def apply(self, seq, kind, value):
+        self.last_seq = seq
+        self.kinds[kind] = self.kinds.get(kind, 0) + 1
+        if kind == "edit":
+            self.edits[value] = self.edits.get(value, 0) + 1
+        elif kind == "skill":
+            self.skills.add(value)
+        elif kind == "agent":
+            self.agents.add(value)
+        elif kind == "signal":
+            self.signals.add(value)
+        if kind in KIND_SIGNALS:
+            self.signals.add(KIND_SIGNALS[kind])
+
+    def has(self, kind):
+        return kind in self.kinds
+
+    def flags(self):
+        """{SOP signal name: bool}, same keys as SignalSet.flags()."""
+        return {name: name in self.signals for name in SOP_SIGNALS}
+
+
+def replay(session, store=None, repo=None):
+    """Fold the session's events (optionally one repo's) into a Session."""
+    store = store or open_store()
+    folded = Session()
+    for seq, _, kind, value in store.events(session, repo=repo):
+        folded.apply(seq, kind, value)
+    return folded
@@ -0,0 +1,107 @@
+"""Hook entry point that runs a hook by name from cached bytecode.
+
+The old settings.json pattern, ``exec(open(path).read())``, re-read and
+re-compiled the hook source on every call (exec'd source never gets a
+__pycache__ entry). settings.json now runs:
+
+  python -S -c "import os,sys;sys.path.insert(0,os.path.expanduser('~/.claude/skills/hook-runtime/scripts'));from hooklib.loader import main;main()" hook-dispatch PreToolUse
+
+* ``-S`` skips site initialization (site-packages scan, .pth files); hooks
+  use only the standard library.
+* hooklib itself is imported normally, so Python's own __pycache__ covers it.
+* The hook script is resolved by name (``resolve()``) and its code object is
+  loaded from ``__pycache__/<name>.<cache tag>.hook`` next to the script,
+  recompiled only when the source's mtime or size changes.
+
+The dispatcher uses ``load_code()`` for every hook it runs, too.
+"""
+import builtins
+import glob
+import marshal
+import os
+import struct
+import sys
+
+import hooklib
+
+_HEADER = struct.Struct("<4sqq")  # tag, source mtime_ns, source size
+_TAG = b"HKC1"
+
+
+def cache_path(path):
+    directory, name = os.path.split(path)
+    stem = os.path.splitext(name)[0]
+    return os.path.join(directory, "__pycache__",
+                        f"{stem}.{sys.implementation.cache_tag}.hook")
+
+
+def load_code(path):
+    """Code object for ``path``, from the bytecode cache when still valid."""
+    st = os.stat(path)
+    header = _HEADER.pack(_TAG, st.st_mtime_ns, st.st_size)
+    cache = cache_path(path)
+    try:
+        with open(cache, "rb") as f:
+            data = f.read()
+        if data[:_HEADER.size] == header:
+            return marshal.loads(data[_HEADER.size:])
+    except (OSError, ValueError, EOFError, TypeError):
+        pass
+    with open(path, "r", encoding="utf-8") as f:
+        source = f.read()
+    code = compile(source, path, "exec")
+    after = os.stat(path)
+    if (not sys.dont_write_bytecode
+            and (after.st_mtime_ns, after.st_size) == (st.st_mtime_ns, st.st_size)):
+        _write_cache(cache, header + marshal.dumps(code))
+    return code
+
+
+def _write_cache(cache, data):
+    tmp = f"{cache}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(cache), exist_ok=True)
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, cache)
+    except OSError:  # read-only tree: run uncached
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+
+
+def resolve(name):
+    """Script path for a hook name ("hook-dispatch", "preToolUse-rules") or path."""
+    if "/" in name or "\\" in name or name.startswith("~"):
+        path = hooklib.expand(name)
+        return path if os.path.isfile(path) else None
+    stem = name[:-3] if name.endswith(".py") else name
+    candidates = [os.path.join(hooklib.RUNTIME_DIR, "scripts", f"{stem}.py")]
+    candidates += sorted(glob.glob(os.path.join(hooklib.CLAUDE_DIR, "skills", "*",
+                                                "scripts", f"{stem}.py")))
+    candidates.append(os.path.join(hooklib.CLAUDE_DIR, "scripts", f"{stem}.py"))
+    for path in candidates:
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+def run(path):
+    """Execute a hook script as __main__ (SystemExit propagates)."""
+    exec(load_code(path), {"__name__": "__main__", "__file__": path,
+                           "__builtins__": builtins})
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        print("usage: ... from hooklib.loader import main;main() <hook-name> [args]",
+              file=sys.stderr)
+        sys.exit(1)
+    path = resolve(argv[0])
+    if path is None:
+        print(f"hook script not found: {argv[0]}", file=sys.stderr)
+        sys.exit(1)
+    sys.argv = [path] + list(argv[1:])
+    run(path)
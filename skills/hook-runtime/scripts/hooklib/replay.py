@@ -0,0 +1,196 @@
+"""Rebuild hook events from recorded sessions and run them through the hooks.
+
+A session JSONL under ~/.claude/projects/ holds every tool call and result,
+which is enough to reconstruct the payloads Claude Code sent to the hooks:
+
+  user prompt                      -> UserPromptSubmit {prompt}
+  assistant tool_use block         -> PreToolUse  {tool_name, tool_input}
+  user tool_result for that call   -> PostToolUse {tool_name, tool_input, tool_response}
+  end of an assistant turn         -> Stop        {transcript_path, stop_hook_active}
+
+A turn ends when the next real user prompt arrives (not a tool result) or
+the file ends. Stop hooks read the transcript, so the replay writes a copy
+that grows line by line and only contains what existed at that point.
+
+Hooks keep state (hooklib.state, the session ledger) in the temp dir;
+callers point ``tempfile.tempdir`` at a scratch directory first. Stop hooks
+read what the UserPromptSubmit/PostToolUse hooks recorded, so every event is
+run even when only some are reported.
+
+This module is standalone (no hooklib imports at module level) so
+hook-replay.py can load it by path next to any hook tree's hooklib.
+"""
+import json
+import os
+import time
+
+EVENTS = ("UserPromptSubmit", "PreToolUse", "PostToolUse", "Stop")
+
+
+def session_files(projects_dir, project=None, since=None):
+    """Session JSONL paths, newest first; ``since`` is an epoch mtime."""
+    out = []
+    try:
+        projects = sorted(os.listdir(projects_dir))
+    except OSError:
+        return out
+    for name in projects:
+        if project and project.lower() not in name.lower():
+            continue
+        folder = os.path.join(projects_dir, name)
+        if not os.path.isdir(folder):
+            continue
+        for fname in os.listdir(folder):
+            if not fname.endswith(".jsonl"):
+                continue
+            path = os.path.join(folder, fname)
+            mtime = os.path.getmtime(path)
+            if since is None or mtime >= since:
+                out.append((mtime, path))
+    return [p for _, p in sorted(out, reverse=True)]
+
+
+def _prompt_text(content):
+    if isinstance(content, str):
+        return content
+    return "\n".join(b.get("text") or "" for b in content
+                     if isinstance(b, dict) and b.get("type") == "text")
+
+
+def _is_prompt(entry):
+    """A user entry typed by the user (not a tool result or meta message)."""
+    if entry.get("type") != "user" or entry.get("isMeta"):
+        return False
+    content = (entry.get("message") or {}).get("content")
+    if isinstance(content, str):
+        return bool(content)
+    return isinstance(content, list) and any(
+        isinstance(b, dict) and b.get("type") == "text" for b in content)
+
+
+def events(path, copy_path):
+    """Yield (seq, event, payload) for one session, in the order they fired.
+
+    ``copy_path`` receives the transcript as it stood at each Stop.
+    """
+    pending = {}  # tool_use_id -> (tool_name, tool_input)
+    session_id, cwd = os.path.splitext(os.path.basename(path))[0], ""
+    turn_open, seq = False, 0
+
+    def base(event):
+        return {"session_id": session_id, "transcript_path": copy_path,
+                "cwd": cwd, "hook_event_name": event}
+
+    with open(path, "rb") as src, open(copy_path, "wb") as copy:
+        for line in src:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                copy.write(line)
+                continue
+            if not isinstance(entry, dict):
+                continue
+            session_id = entry.get("sessionId") or session_id
+            cwd = entry.get("cwd") or cwd
+            content = (entry.get("message") or {}).get("content")
+            if _is_prompt(entry):
+                if turn_open:
+                    copy.flush()
+                    seq += 1
+                    yield seq, "Stop", dict(base("Stop"), stop_hook_active=False)
+                    turn_open = False
+                seq += 1
+                yield seq, "UserPromptSubmit", dict(base("UserPromptSubmit"),
+                                                    prompt=_prompt_text(content))
+            blocks = content if isinstance(content, list) else []
+            if entry.get("type") == "assistant":
+                turn_open = True
+                for block in blocks:
+                    if isinstance(block, dict) and block.get("type") == "tool_use":
+                        name, tool_input = block.get("name", ""), block.get("input") or {}
+                        pending[block.get("id")] = (name, tool_input)
+                        seq += 1
+                        yield seq, "PreToolUse", dict(base("PreToolUse"), tool_name=name,
+                                                      tool_input=tool_input)
+            copy.write(line if line.endswith(b"\n") else line + b"\n")
+            if entry.get("type") == "user":
+                for block in blocks:
+                    if not (isinstance(block, dict) and block.get("type") == "tool_result"):
+                        continue
+                    call = pending.pop(block.get("tool_use_id"), None)
+                    if call is None:
+                        continue
+                    response = entry.get("toolUseResult", block.get("content"))
+                    seq += 1
+                    copy.flush()
+                    yield seq, "PostToolUse", dict(base("PostToolUse"), tool_name=call[0],
+                                                   tool_input=call[1], tool_response=response)
+        if turn_open:
+            copy.flush()
+            seq += 1
+            yield seq, "Stop", dict(base("Stop"), stop_hook_active=False)
+
+
+def _detail(payload):
+    tool_input = payload.get("tool_input")
+    if not isinstance(tool_input, dict):
+        return ""
+    text = tool_input.get("command") or tool_input.get("file_path") or ""
+    return text[:200] if isinstance(text, str) else ""
+
+
+def replay_session(path, scratch_dir, wanted=EVENTS, hook_filter=None):
+    """Run one session's events through the hooks; return decision dicts.
+
+    Uses only the dispatcher API every hook tree has (load_registry, matches,
+    run_hook), so an older tree can be replayed by this module as a baseline.
+    """
+    import hooklib  # the tree under test: the caller set up HOME and sys.path
+    from hooklib import dispatch
+
+    try:
+        from hooklib.telemetry import block_reason
+    except ImportError:  # tree older than telemetry
+        def block_reason(stderr):
+            return next((ln.strip("| ") for ln in stderr.splitlines()
+                         if ln.strip("|+= ") and not ln.endswith("HOOK OUTPUT")), "")
+
+    registry = dispatch.load_registry()
+    copy_path = os.path.join(scratch_dir, os.path.basename(path))
+    session = os.path.splitext(os.path.basename(path))[0]
+    decisions = []
+    home_cwd = os.getcwd()
+    try:
+        for seq, event, payload in events(path, copy_path):
+            cwd = payload.get("cwd")
+            os.chdir(cwd if cwd and os.path.isdir(cwd) else home_cwd)
+            raw = json.dumps(payload)
+            tool = payload.get("tool_name", "")
+            for hook in registry.get(event, []):
+                if not dispatch.matches(hook.get("matcher", ""), tool):
+                    continue
+                script = hooklib.expand(hook["script"])
+                name = os.path.splitext(os.path.basename(script))[0]
+                start = time.perf_counter()
+                result = dispatch.run_hook(script, raw, json.loads(raw))
+                ms = (time.perf_counter() - start) * 1000
+                if event not in wanted or (hook_filter and hook_filter not in name):
+                    continue
+                decisions.append({
+                    "session": session,
+                    "seq": seq,
+                    "event": event,
+                    "tool": tool,
+                    "hook": name,
+                    "exit_code": result.exit_code,
+                    "ms": round(ms, 3),
+                    "reason": block_reason(result.stderr) if result.exit_code else "",
+                    "detail": _detail(payload),
+                })
+    finally:
+        os.chdir(home_cwd)
+        try:
+            os.remove(copy_path)
+        except OSError:
+            pass
+    return decisions
@@ -0,0 +1,302 @@
+"""Declarative PreToolUse guardrails (rules.json) evaluated in one pass.
+
+Most guardrails have the same shape: match a tool, look at one field of its
+input, match patterns, honour a bypass token, print the boxed message and
+block or warn. Each is an entry in ``skills/hook-runtime/rules.json``
+instead of a script:
+
+    {
+      "name": "rclone",
+      "tool": "Bash",                     # matcher, same syntax as hooks.json
+      "field": "command",                 # tool_input field
+      "extract": "programs",              # optional, see EXTRACTORS
+      "match": "exact",                   # substring (default) | regex | exact
+      "patterns": ["rclone"],             # list: any; {"group": [...], ...}: every group
+      "bypass": "#RCLONE-FALLBACK-APPROVED",  # in the raw field: allow
+      "action": "block",                  # block | warn | block_once
+      "message": ["BLOCKED: ...", "Re-run with {bypass}"]
+    }
+
+Optional keys: ``path_suffix`` / ``path_exclude`` (tool_input.file_path
+must / must not end with one of these, case-insensitive) and
+``scan_file`` (for Edit/MultiEdit: when the added text matched only some
+pattern groups, stream the file on disk for the rest). A rule without
+``patterns`` fires on every call its tool matcher accepts. ``block_once``
+blocks the first call per session and value, then lets the retry through
+(hooklib.state). ``{bypass}`` and ``{match}`` in the message are replaced.
+
+Verdicts are cached by the dispatcher (hooklib.verdicts). Files read while
+evaluating (``sql_write`` sources, ``scan_file``) are recorded as
+dependencies; a ``block_once`` rule that fires reads session state, so that
+verdict is never cached.
+
+The file is compiled into per-tool tables (rules whose matcher accepts the
+tool name, computed once per tool) and recompiled when its mtime or size
+changes. Extracted values are computed once per call and shared by every
+rule that reads them.
+"""
+import codecs
+import json
+import os
+import re
+
+import hooklib
+from hooklib import shell, sql
+from hooklib.signals import SignalSet
+
+RULES_PATH = os.path.join(hooklib.RUNTIME_DIR, "rules.json")
+ACTIONS = ("block", "warn", "block_once")
+MATCH_MODES = ("substring", "regex", "exact")
+FILE_CHUNK = 1 << 20
+
+
+# -- extractors: (field value, payload) -> str or list of str --
+
+
+def _added_text(value, data):
+    """The text a Write/Edit/MultiEdit call puts into the file."""
+    tool_name, tool_input = data.get("tool_name"), data.get("tool_input") or {}
+    if tool_name == "Write":
+        return [tool_input.get("content") or ""]
+    if tool_name == "Edit":
+        return [tool_input.get("new_string") or ""]
+    if tool_name == "MultiEdit":
+        return [e.get("new_string") or "" for e in tool_input.get("edits") or ()
+                if isinstance(e, dict)]
+    return []
+
+
+def _sql_write(value, data):
+    """Kind of the first SQL write statement; the files it read are verdict dependencies."""
+    files = set()
+    kind = sql.first_write(value, data.get("cwd"), files)
+    _depends_on(files)
+    return [kind] if kind else []
+
+
+EXTRACTORS = {
+    "programs": lambda value, data: sorted(shell.parse(value).programs),
+    "sql_write": _sql_write,
+    "basename": lambda value, data: os.path.basename(value),
+    "added_text": _added_text,
+}
+
+
+class RuleError(ValueError):
+    pass
+
+
+def _depends_on(paths):
+    """Files read while evaluating: cached verdicts go stale when they change."""
+    if paths:
+        from hooklib import verdicts
+        for path in paths:
+            verdicts.depends_on(path)
+
+
+def _texts(value):
+    if isinstance(value, str):
+        return [value]
+    if isinstance(value, (list, tuple)):
+        return [v for v in value if isinstance(v, str)]
+    return []
+
+
+def _file_chunks(path):
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    with open(path, "rb") as f:
+        while True:
+            data = f.read(FILE_CHUNK)
+            if not data:
+                break
+            yield decoder.decode(data)
+
+
+class Rule:
+    def __init__(self, spec):
+        self.name = spec.get("name") or ""
+        if not self.name:
+            raise RuleError("rule without a name")
+        self.tool = spec.get("tool", "")
+        self.field = spec.get("field")
+        self.extract = spec.get("extract")
+        if self.extract is not None and self.extract not in EXTRACTORS:
+            raise RuleError(f"{self.name}: unknown extractor {self.extract!r}")
+        self.mode = spec.get("match", "substring")
+        if self.mode not in MATCH_MODES:
+            raise RuleError(f"{self.name}: unknown match mode {self.mode!r}")
+        self.action = spec.get("action", "block")
+        if self.action not in ACTIONS:
+            raise RuleError(f"{self.name}: unknown action {self.action!r}")
+        self.bypass = spec.get("bypass")
+        message = spec.get("message", "")
+        self.message = "\n".join(message) if isinstance(message, list) else message
+        self.path_suffix = tuple(s.lower() for s in spec.get("path_suffix", ()))
+        self.path_exclude = tuple(s.lower() for s in spec.get("path_exclude", ()))
+        self.scan_file = bool(spec.get("scan_file"))
+
+        patterns = spec.get("patterns")
+        groups = patterns if isinstance(patterns, dict) else (
+            {"patterns": patterns} if patterns else {})
+        self.groups = groups
+        if self.mode == "substring":
+            self._signals = SignalSet(groups) if groups else None
+        elif self.mode == "regex":
+            try:
+                self._regexes = {name: re.compile("|".join(f"(?:{p})" for p in pats),
+                                                  re.IGNORECASE)
+                                 for name, pats in groups.items()}
+            except re.error as e:
+                raise RuleError(f"{self.name}: bad pattern: {e}")
+        else:
+            self._exact = {name: {p.lower() for p in pats} for name, pats in groups.items()}
+
+    def applies_to_path(self, tool_input):
+        if not (self.path_suffix or self.path_exclude):
+            return True
+        path = (tool_input.get("file_path") or "").lower().replace("\\", "/")
+        if self.path_suffix and not path.endswith(self.path_suffix):
+            return False
+        return not path.endswith(self.path_exclude) if self.path_exclude else True
+
+    def find(self, texts, data):
+        """Matched value (truthy) when every pattern group matches ``texts``."""
+        if not self.groups:
+            return True
+        if self.mode == "exact":
+            values = {t.lower(): t for t in texts}
+            hit = None
+            for allowed in self._exact.values():
+                found = next((values[v] for v in values if v in allowed), None)
+                if found is None:
+                    return None
+                hit = hit or found
+            return hit
+        if self.mode == "regex":
+            hit = None
+            for rx in self._regexes.values():
+                m = next((m for m in map(rx.search, texts) if m), None)
+                if m is None:
+                    return None
+                hit = hit or m.group()
+            return hit
+        scanner = self._signals.scanner()
+        for text in texts:
+            scanner.scan(text)
+            if scanner.done:
+                return True
+        if self.scan_file and scanner.seen and data.get("tool_name") in ("Edit", "MultiEdit"):
+            path = (data.get("tool_input") or {}).get("file_path") or ""
+            _depends_on([path] if path else ())
+            if os.path.isfile(path):
+                try:
+                    scanner.scan_chunks(_file_chunks(path))
+                except OSError:
+                    return None
+        return True if scanner.done else None
+
+    def render(self, match):
+        text = self.message.replace("{bypass}", self.bypass or "")
+        return text.replace("{match}", match if isinstance(match, str) else "")
+
+
+class RuleSet:
+    def __init__(self, rules):
+        self.rules = rules
+        self._tables = {}  # tool name -> [Rule]
+
+    def for_tool(self, tool_name):
+        table = self._tables.get(tool_name)
+        if table is None:
+            from hooklib.dispatch import matches
+            table = self._tables[tool_name] = [r for r in self.rules
+                                               if matches(r.tool, tool_name)]
+        return table
+
+    def rule(self, name):
+        return next((r for r in self.rules if r.name == name), None)
+
+    def evaluate(self, data):
+        """[(rule, match, message)] of the rules that fire for this PreToolUse payload."""
+        tool_input = data.get("tool_input")
+        if not isinstance(tool_input, dict):
+            tool_input = {}
+        fired, values = [], {}
+        for rule in self.for_tool(data.get("tool_name", "")):
+            if not rule.applies_to_path(tool_input):
+                continue
+            raw = tool_input.get(rule.field, "") if rule.field else ""
+            key = (rule.field, rule.extract)
+            if key not in values:
+                value = EXTRACTORS[rule.extract](raw, data) if rule.extract else raw
+                values[key] = _texts(value)
+            match = rule.find(values[key], data)
+            if not match:
+                continue
+            if rule.bypass and isinstance(raw, str) and rule.bypass in raw:
+                continue
+            fired.append((rule, match, rule.render(match)))
+        return fired
+
+
+def compile_rules(specs):
+    rules = [Rule(spec) for spec in specs]
+    names = [r.name for r in rules]
+    dupes = {n for n in names if names.count(n) > 1}
+    if dupes:
+        raise RuleError(f"duplicate rule names: {', '.join(sorted(dupes))}")
+    return RuleSet(rules)
+
+
+_cache = {}  # path -> ((mtime_ns, size), RuleSet)
+
+
+def load(path=RULES_PATH):
+    """The compiled rules file; recompiled only when it changed on disk."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return RuleSet([])
+    stamp = (st.st_mtime_ns, st.st_size)
+    cached = _cache.get(path)
+    if cached and cached[0] == stamp:
+        return cached[1]
+    with open(path, "r", encoding="utf-8") as f:
+        ruleset = compile_rules(json.load(f).get("rules", []))
+    _cache[path] = (stamp, ruleset)
+    return ruleset
+
+
+def box(content):
+    border = "=" * 70
+    boxed = "\n".join(f"| {line}" for line in content.split("\n"))
+    return f"\n+{border}\n| PRETOOLUSE HOOK OUTPUT\n+{border}\n{boxed}\n+{border}\n"
+
+
+def run(data, ruleset=None):
+    """(exit code, stderr text) for a PreToolUse payload."""
+    ruleset = load() if ruleset is None else ruleset
+    blocks, warnings = [], []
+    for rule, match, message in ruleset.evaluate(data):
+        if rule.action == "warn":
+            warnings.append(message)
+        elif rule.action == "block_once" and not _first_attempt(rule, data, match):
+            continue
+        else:
+            blocks.append(message)
+    if blocks:
+        return 2, "".join(box(m) for m in blocks)
+    return 0, "".join(box(m) for m in warnings)
+
+
+def _first_attempt(rule, data, match):
+    """block_once: True (block) the first time, False (allow) on the retry."""
+    from hooklib import verdicts
+    from hooklib.state import open_store, session_key
+    verdicts.uncacheable()
+    store, session = open_store(), session_key(data)
+    key = f"rule-warned:{rule.name}:{match if isinstance(match, str) else ''}".lower()
+    if store.pop(session, "", key):
+        return False
+    store.put(session, "", key, True)
+    return True
@@ -0,0 +1,306 @@
+"""Parallel issue dispatch: one git worktree and branch per issue.
+
+The issue dispatcher handed issues to the handler one at a time, because
+parallel sessions in one working directory overwrite each other's
+unstaged changes. ``Scheduler`` runs up to N handler sessions at once,
+each in its own worktree on its own branch (BRANCH_PREFIX). Issues that
+touch the same files are kept apart:
+
+  expected files  -- an issue's "files" in the queue (files or directories
+                     triage expects it to touch). The issue waits while a
+                     running issue touched or expects any of them, and while
+                     a higher-priority waiting issue expects any of them
+  touched files   -- each running worktree's changes against the commit it
+                     started from, polled every TOUCH_INTERVAL seconds
+  stacking        -- an issue that waited on finished issues starts from
+                     their branches (merged), so its handler sees their
+                     changes and the branches apply in order
+  late overlap    -- two issues that ran side by side and touched the same
+                     file: the one finishing second is rebased onto the
+                     first. If that fails its status is "conflict"
+
+A handler session is a shell command template run in the issue's worktree.
+{number}, {title}, {branch} and {worktree} are substituted shell-quoted and
+exported as ISSUE_NUMBER / ISSUE_TITLE / ISSUE_BRANCH / ISSUE_WORKTREE. Any
+other braces are left alone (``${ISSUE_NUMBER}``, awk ``{print $1}``,
+``find -exec {} +``): the template is not a str.format string.
+Whatever the session leaves uncommitted is committed on the issue's branch:
+the worktree is the issue's alone, so ``git add -A`` is safe there. Nothing
+is pushed; the branches are what the orchestrator deploys.
+
+The state (per issue: status, branch, worktree, touched files, stacked-on
+issues, log) is written to STATE_NAME in the git common dir after every
+change:
+
+    from hooklib import scheduler
+
+    queue = [scheduler.Issue(71, "Role dropdown", ["src/components/Role.tsx"]), ...]
+    sched = scheduler.Scheduler(cwd, queue, "claude -p ...", parallel=4)
+    sched.run()                     # returns when every issue finished
+    [(i.number, i.status, i.branch) for i in sched.issues]
+"""
+import json
+import os
+import re
+import shlex
+import subprocess
+import time
+
+from hooklib import testruns
+
+STATE_NAME = "claude-dispatch.json"
+LOG_DIR = "claude-dispatch"
+BRANCH_PREFIX = "issue/"
+POLL = 0.5              # seconds between checks for finished sessions
+TOUCH_INTERVAL = 2.0    # seconds between scans of running worktrees
+STATUSES = ("pending", "running", "done", "failed", "conflict")
+PLACEHOLDERS = ("number", "title", "branch", "worktree")
+
+
+def handler_command(template, values):
+    """The handler template with each PLACEHOLDERS value substituted, shell-quoted."""
+    for name in PLACEHOLDERS:
+        template = template.replace("{%s}" % name, shlex.quote(values[name]))
+    return template
+
+
+def _norm(path):
+    return path.replace("\\", "/").strip("/")
+
+
+def overlaps(a, b):
+    """Whether two sets of repo-relative files or directories share a path."""
+    for x in a:
+        for y in b:
+            if x == y or x.startswith(y + "/") or y.startswith(x + "/"):
+                return True
+    return False
+
+
+def slug(title, limit=40):
+    return re.sub(r"[^a-z0-9]+", "-", title.lower()).strip("-")[:limit].rstrip("-")
+
+
+class Issue:
+    def __init__(self, number, title="", files=()):
+        self.number = number
+        self.title = title
+        self.files = sorted({_norm(f) for f in files if _norm(f)})
+        self.status = "pending"
+        self.branch = ""
+        self.worktree = ""
+        self.base = ""           # commit the branch started from
+        self.after = []          # issues whose branches this one is stacked on
+        self.touched = set()
+        self.exit = None
+        self.note = ""
+        self.log = ""
+        self.started = None
+        self.finished = None
+        self.proc = None
+
+    @classmethod
+    def from_json(cls, item):
+        """An issue from a queue entry: {"number", "title"?, "files"?} (the
+        shape of ``gh issue list --json number,title`` plus triage's files)."""
+        return cls(int(item["number"]), item.get("title", ""), item.get("files") or ())
+
+    def claims(self):
+        return set(self.files) | self.touched
+
+    def to_json(self):
+        return {"number": self.number, "title": self.title, "status": self.status,
+                "branch": self.branch, "worktree": self.worktree, "base": self.base,
+                "after": self.after, "files": self.files, "touched": sorted(self.touched),
+                "exit": self.exit, "note": self.note, "log": self.log,
+                "started": self.started, "finished": self.finished}
+
+
+class Scheduler:
+    def __init__(self, cwd, issues, handler, parallel=1, base="HEAD", worktrees=None):
+        self.root = testruns.git(cwd, "rev-parse", "--show-toplevel")
+        common = testruns.git(cwd, "rev-parse", "--git-common-dir")
+        if self.root is None or common is None:
+            raise ValueError(f"{cwd}: not a git repository")
+        self.base = testruns.git(cwd, "rev-parse", "--verify", "--quiet", base + "^{commit}")
+        if self.base is None:
+            raise ValueError(f"{base}: unknown revision")
+        common = os.path.join(cwd, common)
+        self.state_path = os.path.join(common, STATE_NAME)
+        self.log_dir = os.path.join(common, LOG_DIR)
+        self.worktrees = worktrees or self.root.rstrip("/") + ".worktrees"
+        self.issues = list(issues)
+        self.handler = handler
+        self.parallel = max(1, parallel)
+        self._scanned = 0.0
+
+    # -- scheduling --
+
+    def _running(self):
+        return [i for i in self.issues if i.status == "running"]
+
+    def _blocked(self, issue):
+        """What keeps a pending issue from starting now, or ""."""
+        for other in self._running():
+            if overlaps(issue.files, other.claims()):
+                return f"#{other.number} (running) touches the same files"
+        for other in self.issues:
+            if other is issue:
+                return ""
+            if other.status == "pending" and overlaps(issue.files, other.files):
+                return f"#{other.number} (higher priority) expects the same files"
+        return ""
+
+    def run(self, poll=POLL):
+        """Run every pending issue; returns the issues."""
+        os.makedirs(self.log_dir, exist_ok=True)
+        os.makedirs(self.worktrees, exist_ok=True)
+        try:
+            while True:
+                changed = self._reap()
+                if time.time() - self._scanned >= TOUCH_INTERVAL:
+                    self._scanned = time.time()
+                    for issue in self._running():
+                        issue.touched |= self._touched(issue)
+                    changed = True
+                for issue in self.issues:
+                    if len(self._running()) >= self.parallel:
+                        break
+                    if issue.status == "pending" and not self._blocked(issue):
+                        self._start(issue)
+                        changed = True
+                if changed:
+                    self.save()
+                if not any(i.status in ("pending", "running") for i in self.issues):
+                    return self.issues
+                time.sleep(poll)
+        finally:
+            for issue in self._running():
+                issue.proc.terminate()
+                issue.proc.wait()
+                issue.status, issue.note = "failed", "interrupted"
+            self.save()
+
+    # -- one issue --
+
+    def _git(self, issue, *args):
+        return testruns.git(issue.worktree, *args)
+
+    def _start(self, issue):
+        issue.branch = f"{BRANCH_PREFIX}{issue.number}"
+        issue.branch += f"-{slug(issue.title)}" if slug(issue.title) else ""
+        issue.worktree = os.path.join(self.worktrees, f"issue-{issue.number}")
+        issue.log = os.path.join(self.log_dir, f"issue-{issue.number}.log")
+        issue.started = time.time()
+        # Stack on finished issues it overlaps, oldest first
+        stack = sorted((o for o in self.issues if o.status == "done" and o.branch
+                        and overlaps(issue.files, o.claims())), key=lambda o: o.finished)
+        start = stack[0].branch if stack else self.base
+        if testruns.git(self.root, "worktree", "add", "-b", issue.branch,
+                        issue.worktree, start) is None:
+            issue.status, issue.finished = "failed", time.time()
+            issue.note = f"could not create worktree {issue.worktree} on {issue.branch}" \
+                " (branch or directory exists?)"
+            return
+        for other in stack[1:]:
+            if self._git(issue, "merge", "--no-edit", other.branch) is None:
+                self._git(issue, "merge", "--abort")
+                issue.status, issue.finished = "conflict", time.time()
+                issue.note = f"could not stack on #{other.number}: merge conflict"
+                return
+        issue.after = [o.number for o in stack]
+        issue.base = self._git(issue, "rev-parse", "HEAD")
+        values = {"number": str(issue.number), "title": issue.title,
+                  "branch": issue.branch, "worktree": issue.worktree}
+        command = handler_command(self.handler, values)
+        env = dict(os.environ, **{f"ISSUE_{k.upper()}": v for k, v in values.items()})
+        log = open(issue.log, "w", encoding="utf-8")
+        log.write(f"$ {command}\n")
+        log.flush()
+        issue.proc = subprocess.Popen(command, shell=True, cwd=issue.worktree, env=env,
+                                      stdin=subprocess.DEVNULL, stdout=log,
+                                      stderr=subprocess.STDOUT)
+        log.close()
+        issue.status = "running"
+
+    def _touched(self, issue):
+        """Repo-relative files the issue's worktree changed since its base."""
+        names = set()
+        for args in (("diff", "--name-only", issue.base, "--"),
+                     ("ls-files", "--others", "--exclude-standard")):
+            names.update(n for n in (self._git(issue, *args) or "").splitlines() if n)
+        return names
+
+    def _reap(self):
+        changed = False
+        for issue in self._running():
+            code = issue.proc.poll()
+            if code is None:
+                continue
+            issue.exit, issue.finished, issue.proc = code, time.time(), None
+            self._finish(issue)
+            changed = True
+        return changed
+
+    def _finish(self, issue):
+        if issue.exit != 0:
+            issue.touched |= self._touched(issue)
+            issue.status = "failed"
+            issue.note = f"handler exited {issue.exit}"
+            return
+        if self._git(issue, "status", "--porcelain"):
+            self._git(issue, "add", "-A")
+            message = f"#{issue.number}: {issue.title}" if issue.title else f"#{issue.number}"
+            if self._git(issue, "commit", "-q", "-m", message) is None:
+                issue.status, issue.note = "failed", "could not commit the handler's changes"
+                return
+        issue.touched |= self._touched(issue)
+        issue.status = "done"
+        if not issue.touched:
+            issue.note = "no changes"
+        # Ran side by side with a finished issue that touched the same files
+        for other in sorted(self.issues, key=lambda o: o.finished or 0):
+            if other is issue or other.status != "done" or other.number in issue.after:
+                continue
+            if other.finished > issue.started and overlaps(issue.touched, other.touched):
+                if self._git(issue, "rebase", "-q", other.branch) is None:
+                    self._git(issue, "rebase", "--abort")
+                    issue.status = "conflict"
+                    issue.note = f"touched the same files as #{other.number}, rebase failed"
+                    return
+                issue.after.append(other.number)
+
+    # -- state --
+
+    def save(self):
+        state = {"base": self.base, "handler": self.handler, "parallel": self.parallel,
+                 "worktrees": self.worktrees, "updated": time.time(),
+                 "issues": [i.to_json() for i in self.issues]}
+        tmp = f"{self.state_path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp, self.state_path)
+
+
+def load_state(cwd):
+    """The last saved dispatch state of the repository ``cwd`` is in, or None."""
+    common = testruns.git(cwd, "rev-parse", "--git-common-dir")
+    if common is None:
+        return None
+    try:
+        with open(os.path.join(cwd, common, STATE_NAME), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def remove_worktrees(cwd, state, statuses=("done",)):
+    """Remove the worktrees (not the branches) of issues in ``statuses``;
+    returns the removed paths. A worktree with uncommitted changes is kept."""
+    removed = []
+    for issue in state.get("issues", []):
+        path = issue.get("worktree")
+        if issue.get("status") in statuses and path and os.path.isdir(path):
+            if testruns.git(cwd, "worktree", "remove", path) is not None:
+                removed.append(path)
+    return removed
@@ -0,0 +1,305 @@
+"""Timing-balanced test shards: one suite split across parallel workers.
+
+Running vitest, jest, Playwright and pytest suites one after another takes
+the sum of their durations. ``plan()`` splits the repository's test files
+(hooklib.impact's import graph finds them and their runner) into N shards
+of about equal expected duration, and ``run()`` runs the shards in parallel,
+one worker process per shard, so wall-clock time falls with the number of
+cores:
+
+  history      -- per test file seconds from earlier runs (exponential moving
+                  average), plus each runner's start-up cost, in the git
+                  common dir (TIMINGS_NAME); files never timed get the median
+                  of their runner, else DEFAULT_SECONDS
+  balancing    -- longest file first onto the shard that would finish
+                  earliest, counting a runner's start-up once per shard
+  workers      -- each shard runs one command per runner and project, with
+                  the runner's own parallelism cut to its share of the cores
+                  (WORKER_FLAGS); CLAUDE_SHARD / CLAUDE_SHARDS are set so a
+                  config can pick per-shard ports
+  reports      -- every command writes its runner's machine-readable report
+                  (jest/vitest JSON, Playwright JSON, pytest JUnit XML), read
+                  back into per-file seconds / passed / failed and merged
+
+The unit is the test file, not the test: it is what every runner accepts on
+its command line and what hooklib.impact narrows to.
+
+    from hooklib import shards
+
+    graph = impact.Graph.load(cwd)
+    history = shards.History.load(cwd)
+    planned = shards.plan(graph, graph.tests, history, count=8)
+    results = shards.run(graph, planned, workdir)
+    history.update(results)
+"""
+import json
+import os
+import posixpath
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from hooklib import testruns
+
+TIMINGS_NAME = "claude-test-timings.json"
+VERSION = 1
+DEFAULT_SECONDS = 1.0
+SMOOTHING = 0.5     # weight of the newest measurement in the moving average
+# The runner's own parallelism, cut to (cores // shards) per shard
+WORKER_FLAGS = {"jest": "--maxWorkers={}", "vitest": "--maxWorkers={}",
+                "playwright": "--workers={}"}
+
+
+# -- timing history --
+
+
+class History:
+    def __init__(self, path, files=None, startup=None):
+        self.path = path
+        self.files = files or {}       # "runner:rel" -> seconds
+        self.startup = startup or {}   # runner -> seconds per command
+
+    @classmethod
+    def load(cls, cwd):
+        """History of the repository ``cwd`` is in (empty if none yet), or
+        None outside a git repo."""
+        common = testruns.git(cwd, "rev-parse", "--git-common-dir")
+        if common is None:
+            return None
+        path = os.path.join(cwd, common, TIMINGS_NAME)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == VERSION:
+                return cls(path, data.get("files"), data.get("startup"))
+        except (OSError, ValueError):
+            pass
+        return cls(path)
+
+    def estimate(self, runner, rel):
+        """Expected seconds of one test file."""
+        seconds = self.files.get(f"{runner}:{rel}")
+        if seconds is not None:
+            return seconds
+        known = [s for key, s in self.files.items() if key.startswith(runner + ":")]
+        return statistics.median(known) if known else DEFAULT_SECONDS
+
+    def update(self, results):
+        """Fold a run's measurements (``run()`` results) into the history and save it."""
+        def blend(old, new):
+            return new if old is None else old + SMOOTHING * (new - old)
+
+        for result in results:
+            for command in result["commands"]:
+                timed = [command["files"][rel]["seconds"] for rel in command["files"]]
+                for rel, outcome in command["files"].items():
+                    key = f"{command['runner']}:{rel}"
+                    self.files[key] = round(blend(self.files.get(key), outcome["seconds"]), 3)
+                if timed and command["status"] == 0:
+                    overhead = max(0.0, command["seconds"] - sum(timed))
+                    runner = command["runner"]
+                    self.startup[runner] = round(blend(self.startup.get(runner), overhead), 3)
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"version": VERSION, "files": self.files, "startup": self.startup},
+                          f, separators=(",", ":"))
+            os.replace(tmp, self.path)
+        except OSError:
+            pass
+
+
+# -- planning --
+
+
+class Shard:
+    def __init__(self, index):
+        self.index = index             # 1-based
+        self.groups = {}               # (runner, project, config) -> [rel]
+        self.estimate = 0.0            # expected seconds, start-up included
+
+    @property
+    def files(self):
+        return [rel for group in sorted(self.groups) for rel in self.groups[group]]
+
+
+def plan(graph, tests, history, count):
+    """``tests`` (repo-relative test files) split into at most ``count`` shards
+    of about equal expected duration."""
+    units = []
+    for rel in tests:
+        group = graph.runner(rel)
+        units.append((history.estimate(group[0], rel), rel, group))
+    shards = [Shard(i + 1) for i in range(max(1, min(count, len(units))))]
+    for seconds, rel, group in sorted(units, key=lambda u: (-u[0], u[1])):
+        def finish(shard):
+            startup = 0.0 if group in shard.groups else history.startup.get(group[0], 0.0)
+            return shard.estimate + startup + seconds, shard.index
+
+        shard = min(shards, key=finish)
+        shard.estimate = finish(shard)[0]
+        shard.groups.setdefault(group, []).append(rel)
+    return [shard for shard in shards if shard.groups]
+
+
+# -- running --
+
+
+def _program(name):
+    return shutil.which(name) or name
+
+
+def command(graph, group, files, report, threads):
+    """(directory, argv, extra env) running ``files`` of one runner group with
+    its report written to ``report``."""
+    runner, project, config = group
+    directory = posixpath.join(graph.root, project) if project else graph.root
+    local = [posixpath.relpath(rel, project) if project else rel for rel in files]
+    env = {}
+    if runner == "vitest":
+        argv = [_program("npx"), "vitest", "run", "--reporter=default", "--reporter=json",
+                f"--outputFile.json={report}"]
+    elif runner == "jest":
+        argv = [_program("npx"), "jest", "--runTestsByPath", "--json", f"--outputFile={report}"]
+    elif runner == "playwright":
+        argv = [_program("npx"), "playwright", "test", "--reporter=list,json"]
+        argv += ["--config", config] if config else []
+        env = {"PLAYWRIGHT_JSON_OUTPUT_NAME": report, "PLAYWRIGHT_JSON_OUTPUT_FILE": report}
+    else:
+        pytest = shutil.which("pytest")
+        argv = [pytest] if pytest else [sys.executable, "-m", "pytest"]
+        argv += ["-o", "junit_family=xunit1", f"--junitxml={report}"]
+    if runner in WORKER_FLAGS:
+        argv.append(WORKER_FLAGS[runner].format(threads))
+    return directory, argv + local, env
+
+
+def _match(name, files):
+    """The one of ``files`` a runner's reported file name refers to, or None."""
+    name = name.replace("\\", "/")
+    if name in files:
+        return name
+    found = [rel for rel in files if rel.endswith("/" + name.lstrip("./"))]
+    return found[0] if len(found) == 1 else None
+
+
+def _outcome(files, rel, seconds, passed, failed):
+    entry = files.setdefault(rel, {"seconds": 0.0, "passed": 0, "failed": 0})
+    entry["seconds"] = round(entry["seconds"] + seconds, 3)
+    entry["passed"] += passed
+    entry["failed"] += failed
+
+
+def _playwright_tests(suite):
+    for spec in suite.get("specs", []):
+        yield from spec.get("tests", [])
+    for child in suite.get("suites", []):
+        yield from _playwright_tests(child)
+
+
+def parse_report(runner, report, root, files):
+    """{rel: {"seconds", "passed", "failed"}} of the ``files`` a report covers;
+    files the report does not mention are left out."""
+    out = {}
+    try:
+        if runner == "pytest":
+            import xml.etree.ElementTree as ET
+            cases = ET.parse(report).getroot().iter("testcase")
+        else:
+            with open(report, "r", encoding="utf-8") as f:
+                data = json.load(f)
+    except (OSError, ValueError, SyntaxError):
+        return out
+    if runner in ("vitest", "jest"):
+        for result in data.get("testResults", []):
+            rel = _match(posixpath.relpath(result.get("name", "").replace("\\", "/"), root),
+                         files)
+            if rel is None:
+                continue
+            statuses = [a.get("status") for a in result.get("assertionResults", [])]
+            seconds = max(0, (result.get("endTime") or 0) - (result.get("startTime") or 0))
+            _outcome(out, rel, seconds / 1000, statuses.count("passed"),
+                     statuses.count("failed") + (result.get("status") == "failed"
+                                                 and not statuses))
+    elif runner == "playwright":
+        for suite in data.get("suites", []):
+            rel = _match(suite.get("file", ""), files)
+            if rel is None:
+                continue
+            for test in _playwright_tests(suite):
+                ms = sum(r.get("duration", 0) for r in test.get("results", []))
+                status = test.get("status")
+                _outcome(out, rel, ms / 1000, status in ("expected", "flaky"),
+                         status == "unexpected")
+    else:
+        for case in cases:
+            rel = _match(case.get("file", ""), files)
+            if rel is None:
+                continue
+            failed = any(child.tag in ("failure", "error") for child in case)
+            skipped = any(child.tag == "skipped" for child in case)
+            _outcome(out, rel, float(case.get("time") or 0),
+                     not failed and not skipped, failed)
+    return out
+
+
+def _run_shard(graph, shard, count, workdir, threads):
+    log_path = os.path.join(workdir, f"shard-{shard.index}.log")
+    env = dict(os.environ, CLAUDE_SHARD=str(shard.index), CLAUDE_SHARDS=str(count))
+    result = {"shard": shard.index, "estimate": round(shard.estimate, 1), "status": 0,
+              "log": log_path, "commands": []}
+    start = time.perf_counter()
+    with open(log_path, "w", encoding="utf-8") as log:
+        for n, (group, files) in enumerate(sorted(shard.groups.items())):
+            report = os.path.join(workdir, f"shard-{shard.index}-{n}.report")
+            directory, argv, extra = command(graph, group, files, report, threads)
+            log.write(f"$ (cd {directory} && {' '.join(argv)})\n")
+            log.flush()
+            began = time.perf_counter()
+            try:
+                status = subprocess.run(argv, cwd=directory, env=dict(env, **extra),
+                                        stdin=subprocess.DEVNULL, stdout=log,
+                                        stderr=subprocess.STDOUT).returncode
+            except OSError as exc:
+                log.write(f"{exc}\n")
+                status = 127
+            result["commands"].append({
+                "runner": group[0], "status": status, "argv": argv,
+                "seconds": round(time.perf_counter() - began, 3),
+                "files": parse_report(group[0], report, graph.root, files)})
+            if status != 0:
+                result["status"] = status
+    result["seconds"] = round(time.perf_counter() - start, 3)
+    return result
+
+
+def run(graph, shards, workdir, cores=None):
+    """Run ``shards`` (``plan()``) in parallel; one result per shard:
+    {"shard", "status", "seconds", "estimate", "log", "commands": [{"runner",
+    "status", "argv", "seconds", "files": parse_report()}]}."""
+    os.makedirs(workdir, exist_ok=True)
+    threads = max(1, (cores or os.cpu_count() or 1) // max(1, len(shards)))
+    with ThreadPoolExecutor(max(1, len(shards))) as pool:
+        return list(pool.map(lambda s: _run_shard(graph, s, len(shards), workdir, threads),
+                             shards))
+
+
+def merge(results):
+    """One report of all shards: {"files": {rel: outcome + "shard"}, "passed",
+    "failed", "status", "wall", "serial"}."""
+    files = {}
+    for result in results:
+        for cmd in result["commands"]:
+            for rel, outcome in cmd["files"].items():
+                files[rel] = dict(outcome, shard=result["shard"])
+    return {"files": dict(sorted(files.items())),
+            "passed": sum(f["passed"] for f in files.values()),
+            "failed": sum(f["failed"] for f in files.values()),
+            "status": next((r["status"] for r in results if r["status"] != 0), 0),
+            "wall": max((r["seconds"] for r in results), default=0.0),
+            "serial": round(sum(r["seconds"] for r in results), 3),
+            "shards": [{k: r[k] for k in ("shard", "status", "seconds", "estimate", "log")}
+                       for r in results]}
@@ -0,0 +1,528 @@
+"""Shared Bash command tokenizer for PreToolUse/PostToolUse hooks.
+
+Hooks used to look for programs with substring checks or a regex split on
+``&&``/``||``/``;``/``|``, so a program named inside a quoted commit message
+("git commit -m 'drop psql usage'") looked like an invocation. ``parse()``
+tokenizes the command once, the way the shell would, and returns every
+program it would actually run:
+
+    from hooklib import shell
+
+    script = shell.parse(command)
+    "psql" in script.programs
+    for inv in script.find("git", "push"):
+        inv.args, inv.env, inv.stdin
+
+Understood: single/double/ANSI-C quoting, backslash escapes and line
+continuations, comments, ``&& || ; & | |&`` and newlines, ``( )`` subshells
+and ``{ }`` groups, reserved words (if/then/do/...), ``NAME=value`` env
+prefixes, redirections, heredocs (``<<EOF``, ``<<-'EOF'``) and here-strings,
+``$(...)``, backticks and ``<(...)`` substitutions (their commands are
+invocations too, also inside ``${x:-...}`` operands and unquoted heredoc
+bodies), ``bash -c``/``eval`` strings, and wrappers such as sudo,
+env, timeout, xargs (``inv.program`` is the wrapped program).
+
+Results are memoized by command text, so every hook the dispatcher runs for
+one Bash call shares a single parse.
+"""
+import functools
+import os
+import re
+
+_ASSIGN = re.compile(r"[A-Za-z_][A-Za-z0-9_]*\+?=")
+_PLAIN = re.compile(r"[^\s\\'\"`$<>&|;()]+")   # run of unquoted word characters
+_DQ_PLAIN = re.compile(r"[^\"\\`$]+")          # run of literal chars inside "..."
+_OPERATORS = ("&&", "||", ";;", ";&", "|&", ";", "&", "|", "(", ")")
+_REDIRECTS = ("<<<", "<<-", "&>>", "<<", "<>", ">>", ">|", ">&", "<&", "&>", ">", "<")
+_SEPARATORS = {"&&", "||", ";;", ";&", ";", "&", "\n", "("}  # start a new pipeline
+_RESERVED = {"if", "then", "else", "elif", "fi", "do", "done", "while", "until",
+             "esac", "{", "}", "!", "time"}
+_NON_COMMANDS = {"for", "select", "case", "function", "[[", "]]", "(("}
+_DECLARATIONS = {"export", "declare", "local", "readonly", "typeset"}
+_SHELLS = {"bash", "sh", "zsh", "dash", "ksh"}
+
+# wrapper program -> (options that take a value, positional args before the command)
+WRAPPERS = {
+    "sudo": ({"-u", "-g", "-C", "-D", "-h", "-p", "-r", "-t", "-U"}, 0),
+    "env": ({"-u", "-C", "-S"}, 0),
+    "nohup": (set(), 0),
+    "nice": ({"-n"}, 0),
+    "ionice": ({"-c", "-n"}, 0),
+    "stdbuf": ({"-i", "-o", "-e"}, 0),
+    "time": ({"-f", "-o"}, 0),
+    "exec": ({"-a"}, 0),
+    "command": (set(), 0),
+    "builtin": (set(), 0),
+    "timeout": ({"-s", "-k", "--signal", "--kill-after"}, 1),
+    "xargs": ({"-I", "-n", "-P", "-L", "-d", "-E", "-s", "-a"}, 0),
+    "watch": ({"-n", "-d"}, 0),
+    "npx": ({"-p", "--package"}, 0),
+}
+
+
+class Word:
+    """One shell word: ``text`` with quotes removed, ``subs`` = nested token lists."""
+
+    __slots__ = ("text", "parts", "subs", "quoted")
+
+    def __init__(self):
+        self.text = ""
+        self.parts = []  # pieces collected by the lexer, joined into text at word end
+        self.subs = []
+        self.quoted = False
+
+
+class Redirect:
+    __slots__ = ("op", "fd", "target", "body")
+
+    def __init__(self, op, fd):
+        self.op = op
+        self.fd = fd
+        self.target = None  # Word
+        self.body = None    # heredoc body / here-string text
+
+
+class Invocation:
+    """One program the command would run."""
+
+    __slots__ = ("argv", "env", "program", "args", "wrappers", "redirects",
+                 "depth", "pipeline")
+
+    def __init__(self, argv, env, redirects, depth, pipeline):
+        self.argv = argv
+        self.env = env
+        self.redirects = redirects
+        self.depth = depth          # 0 = top level, >0 = inside $(...) / bash -c
+        self.pipeline = pipeline    # invocations sharing a pipeline share this id
+        self.wrappers = []
+        self.program, self.args = _unwrap(argv, self.wrappers)
+
+    @property
+    def stdin(self):
+        """Heredoc bodies and here-strings fed to this invocation."""
+        return [r.body for r in self.redirects if r.body is not None]
+
+    @property
+    def files_in(self):
+        """Files redirected into stdin (``< file``)."""
+        return [r.target for r in self.redirects if r.op == "<" and r.target]
+
+    def subcommand(self, value_options=()):
+        """First positional argument, skipping options (and values of ``value_options``)."""
+        skip = False
+        for arg in self.args:
+            if skip:
+                skip = False
+            elif arg in value_options:
+                skip = True
+            elif not arg.startswith("-"):
+                return arg
+        return None
+
+    def __repr__(self):
+        return f"Invocation({self.argv!r}, depth={self.depth}, pipeline={self.pipeline})"
+
+
+class Script:
+    """Every invocation in a command, plus the bits hooks commonly need."""
+
+    __slots__ = ("command", "invocations", "programs", "assignments", "comments")
+
+    def __init__(self, command, invocations, assignments, comments):
+        self.command = command
+        self.invocations = invocations
+        self.programs = frozenset(i.program for i in invocations if i.program)
+        self.assignments = assignments  # values of NAME=value words (incl. export)
+        self.comments = comments
+
+    def find(self, program, subcommand=None, value_options=()):
+        return [i for i in self.invocations
+                if i.program == program
+                and (subcommand is None or i.subcommand(value_options) == subcommand)]
+
+    def upstream(self, inv):
+        """Invocations feeding ``inv`` through a pipe (earlier in its pipeline)."""
+        out = []
+        for other in self.invocations:
+            if other is inv:
+                break
+            if other.pipeline == inv.pipeline and other.depth == inv.depth:
+                out.append(other)
+        return out
+
+
+def program_name(word):
+    """Normalized program name: basename, lowercased, without .exe."""
+    name = os.path.basename(word.replace("\\", "/")).lower()
+    return name[:-4] if name.endswith(".exe") else name
+
+
+def _unwrap(argv, wrappers):
+    i = 0
+    while i < len(argv):
+        name = program_name(argv[i])
+        if name not in WRAPPERS:
+            return name, argv[i + 1:]
+        wrappers.append(name)
+        value_options, positional = WRAPPERS[name]
+        i += 1
+        while i < len(argv) and argv[i].startswith("-") and argv[i] != "-":
+            opt = argv[i]
+            i += 1
+            if opt in value_options and "=" not in opt:
+                i += 1
+        if name == "env":
+            while i < len(argv) and _ASSIGN.match(argv[i]):
+                i += 1
+        i += positional
+    return None, []
+
+
+# -- lexer --
+
+
+class _Op:
+    __slots__ = ("op",)
+
+    def __init__(self, op):
+        self.op = op
+
+
+class _Lexer:
+    def __init__(self, src):
+        self.src = src
+        self.comments = []
+
+    def lex(self, i=0, stop=None):
+        """Tokens from ``i`` until end (or an unmatched ``stop`` char); returns (tokens, end)."""
+        src, n = self.src, len(self.src)
+        tokens, pending = [], []  # pending heredoc Redirects awaiting their body
+        word, depth = None, 0
+
+        def end_word():
+            nonlocal word
+            if word is None:
+                return
+            word.text = "".join(word.parts)
+            last = tokens[-1] if tokens else None
+            if isinstance(last, Redirect) and last.target is None:
+                last.target = word
+                if last.op == "<<<":
+                    last.body = word.text
+            else:
+                tokens.append(word)
+            word = None
+
+        while i < n:
+            c = src[i]
+            if c in " \t\r":
+                end_word()
+                i += 1
+            elif c == "\n":
+                end_word()
+                tokens.append(_Op("\n"))
+                i = self._heredoc_bodies(i + 1, pending)
+            elif c == "#" and word is None:
+                j = src.find("\n", i)
+                j = n if j < 0 else j
+                self.comments.append(src[i:j])
+                i = j
+            elif c == "\\":
+                if i + 1 < n and src[i + 1] == "\n":
+                    i += 2
+                    continue
+                word = word or Word()
+                word.parts.append(src[i + 1:i + 2])
+                i += 2
+            elif c == "'":
+                word = word or Word()
+                word.quoted = True
+                j = src.find("'", i + 1)
+                j = n if j < 0 else j
+                word.parts.append(src[i + 1:j])
+                i = j + 1
+            elif c == '"':
+                word = word or Word()
+                word.quoted = True
+                i = self._double_quoted(i + 1, word)
+            elif c == "`":
+                word = word or Word()
+                i = self._backticks(i + 1, word)
+            elif c == "$" and src.startswith("$'", i):
+                word = word or Word()
+                word.quoted = True
+                i = self._ansi_c(i + 2, word)
+            elif c == "$" and src.startswith("$((", i):
+                word = word or Word()
+                j = self._balanced(i + 1, "(", ")")
+                word.parts.append(src[i:j])
+                i = j
+            elif c == "$" and src.startswith("$(", i):
+                word = word or Word()
+                i = self._substitution(i + 2, word, "$(")
+            elif c == "$" and src.startswith("${", i):
+                word = word or Word()
+                i = self._parameter(i + 2, word)
+            elif c in "<>" and src.startswith("(", i + 1) and word is None:
+                word = Word()
+                i = self._substitution(i + 2, word, c + "(")
+            elif c in "<>&" and self._redirect_at(i):
+                op = self._redirect_at(i)
+                fd = None
+                if word is not None and not word.quoted and not word.subs:
+                    text = "".join(word.parts)
+                    if text.isdigit():
+                        fd, word = text, None
+                end_word()
+                redirect = Redirect(op, fd)
+                tokens.append(redirect)
+                if op in ("<<", "<<-"):
+                    pending.append(redirect)
+                i += len(op)
+            elif c in ";&|()":
+                op = next(o for o in _OPERATORS if src.startswith(o, i))
+                if stop and op == "(":
+                    depth += 1
+                elif stop and op == ")":
+                    if depth == 0:
+                        end_word()
+                        return tokens, i + 1
+                    depth -= 1
+                end_word()
+                tokens.append(_Op(op))
+                i += len(op)
+            else:
+                word = word or Word()
+                m = _PLAIN.match(src, i)
+                run = m.group() if m else c
+                word.parts.append(run)
+                i += len(run)
+        end_word()
+        return tokens, n
+
+    def _redirect_at(self, i):
+        src = self.src
+        for op in _REDIRECTS:
+            if src.startswith(op, i):
+                if op[0] == "&" and not src.startswith(">", i + 1):
+                    return None
+                return op
+        return None
+
+    def _double_quoted(self, i, word):
+        src, n = self.src, len(self.src)
+        while i < n:
+            c = src[i]
+            if c == '"':
+                return i + 1
+            if c == "\\" and i + 1 < n:
+                nxt = src[i + 1]
+                if nxt == "\n":
+                    i += 2
+                    continue
+                word.parts.append(nxt if nxt in '"\\$`' else c + nxt)
+                i += 2
+            elif c == "`":
+                i = self._backticks(i + 1, word)
+            elif src.startswith("$((", i):
+                j = self._balanced(i + 1, "(", ")")
+                word.parts.append(src[i:j])
+                i = j
+            elif src.startswith("$(", i):
+                i = self._substitution(i + 2, word, "$(")
+            elif src.startswith("${", i):
+                i = self._parameter(i + 2, word, in_dq=True)
+            else:
+                m = _DQ_PLAIN.match(src, i)
+                run = m.group() if m else c
+                word.parts.append(run)
+                i += len(run)
+        return n
+
+    def _ansi_c(self, i, word):
+        src, n = self.src, len(self.src)
+        escapes = {"n": "\n", "t": "\t", "r": "\r", "\\": "\\", "'": "'", '"': '"'}
+        while i < n:
+            c = src[i]
+            if c == "'":
+                return i + 1
+            if c == "\\" and i + 1 < n:
+                word.parts.append(escapes.get(src[i + 1], "\\" + src[i + 1]))
+                i += 2
+            else:
+                word.parts.append(c)
+                i += 1
+        return n
+
+    def _backticks(self, i, word):
+        src, n = self.src, len(self.src)
+        j = i
+        while j < n and src[j] != "`":
+            j += 2 if src[j] == "\\" else 1
+        inner = src[i:min(j, n)].replace("\\`", "`")
+        sub = _Lexer(inner)
+        tokens, _ = sub.lex()
+        self.comments.extend(sub.comments)
+        word.subs.append(tokens)
+        word.parts.append("`" + inner + "`")
+        return min(j + 1, n)
+
+    def _substitution(self, i, word, opener):
+        tokens, end = self.lex(i, stop=")")
+        word.subs.append(tokens)
+        word.parts.append(opener + self.src[i:end])
+        return end
+
+    def _parameter(self, i, word, in_dq=False):
+        """``${...}`` from ``i`` (after ``${``): kept as text, but substitutions in
+        its operand (``${x:-$(cmd)}``) are lexed, since the shell runs them.
+        Inside "..." a single quote is literal."""
+        src, n = self.src, len(self.src)
+        start, depth, inner = i - 2, 1, Word()
+        while i < n and depth:
+            c = src[i]
+            if c == "\\":
+                i += 2
+            elif c == "'" and not in_dq:
+                k = src.find("'", i + 1)
+                i = n if k < 0 else k + 1
+            elif c == '"':
+                i = self._double_quoted(i + 1, inner)
+            elif c == "`":
+                i = self._backticks(i + 1, inner)
+            elif src.startswith("$((", i):
+                i = self._balanced(i + 1, "(", ")")
+            elif src.startswith("$(", i):
+                i = self._substitution(i + 2, inner, "$(")
+            elif src.startswith("${", i):
+                depth += 1
+                i += 2
+            else:
+                if c == "}":
+                    depth -= 1
+                i += 1
+        word.parts.append(src[start:min(i, n)])
+        word.subs.extend(inner.subs)
+        return min(i, n)
+
+    def _balanced(self, i, open_ch, close_ch):
+        """Index after the ``close_ch`` matching the ``open_ch`` at ``i`` (quote-aware)."""
+        src, n = self.src, len(self.src)
+        depth, j = 0, i
+        while j < n:
+            c = src[j]
+            if c == "\\":
+                j += 2
+                continue
+            if c == "'":
+                k = src.find("'", j + 1)
+                j = n if k < 0 else k + 1
+                continue
+            if c == open_ch:
+                depth += 1
+            elif c == close_ch:
+                depth -= 1
+                if depth == 0:
+                    return j + 1
+            j += 1
+        return n
+
+    def _heredoc_bodies(self, i, pending):
+        src, n = self.src, len(self.src)
+        while pending:
+            redirect = pending.pop(0)
+            delimiter = redirect.target.text if redirect.target else ""
+            strip_tabs = redirect.op == "<<-"
+            lines = []
+            while i < n:
+                j = src.find("\n", i)
+                j = n if j < 0 else j
+                line = src[i:j]
+                i = j + 1
+                if (line.lstrip("\t") if strip_tabs else line) == delimiter:
+                    break
+                lines.append(line)
+            body = "\n".join(lines)
+            redirect.body = body
+            if (redirect.target is not None and not redirect.target.quoted
+                    and ("$(" in body or "`" in body)):
+                sub = _Lexer(body)
+                tokens, _ = sub.lex()
+                for tok in tokens:
+                    if isinstance(tok, Word):
+                        redirect.target.subs.extend(tok.subs)
+        return min(i, n)
+
+
+# -- parser --
+
+
+def _parse_tokens(tokens, depth, lexer_comments, out, assignments, counter):
+    """Group tokens into simple commands and append their Invocations to ``out``."""
+    pipeline = counter[0] = counter[0] + 1
+    words, redirects = [], []
+
+    def flush():
+        nested = []
+        for w in words:
+            nested.extend(w.subs)
+        for r in redirects:
+            if r.target is not None:
+                nested.extend(r.target.subs)
+        env, argv = {}, [w.text for w in words]
+        while argv and argv[0] in _RESERVED and not words[len(words) - len(argv)].quoted:
+            argv.pop(0)
+        if argv and argv[0] in _NON_COMMANDS:
+            argv = []
+        while argv and _ASSIGN.match(argv[0]):
+            name, _, value = argv.pop(0).partition("=")
+            env[name.rstrip("+")] = value
+            assignments.append(value)
+        if argv:
+            inv = Invocation(argv, env, list(redirects), depth, pipeline)
+            out.append(inv)
+            if inv.program in _DECLARATIONS:
+                assignments.extend(a.partition("=")[2] for a in inv.args if _ASSIGN.match(a))
+            for text in _inline_scripts(inv):
+                lexer = _Lexer(text)
+                inner, _ = lexer.lex()
+                lexer_comments.extend(lexer.comments)
+                _parse_tokens(inner, depth + 1, lexer_comments, out, assignments, counter)
+        for sub in nested:
+            _parse_tokens(sub, depth + 1, lexer_comments, out, assignments, counter)
+        words.clear()
+        redirects.clear()
+
+    for tok in tokens:
+        if isinstance(tok, Word):
+            words.append(tok)
+        elif isinstance(tok, Redirect):
+            redirects.append(tok)
+        else:
+            flush()
+            if tok.op in _SEPARATORS:
+                pipeline = counter[0] = counter[0] + 1
+    flush()
+
+
+def _inline_scripts(inv):
+    """Command strings an invocation runs itself: ``bash -c STR``, ``eval ARGS``."""
+    if inv.program == "eval":
+        return [" ".join(inv.args)] if inv.args else []
+    if inv.program in _SHELLS:
+        for k, arg in enumerate(inv.args):
+            if arg.startswith("-") and not arg.startswith("--") and "c" in arg[1:]:
+                return inv.args[k + 1:k + 2]
+            if not arg.startswith("-"):
+                break
+    return []
+
+
+@functools.lru_cache(maxsize=64)
+def parse(command):
+    """Tokenize a Bash command into a Script (memoized per command text)."""
+    lexer = _Lexer(command or "")
+    tokens, _ = lexer.lex()
+    invocations, assignments = [], []
+    _parse_tokens(tokens, 0, lexer.comments, invocations, assignments, [0])
+    return Script(command, invocations, assignments, lexer.comments)
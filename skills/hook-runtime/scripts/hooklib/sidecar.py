@@ -0,0 +1,500 @@
+"""Columnar sidecar of a session transcript: its metadata without the JSONL.
+
+A session JSONL mixes small records (prompts, tool calls) with tool results
+that make up most of its bytes, so every reader pays to parse all of it.
+``update()`` keeps ``<session-uuid>.cols`` next to ``<session-uuid>.jsonl``
+with one row per prompt, text block, tool call and tool result, stored
+column by column:
+
+  seq         line number in the JSONL
+  type        entry type (user, assistant, summary, system, ...)
+  kind        prompt | text | tool_use | tool_result | tool_error (a tool_result
+              with is_error: a failed call, or one a hook blocked) |
+              "" (entry without blocks)
+  ts          timestamp
+  tool        tool name (tool_use, and the tool_result answering it)
+  tool_id     tool_use id
+  file_path   tool input file_path / notebook_path / path
+  command     Bash command (first MAX_VALUE chars)
+  text        prompt, assistant text, tool_error message or summary (first
+              MAX_VALUE chars)
+  offset      byte offset of the entry's line in the JSONL
+  length      byte length of that line
+
+Tool output is not copied: ``Sidecar.payload(i)`` decodes row i's line
+from the JSONL when a caller does need it.
+
+Format: a file header, then row groups appended as the session grows. A
+group records the JSONL byte range it covers and the reader cursor
+(hooklib.transcript) to resume from, then its columns: int64 arrays,
+uint16 codes plus a dictionary for type / kind / tool, and uint32 end
+offsets plus a UTF-8 blob for the other strings. Everything is
+little-endian and 8-byte aligned, so the reader casts memoryviews over the
+mmap instead of copying. A group that does not continue the previous one's
+range (a concurrent writer appended the same lines) or that is cut short is
+ignored. Past MAX_GROUPS groups, after a torn write, or when the JSONL was
+rewritten, the file is rebuilt and swapped in with os.replace.
+
+    from hooklib import sidecar
+
+    with sidecar.load(transcript_path) as sc:      # update, then mmap
+        for row in sc.rows(kind="tool_use", tool="Bash"):
+            row.seq, row.ts, row.command
+        sc.values("file_path", kind="tool_use")    # only the columns asked for
+        sc.column("file_path")                     # lazy sequence over all rows
+        sc.payload(i)                              # full JSON entry of row i
+"""
+import array
+import json
+import mmap
+import os
+import struct
+import sys
+from bisect import bisect_right
+from collections import namedtuple
+
+from hooklib.transcript import IncrementalReader
+
+SUFFIX = ".cols"
+VERSION = 2
+MAX_VALUE = 4096  # chars kept per command / text value
+MAX_GROUPS = 64   # row groups before the file is compacted into one
+PATH_KEYS = ("file_path", "notebook_path", "path")
+# What the writer decodes; tool_result content and toolUseResult are only
+# referenced by offset (strings in lines over 64 KB are cut while parsing).
+BLOCK_TYPES = ("text", "tool_use", "tool_result")
+SKIP_KEYS = ("toolUseResult",)
+
+COLUMNS = ("seq", "type", "kind", "ts", "tool", "tool_id", "file_path", "command", "text",
+           "offset", "length")
+INT_COLUMNS = ("seq", "offset", "length")
+DICT_COLUMNS = ("type", "kind", "tool")
+STR_COLUMNS = ("ts", "tool_id", "file_path", "command", "text")
+Row = namedtuple("Row", COLUMNS)
+
+_FILE_MAGIC, _GROUP_MAGIC = b"CCSC", b"CSRG"
+_FILE_HEADER = struct.Struct("<4sI")  # magic, version
+# magic, rows, JSONL start, JSONL end, lines read up to the end, body bytes, cursor bytes
+_GROUP_HEADER = struct.Struct("<4sIQQQQI4x")
+_LITTLE = sys.byteorder == "little"
+_ITEM = {"q": 8, "I": 4, "H": 2}
+
+
+class SidecarError(ValueError):
+    pass
+
+
+def sidecar_path(jsonl_path):
+    base = jsonl_path[:-len(".jsonl")] if jsonl_path.endswith(".jsonl") else jsonl_path
+    return base + SUFFIX
+
+
+# -- rows from transcript entries --
+
+
+def _str(value):
+    return value if isinstance(value, str) else ""
+
+
+class _ToolNames(dict):
+    """tool_use id -> tool name. Ids from earlier groups are looked up in the
+    existing sidecar, read once on the first miss."""
+
+    def __init__(self, old=None):
+        super().__init__()
+        self.old = old
+
+    def __missing__(self, key):
+        old, self.old = self.old, None
+        if old is not None:
+            for tool_id, tool in old.values("tool_id", "tool", kind="tool_use"):
+                self.setdefault(tool_id, tool)
+            if key in self:
+                return self[key]
+        return ""
+
+
+def _result_text(content):
+    if isinstance(content, list):
+        return "\n".join(_str(b.get("text")) for b in content if isinstance(b, dict))
+    return _str(content)
+
+
+def entry_rows(entry, seq, offset, length, tool_names):
+    """Row tuples (COLUMNS order) for one transcript entry; at least one."""
+    etype = _str(entry.get("type"))
+    ts = _str(entry.get("timestamp"))
+    message = entry.get("message")
+    content = message.get("content") if isinstance(message, dict) else None
+    text_kind = "prompt" if etype == "user" else "text"
+    rows = []
+
+    def add(kind, tool="", tool_id="", file_path="", command="", text=""):
+        rows.append((seq, etype, kind, ts, tool, tool_id, file_path,
+                     command[:MAX_VALUE], text[:MAX_VALUE], offset, length))
+
+    if isinstance(content, str) and content:
+        add(text_kind, text=content)
+    elif isinstance(content, list):
+        for block in content:
+            if not isinstance(block, dict):
+                continue
+            btype = block.get("type")
+            if btype == "text" and _str(block.get("text")):
+                add(text_kind, text=block["text"])
+            elif btype == "tool_use":
+                inp = block.get("input")
+                if not isinstance(inp, dict):
+                    inp = {}
+                name, tool_id = _str(block.get("name")), _str(block.get("id"))
+                tool_names[tool_id] = name
+                path = next((inp[k] for k in PATH_KEYS if isinstance(inp.get(k), str)), "")
+                add("tool_use", name, tool_id, path, _str(inp.get("command")))
+            elif btype == "tool_result":
+                tool_id = _str(block.get("tool_use_id"))
+                tool = tool_names[tool_id] if tool_id else ""
+                if block.get("is_error"):
+                    add("tool_error", tool, tool_id, text=_result_text(block.get("content")))
+                else:
+                    add("tool_result", tool, tool_id)
+    if not rows:
+        add("", text=_str(entry.get("summary")))
+    return rows
+
+
+# -- encoding --
+
+
+def _padded(data):
+    return data + b"\0" * (-len(data) % 8)
+
+
+def _ints(values, code):
+    arr = array.array(code, values)
+    if not _LITTLE:
+        arr.byteswap()
+    return _padded(arr.tobytes())
+
+
+def _strings(values):
+    """uint32 end offsets, then the UTF-8 blob."""
+    blobs, ends, end = [], [], 0
+    for value in values:
+        blob = value.encode("utf-8", "surrogatepass")
+        end += len(blob)
+        ends.append(end)
+        blobs.append(blob)
+    return _ints(ends, "I") + _padded(b"".join(blobs))
+
+
+def _encode_group(rows, src_start, src_end, lines, cursor):
+    columns = dict(zip(COLUMNS, zip(*rows))) if rows else {name: () for name in COLUMNS}
+    cursor_bytes = json.dumps(cursor).encode("ascii")
+    parts = [_padded(cursor_bytes)]
+    for name in INT_COLUMNS:
+        parts.append(_ints(columns[name], "q"))
+    for name in DICT_COLUMNS:
+        index = {}
+        codes = [index.setdefault(value, len(index)) for value in columns[name]]
+        parts.append(_ints([len(index)], "I"))
+        parts.append(_strings(index))
+        parts.append(_ints(codes, "H"))
+    for name in STR_COLUMNS:
+        parts.append(_strings(columns[name]))
+    body = b"".join(parts)
+    return _GROUP_HEADER.pack(_GROUP_MAGIC, len(rows), src_start, src_end, lines,
+                              len(body), len(cursor_bytes)) + body
+
+
+# -- reading --
+
+
+class _Strings:
+    """Lazy sequence of the strings in one string column of a group."""
+
+    def __init__(self, buf, ends, blob):
+        self.buf, self.ends, self.blob = buf, ends, blob
+
+    def __len__(self):
+        return len(self.ends)
+
+    def __getitem__(self, i):
+        start = self.ends[i - 1] if i else 0
+        return self.buf[self.blob + start:self.blob + self.ends[i]].decode(
+            "utf-8", "surrogatepass")
+
+    def __iter__(self):
+        buf, blob, start = self.buf, self.blob, 0
+        for end in self.ends:
+            yield buf[blob + start:blob + end].decode("utf-8", "surrogatepass")
+            start = end
+
+
+class _Codes:
+    """Dictionary-encoded column: ``words[codes[i]]``."""
+
+    def __init__(self, words, codes):
+        self.words, self.codes = words, codes
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, i):
+        return self.words[self.codes[i]]
+
+    def __iter__(self):
+        words = self.words
+        return (words[c] for c in self.codes)
+
+    def code(self, value):
+        try:
+            return self.words.index(value)
+        except ValueError:
+            return None
+
+
+class _Group:
+    def __init__(self, sidecar, pos, rows):
+        self.rows = rows
+        self.columns = {}
+        for name in INT_COLUMNS:
+            self.columns[name], pos = sidecar._array(pos, rows, "q")
+        for name in DICT_COLUMNS:
+            size, pos = sidecar._array(pos, 1, "I")
+            words, pos = sidecar._strings(pos, size[0])
+            codes, pos = sidecar._array(pos, rows, "H")
+            self.columns[name] = _Codes(list(words), codes)
+        for name in STR_COLUMNS:
+            self.columns[name], pos = sidecar._strings(pos, rows)
+
+    def row(self, i):
+        return Row(*(self.columns[name][i] for name in COLUMNS))
+
+    def select(self, where):
+        """Indices of the rows whose columns equal ``where``."""
+        picked = None
+        for name, value in where.items():
+            column = self.columns[name]
+            if isinstance(column, _Codes):
+                code = column.code(value)
+                if code is None:
+                    return []
+                candidates = range(self.rows) if picked is None else picked
+                codes = column.codes
+                picked = [i for i in candidates if codes[i] == code]
+            else:
+                candidates = range(self.rows) if picked is None else picked
+                picked = [i for i in candidates if column[i] == value]
+        return range(self.rows) if picked is None else picked
+
+
+class _Column:
+    """One column across every group, as a read-only sequence."""
+
+    def __init__(self, parts, starts):
+        self.parts, self.starts = parts, starts
+
+    def __len__(self):
+        return sum(len(p) for p in self.parts)
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        g = bisect_right(self.starts, i) - 1
+        if g < 0 or i - self.starts[g] >= len(self.parts[g]):
+            raise IndexError(i)
+        return self.parts[g][i - self.starts[g]]
+
+    def __iter__(self):
+        for part in self.parts:
+            yield from part
+
+
+class Sidecar:
+    """Memory-mapped, read-only view of a sidecar file.
+
+    ``source`` is the JSONL it describes (for ``payload``). ``end`` / ``lines``
+    / ``cursor`` say how much of the JSONL the rows cover; ``intact`` is
+    False when bytes after the last valid group were left by a torn write.
+    """
+
+    def __init__(self, path, source=None):
+        self.path = path
+        self.source = source
+        self._views = []
+        self._file = open(path, "rb")
+        try:
+            size = os.fstat(self._file.fileno()).st_size
+            self._buf = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+            self._load()
+        except BaseException:
+            self.close()
+            raise
+
+    def _load(self):
+        buf = self._buf
+        if len(buf) < _FILE_HEADER.size:
+            raise SidecarError(f"{self.path}: not a sidecar")
+        magic, version = _FILE_HEADER.unpack_from(buf, 0)
+        if magic != _FILE_MAGIC or version != VERSION:
+            raise SidecarError(f"{self.path}: not a version {VERSION} sidecar")
+        self.groups, self.starts = [], []
+        self.end, self.lines, self.cursor, total = 0, 0, None, 0
+        pos = _FILE_HEADER.size
+        while pos + _GROUP_HEADER.size <= len(buf):
+            magic, rows, src_start, src_end, lines, body, cursor_len = (
+                _GROUP_HEADER.unpack_from(buf, pos))
+            start, stop = pos + _GROUP_HEADER.size, pos + _GROUP_HEADER.size + body
+            if magic != _GROUP_MAGIC or stop > len(buf):
+                break
+            if src_start == self.end:
+                self.cursor = json.loads(buf[start:start + cursor_len])
+                self.end, self.lines = src_end, lines
+                self.groups.append(_Group(self, start + cursor_len + (-cursor_len % 8), rows))
+                self.starts.append(total)
+                total += rows
+            pos = stop
+        self.intact = pos == len(buf)
+        self._rows = total
+
+    def _array(self, pos, n, code):
+        size = n * _ITEM[code]
+        if _LITTLE:
+            view = memoryview(self._buf)[pos:pos + size]
+            cast = view.cast(code)
+            self._views += (view, cast)
+        else:
+            cast = array.array(code, self._buf[pos:pos + size])
+            cast.byteswap()
+        return cast, pos + size + (-size % 8)
+
+    def _strings(self, pos, n):
+        ends, pos = self._array(pos, n, "I")
+        size = ends[-1] if n else 0
+        return _Strings(self._buf, ends, pos), pos + size + (-size % 8)
+
+    def __len__(self):
+        return self._rows
+
+    def column(self, name):
+        if name not in COLUMNS:
+            raise KeyError(name)
+        return _Column([g.columns[name] for g in self.groups], self.starts)
+
+    def row(self, i):
+        if i < 0:
+            i += self._rows
+        g = bisect_right(self.starts, i) - 1
+        if g < 0 or i >= self._rows:
+            raise IndexError(i)
+        return self.groups[g].row(i - self.starts[g])
+
+    def rows(self, **where):
+        """Rows whose columns equal the given values, in order:
+        ``rows(kind="tool_use", tool="Bash")``."""
+        for name in where:
+            if name not in COLUMNS:
+                raise KeyError(name)
+        for group in self.groups:
+            for i in group.select(where):
+                yield group.row(i)
+
+    def values(self, *names, **where):
+        """Like rows(), decoding only the named columns: one value per row for
+        a single name, else a tuple. ``values("command", tool="Bash")``."""
+        for name in tuple(names) + tuple(where):
+            if name not in COLUMNS:
+                raise KeyError(name)
+        for group in self.groups:
+            columns = [group.columns[name] for name in names]
+            if len(columns) == 1:
+                column = columns[0]
+                for i in group.select(where):
+                    yield column[i]
+            else:
+                for i in group.select(where):
+                    yield tuple(c[i] for c in columns)
+
+    def payload(self, i):
+        """The JSONL entry row ``i`` came from, decoded in full."""
+        row = self.row(i)
+        with open(self.source, "rb") as f:
+            f.seek(row.offset)
+            return json.loads(f.read(row.length))
+
+    def close(self):
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        if isinstance(getattr(self, "_buf", None), mmap.mmap):
+            self._buf.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# -- writing --
+
+
+def _open(path, source):
+    try:
+        return Sidecar(path, source)
+    except (OSError, SidecarError):
+        return None
+
+
+def update(jsonl_path, path=None):
+    """Bring the sidecar of ``jsonl_path`` up to date.
+
+    Appends one group with the rows of lines added since the last update, or
+    rewrites the file (first run, rewritten JSONL, compaction). Returns the
+    number of rows written.
+    """
+    path = path or sidecar_path(jsonl_path)
+    old = _open(path, jsonl_path)
+    try:
+        reader = IncrementalReader(jsonl_path, old.cursor if old else None)
+        append = old is not None and not reader.reset
+        names = _ToolNames(old if append else None)
+        base = old.lines if append else 0
+        rows = []
+        for entry in reader.entries(None, BLOCK_TYPES, SKIP_KEYS):
+            rows.extend(entry_rows(entry, base + reader.count, reader.line_start,
+                                   reader.offset - reader.line_start, names))
+        if append and old.intact and len(old.groups) < MAX_GROUPS:
+            if reader.offset == old.end:
+                return 0
+            data = _encode_group(rows, old.end, reader.offset, base + reader.count,
+                                 reader.cursor())
+            with open(path, "ab") as f:
+                f.write(data)
+            return len(rows)
+        if append:
+            rows = [tuple(row) for row in old.rows()] + rows
+        group = _encode_group(rows, 0, reader.offset, base + reader.count, reader.cursor())
+    finally:
+        if old is not None:
+            old.close()
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "wb") as f:
+            f.write(_FILE_HEADER.pack(_FILE_MAGIC, VERSION))
+            f.write(group)
+        os.replace(tmp, path)
+    except OSError:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+    return len(rows)
+
+
+def load(jsonl_path, refresh=True):
+    """The sidecar of ``jsonl_path``, updated first unless ``refresh`` is False."""
+    path = sidecar_path(jsonl_path)
+    if refresh:
+        update(jsonl_path, path)
+    return Sidecar(path, jsonl_path)
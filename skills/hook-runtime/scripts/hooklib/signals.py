@@ -0,0 +1,172 @@
+"""Declarative phrase signals compiled into a single-pass matcher.
+
+A signal table maps a signal name to a list of alternatives; the signal is
+set when ANY alternative matched. An alternative is a phrase, or a tuple of
+phrases that must ALL have been seen (anywhere in the scanned text):
+
+    TABLE = {
+        "tests_run": ["npm test", "playwright", ("passed", "test")],
+    }
+
+All phrases of a table are compiled into one trie-shaped alternation regex
+(common prefixes factored out, so each text position is tested against a
+handful of branches instead of every phrase). Each text block is scanned
+once; only the set of phrases seen is kept, so callers can stream blocks and
+never hold the whole transcript. Phrases already seen, and phrases only
+needed by signals already set, are dropped from the regex; scanning stops
+once every signal is set (``Scanner.done``).
+
+Matching is case-insensitive. Long texts are lowercased one window at a
+time (``WINDOW`` chars plus an overlap of the longest phrase), so a scan
+never copies the whole text; ``scan_chunks`` carries the same overlap
+across separately read chunks (e.g. a file read piecewise).
+"""
+import re
+
+WINDOW = 1 << 16
+# Up to this many unseen phrases, per-phrase substring search (memchr-fast)
+# beats the combined regex; larger sets use the regex.
+FIND_MAX = 16
+
+
+def _phrases(table):
+    out = set()
+    for alternatives in table.values():
+        for alt in alternatives:
+            out.update((alt,) if isinstance(alt, str) else alt)
+    return out
+
+
+def trie_pattern(phrases):
+    """Regex source matching any of ``phrases``, longest match first."""
+    trie = {}
+    for phrase in phrases:
+        node = trie
+        for ch in phrase:
+            node = node.setdefault(ch, {})
+        node[""] = {}  # end of phrase
+
+    def emit(node):
+        branches = [re.escape(ch) + emit(child)
+                    for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if "" in node:  # a phrase ends here; the longer ones are optional
+            body = ("(?:" + body + ")" if len(branches) == 1 else body) + "?"
+        return body
+
+    return emit(trie)
+
+
+class SignalSet:
+    def __init__(self, table):
+        self.table = {
+            name: [tuple(p.lower() for p in ((alt,) if isinstance(alt, str) else alt))
+                   for alt in alternatives]
+            for name, alternatives in table.items()}
+        self.phrases = frozenset(p.lower() for p in _phrases(table))
+        self.overlap = max(map(len, self.phrases), default=1) - 1
+        # The regex reports the longest phrase at a position; every phrase
+        # contained in it is implied.
+        self._implied = {p: frozenset(q for q in self.phrases if q in p)
+                         for p in self.phrases}
+        # Offsets inside a phrase where a longer phrase could start and run
+        # past its end ("git commit" + "committed" in "git committed").
+        # finditer() resumes after a match, so those are re-tried explicitly.
+        self._overlaps = {
+            p: tuple(k for k in range(1, len(p))
+                     if any(q.startswith(p[k:]) and len(q) > len(p) - k
+                            for q in self.phrases))
+            for p in self.phrases}
+        self._compiled = {}  # frozenset(unseen phrases) -> regex
+
+    def regex(self, unseen):
+        rx = self._compiled.get(unseen)
+        if rx is None:
+            rx = self._compiled[unseen] = re.compile(trie_pattern(unseen))
+        return rx
+
+    def scanner(self, seen=()):
+        """Start a scan, optionally resuming from previously seen phrases."""
+        return Scanner(self, seen)
+
+    def flags(self, seen):
+        """Evaluate the table against the phrases seen: {signal: bool}."""
+        return {name: any(all(p in seen for p in alt) for alt in alternatives)
+                for name, alternatives in self.table.items()}
+
+
+class Scanner:
+    """Accumulates the phrases of one SignalSet seen across many text blocks."""
+
+    def __init__(self, signals, seen=()):
+        self.signals = signals
+        self.seen = set(seen) & signals.phrases
+        self._rx = None
+        self._update()
+
+    def _update(self):
+        flags = self.signals.flags(self.seen)
+        wanted = set()
+        for name, alternatives in self.signals.table.items():
+            if not flags[name]:
+                for alt in alternatives:
+                    wanted.update(alt)
+        self._unseen = unseen = frozenset(wanted.difference(self.seen))
+        self._rx = self.signals.regex(unseen) if unseen else None
+
+    @property
+    def done(self):
+        """Every signal is set; further text cannot change the flags."""
+        return self._rx is None
+
+    def scan(self, text):
+        """Record every phrase occurring in ``text``."""
+        if len(text) <= WINDOW:
+            self._scan(text)
+            return
+        step = WINDOW
+        for start in range(0, len(text), step):
+            if self._rx is None:
+                return
+            self._scan(text[start:start + step + self.signals.overlap])
+
+    def scan_chunks(self, chunks):
+        """Scan consecutive pieces of one text; phrases may span pieces."""
+        overlap = self.signals.overlap
+        tail = ""
+        for chunk in chunks:
+            if self._rx is None:
+                return
+            text = tail + chunk
+            self.scan(text)
+            tail = text[-overlap:] if overlap else ""
+
+    def _scan(self, text):
+        rx = self._rx
+        if rx is None or not text:
+            return
+        text = text.lower()
+        seen = self.seen
+        before = len(seen)
+        if len(self._unseen) <= FIND_MAX:
+            for phrase in tuple(self._unseen):
+                if phrase in self._unseen and phrase in text:
+                    seen.add(phrase)
+                    self._update()  # may settle a signal and drop its other phrases
+            return
+        implied, overlaps = self.signals._implied, self.signals._overlaps
+        for m in rx.finditer(text):
+            phrase = m.group()
+            seen.update(implied[phrase])
+            start = m.start()
+            for k in overlaps[phrase]:
+                extra = rx.match(text, start + k)
+                if extra:
+                    seen.update(implied[extra.group()])
+        if len(seen) != before:
+            self._update()
+
+    def flags(self):
+        return self.signals.flags(self.seen)
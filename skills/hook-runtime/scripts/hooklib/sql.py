@@ -0,0 +1,355 @@
+"""SQL reaching a SQL CLI from a Bash command, classified read vs write.
+
+Only commands that actually INVOKE a SQL CLI count, not ones mentioning one
+in a string: the shared tokenizer (hooklib/shell.py) resolves quoting,
+&& / || / ; / | chains, env prefixes, wrappers (sudo, timeout) and $(...)
+substitutions, so SQL quoted inside e.g. a git commit message is not
+mistaken for a psql call.
+
+The SQL itself is lexed, not pattern-matched: comments (``--``, nested
+``/* */``, mysql ``#``), string literals (``'...'``, ``E'...'``, ``$$...$$``)
+and quoted identifiers are blanked, then each statement is classified by
+its first word (WRITE_STATEMENTS; WITH / EXPLAIN ANALYZE / PREPARE by the
+statement they wrap, COPY only FROM). So ``SELECT 'DELETE' -- UPDATE later``
+and ``SELECT ... FOR UPDATE`` are reads. Sources:
+
+  -c / --command / -e / --execute text and other CLI arguments
+  heredocs, here-strings and whatever is piped in (echo ... | psql)
+  files: -f / --file, ``< file``, ``cat file | psql``, psql ``\\i`` / ``\\ir``
+  shell variables the command may expand ($SQL)
+
+Files are memory-mapped and scanned in CHUNK-sized pieces (no read into
+memory, no decode), and the scan stops at the first write statement: a dump
+stops at its first CREATE / COPY; only read-only SQL is scanned to the end.
+
+    from hooklib import sql
+
+    sql.first_write("psql -f migrate.sql")   # "ALTER", or None for reads / no SQL CLI
+"""
+import mmap
+import os
+import re
+
+from hooklib import shell
+
+SQL_CLI_TOOLS = frozenset(("psql", "mysql", "sqlite3", "pgcli"))
+SCRIPT_RUNNERS = ("python", "python3", "node")
+FILE_READERS = ("cat", "type", "head", "tail", "less")
+FILE_OPTIONS = ("-f", "--file")  # psql / pgcli (mysql -f is --force)
+FILE_OPTION_TOOLS = ("psql", "pgcli")
+MAX_INCLUDE_DEPTH = 8
+
+# Statement kinds that change data, schema or permissions.
+WRITE_STATEMENTS = ("INSERT", "UPDATE", "DELETE", "MERGE", "REPLACE", "ALTER", "DROP",
+                    "TRUNCATE", "CREATE", "GRANT", "REVOKE", "RENAME", "COMMENT", "REFRESH",
+                    "IMPORT", "CALL", "DO", "COPY", "LOAD")
+CHUNK = 4 << 20        # bytes of SQL stripped and classified at a time
+MAX_PENDING = 4096     # bytes of an unfinished statement carried to the next chunk
+
+# python/node scripts that shell out to psql (e.g. subprocess.run(['psql',...]))
+_PSQL_IN_CODE = re.compile(r"""['"]psql['"]""")
+# Code of a python/node script that shells out to psql: its SQL sits inside
+# the script's own string literals, so it is searched for keywords instead.
+_CODE_WRITE = re.compile(r"\b(INSERT|UPDATE|DELETE|ALTER|DROP|TRUNCATE|CREATE)\b", re.I)
+
+# Comments, strings, quoted identifiers and dollar quotes, blanked to " _ "
+# before statements are classified.
+# A block comment holding another /* is left alone: the opener it leaves
+# behind marks the chunk as open or sends it to _strip_nested.
+_PG_LITERALS = re.compile(rb"""
+    --[^\n]*
+  | /\*(?:[^*/]|\*(?!/)|/(?!\*))*\*/
+  | '[^']*'
+  | "[^"]*"
+  | \$(?<![\w$]\$)(\w*)\$.*?\$\1\$
+""", re.X | re.S)
+# Same, with E'...' backslash escapes; only used when a chunk has a \'. The
+# quote of an E-string is never the start of a plain one, so an unterminated
+# E-string stays visible as open.
+_PG_E_LITERALS = re.compile(rb"""
+    --[^\n]*
+  | /\*(?:[^*/]|\*(?!/)|/(?!\*))*\*/
+  | [Ee](?<![\w$][Ee])'[^'\\]*(?:\\.[^'\\]*)*'
+  | '(?<!(?<![\w$])[Ee]')[^']*'
+  | "[^"]*"
+  | \$(?<![\w$]\$)(\w*)\$.*?\$\1\$
+""", re.X | re.S)
+_MYSQL_LITERALS = re.compile(rb"""
+    --[^\n]*
+  | \#[^\n]*
+  | /\*.*?\*/
+  | '[^'\\]*(?:\\.[^'\\]*)*'
+  | "[^"\\]*(?:\\.[^"\\]*)*"
+  | `[^`]*`
+""", re.X | re.S)
+# Without any of these a chunk's only literals are '...' strings, which a
+# split on the quote character separates exactly (ten times faster).
+_FAST_PATH_BLOCKERS = (b"--", b"/*", b'"', b"`", b"\\", b"$", b"#")
+_OPEN_DOLLAR = re.compile(rb"\$(?<![\w$]\$)\w*\$")
+_BLOCK_EDGE = re.compile(rb"/\*|\*/")
+_META = re.compile(rb"^[ \t]*\\([A-Za-z]+)([^\n]*)", re.M)
+
+# First word of every statement, once the code is blanked and lowercased
+_STATEMENT = re.compile(rb";[\s(_]*([a-z]\w*)")
+_WRITE_WORDS = frozenset(k.lower().encode("ascii") for k in WRITE_STATEMENTS)
+# Writes only with what follows: COPY ... FROM, LOAD DATA, and statements
+# that may wrap a data-modifying one (WITH, EXPLAIN ANALYZE, PREPARE)
+_WRAPPERS = frozenset((b"with", b"explain", b"prepare"))
+_CANDIDATES = _WRITE_WORDS | _WRAPPERS
+_COPY_FROM = re.compile(rb"\s*\w[\w.\s]*?(?:\([^)]*\)\s*)?from\b")
+_LOAD_DATA = re.compile(rb"\s+(?:data|xml)\b")
+_ANALYZE = re.compile(rb"\banalyze\b")
+_DML = re.compile(rb"(?<![\w$.])(insert|update|delete|merge)(?![\w$])")
+_PREV_WORD = re.compile(rb"(\w+)\s*$")
+# UPDATE/DELETE that are not statements: SELECT ... FOR [NO KEY] UPDATE,
+# REFERENCES ... ON DELETE
+_NOT_STATEMENT_AFTER = (b"for", b"key", b"on")
+_INCLUDES = ("i", "ir", "include", "include_relative")
+
+
+# -- lexer --
+
+
+def _strip_nested(raw, literals):
+    """``literals.sub()`` for SQL whose ``/* */`` comments nest (PostgreSQL)."""
+    out, pos = [], 0
+    while True:
+        m = literals.search(raw, pos)
+        start, stop = (m.start(), m.end()) if m else (len(raw), len(raw))
+        opener = raw.find(b"/*", pos, start)
+        if opener >= 0:
+            depth, start, stop = 1, opener, opener + 2
+            while depth:
+                edge = _BLOCK_EDGE.search(raw, stop)
+                if edge is None:
+                    out.append(raw[pos:start] + b"/*")  # left open: _strip sees it
+                    return b"".join(out)
+                depth += 1 if edge.group() == b"/*" else -1
+                stop = edge.end()
+        elif m is None:
+            break
+        out.append(raw[pos:start])
+        out.append(b" _ ")
+        pos = stop
+    out.append(raw[pos:])
+    return b"".join(out)
+
+
+def _strip(raw, dialect, final):
+    """Lowercased code of ``raw`` with every literal and comment blanked.
+
+    None when a literal is still open at the end and more input follows;
+    at the end of the input an open literal runs to the end.
+    """
+    if not any(b in raw for b in _FAST_PATH_BLOCKERS):
+        parts = raw.split(b"'")
+        if len(parts) % 2 == 0:
+            if not final:
+                return None
+            parts.pop()
+        return b" _ ".join(parts[::2]).lower()
+    if dialect == "mysql":
+        literals = _MYSQL_LITERALS
+    else:
+        literals = _PG_E_LITERALS if b"\\'" in raw else _PG_LITERALS
+    code = literals.sub(b" _ ", raw)
+    if dialect != "mysql" and b"*/" in code:
+        code = _strip_nested(raw, literals)
+    opened = [i for i in (code.find(b"'"), code.find(b'"'), code.find(b"`"), code.find(b"/*"))
+              if i >= 0]
+    if b"$" in code:
+        m = _OPEN_DOLLAR.search(code)
+        if m:
+            opened.append(m.start())
+    if opened:
+        if not final:
+            return None
+        code = code[:min(opened)]
+    return code.lower()
+
+
+def _chunks(buf, dialect):
+    """Yield (psql meta-commands, code) for chunks of ``buf`` cut at line ends
+    outside literals; a chunk grows until its literals are closed."""
+    pos, end = 0, len(buf)
+    while pos < end:
+        size = CHUNK
+        while True:
+            stop = buf.find(b"\n", pos + size) if pos + size < end else -1
+            stop = end if stop < 0 else stop + 1
+            raw, metas = buf[pos:stop], ()
+            if b"\\" in raw:
+                metas = _META.findall(raw)
+                raw = _META.sub(b"", raw)
+            code = _strip(raw, dialect, stop == end)
+            if code is not None:
+                break
+            size *= 2
+        yield metas, code
+        pos = stop
+
+
+def _statement_kind(word, body):
+    """Write kind of the statement starting with ``word``, else None."""
+    if word == b"copy":
+        return "COPY" if _COPY_FROM.match(body) else None
+    if word == b"load":
+        return "LOAD" if _LOAD_DATA.match(body) else None
+    if word not in _WRAPPERS:
+        return word.decode("ascii").upper()
+    if word == b"explain" and not _ANALYZE.search(body):
+        return None  # plain EXPLAIN plans without running
+    for m in _DML.finditer(body):
+        prev = _PREV_WORD.search(body[max(0, m.start() - 32):m.start()])
+        if not (prev and prev.group(1) in _NOT_STATEMENT_AFTER):
+            return m.group(1).decode("ascii").upper()
+    return None
+
+
+def _scan(buf, dialect="pg"):
+    """Yield ("write", KIND) and ("include", (command, path)) from SQL bytes.
+
+    Each chunk is blanked of literals and comments with C-speed primitives
+    (split or one regex sub), then only the first word of each statement is
+    looked at; chunks without a candidate word cost one findall.
+    """
+    pending = b""
+    for metas, code in _chunks(buf, dialect):
+        for cmd, arg in metas:
+            cmd = cmd.lower().decode("ascii")
+            if cmd == "copy" and _COPY_FROM.match(arg.lower().replace(b'"', b"")):
+                yield "write", "COPY"
+            elif cmd in _INCLUDES and arg.strip():
+                yield "include", (cmd, arg.strip().strip(b"'\"").decode("utf-8", "replace"))
+        code = b";" + pending + code
+        if _CANDIDATES.intersection(_STATEMENT.findall(code)):
+            for m in _STATEMENT.finditer(code):
+                word = m.group(1)
+                if word in _CANDIDATES:
+                    stop = code.find(b";", m.end())
+                    kind = _statement_kind(word, code[m.end():stop if stop >= 0 else len(code)])
+                    if kind:
+                        yield "write", kind
+        cut = code.rfind(b";") + 1
+        pending = code[cut:cut + MAX_PENDING]
+
+
+def _text_write(text, cwd, seen, dialect):
+    return _first(_scan(text.encode("utf-8", "surrogatepass"), dialect), cwd, cwd, 0, seen,
+                  dialect)
+
+
+def _file_write(path, cwd, depth, seen, dialect):
+    """First write statement in a SQL file, scanned through mmap; None if unreadable."""
+    path = os.path.normpath(os.path.join(cwd, os.path.expanduser(path)))
+    if path in seen or depth > MAX_INCLUDE_DEPTH:
+        return None
+    seen.add(path)
+    try:
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return None
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                return _first(_scan(buf, dialect), os.path.dirname(path), cwd, depth, seen,
+                              dialect)
+    except (OSError, ValueError):
+        return None
+
+
+def _first(events, file_dir, cwd, depth, seen, dialect):
+    """First write in ``events``, following \\i includes (\\ir: relative to the file)."""
+    for event, value in events:
+        if event == "write":
+            return value
+        cmd, target = value
+        base = file_dir if cmd in ("ir", "include_relative") else cwd
+        kind = _file_write(os.path.join(base, target), cwd, depth + 1, seen, dialect)
+        if kind:
+            return kind
+    return None
+
+
+# -- what a command feeds to a SQL CLI --
+
+
+def sql_calls(script):
+    """Invocations of a SQL CLI (or of a script that shells out to psql)."""
+    calls = [inv for inv in script.invocations if inv.program in SQL_CLI_TOOLS]
+    if not calls:
+        calls = [inv for inv in script.invocations
+                 if inv.program in SCRIPT_RUNNERS and _PSQL_IN_CODE.search(" ".join(inv.args))]
+    return calls
+
+
+def _split_files(args):
+    """(SQL-ish text args, file paths given with -f/--file)."""
+    texts, files, take = [], [], False
+    for arg in args:
+        if take:
+            files.append(arg)
+            take = False
+        elif arg in FILE_OPTIONS:
+            take = True
+        elif arg.startswith("--file="):
+            files.append(arg[len("--file="):])
+        elif arg.startswith("-f") and len(arg) > 2 and not arg.startswith("--"):
+            files.append(arg[2:])
+        else:
+            texts.append(arg)
+    return texts, files
+
+
+def sql_sources(command):
+    """(texts, files, code, dialect) the command feeds to a SQL CLI; lists all
+    empty when it runs none.
+
+    ``code`` is the source of scripts that shell out to psql. ``dialect`` is
+    "mysql" (backslash escapes, # comments) when mysql is called, else "pg".
+    """
+    script = shell.parse(command)
+    calls = sql_calls(script)
+    texts, files, code = [], [], []
+    for inv in calls:
+        if inv.program not in SQL_CLI_TOOLS:
+            code.extend(inv.args)
+            code.extend(inv.stdin)
+            continue
+        t, f = _split_files(inv.args) if inv.program in FILE_OPTION_TOOLS else (inv.args, [])
+        texts.extend(t)
+        files.extend(f)
+        texts.extend(inv.stdin)
+        files.extend(w.text for w in inv.files_in)
+        for source in script.upstream(inv):
+            if source.program in FILE_READERS:
+                files.extend(a for a in source.args if not a.startswith("-"))
+            else:
+                texts.extend(source.args)
+            texts.extend(source.stdin)
+            files.extend(w.text for w in source.files_in)
+    if calls:
+        texts.extend(script.assignments)
+    dialect = "mysql" if any(inv.program == "mysql" for inv in calls) else "pg"
+    return texts, files, code, dialect
+
+
+def first_write(command, cwd=None, seen=None):
+    """Kind of the first write statement the command sends to a SQL CLI, else None.
+
+    ``seen`` (a set) receives the absolute paths of the SQL files looked at.
+    """
+    texts, files, code, dialect = sql_sources(command)
+    for text in code:
+        m = _CODE_WRITE.search(text)
+        if m:
+            return m.group(1).upper()
+    cwd = cwd or os.getcwd()
+    seen = set() if seen is None else seen
+    for text in texts:
+        kind = _text_write(text, cwd, seen, dialect)
+        if kind:
+            return kind
+    for path in files:
+        kind = _file_write(path, cwd, 0, seen, dialect)
+        if kind:
+            return kind
+    return None
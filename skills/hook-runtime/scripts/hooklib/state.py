@@ -0,0 +1,229 @@
+"""Expiring key/value state shared by hooks, keyed by session and repo.
+
+Replaces the one-file-per-marker scheme (claude-tdd-markers/, claude-stop-hook/,
+claude-knowledge-arch-warned-*) that grew without bound in the temp dir and
+let parallel agents in the same repo overwrite each other's markers.
+
+One SQLite file (WAL, busy timeout) holds every hook's state:
+
+  state(session, repo, key, value, expires)            -- one value per key
+  members(session, repo, key, member, expires)         -- a set per key
+  events(seq, session, repo, kind, value, ts, expires) -- append-only log
+
+``session`` is the hook payload's session_id, ``repo`` the normalized cwd
+(``repo_key()``); use ``repo=""`` for session-wide state. Every row carries
+an expiry; expired rows are invisible to reads and deleted at most once per
+EVICT_INTERVAL by whichever hook opens the store next.
+
+    from hooklib import state
+
+    store = state.open_store()
+    store.put(session, state.repo_key(), "tests-run", command)
+    if store.get(session, state.repo_key(), "tests-run") is None: ...
+    if not store.put_once(session, "", "stop-verify-pipeline:fired", True): ...
+    store.append(session, state.repo_key(), "commit", command)  # see hooklib.ledger
+
+Location: %TEMP%/claude-hook-state.sqlite
+"""
+import glob
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+
+STATE_PATH = os.path.join(tempfile.gettempdir(), "claude-hook-state.sqlite")
+DEFAULT_TTL = 3 * 86400
+EVICT_INTERVAL = 600
+
+# Marker files from before the store; swept once so they stop piling up.
+LEGACY_MARKERS = ("claude-tdd-markers", "claude-stop-hook", "claude-knowledge-arch-warned-*")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS state (
+    session TEXT, repo TEXT, key TEXT, value TEXT, expires REAL,
+    PRIMARY KEY (session, repo, key));
+CREATE TABLE IF NOT EXISTS members (
+    session TEXT, repo TEXT, key TEXT, member TEXT, expires REAL,
+    PRIMARY KEY (session, repo, key, member));
+CREATE TABLE IF NOT EXISTS events (
+    seq INTEGER PRIMARY KEY, session TEXT, repo TEXT, kind TEXT, value TEXT,
+    ts REAL, expires REAL);
+CREATE INDEX IF NOT EXISTS state_expires ON state (expires);
+CREATE INDEX IF NOT EXISTS members_expires ON members (expires);
+CREATE INDEX IF NOT EXISTS events_session ON events (session, seq);
+CREATE INDEX IF NOT EXISTS events_expires ON events (expires);
+"""
+
+_stores = {}  # path -> StateStore (one connection per process)
+
+
+def repo_key(cwd=None):
+    """Normalized repo key for a working directory (default: os.getcwd())."""
+    return (cwd or os.getcwd()).replace("\\", "/").rstrip("/").lower()
+
+
+def session_key(data):
+    """Session key from a hook payload: session_id, else transcript path."""
+    data = data or {}
+    return data.get("session_id") or data.get("transcript_path") or ""
+
+
+def open_store(path=STATE_PATH):
+    store = _stores.get(path)
+    if store is None:
+        store = _stores[path] = StateStore(path)
+    return store
+
+
+class StateStore:
+    def __init__(self, path=STATE_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.db = sqlite3.connect(path, timeout=10, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(_SCHEMA)
+        self._maybe_evict()
+
+    def close(self):
+        _stores.pop(self.path, None)
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # -- single values --
+
+    def get(self, session, repo, key, default=None):
+        row = self.db.execute(
+            "SELECT value FROM state WHERE session = ? AND repo = ? AND key = ? AND expires > ?",
+            (session, repo, key, time.time())).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def put(self, session, repo, key, value, ttl=DEFAULT_TTL):
+        self.db.execute("INSERT OR REPLACE INTO state VALUES (?, ?, ?, ?, ?)",
+                        (session, repo, key, json.dumps(value), time.time() + ttl))
+
+    def put_once(self, session, repo, key, value, ttl=DEFAULT_TTL):
+        """Set ``key`` only if unset (or expired); True if this call set it."""
+        now = time.time()
+        with self._transaction():
+            self.db.execute("DELETE FROM state WHERE session = ? AND repo = ? AND key = ?"
+                            " AND expires <= ?", (session, repo, key, now))
+            cur = self.db.execute("INSERT OR IGNORE INTO state VALUES (?, ?, ?, ?, ?)",
+                                  (session, repo, key, json.dumps(value), now + ttl))
+        return cur.rowcount == 1
+
+    def pop(self, session, repo, key, default=None):
+        """Atomically read and delete ``key``."""
+        with self._transaction():
+            value = self.get(session, repo, key, default)
+            self.delete(session, repo, key)
+        return value
+
+    def delete(self, session, repo, key):
+        self.db.execute("DELETE FROM state WHERE session = ? AND repo = ? AND key = ?",
+                        (session, repo, key))
+
+    # -- sets --
+
+    def add(self, session, repo, key, member, ttl=DEFAULT_TTL):
+        """Add ``member`` to the set ``key`` (refreshing its expiry)."""
+        self.db.execute("INSERT OR REPLACE INTO members VALUES (?, ?, ?, ?, ?)",
+                        (session, repo, key, member, time.time() + ttl))
+
+    def members(self, session, repo, key):
+        return [r[0] for r in self.db.execute(
+            "SELECT member FROM members WHERE session = ? AND repo = ? AND key = ?"
+            " AND expires > ? ORDER BY rowid", (session, repo, key, time.time()))]
+
+    def has_members(self, session, repo, key):
+        return self.db.execute(
+            "SELECT 1 FROM members WHERE session = ? AND repo = ? AND key = ?"
+            " AND expires > ? LIMIT 1", (session, repo, key, time.time())).fetchone() is not None
+
+    def clear(self, session, repo, key):
+        self.db.execute("DELETE FROM members WHERE session = ? AND repo = ? AND key = ?",
+                        (session, repo, key))
+
+    # -- event log --
+
+    def append(self, session, repo, kind, value="", ttl=DEFAULT_TTL):
+        """Append one event to the session's log; returns its seq."""
+        return self.append_many(session, repo, [(kind, value)], ttl)
+
+    def append_many(self, session, repo, events, ttl=DEFAULT_TTL):
+        """Append ``[(kind, value)]`` in one transaction; returns the last seq."""
+        now = time.time()
+        with self._transaction():
+            cur = None
+            for kind, value in events:
+                cur = self.db.execute(
+                    "INSERT INTO events (session, repo, kind, value, ts, expires)"
+                    " VALUES (?, ?, ?, ?, ?, ?)", (session, repo, kind, value, now, now + ttl))
+        return cur.lastrowid if cur else None
+
+    def events(self, session, since=0, repo=None):
+        """(seq, repo, kind, value) of the session's events after ``since``, in order."""
+        sql = ("SELECT seq, repo, kind, value FROM events WHERE session = ? AND seq > ?"
+               " AND expires > ?")
+        params = [session, since, time.time()]
+        if repo is not None:
+            sql += " AND repo = ?"
+            params.append(repo)
+        return self.db.execute(sql + " ORDER BY seq", params)
+
+    # -- maintenance --
+
+    def _transaction(self):
+        return _Transaction(self.db)
+
+    def evict(self):
+        """Delete every expired row; returns the number removed."""
+        now = time.time()
+        with self._transaction():
+            removed = self.db.execute("DELETE FROM state WHERE expires <= ?", (now,)).rowcount
+            removed += self.db.execute("DELETE FROM members WHERE expires <= ?", (now,)).rowcount
+            removed += self.db.execute("DELETE FROM events WHERE expires <= ?", (now,)).rowcount
+            self.db.execute("INSERT OR REPLACE INTO meta VALUES ('evicted', ?)", (str(now),))
+        return removed
+
+    def _maybe_evict(self):
+        row = self.db.execute("SELECT value FROM meta WHERE key = 'evicted'").fetchone()
+        if row and time.time() - float(row[0]) < EVICT_INTERVAL:
+            return
+        try:
+            self.evict()
+        except sqlite3.OperationalError:  # another process holds the write lock
+            return
+        if row is None:
+            _sweep_legacy(os.path.dirname(self.path))
+
+
+class _Transaction:
+    def __init__(self, db):
+        self.db = db
+
+    def __enter__(self):
+        self.db.execute("BEGIN IMMEDIATE")
+
+    def __exit__(self, exc_type, *exc):
+        self.db.execute("ROLLBACK" if exc_type else "COMMIT")
+
+
+def _sweep_legacy(tmp_dir):
+    for pattern in LEGACY_MARKERS:
+        for path in glob.glob(os.path.join(tmp_dir, pattern)):
+            if os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+            else:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
@@ -0,0 +1,141 @@
+"""Per-hook timing and decision telemetry.
+
+The dispatcher appends one compact JSON line per hook run to a local,
+size-rotated log:
+
+  {"ts": 1760790000.12, "session": "...", "event": "PreToolUse",
+   "hook": "preToolUse-rules", "matcher": "",
+   "tool": "Bash", "input_bytes": 412, "parse_ms": 0.05, "total_ms": 1.9,
+   "exit_code": 2, "reason": "BLOCKED: Direct SQL write operation ..."}
+
+A hook that raised instead of exiting has exit_code 1, the exception as
+``error`` (and ``reason``) and the end of its traceback as ``traceback``.
+
+``parse_ms`` is the dispatcher's one JSON parse of the event (shared by every
+hook of that event); ``total_ms`` is the hook's own in-process run time.
+Verdicts replayed from the cache (hooklib.verdicts) carry ``"cached": true``
+and the lookup time as ``total_ms``.
+Logging never affects a hook's result: any OSError is swallowed.
+
+Location: %TEMP%/claude-hook-telemetry/hooks.jsonl (+ .1 .. .3 rotations).
+Set CLAUDE_HOOK_TELEMETRY=0 to disable, or to a file path to relocate.
+Aggregate with scripts/hook-telemetry.py.
+"""
+import json
+import os
+import tempfile
+import time
+
+LOG_DIR = os.path.join(tempfile.gettempdir(), "claude-hook-telemetry")
+MAX_BYTES = 2 * 1024 * 1024
+BACKUPS = 3
+REASON_CHARS = 160
+TRACEBACK_CHARS = 4000
+
+
+def log_path():
+    """Active log file, or None when telemetry is disabled."""
+    setting = os.environ.get("CLAUDE_HOOK_TELEMETRY", "")
+    if setting.lower() in ("0", "off", "false", "no"):
+        return None
+    if setting and setting.lower() not in ("1", "on", "true", "yes"):
+        return os.path.expanduser(setting)
+    return os.path.join(LOG_DIR, "hooks.jsonl")
+
+
+def log_files(path=None):
+    """Existing log files, oldest first."""
+    path = path or log_path() or os.path.join(LOG_DIR, "hooks.jsonl")
+    files = [f"{path}.{n}" for n in range(BACKUPS, 0, -1)] + [path]
+    return [f for f in files if os.path.exists(f)]
+
+
+def hook_name(script):
+    """Short hook name from a script path (file name without .py)."""
+    return os.path.splitext(os.path.basename(script))[0]
+
+
+def block_reason(stderr):
+    """First line of a hook's message, skipping the boxed header."""
+    for line in stderr.splitlines():
+        line = line.strip()
+        if line.startswith("|"):
+            line = line[1:].strip()
+        if not line or line.startswith("+=") or line.endswith("HOOK OUTPUT"):
+            continue
+        return line[:REASON_CHARS]
+    return ""
+
+
+def record(payload, event, raw_len, parse_ms, result, matcher):
+    """Build the telemetry record for one HookResult."""
+    payload = payload or {}
+    rec = {
+        "ts": None,  # stamped by write(), identical for one event's hooks
+        "session": payload.get("session_id", ""),
+        "event": event,
+        "hook": hook_name(result.script),
+        "matcher": matcher,
+        "tool": payload.get("tool_name", ""),
+        "input_bytes": raw_len,
+        "parse_ms": round(parse_ms, 3),
+        "total_ms": round(result.ms, 3),
+        "exit_code": result.exit_code,
+    }
+    if result.cached:
+        rec["cached"] = True
+    if result.error:
+        rec["error"] = rec["reason"] = result.error[:REASON_CHARS]
+        rec["traceback"] = result.stderr[-TRACEBACK_CHARS:]
+    elif result.exit_code != 0:
+        rec["reason"] = block_reason(result.stderr)
+    return rec
+
+
+def _rotate(path):
+    for n in range(BACKUPS - 1, 0, -1):
+        if os.path.exists(f"{path}.{n}"):
+            os.replace(f"{path}.{n}", f"{path}.{n + 1}")
+    os.replace(path, f"{path}.1")
+
+
+def write(records, path=None):
+    """Append records as JSON lines (one write call), rotating past MAX_BYTES."""
+    path = path or log_path()
+    if not path or not records:
+        return
+    now = round(time.time(), 3)
+    for r in records:
+        r["ts"] = now
+    data = "".join(json.dumps(r, separators=(",", ":")) + "\n" for r in records)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        try:
+            if os.path.getsize(path) >= MAX_BYTES:
+                _rotate(path)
+        except OSError:  # no log yet, or another process rotated first
+            pass
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+        try:
+            os.write(fd, data.encode("utf-8"))
+        finally:
+            os.close(fd)
+    except OSError:
+        pass
+
+
+def read(paths=None):
+    """Yield records from the log files, oldest first; bad lines skipped."""
+    for path in paths or log_files():
+        try:
+            f = open(path, "r", encoding="utf-8")
+        except OSError:
+            continue
+        with f:
+            for line in f:
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(rec, dict):
+                    yield rec
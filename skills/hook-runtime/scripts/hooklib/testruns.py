@@ -0,0 +1,197 @@
+"""Test runs keyed by the git tree they ran against (the push gate's evidence).
+
+The push gate used to accept any test command run earlier in the session:
+edits made after the run went out untested, and a new session had to re-run
+a suite (10-20 minutes of Playwright) on a tree that had already passed.
+Now postToolUse-mark-tests-run.py records each test run under the hash of
+the working tree it ran on, and the gate allows a push exactly when every
+tree being pushed has a passing run:
+
+  worktree_tree   -- ``git write-tree`` of the working tree as it is: HEAD
+                     plus changes to tracked files, staged into a scratch
+                     copy of the index (the real index is untouched).
+                     Untracked files are left out -- a stray log or scratch
+                     script is never pushed, so it must not make the tested
+                     tree differ from ``HEAD^{tree}``
+  pushed_trees    -- the trees a ``git push`` publishes: ``<src>^{tree}`` of
+                     each refspec, HEAD's without one, every branch for --all
+
+Runs are stored in the hook state store (hooklib.state) per repository --
+the git common dir, so linked worktrees share them -- and across sessions,
+for TTL:
+
+    from hooklib import testruns
+
+    tree = testruns.worktree_tree(cwd)
+    testruns.record(cwd, tree, command, status, session, scope)
+    testruns.passing(cwd, tree)     # {"command", "status", "scope", "session", "ts"} or None
+
+A run counts as passing with status 0. PostToolUse only fires for commands
+that exited 0, so the hooks record the status they can vouch for: 0, or None
+when the test's own exit status was hidden (piped into another program
+without ``pipefail``) or the command was sent to the background.
+"""
+import os
+import shutil
+import tempfile
+import time
+
+from hooklib import shell
+from hooklib.ledger import TEST_PATTERNS
+from hooklib.state import open_store, repo_key
+
+TTL = 14 * 86400
+GIT_TIMEOUT = 30
+KEY = "test-run:"
+# git push options that take a separate value
+PUSH_VALUE_OPTIONS = ("-o", "--push-option", "--repo", "--receive-pack", "--exec")
+PUSH_ALL = ("--all", "--mirror", "--branches")
+
+
+def git(cwd, *args, env=None):
+    """stdout of a git command (stripped), or None if it failed."""
+    import subprocess  # ~8 ms; most hook runs that import this module never call git
+    try:
+        proc = subprocess.run(["git", *args], cwd=cwd, env=env, capture_output=True,
+                              text=True, timeout=GIT_TIMEOUT)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return proc.stdout.strip() if proc.returncode == 0 else None
+
+
+def repository(cwd):
+    """Store key of the repository ``cwd`` is in (its git common dir), or None."""
+    common = git(cwd, "rev-parse", "--git-common-dir")
+    return repo_key(os.path.normpath(os.path.join(cwd, common))) if common else None
+
+
+def worktree_tree(cwd):
+    """Tree hash of the working tree as it is now, or None outside a repo.
+
+    Untracked files do not count (``git add -u``). Writes blobs for changed
+    files into the object store (as ``git add`` would); they are
+    garbage-collected like any unreferenced object.
+    """
+    index = git(cwd, "rev-parse", "--git-path", "index")
+    if index is None:
+        return None
+    index = os.path.join(cwd, index)
+    with tempfile.TemporaryDirectory(prefix="claude-tree-") as tmp:
+        scratch = os.path.join(tmp, "index")
+        if os.path.exists(index):
+            # Keeps its stat cache (unchanged files not rehashed) and its mtime:
+            # git's racy-clean check rehashes entries not older than the index,
+            # which a fresh mtime would hide (same-size edit, same second)
+            shutil.copy2(index, scratch)
+        env = dict(os.environ, GIT_INDEX_FILE=scratch)
+        if git(cwd, "add", "--update", "--", ":/", env=env) is None:
+            return None
+        return git(cwd, "write-tree", env=env)
+
+
+def _push_target(inv, cwd):
+    """(directory, [refspec sources], all branches?) of one ``git push`` invocation."""
+    args, skip, directory = inv.args, False, cwd
+    for i, arg in enumerate(args):
+        if arg == "push":
+            args = args[i + 1:]
+            break
+        if arg == "-C" and i + 1 < len(args):
+            directory = os.path.join(directory, args[i + 1])
+    positional, everything = [], False
+    for arg in args:
+        if skip:
+            skip = False
+        elif arg in PUSH_VALUE_OPTIONS:
+            skip = True
+        elif arg in PUSH_ALL:
+            everything = True
+        elif arg in ("-d", "--delete"):
+            return directory, [], False  # deletes refs, publishes no tree
+        elif not arg.startswith("-"):
+            positional.append(arg)
+    sources = []
+    for spec in positional[1:]:  # first positional is the remote
+        src = spec.lstrip("+").split(":", 1)[0]
+        if src:  # ":dst" deletes dst
+            sources.append(src)
+    if not positional[1:]:
+        sources = ["HEAD"]
+    return directory, sources, everything
+
+
+def pushed_trees(cwd, invocations):
+    """{tree hash: what it is} for every tree these pushes publish, or None
+    when one cannot be resolved (not a repo, unknown ref)."""
+    trees = {}
+    for inv in invocations:
+        directory, sources, everything = _push_target(inv, cwd)
+        if everything:
+            heads = git(directory, "for-each-ref", "--format=%(refname:short)", "refs/heads")
+            if heads is None:
+                return None
+            sources = heads.split()
+        for src in sources:
+            tree = git(directory, "rev-parse", "--verify", "--quiet", f"{src}^{{tree}}")
+            if tree is None:
+                return None
+            trees.setdefault(tree, src)
+    return trees
+
+
+def vouched_status(command, tool_input=None):
+    """Exit status a successful Bash PostToolUse vouches for: 0, or None when
+    the test's status did not decide the command's (piped without pipefail,
+    run in the background)."""
+    if (tool_input or {}).get("run_in_background"):
+        return None
+    if "pipefail" in command:
+        return 0
+    script = shell.parse(command)
+    for inv in script.invocations:
+        if not any(p in " ".join(inv.argv).lower() for p in TEST_PATTERNS):
+            continue
+        if any(inv in script.upstream(other) for other in script.invocations
+               if other is not inv):
+            return None
+    return 0
+
+
+def record(cwd, tree, command, status, session="", scope="full", store=None):
+    """Store a test run for ``tree``. ``scope`` is "full" or the test files the
+    run was narrowed to (hooklib.impact.run_scope); passing runs of one tree
+    add up their scopes, and a passing run is not replaced by a failing one."""
+    repo = repository(cwd)
+    if repo is None or tree is None:
+        return False
+    store = store or open_store()
+    previous = passing(cwd, tree, store, repo)
+    if previous is not None:
+        if status != 0:
+            return False
+        if scope != "full":
+            earlier = previous.get("scope", "full")
+            scope = "full" if earlier == "full" else sorted(set(earlier) | set(scope))
+    store.put("", repo, KEY + tree, {"command": command, "status": status, "scope": scope,
+                                     "session": session, "ts": time.time()}, ttl=TTL)
+    return True
+
+
+def _run(store, repo, tree):
+    run = store.get("", repo, KEY + tree)
+    return run if isinstance(run, dict) else None
+
+
+def passing(cwd, tree, store=None, repo=None):
+    """The recorded passing run for ``tree``, or None."""
+    repo = repo or repository(cwd)
+    if repo is None or tree is None:
+        return None
+    run = _run(store or open_store(), repo, tree)
+    return run if run and run.get("status") == 0 else None
+
+
+def last_run(cwd, tree, store=None):
+    """The recorded run for ``tree`` whatever its status, or None."""
+    repo = repository(cwd)
+    return _run(store or open_store(), repo, tree) if repo and tree else None
@@ -0,0 +1,423 @@
+"""Incremental reading of session transcript JSONL files.
+
+Transcripts are append-only while a session runs, so a Stop hook only needs
+the lines written since its last run. ``IncrementalReader`` resumes from a
+saved cursor (byte offset plus fingerprints of the already-read bytes) and
+falls back to a full rescan when the file was truncated or rewritten
+(e.g. /compact, manual edits, a new file at the same path).
+
+Most of a transcript's bytes are tool output (file contents, command
+output) that Stop hooks never look at. ``entries()`` can be told which
+entry types, content block types and top-level keys a caller wants:
+
+* the top-level ``type`` is peeked from the raw line first, so unwanted
+  entries are never decoded;
+* lines longer than ``max_line`` are decoded by a streaming parser that
+  reads the line in chunks, skips unwanted keys and blocks without
+  allocating them, and cuts every other string to ``max_string`` chars;
+  a multi-megabyte tool result costs one regex scan, not a copy.
+
+Peak memory is bounded by ``max_line`` + ``CHUNK`` whatever the transcript
+holds.
+"""
+import hashlib
+import json
+import os
+import re
+
+HEAD_BYTES = 4096  # fingerprint of the start of the file
+TAIL_BYTES = 256   # fingerprint of the bytes just before the cursor
+CHUNK = 1 << 16
+MAX_LINE = 1 << 16    # longer lines are decoded in streaming mode
+MAX_STRING = 1 << 14  # chars kept per string in streaming mode
+
+
+def _digest(f, start, length):
+    f.seek(start)
+    return hashlib.sha1(f.read(length)).hexdigest()
+
+
+class IncrementalReader:
+    """Yield transcript entries appended after a saved cursor.
+
+    Usage:
+        reader = IncrementalReader(path, saved_cursor)
+        if reader.reset:
+            ...discard state derived from earlier reads...
+        for entry in reader.entries():
+            ...
+        saved_cursor = reader.cursor()
+    """
+
+    def __init__(self, path, cursor=None):
+        self.path = path
+        self.offset = 0
+        self.count = 0       # complete lines consumed by this reader
+        self.line_start = 0  # byte offset of the line just consumed
+        self.reset = True
+        self._head = None
+        self._head_len = 0
+        if cursor:
+            self._resume(cursor)
+
+    def _resume(self, cursor):
+        offset = cursor.get("offset", 0)
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            return
+        if offset <= 0 or size < offset:
+            return  # truncated
+        with open(self.path, "rb") as f:
+            head = _digest(f, 0, min(HEAD_BYTES, offset))
+            tail_start = max(0, offset - TAIL_BYTES)
+            tail = _digest(f, tail_start, offset - tail_start)
+        if head != cursor.get("head") or tail != cursor.get("tail"):
+            return  # rewritten
+        self.offset = offset
+        self._head, self._head_len = head, min(HEAD_BYTES, offset)
+        self.reset = False
+
+    def lines(self):
+        """Yield raw bytes of each complete line after the cursor.
+
+        A trailing line without a newline is still being written; it is
+        left for the next run and the cursor stays before it.
+        """
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                self.offset += len(line)
+                self.count += 1
+                yield line
+
+    def entries(self, types=None, blocks=None, skip_keys=(),
+                max_line=MAX_LINE, max_string=MAX_STRING):
+        """Yield each complete, valid JSON entry after the cursor.
+
+        ``types``: entry types to decode ("user", "assistant", ...); others
+        are skipped after a peek at the raw line. ``blocks``: message content
+        block types to keep ("text", "tool_use", ...). ``skip_keys``:
+        top-level keys to drop ("toolUseResult"). None keeps everything.
+        ``self.count`` is the line number of the entry just yielded, and
+        ``self.line_start`` / ``self.offset`` the byte range of its line.
+        """
+        want = _Filter(types, blocks, skip_keys, max_string)
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            buf, pos = b"", 0
+            while True:
+                nl = buf.find(b"\n", pos)
+                if nl >= 0:
+                    line, pos = buf[pos:nl + 1], nl + 1
+                    self.line_start = self.offset
+                    self.offset += len(line)
+                    self.count += 1
+                    entry = want.line(line)
+                elif len(buf) - pos >= max_line:
+                    stream = _LineStream(f, buf[pos:])
+                    entry = want.stream(stream)
+                    if not stream.eol:
+                        return  # partial last line: left for the next run
+                    self.line_start = self.offset
+                    self.offset += stream.length
+                    self.count += 1
+                    buf, pos = stream.rest, 0
+                else:
+                    chunk = f.read(CHUNK)
+                    if not chunk:
+                        return
+                    buf, pos = buf[pos:] + chunk, 0
+                    continue
+                if entry is not None:
+                    yield entry
+
+    def cursor(self):
+        """Serializable cursor for the current position."""
+        if self.offset == 0:
+            return {"offset": 0}
+        with open(self.path, "rb") as f:
+            head_len = min(HEAD_BYTES, self.offset)
+            if self._head_len != head_len:
+                self._head, self._head_len = _digest(f, 0, head_len), head_len
+            tail_start = max(0, self.offset - TAIL_BYTES)
+            tail = _digest(f, tail_start, self.offset - tail_start)
+        return {"offset": self.offset, "head": self._head, "tail": tail}
+
+
+# -- selective decoding --
+
+_TYPE = re.compile(rb'"type"\s*:\s*"([^"\\]*)"')
+_LITERAL = re.compile(rb'[-+0-9.eE]+|true|false|null')
+_WS = b" \t\r\n"
+
+
+def peek_type(line):
+    """Top-level "type" of a raw JSONL line, or None when not certain.
+
+    Certain means the first "type" key comes before any nested object or
+    array; a JSON string cannot contain an unescaped quote, so the match is
+    a key, and with no nesting before it, a top-level one.
+    """
+    m = _TYPE.search(line)
+    if m is None:
+        return None
+    head = line[1:m.start()]
+    if b"{" in head or b"[" in head:
+        return None
+    return m.group(1).decode("utf-8", "replace")
+
+
+class _Filter:
+    def __init__(self, types, blocks, skip_keys, max_string):
+        self.types = None if types is None else frozenset(types)
+        self.blocks = None if blocks is None else frozenset(blocks)
+        self.skip_keys = frozenset(skip_keys)
+        self.max_string = max_string
+
+    def line(self, line):
+        if self.types is not None:
+            etype = peek_type(line)
+            if etype is not None and etype not in self.types:
+                return None
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            return None
+        if not isinstance(entry, dict):
+            return None
+        return self._finish(entry)
+
+    def _finish(self, entry):
+        if self.types is not None and entry.get("type") not in self.types:
+            return None
+        for key in self.skip_keys:
+            entry.pop(key, None)
+        message = entry.get("message")
+        if self.blocks is not None and isinstance(message, dict):
+            content = message.get("content")
+            if isinstance(content, list):
+                message["content"] = [b for b in content if not isinstance(b, dict)
+                                      or b.get("type") in self.blocks]
+        return entry
+
+    def stream(self, stream):
+        if self.types is not None:
+            etype = peek_type(stream.buf)
+            if etype is not None and etype not in self.types:
+                stream.drain()
+                return None
+        try:
+            entry = _StreamDecoder(stream, self).entry()
+        except ValueError:
+            entry = None
+        stream.drain()
+        return None if entry is None else self._finish(entry)
+
+
+class _LineStream:
+    """The bytes of one line, pulled from the file a chunk at a time.
+
+    Only the unconsumed part of the current chunk is held in memory.
+    ``length`` is the line's size once ``eol`` is set; ``rest`` is what was
+    read past the newline.
+    """
+
+    def __init__(self, f, start):
+        self.f = f
+        self.buf, self.pos = b"", 0
+        self.length = 0
+        self.eol = False
+        self.rest = b""
+        self._take(start)
+
+    def _take(self, data):
+        nl = data.find(b"\n")
+        if nl >= 0:
+            self.rest = data[nl + 1:]
+            data = data[:nl + 1]
+            self.eol = True
+        self.length += len(data)
+        self.buf = self.buf[self.pos:] + data
+        self.pos = 0
+
+    def fill(self):
+        """Read more of the line; False at the end of the line or file."""
+        if self.eol:
+            return False
+        chunk = self.f.read(CHUNK)
+        if not chunk:
+            return False
+        self._take(chunk)
+        return True
+
+    def drain(self):
+        """Skip to the end of the line without keeping it."""
+        self.buf, self.pos = b"", 0
+        while self.fill():
+            self.buf, self.pos = b"", 0
+
+
+def _backslashes_before(buf, end, start):
+    i = end
+    while i > start and buf[i - 1] == 0x5C:
+        i -= 1
+    return end - i
+
+
+def _string_end(buf, start):
+    """(index, closed): the closing quote of a string body starting at
+    ``start``, or how far the body safely extends when the buffer ends first
+    (an odd trailing backslash escapes the next chunk's first byte)."""
+    scan = start
+    while True:
+        quote = buf.find(b'"', scan)
+        if quote < 0:
+            end = len(buf)
+            return end - _backslashes_before(buf, end, start) % 2, False
+        if _backslashes_before(buf, quote, start) % 2 == 0:
+            return quote, True
+        scan = quote + 1
+
+
+_SKIP = object()
+
+
+class _StreamDecoder:
+    """Recursive-descent JSON decoder over a _LineStream.
+
+    Knows just enough of the transcript layout to filter while decoding:
+    the top-level object (type, skip_keys), message.content (block types).
+    """
+
+    def __init__(self, stream, want):
+        self.s = stream
+        self.want = want
+
+    def _peek(self):
+        s = self.s
+        while True:
+            while s.pos < len(s.buf) and s.buf[s.pos] in _WS:
+                s.pos += 1
+            if s.pos < len(s.buf):
+                return s.buf[s.pos:s.pos + 1]
+            if not s.fill():
+                raise ValueError("unexpected end of line")
+
+    def _expect(self, char):
+        if self._peek() != char:
+            raise ValueError(f"expected {char!r}")
+        self.s.pos += 1
+
+    def entry(self):
+        if self._peek() != b"{":
+            return None
+        return self._object("top", skip=False)
+
+    def _value(self, ctx, skip):
+        char = self._peek()
+        if char == b"{":
+            return self._object(ctx, skip)
+        if char == b"[":
+            return self._array(ctx, skip)
+        if char == b'"':
+            return self._string(None if skip else self.want.max_string)
+        return self._literal()
+
+    def _object(self, ctx, skip):
+        self.s.pos += 1
+        out = {}
+        if self._peek() == b"}":
+            self.s.pos += 1
+            return out
+        while True:
+            if self._peek() != b'"':
+                raise ValueError("expected a key")
+            key = self._string(256)
+            self._expect(b":")
+            if skip or (ctx == "top" and key in self.want.skip_keys):
+                self._value(None, skip=True)
+            else:
+                child = _CHILD.get((ctx, key))
+                value = self._value(child, skip=False)
+                if key == "type" and not self._wanted(ctx, value):
+                    if ctx == "top":
+                        return None  # caller drains the line
+                    skip = True      # unwanted block: skip its other members
+                out[key] = value
+            char = self._peek()
+            self.s.pos += 1
+            if char == b"}":
+                return _SKIP if skip and ctx == "block" else (None if skip else out)
+            if char != b",":
+                raise ValueError("expected ',' or '}'")
+
+    def _wanted(self, ctx, value):
+        if ctx == "top":
+            return self.want.types is None or value in self.want.types
+        if ctx == "block":
+            return self.want.blocks is None or value in self.want.blocks
+        return True
+
+    def _array(self, ctx, skip):
+        self.s.pos += 1
+        out = []
+        item_ctx = "block" if ctx == "content" else None
+        if self._peek() == b"]":
+            self.s.pos += 1
+            return out
+        while True:
+            value = self._value(item_ctx, skip)
+            if not skip and value is not _SKIP:
+                out.append(value)
+            char = self._peek()
+            self.s.pos += 1
+            if char == b"]":
+                return None if skip else out
+            if char != b",":
+                raise ValueError("expected ',' or ']'")
+
+    def _string(self, limit):
+        """Decode a string, keeping at most ``limit`` bytes (None: keep nothing)."""
+        s = self.s
+        s.pos += 1  # opening quote
+        parts, kept = [], 0
+        while True:
+            end, closed = _string_end(s.buf, s.pos)
+            if limit is not None and kept < limit:
+                piece = s.buf[s.pos:min(end, s.pos + limit - kept)]
+                parts.append(piece)
+                kept += len(piece)
+            s.pos = end
+            if closed:
+                s.pos += 1
+                break
+            if not s.fill():
+                raise ValueError("unterminated string")
+        if limit is None:
+            return None
+        body = b"".join(parts)
+        for cut in range(12):  # a cut string may end inside an escape or a UTF-8 char
+            try:
+                text = json.loads(b'"' + body[:len(body) - cut] + b'"')
+            except ValueError:
+                continue
+            if text and "\ud800" <= text[-1] <= "\udbff":  # half of a \u surrogate pair
+                text = text[:-1]
+            return text
+        return ""
+
+    def _literal(self):
+        s = self.s
+        if len(s.buf) - s.pos < 64:
+            s.fill()
+        m = _LITERAL.match(s.buf, s.pos)
+        if m is None:
+            raise ValueError("unexpected character")
+        s.pos = m.end()
+        return json.loads(m.group())
+
+
+_CHILD = {("top", "message"): "message", ("message", "content"): "content"}
@@ -0,0 +1,270 @@
+"""Persistent PreToolUse verdict cache shared by hook processes.
+
+Agents repeat the same Bash commands all session (``git status``, ``npm
+test``, ``git diff``) and every PreToolUse hook re-evaluated each one from
+scratch. The dispatcher now looks a hook's verdict (exit code, stdout,
+stderr) up before running it, keyed by
+
+  hook version      -- content hash of the script, of the table files named
+                       in its hooks.json entry (rules.json) and of hooklib's
+                       sources
+  normalized input  -- tool_name, tool_input as canonical JSON (without
+                       IGNORED_INPUT fields), the payload's cwd and the
+                       process cwd
+
+Only hooks whose hooks.json entry has a ``cache`` key take part:
+
+  {"matcher": "", "script": "~/.claude/skills/hook-runtime/scripts/preToolUse-rules.py",
+   "cache": ["~/.claude/skills/hook-runtime/rules.json"]}      # true: no tables
+
+A verdict that depends on more than the input must say so while the hook
+runs; it is then stored with dependency stamps, or not at all:
+
+    from hooklib import verdicts
+
+    verdicts.depends_on(path)   # read this file: stale once its mtime/size changes
+    verdicts.uncacheable()      # read session state (markers, block_once): never stored
+
+Only exit codes 0 and 2 are stored, only for events up to MAX_INPUT bytes
+(big Write payloads do not repeat), and never while a dependency's mtime is
+younger than the run (it may have changed under the hook). Rows are evicted
+least recently used once the file holds more than MAX_ROWS verdicts or
+MAX_BYTES of them. Any cache error counts as a miss: the hook just runs.
+
+Location: %TEMP%/claude-hook-verdicts.sqlite (delete it to start over).
+Set CLAUDE_HOOK_VERDICTS=0 to disable.
+"""
+import json
+import os
+import sqlite3
+import tempfile
+import time
+
+try:
+    from _blake2 import blake2b  # hashlib's import loads OpenSSL, ~3 ms per hook process
+except ImportError:
+    from hashlib import blake2b
+
+CACHE_PATH = os.path.join(tempfile.gettempdir(), "claude-hook-verdicts.sqlite")
+HOOKLIB_DIR = os.path.dirname(os.path.abspath(__file__))
+EVENTS = ("PreToolUse",)
+CACHED_EXIT_CODES = (0, 2)
+IGNORED_INPUT = ("description",)  # Bash's free-text label; no cached hook reads it
+MAX_INPUT = 64 * 1024
+MAX_ROWS = 20000
+MAX_BYTES = 16 * 1024 * 1024
+TOUCH_INTERVAL = 60       # seconds between LRU bumps of one row (a hit is then read-only)
+RACY_NS = 2 * 10 ** 9     # dependencies modified this close to the run are not trusted
+BUSY_TIMEOUT = 0.5
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS verdicts (
+    key TEXT PRIMARY KEY, code INTEGER, stdout TEXT, stderr TEXT, deps TEXT,
+    size INTEGER, used REAL);
+CREATE INDEX IF NOT EXISTS verdicts_used ON verdicts (used, size);
+CREATE TABLE IF NOT EXISTS sources (
+    path TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER, digest TEXT);
+"""
+
+
+def enabled():
+    return os.environ.get("CLAUDE_HOOK_VERDICTS", "").lower() not in ("0", "off", "false", "no")
+
+
+def _stamp(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+# -- what the running hook read (set by the hook, collected by the dispatcher) --
+
+_deps = {}         # path -> stamp taken when the hook said it read the file
+_volatile = False
+_started_ns = 0
+
+
+def begin():
+    global _volatile, _started_ns
+    _deps.clear()
+    _volatile = False
+    _started_ns = time.time_ns()
+
+
+def depends_on(path):
+    """The running hook's verdict depends on this file's contents."""
+    path = os.path.abspath(path)
+    if path not in _deps:
+        _deps[path] = _stamp(path)
+
+
+def uncacheable():
+    """The running hook's verdict depends on state: do not store it."""
+    global _volatile
+    _volatile = True
+
+
+def _collected():
+    """Dependency stamps of the finished run, or None when it must not be stored."""
+    if _volatile:
+        return None
+    racy = _started_ns - RACY_NS
+    if any(s is not None and s[0] >= racy for s in _deps.values()):
+        return None
+    return sorted([path] + (stamp or [None, None]) for path, stamp in _deps.items())
+
+
+# -- keys --
+
+
+def normalized_input(payload):
+    tool_input = payload.get("tool_input")
+    if isinstance(tool_input, dict) and any(k in tool_input for k in IGNORED_INPUT):
+        tool_input = {k: v for k, v in tool_input.items() if k not in IGNORED_INPUT}
+    return json.dumps([payload.get("tool_name", ""), tool_input, payload.get("cwd", ""),
+                       os.getcwd()], sort_keys=True, separators=(",", ":"),
+                      ensure_ascii=False).encode("utf-8", "surrogatepass")
+
+
+def hooklib_sources():
+    return tuple(sorted(os.path.join(HOOKLIB_DIR, n) for n in os.listdir(HOOKLIB_DIR)
+                        if n.endswith(".py")))
+
+
+class VerdictCache:
+    def __init__(self, path=CACHE_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.db = sqlite3.connect(path, timeout=BUSY_TIMEOUT, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(_SCHEMA)
+        self._digests = None  # path -> content digest, for the files seen so far
+        self._library = None
+
+    # -- hook versions --
+
+    def _digest(self, path):
+        """Content digest of ``path`` ("" if unreadable), rehashed only when its
+        mtime or size changed since the digest was stored."""
+        if self._digests is None:
+            self._digests = {row[0]: row[1:] for row in self.db.execute(
+                "SELECT path, mtime_ns, size, digest FROM sources")}
+        stamp = _stamp(path)
+        known = self._digests.get(path)
+        if stamp is None:
+            return ""
+        if known and list(known[:2]) == stamp:
+            return known[2]
+        try:
+            with open(path, "rb") as f:
+                digest = blake2b(f.read(), digest_size=16).hexdigest()
+        except OSError:
+            return ""
+        self._digests[path] = (stamp[0], stamp[1], digest)
+        self.db.execute("INSERT OR REPLACE INTO sources VALUES (?, ?, ?, ?)",
+                        (path, stamp[0], stamp[1], digest))
+        return digest
+
+    def version(self, script, tables=()):
+        """Content hash of a hook: script, table files, hooklib; None if no script."""
+        script_digest = self._digest(script)
+        if not script_digest:
+            return None
+        if self._library is None:
+            self._library = "".join(self._digest(p) for p in hooklib_sources())
+        h = blake2b(digest_size=16)
+        h.update(script_digest.encode("ascii"))
+        for path in tables:
+            h.update(f"{path}\0{self._digest(path)}\0".encode("utf-8", "surrogatepass"))
+        h.update(self._library.encode("ascii"))
+        return h.hexdigest()
+
+    def key(self, version, normalized):
+        h = blake2b(version.encode("ascii"), digest_size=16)
+        h.update(normalized)
+        return h.hexdigest()
+
+    # -- verdicts --
+
+    def get(self, key):
+        """(exit code, stdout, stderr) stored under ``key`` while still fresh, else None."""
+        row = self.db.execute("SELECT code, stdout, stderr, deps, used FROM verdicts"
+                              " WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        code, stdout, stderr, deps, used = row
+        if deps and any(_stamp(path) != ([mtime, size] if mtime is not None else None)
+                        for path, mtime, size in json.loads(deps)):
+            return None
+        now = time.time()
+        if now - used > TOUCH_INTERVAL:
+            self.db.execute("UPDATE verdicts SET used = ? WHERE key = ?", (now, key))
+        return code, stdout, stderr
+
+    def put(self, key, code, stdout, stderr, deps=()):
+        deps = json.dumps(deps, separators=(",", ":")) if deps else ""
+        size = len(key) + len(stdout) + len(stderr) + len(deps)
+        self.db.execute("INSERT OR REPLACE INTO verdicts VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (key, code, stdout, stderr, deps, size, time.time()))
+        self.evict()
+
+    def evict(self, max_rows=MAX_ROWS, max_bytes=MAX_BYTES):
+        """Drop least recently used verdicts down to 3/4 of the caps once either
+        is exceeded; returns the number removed."""
+        rows, total = self.db.execute("SELECT count(*), total(size) FROM verdicts").fetchone()
+        if rows <= max_rows and total <= max_bytes:
+            return 0
+        keep = min(max_rows * 3 // 4, int(rows * max_bytes * 3 / 4 / total) if total else rows)
+        return self.db.execute(
+            "DELETE FROM verdicts WHERE key IN"
+            " (SELECT key FROM verdicts ORDER BY used LIMIT ?)", (rows - keep,)).rowcount
+
+    def clear(self):
+        self.db.execute("DELETE FROM verdicts")
+
+
+# -- dispatcher side --
+
+
+class Lookup:
+    """The cache as seen by one event: key per hook, get and put that never raise."""
+
+    def __init__(self, cache, normalized):
+        self.cache = cache
+        self.normalized = normalized
+
+    def key(self, script, tables):
+        try:
+            version = self.cache.version(script, tables)
+        except (sqlite3.Error, OSError):
+            return None
+        return version and self.cache.key(version, self.normalized)
+
+    def get(self, key):
+        try:
+            return self.cache.get(key)
+        except (sqlite3.Error, OSError, ValueError):
+            return None
+
+    def put(self, key, code, stdout, stderr):
+        deps = _collected()
+        if deps is None or code not in CACHED_EXIT_CODES:
+            return False
+        try:
+            self.cache.put(key, code, stdout, stderr, deps)
+        except (sqlite3.Error, OSError):
+            return False
+        return True
+
+
+def open_lookup(event, raw, payload, path=CACHE_PATH):
+    """Lookup for this event, or None when the event's verdicts are not cached."""
+    if event not in EVENTS or not payload or len(raw) > MAX_INPUT or not enabled():
+        return None
+    try:
+        return Lookup(VerdictCache(path), normalized_input(payload))
+    except (sqlite3.Error, OSError, ValueError, TypeError):
+        return None
@@ -0,0 +1,24 @@
+#!/usr/bin/env python3
+"""PostToolUse hook: Record NotebookEdit, Skill, agent and plan-mode calls in the session ledger.
+
+Bash and Edit/Write/MultiEdit calls are recorded by the dev-loop
+mark-tests-run / mark-code-edits hooks; this one covers the other tools the
+Stop hooks care about (see hooklib/ledger.py for the event kinds). Read and
+MCP calls settle no SOP step, so the hook is not registered for them: every
+tool a PostToolUse matcher accepts costs an interpreter start per call.
+
+Exit code: Always 0 (informational).
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.expanduser("~/.claude/skills/hook-runtime/scripts"))
+from hooklib import ledger, read_input
+
+data = read_input()
+if data is None:
+    sys.exit(0)
+
+ledger.record(data)
+
+sys.exit(0)
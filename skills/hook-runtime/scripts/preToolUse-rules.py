@@ -0,0 +1,26 @@
+#!/usr/bin/env python3
+"""PreToolUse hook: every declarative guardrail in rules.json, in one pass.
+
+Covers rclone, raw SQL writes, prod-bypass scripts, CLAUDE.md/SKILL.md
+edits and the message-drafting reminder (see hooklib/rules.py for the rule
+format). A new guardrail of the same shape is a rules.json entry, not a
+new script.
+
+Exit codes:
+  0 = allow (reminders, if any, on stderr)
+  2 = block (messages of the blocking rules on stderr)
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.expanduser("~/.claude/skills/hook-runtime/scripts"))
+from hooklib import read_input, rules
+
+data = read_input()
+if data is None:
+    sys.exit(0)
+
+code, message = rules.run(data)
+if message:
+    print(message, file=sys.stderr)
+sys.exit(code)
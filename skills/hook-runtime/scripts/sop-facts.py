@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""Dev-loop SOP compliance and hook behaviour across every recorded session.
+
+Builds a per-session fact table (CSV) from the session JSONLs under
+~/.claude/projects/ with the Stop hook's own classification (hooklib/facts.py):
+code edits, tests run / attempted, commit, push, deploy, QA, planning,
+migrations, the missing steps the Stop hook would report, and the PreToolUse
+blocks seen in the session (and how many were overridden).
+
+Incremental: a session whose size, mtime and classification version match
+its row in the existing table is not read again, and a changed one is read
+through its columnar sidecar (only new lines parsed). Sessions are spread
+over a process pool.
+
+Usage:
+  python ~/.claude/skills/hook-runtime/scripts/sop-facts.py               # update + summary
+  python .../sop-facts.py --project myapp --since 30d
+  python .../sop-facts.py --out facts.csv --rebuild
+  python .../sop-facts.py --summary-only                                  # just read the table
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.expanduser("~/.claude/skills/hook-runtime/scripts"))
+from hooklib import devloop, facts, replay  # noqa: E402
+
+PROJECTS_DIR = os.path.expanduser("~/.claude/projects")
+DEFAULT_OUT = os.path.join(PROJECTS_DIR, "sop-facts.csv")
+TEXT_FIELDS = ("session", "project", "path", "version", "started", "ended", "exempt",
+               "missing", "block_reasons")
+
+
+def parse_since(value):
+    """'30d' / '12h' -> epoch seconds."""
+    units = {"h": 3600, "d": 86400}
+    if not value or value[-1] not in units:
+        raise argparse.ArgumentTypeError("use e.g. 12h, 30d")
+    return time.time() - float(value[:-1]) * units[value[-1]]
+
+
+def read_table(path):
+    """{jsonl path: row} of an existing fact table (typed like session_facts)."""
+    rows = {}
+    try:
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            for row in csv.DictReader(f):
+                try:
+                    rows[row["path"]] = {k: v if k in TEXT_FIELDS else int(v)
+                                         for k, v in row.items() if k in facts.FIELDS}
+                except (KeyError, TypeError, ValueError):
+                    continue
+    except OSError:
+        pass
+    return rows
+
+
+def write_table(path, rows):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=facts.FIELDS)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({k: int(v) if isinstance(v, bool) else v for k, v in row.items()})
+    os.replace(tmp, path)
+
+
+def compute(path):
+    """Worker: (path, facts row or None, error)."""
+    try:
+        return path, facts.session_facts(path), None
+    except (OSError, ValueError) as e:
+        return path, None, str(e)
+
+
+def is_current(row, path, version):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return False
+    return (row is not None and row["bytes"] == st.st_size
+            and row["mtime_ns"] == st.st_mtime_ns and row["version"] == version)
+
+
+def pct(part, whole):
+    return f"{part / whole:.0%}" if whole else "-"
+
+
+def summary(rows):
+    """Compliance and hook numbers over the fact rows, as printable lines."""
+    edited = [r for r in rows if r["code_edits"]]
+    assessed = [r for r in edited if not r["exempt"]]
+    firing = [r for r in assessed if r["stop_fires"]]
+    exempt = Counter(r["exempt"] for r in edited if r["exempt"])
+    lines = [
+        f"sessions {len(rows)}, with code edits {len(edited)}"
+        f" (exempt: {', '.join(f'{k} {n}' for k, n in exempt.most_common()) or 'none'})",
+        f"Stop hook fires on {len(firing)} of {len(assessed)} assessed sessions"
+        f" ({pct(len(firing), len(assessed))});"
+        f" feedback seen in {sum(1 for r in rows if r['stop_feedback'])} transcripts",
+    ]
+    missing = Counter(step for r in assessed for step in r["missing"].split())
+    lines.append("  missing: " + "   ".join(
+        f"{step} {pct(missing[step], len(assessed))}" for step in devloop.STEPS))
+    failed_tests = sum(1 for r in firing if "tests" in r["missing"].split()
+                       and r["tests_attempted"])
+    lines.append(f"  'tests not run' although a test command ran (failed or never returned):"
+                 f" {failed_tests} of {missing['tests']}")
+    blocks = sum(r["hook_blocks"] for r in rows)
+    overridden = sum(r["hook_overridden"] for r in rows)
+    reasons = Counter()
+    for r in rows:
+        if r["block_reasons"]:
+            reasons.update(json.loads(r["block_reasons"]))
+    lines.append(f"PreToolUse blocks {blocks} in {sum(1 for r in rows if r['hook_blocks'])}"
+                 f" sessions; overridden afterwards {overridden} ({pct(overridden, blocks)})")
+    lines += [f"  [{n}x] {reason}" for reason, n in reasons.most_common(5)]
+    return lines
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    ap.add_argument("paths", nargs="*", help="session JSONL files (default: every session)")
+    ap.add_argument("--project", help="project folder name contains this text")
+    ap.add_argument("--projects", default=PROJECTS_DIR)
+    ap.add_argument("--since", type=parse_since, help="sessions modified in the last 12h, 30d")
+    ap.add_argument("--out", default=DEFAULT_OUT, help="fact table (CSV), also the cache")
+    ap.add_argument("--rebuild", action="store_true", help="recompute every session")
+    ap.add_argument("--summary-only", action="store_true", help="report on the table as is")
+    ap.add_argument("--workers", type=int)
+    args = ap.parse_args()
+
+    if hasattr(sys.stdout, "reconfigure"):
+        sys.stdout.reconfigure(encoding="utf-8")
+    out = os.path.expanduser(args.out)
+    table = read_table(out)
+    if args.summary_only:
+        if not table:
+            print(f"no fact table at {out}", file=sys.stderr)
+            sys.exit(1)
+        print("\n".join(summary(list(table.values()))))
+        return
+
+    start = time.perf_counter()
+    paths = [os.path.expanduser(p) for p in args.paths] or replay.session_files(
+        os.path.expanduser(args.projects), args.project, args.since)
+    version = facts.version()
+    stale = paths if args.rebuild else [p for p in paths
+                                        if not is_current(table.get(p), p, version)]
+    if len(stale) <= 1 or args.workers == 1:
+        results, pool = map(compute, stale), None
+    else:
+        pool = ProcessPoolExecutor(args.workers)
+        results = pool.map(compute, stale, chunksize=4)
+    failed = 0
+    try:
+        for path, row, error in results:
+            if error:
+                failed += 1
+                print(f"{path}: {error}", file=sys.stderr)
+            else:
+                table[path] = row
+    finally:
+        if pool:
+            pool.shutdown()
+    write_table(out, sorted(table.values(), key=lambda r: (r["project"], r["started"])))
+
+    selected = [table[p] for p in paths if p in table]
+    print(f"{len(paths)} session(s): {len(stale) - failed} read, {len(paths) - len(stale)}"
+          f" unchanged, {failed} failed in {time.perf_counter() - start:.1f} s -> {out}")
+    print("\n".join(summary(selected)))
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
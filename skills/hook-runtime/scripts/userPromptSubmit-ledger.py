@@ -0,0 +1,22 @@
+#!/usr/bin/env python3
+"""UserPromptSubmit hook: Record waivers and retrospective requests in the session ledger.
+
+Only classified events are stored (hooklib/ledger.py: "signal" for
+qa_waived / temp_script_exempt, "retro_requested"), never the prompt text.
+
+Exit code: Always 0 (stdout of a UserPromptSubmit hook would be added to
+the context, so nothing is printed).
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.expanduser("~/.claude/skills/hook-runtime/scripts"))
+from hooklib import ledger, read_input
+
+data = read_input()
+if data is None:
+    sys.exit(0)
+
+ledger.record(data)
+
+sys.exit(0)
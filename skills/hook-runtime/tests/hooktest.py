@@ -0,0 +1,75 @@
+"""Helpers for the hook-runtime tests: scratch git repos, hooks run in isolation.
+
+Every test gets its own temp dir, used as TMPDIR for the hooks it runs, so
+the state store (hooklib/state.py) and verdict cache start empty. In-process
+calls take ``self.store()``, a store in the same place.
+
+    from hooktest import IsolatedCase
+
+    class TestX(IsolatedCase):
+        def test_y(self):
+            repo = self.repo({"app.py": "x = 1\\n"})
+            proc = self.hook("dev-loop/scripts/preToolUse-block-push-without-tests.py",
+                             {"tool_name": "Bash", ...}, cwd=repo)
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SKILLS = os.path.dirname(os.path.dirname(HERE))
+SCRIPTS = os.path.join(SKILLS, "hook-runtime", "scripts")
+sys.path.insert(0, SCRIPTS)
+
+
+def git(cwd, *args):
+    return subprocess.run(["git", "-c", "user.name=test", "-c", "user.email=test@example.com",
+                           *args], cwd=cwd, check=True, capture_output=True,
+                          text=True).stdout.strip()
+
+
+class IsolatedCase(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory(prefix="hook-test-")
+        self.tmp = os.path.realpath(self._tmp.name)
+        self.env = dict(os.environ, TMPDIR=self.tmp, TEMP=self.tmp, TMP=self.tmp,
+                        PYTHONPATH=SCRIPTS, GIT_AUTHOR_NAME="test",
+                        GIT_AUTHOR_EMAIL="test@example.com", GIT_COMMITTER_NAME="test",
+                        GIT_COMMITTER_EMAIL="test@example.com")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def store(self):
+        """A state store of this test's own (for in-process calls)."""
+        from hooklib.state import StateStore
+        return StateStore(os.path.join(self.tmp, "claude-hook-state.sqlite"))
+
+    def repo(self, files, name="repo"):
+        """A git repo with ``files`` ({path: text}) committed."""
+        path = os.path.join(self.tmp, name)
+        os.makedirs(path)
+        git(path, "init", "-q", "-b", "main")
+        git(path, "config", "user.name", "test")
+        git(path, "config", "user.email", "test@example.com")
+        self.write(path, files)
+        git(path, "add", "-A")
+        git(path, "commit", "-qm", "init")
+        return path
+
+    @staticmethod
+    def write(root, files):
+        for rel, text in files.items():
+            full = os.path.join(root, rel)
+            os.makedirs(os.path.dirname(full), exist_ok=True)
+            with open(full, "w", encoding="utf-8") as f:
+                f.write(text)
+
+    def hook(self, script, event, cwd, *args):
+        """Run a hook script (path under skills/) on ``event``; the finished process."""
+        return subprocess.run([sys.executable, os.path.join(SKILLS, script), *args],
+                              input=json.dumps(event), cwd=cwd, env=self.env,
+                              capture_output=True, text=True)
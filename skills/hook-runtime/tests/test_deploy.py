@@ -0,0 +1,67 @@
+"""deploy-queue.py against a bare remote: one push, bisection, scratch worktrees."""
+import json
+import os
+import unittest
+
+from hooktest import IsolatedCase, git
+
+from hooklib import deployqueue
+
+DEPLOY = "autonomous-issue-dispatch/scripts/deploy-queue.py"
+
+
+class TestDeployQueue(IsolatedCase):
+    def setUp(self):
+        super().setUp()
+        self.origin = os.path.join(self.tmp, "origin.git")
+        git(self.tmp, "init", "-q", "--bare", "-b", "main", self.origin)
+        git(self.origin, "config", "core.logAllRefUpdates", "always")
+        self.cwd = self.repo({"README.md": "x\n"})
+        git(self.cwd, "remote", "add", "origin", self.origin)
+        git(self.cwd, "push", "-q", "origin", "main")
+        git(self.cwd, "remote", "set-head", "origin", "main")
+        self.base = git(self.cwd, "rev-parse", "HEAD")
+        for branch, name in (("good-a", "a.txt"), ("bad", "bad.txt")):
+            git(self.cwd, "checkout", "-q", "-b", branch, "main")
+            self.write(self.cwd, {name: "1\n"})
+            git(self.cwd, "add", "-A")
+            git(self.cwd, "commit", "-qm", branch)
+        git(self.cwd, "checkout", "-q", "main")
+        git(self.cwd, "checkout", "-q", "-b", "good-b")
+        self.write(self.cwd, {"b.txt": "1\n"})
+        git(self.cwd, "add", "-A")
+        with open(os.path.join(self.cwd, "good-b.patch"), "w", encoding="utf-8") as f:
+            f.write(git(self.cwd, "diff", "--cached") + "\n")
+        git(self.cwd, "reset", "-q", "--hard")
+        git(self.cwd, "checkout", "-q", "main")
+
+    def deploy(self, *refs):
+        # Run from outside the repo: the patch path is relative to --cwd
+        proc = self.hook(DEPLOY, {}, self.tmp, *refs, "--test", "test ! -e bad.txt",
+                         "--cwd", self.cwd, "--json")
+        self.assertIn(proc.returncode, (0, 1), proc.stderr)
+        return json.loads(proc.stdout)
+
+    def test_bad_item_bisected_out_and_one_push(self):
+        result = self.deploy("good-a", "bad", "good-b.patch")
+        self.assertEqual([(i["ref"], i["status"]) for i in result["items"]],
+                         [("good-a", "included"), ("bad", "failing"),
+                          ("good-b.patch", "included")])
+        self.assertTrue(result["pushed"])
+        self.assertEqual(git(self.origin, "rev-list", "--count", f"{self.base}..main"), "1")
+        self.assertEqual(git(self.origin, "ls-tree", "--name-only", "main").split(),
+                         ["README.md", "a.txt", "b.txt"])
+        # the initial push and the batch: one deploy push
+        self.assertEqual(len(git(self.origin, "reflog", "show", "main").splitlines()), 2)
+
+    def test_concurrent_worktree_untouched(self):
+        other = deployqueue.DeployQueue(self.cwd, [], "true")
+        other.prepare()
+        self.write(other.worktree, {"wip.txt": "in progress\n"})
+        self.assertTrue(self.deploy("good-a")["pushed"])
+        self.assertTrue(os.path.isfile(os.path.join(other.worktree, "wip.txt")))
+        self.assertIn(other.worktree, git(self.cwd, "worktree", "list"))
+
+
+if __name__ == "__main__":
+    unittest.main()
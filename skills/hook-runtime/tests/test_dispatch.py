@@ -0,0 +1,213 @@
+"""Dispatcher: hook std streams, crashes of hooks that can block, process hooks,
+per-hook timeouts and merged JSON outputs."""
+import json
+import os
+import signal
+import subprocess
+import sys
+import unittest
+from unittest import mock
+
+from hooktest import SCRIPTS, SKILLS, IsolatedCase
+
+from hooklib import dispatch, telemetry
+
+EVENT = json.dumps({"session_id": "s1", "tool_name": "Bash",
+                    "tool_input": {"command": "echo café"}})
+
+
+class DispatchCase(IsolatedCase):
+    def setUp(self):
+        super().setUp()
+        self.log = os.path.join(self.tmp, "hooks.jsonl")
+        patcher = mock.patch.dict(os.environ, {"CLAUDE_HOOK_TELEMETRY": self.log})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def script(self, name, source):
+        path = os.path.join(self.tmp, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(source)
+        return path
+
+    def run_event(self, event, *scripts):
+        registry = {event: [{"matcher": "", "script": path} for path in scripts]}
+        return dispatch.combine(dispatch.run_event(event, EVENT, registry))
+
+
+class TestDispatch(DispatchCase):
+    def test_byte_level_streams(self):
+        path = self.script("bytes.py", (
+            "import json, sys\n"
+            "sys.stdout.reconfigure(encoding='utf-8')\n"
+            "data = json.loads(sys.stdin.buffer.read())\n"
+            "sys.stdout.buffer.write(data['tool_input']['command'].encode('utf-8'))\n"
+            "sys.stderr.buffer.write(b'err')\n"))
+        result = dispatch.run_hook(path, EVENT, json.loads(EVENT))
+        self.assertEqual((result.exit_code, result.stdout, result.stderr),
+                         (0, "echo café", "err"))
+
+    def test_rewrapped_stdout(self):
+        path = self.script("rewrap.py", (
+            "import io, sys\n"
+            "sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')\n"
+            "print('café')\n"
+            "sys.exit(2)\n"))
+        result = dispatch.run_hook(path, EVENT, None)
+        self.assertEqual((result.exit_code, result.stdout), (2, "café\n"))
+
+    def test_crash_in_blocking_event_reported(self):
+        ok = self.script("ok.py", "import sys\nsys.exit(0)\n")
+        crash = self.script("crash.py", "import sys\nsys.stdin.fileno()\n")
+        code, _, stderr = self.run_event("PreToolUse", ok, crash)
+        self.assertEqual(code, 1)
+        self.assertIn("HOOK ERROR: crash failed (io.UnsupportedOperation", stderr)
+        self.assertIn("Traceback", stderr)
+        records = list(telemetry.read([self.log]))
+        self.assertEqual([r.get("error", "")[:2] for r in records], ["", "io"])
+        self.assertIn("fileno", records[1]["traceback"])
+
+    def test_crash_in_post_tool_use_not_flagged(self):
+        crash = self.script("crash.py", "raise ValueError('x')\n")
+        code, _, stderr = self.run_event("PostToolUse", crash)
+        self.assertEqual(code, 1)
+        self.assertNotIn("HOOK ERROR", stderr)
+
+    def test_missing_file_inside_hook_is_a_crash(self):
+        path = self.script("opens.py", "open('/nonexistent/config.json')\n")
+        result = dispatch.run_hook(path, EVENT, None)
+        self.assertIn("FileNotFoundError", result.error)
+        missing = dispatch.run_hook(os.path.join(self.tmp, "gone.py"), EVENT, None)
+        self.assertEqual(missing.error, "script not found")
+
+
+class TestProcessHooks(DispatchCase):
+    def test_process_hook(self):
+        path = self.script("pid.py", (
+            "import json, os, sys\n"
+            "data = json.load(sys.stdin)\n"
+            "print(os.getpid(), data['tool_input']['command'])\n"
+            "sys.exit(2)\n"))
+        registry = {"PreToolUse": [{"matcher": "", "script": path, "process": True}]}
+        result, = dispatch.run_event("PreToolUse", EVENT, registry)
+        pid, command = result.stdout.split(" ", 1)
+        self.assertNotEqual(int(pid), os.getpid())
+        self.assertEqual((result.exit_code, command), (2, "echo café\n"))
+
+    def test_process_crash_and_timeout(self):
+        crash = self.script("crash.py", "raise ValueError('bad config')\n")
+        registry = {"PreToolUse": [{"matcher": "", "script": crash, "process": True}]}
+        code, _, stderr = dispatch.combine(dispatch.run_event("PreToolUse", EVENT, registry))
+        self.assertEqual(code, 1)
+        self.assertIn("HOOK ERROR: crash failed (ValueError: bad config)", stderr)
+        slow = self.script("slow.py", "import time\ntime.sleep(30)\n")
+        result = dispatch.run_process(slow, EVENT, timeout=0.5)
+        self.assertEqual((result.exit_code, result.error), (1, "timed out after 0.5 s"))
+        self.assertLess(result.ms, 5000)
+
+    def test_site_import_under_no_site_rerun_as_process(self):
+        # A module only site-packages provides (the user site of a scratch base)
+        env = dict(self.env, PYTHONUSERBASE=os.path.join(self.tmp, "userbase"))
+        site_dir = subprocess.run([sys.executable, "-c",
+                                   "import site; print(site.getusersitepackages())"],
+                                  env=env, capture_output=True, text=True).stdout.strip()
+        self.write(site_dir, {"thirdparty.py": "VALUE = 'from site-packages'\n"})
+        path = self.script("uses_site.py", "import thirdparty\nprint(thirdparty.VALUE)\n")
+        driver = ("import json, sys\n"
+                  "from hooklib import dispatch\n"
+                  f"registry = {{'PreToolUse': [{{'matcher': '', 'script': {path!r}}}]}}\n"
+                  "code, out, err = dispatch.combine(dispatch.run_event("
+                  "'PreToolUse', '{}', registry))\n"
+                  "print(json.dumps([code, out, err]))\n")
+        proc = subprocess.run([sys.executable, "-S", "-c", driver], env=env, cwd=SCRIPTS,
+                              capture_output=True, text=True)
+        self.assertEqual(json.loads(proc.stdout), [0, "from site-packages\n", ""],
+                         proc.stderr)
+
+
+class TestTimeouts(DispatchCase):
+    def test_slow_hook_stopped_and_later_hooks_run(self):
+        slow = self.script("slow.py", (
+            "import time\n"
+            "try:\n    time.sleep(30)\nexcept Exception:\n    pass\n"))
+        gate = self.script("gate.py", (
+            "import sys\nprint('blocked', file=sys.stderr)\nsys.exit(2)\n"))
+        registry = {"PreToolUse": [{"matcher": "", "script": slow, "timeout": 0.5},
+                                   {"matcher": "", "script": gate}]}
+        before = signal.getsignal(signal.SIGALRM)
+        results = dispatch.run_event("PreToolUse", EVENT, registry)
+        self.assertEqual([(r.exit_code, r.error) for r in results],
+                         [(1, "timed out after 0.5 s"), (2, "")])
+        self.assertLess(results[0].ms, 5000)
+        self.assertIn("HOOK ERROR: slow failed (timed out", results[0].stderr)
+        self.assertEqual(dispatch.combine(results), (2, "", "blocked\n"))
+        self.assertEqual(signal.getsignal(signal.SIGALRM), before)
+
+    def test_timeouts_per_event_and_entry(self):
+        registry = {event: [{"matcher": "", "script": "a.py"},
+                            {"matcher": "", "script": "b.py", "timeout": 2}]
+                    for event in ("PreToolUse", "Stop")}
+        for event, expected in (("PreToolUse", [5.0, 2.0]), ("Stop", [15.0, 2.0])):
+            with self.subTest(event):
+                self.assertEqual([h.timeout for h in dispatch.select_hooks(registry, event, "")],
+                                 expected)
+
+    def test_settings_timeout_covers_every_hook(self):
+        with open(os.path.join(os.path.dirname(SKILLS), "settings.json"), encoding="utf-8") as f:
+            settings = json.load(f)["hooks"]
+        registry = dispatch.load_registry(os.path.join(SKILLS, "hook-runtime", "hooks.json"))
+        for event in registry:
+            with self.subTest(event):
+                budget = sum(h.timeout for h in dispatch.select_hooks(registry, event, ""))
+                timeout, = (h["timeout"] for group in settings[event] for h in group["hooks"])
+                self.assertGreater(timeout, budget)
+
+
+def output(stdout, exit_code=0, stderr=""):
+    return dispatch.HookResult("hook.py", exit_code, stdout, stderr)
+
+
+def decision(verdict, reason):
+    return json.dumps({"hookSpecificOutput": {"hookEventName": "PreToolUse",
+                                              "permissionDecision": verdict,
+                                              "permissionDecisionReason": reason}})
+
+
+class TestCombine(unittest.TestCase):
+    def test_json_outputs_merged(self):
+        code, stdout, stderr = dispatch.combine([
+            output(json.dumps({"systemMessage": "checked", "suppressOutput": True})),
+            output("plain note\n"),
+            output('{"systemMessage": "also checked"}\n', stderr="warn\n"),
+            output("", exit_code=1, stderr="crashed\n")])
+        self.assertEqual(code, 0)
+        self.assertEqual(json.loads(stdout), {"systemMessage": "checked\nalso checked\ncrashed",
+                                              "suppressOutput": True})
+        self.assertEqual(stderr, "plain note\nwarn\n")
+
+    def test_most_restrictive_verdict_wins(self):
+        for name, outputs, expected in (
+                ("deny over allow", [decision("allow", "safe"), decision("deny", "prod push")],
+                 {"permissionDecision": "deny", "permissionDecisionReason": "prod push"}),
+                ("ask over allow", [decision("ask", "a"), decision("allow", "b"),
+                                    decision("ask", "c")],
+                 {"permissionDecision": "ask", "permissionDecisionReason": "a\nc"}),
+                ("block", ['{"decision": "block", "reason": "tests"}', '{"decision": "approve"}'],
+                 {"decision": "block", "reason": "tests"}),
+                ("stop", ['{"continue": true}', '{"continue": false, "stopReason": "done"}'],
+                 {"continue": False, "stopReason": "done"})):
+            with self.subTest(name):
+                merged = json.loads(dispatch.combine([output(o) for o in outputs])[1])
+                merged.update(merged.pop("hookSpecificOutput", {}))
+                merged.pop("hookEventName", None)
+                self.assertEqual(merged, expected)
+
+    def test_block_and_plain_text_unchanged(self):
+        json_out = output('{"systemMessage": "x"}')
+        self.assertEqual(dispatch.combine([json_out, output("", 2, "no\n")]), (2, "", "no\n"))
+        self.assertEqual(dispatch.combine([output("a\n"), output("[1]\n")]), (0, "a\n[1]\n", ""))
+        self.assertEqual(dispatch.combine([json_out, output("", 1, "e")])[0], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+"""sop-facts.py: the fact row of a recorded session, and incremental updates."""
+import csv
+import json
+import os
+import unittest
+
+from hooktest import SKILLS, IsolatedCase
+
+SOP_FACTS = "hook-runtime/scripts/sop-facts.py"
+BOX = "\n+====\n| PRETOOLUSE HOOK OUTPUT\n+====\n| Push blocked: run the tests first\n+====\n"
+STOP = "+====\n| [STOP] HOOK OUTPUT\n+====\n| tests not run\n"
+
+
+def tool(n, name, tool_input, error=None):
+    """A tool call and its result (an error result when ``error`` is given)."""
+    result = {"type": "tool_result", "tool_use_id": f"t{n}", "content": error or "ok"}
+    if error:
+        result["is_error"] = True
+    return [{"type": "assistant", "timestamp": f"2026-01-01T00:00:{n:02d}Z",
+             "message": {"content": [{"type": "tool_use", "id": f"t{n}", "name": name,
+                                      "input": tool_input}]}},
+            {"type": "user", "message": {"content": [result]}}]
+
+
+SESSION = (
+    [{"type": "user", "timestamp": "2026-01-01T00:00:00Z",
+      "message": {"content": "fix the login bug"}}]
+    + tool(1, "Edit", {"file_path": "/r/src/login.py", "old_string": "a", "new_string": "b"})
+    + tool(2, "Bash", {"command": "git push"}, error=BOX)
+    + [{"type": "user", "message": {"content": STOP}}]
+    + tool(3, "Bash", {"command": "npm test"}, error="1 failing")
+    + tool(4, "Bash", {"command": "git  push"})
+)
+
+
+class TestSopFacts(IsolatedCase):
+    def setUp(self):
+        super().setUp()
+        # ~/.claude/skills is this checkout: hooks.json and rules.json come from it
+        home = os.path.join(self.tmp, "home")
+        os.makedirs(os.path.join(home, ".claude"))
+        os.symlink(SKILLS, os.path.join(home, ".claude", "skills"))
+        self.env["HOME"] = home
+        self.projects = os.path.join(self.tmp, "projects")
+        self.jsonl = os.path.join(self.projects, "app", "s1.jsonl")
+        self.out = os.path.join(self.tmp, "facts.csv")
+        self.append(SESSION)
+
+    def append(self, entries):
+        os.makedirs(os.path.dirname(self.jsonl), exist_ok=True)
+        with open(self.jsonl, "a", encoding="utf-8") as f:
+            f.writelines(json.dumps(e) + "\n" for e in entries)
+
+    def run_facts(self):
+        proc = self.hook(SOP_FACTS, {}, self.tmp, "--projects", self.projects,
+                         "--out", self.out, "--workers", "1")
+        self.assertEqual(proc.returncode, 0, proc.stderr)
+        with open(self.out, encoding="utf-8", newline="") as f:
+            row, = csv.DictReader(f)
+        return proc.stdout.splitlines()[0], row
+
+    def test_session_row(self):
+        _, row = self.run_facts()
+        expected = {
+            "session": "s1", "project": "app", "prompts": "1", "tool_calls": "4",
+            "tool_errors": "2", "code_edits": "1", "tests_run": "0", "tests_attempted": "1",
+            "pushed": "1", "hook_blocks": "1", "hook_overridden": "1", "stop_feedback": "1",
+            "stop_fires": "1", "started": "2026-01-01T00:00:00Z",
+            "ended": "2026-01-01T00:00:04Z",
+            "block_reasons": json.dumps({"Push blocked: run the tests first": 1}),
+        }
+        self.assertEqual({k: row[k] for k in expected}, expected)
+        self.assertIn("tests", row["missing"].split())
+
+    def test_only_changed_sessions_read(self):
+        first, _ = self.run_facts()
+        self.assertIn("1 read, 0 unchanged", first)
+        self.assertIn("0 read, 1 unchanged", self.run_facts()[0])
+        self.append(tool(5, "Bash", {"command": "npm test"}))
+        line, row = self.run_facts()
+        self.assertIn("1 read, 0 unchanged", line)
+        self.assertEqual((row["tool_calls"], row["tests_run"]), ("5", "1"))
+        self.assertNotIn("tests", row["missing"].split())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+"""fields.extract: named fields out of raw event JSON, without decoding the rest."""
+import json
+import unittest
+
+import hooktest  # noqa: F401  (puts hooklib on sys.path)
+from hooklib import fields
+
+PATHS = ("tool_name", "tool_input.file_path")
+
+
+def event(tool_input, **extra):
+    return json.dumps(dict(extra, tool_name="Write", tool_input=tool_input))
+
+
+class TestExtract(unittest.TestCase):
+    def test_same_as_json_loads(self):
+        # Wanted fields behind values that have to be skipped
+        quotes = 'say \\"hi\\" ' * 40  # more escaped quotes than the fast path handles
+        cases = {
+            "plain": event({"file_path": "/r/a.py", "content": "x"}),
+            "escaped quotes": event({"content": 'a "quoted" \\ word', "file_path": "/r/a.py"}),
+            "many escaped quotes": event({"content": json.loads(f'"{quotes}"'),
+                                          "file_path": "/r/b.py"}),
+            "backslash before quote": event({"content": "ends with \\", "file_path": "/r/c"}),
+            "nested skip": event({"edits": [{"old": "}]", "new": ["{", {"x": '"['}]}],
+                                  "meta": {"a": {"b": [1, 2.5e3, None, True]}},
+                                  "file_path": "/r/d.py"}, session_id="s"),
+            "unicode": event({"file_path": "/r/café/\U0001f600.py", "content": " "}),
+            "whitespace": '{ "tool_name" :\n"Write" , "tool_input" : { "file_path" : "/r/e" } }',
+            "tool_input not an object": json.dumps({"tool_name": "Bash", "tool_input": None}),
+        }
+        for name, raw in cases.items():
+            with self.subTest(name):
+                data = json.loads(raw)
+                expected = {"tool_name": data["tool_name"]}
+                tool_input = data["tool_input"]
+                if isinstance(tool_input, dict):
+                    expected["tool_input"] = {"file_path": tool_input["file_path"]}
+                else:
+                    expected["tool_input"] = tool_input
+                self.assertEqual(fields.extract(raw, PATHS), expected)
+
+    def test_missing_fields_absent(self):
+        raw = json.dumps({"tool_name": "Bash", "tool_input": {"command": "ls"}})
+        self.assertEqual(fields.extract(raw, PATHS), {"tool_name": "Bash", "tool_input": {}})
+        self.assertEqual(fields.extract("{}", PATHS), {})
+
+    def test_first_duplicate_wins(self):
+        raw = '{"tool_name": "Edit", "tool_name": "Write", "tool_input": {"file_path": "/a"}}'
+        self.assertEqual(fields.extract(raw, ("tool_name",)), {"tool_name": "Edit"})
+
+    def test_malformed_is_none(self):
+        for raw in ("", "[]", '"x"', "null", "{", '{"tool_name"', '{"tool_name": }',
+                    '{"a": 1 "tool_name": "x"}', '{"a": "unterminated', "{'tool_name': 1}",
+                    '{"a": [1, 2}', '{"a": nope, "tool_name": "x"}'):
+            with self.subTest(raw=raw):
+                self.assertIsNone(fields.extract(raw, PATHS))
+
+    def test_stops_after_the_last_wanted_field(self):
+        # A large content after file_path is never read: even cut off, the
+        # event still yields its fields
+        raw = event({"file_path": "/r/big.py", "content": "x" * (8 << 20)})
+        expected = {"tool_name": "Write", "tool_input": {"file_path": "/r/big.py"}}
+        self.assertEqual(fields.extract(raw, PATHS), expected)
+        self.assertEqual(fields.extract(raw[:200], PATHS), expected)
+
+    def test_prefix_path_wins(self):
+        raw = event({"file_path": "/r/a", "content": "x"})
+        self.assertEqual(fields.extract(raw, ("tool_input", "tool_input.file_path")),
+                         {"tool_input": {"file_path": "/r/a", "content": "x"}})
+
+
+if __name__ == "__main__":
+    unittest.main()
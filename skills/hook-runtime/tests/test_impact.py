@@ -0,0 +1,149 @@
+"""Test impact: the tests an edit reaches, and which tests a command ran in full."""
+import os
+import unittest
+
+from hooktest import IsolatedCase
+
+from hooklib import impact
+
+FILES = {
+    "tests/unit/test_a.py": "def test_a():\n    pass\n",
+    "tests/unit/test_b.py": "def test_b():\n    pass\n",
+    "tests/test_c.py": "def test_c():\n    pass\n",
+    "src/app.ts": "export const x = 1\n",
+    "src/app.test.ts": "import { x } from './app'\n",
+    "e2e/login.spec.ts": "import { test } from '@playwright/test'\n",
+    "scripts/run.py": "print(1)\n",
+}
+UNIT = ["tests/unit/test_a.py", "tests/unit/test_b.py"]
+
+SCOPES = [
+    # bare runner invocations: the whole suite
+    ("npm test", "full"),
+    ("npm run test:unit -- --coverage", "full"),
+    ("python -m pytest -q", "full"),
+    ("npx vitest run", "full"),
+    ("npx playwright test --workers 4 --reporter list", "full"),
+    ("go test -v ./...", "full"),
+    ("npm test && pytest -k login", "full"),
+    # files, and directories expanded to the tests inside
+    ("pytest tests/unit/test_a.py", ["tests/unit/test_a.py"]),
+    ("pytest tests/unit", UNIT),
+    ("pytest -p no:cacheprovider tests/unit/", UNIT),
+    ("cd src && npx vitest run app.test.ts", ["src/app.test.ts"]),
+    ("npx jest --runTestsByPath src/app.test.ts", ["src/app.test.ts"]),
+    ("npx playwright test --config e2e/pw.config.ts e2e/login.spec.ts", ["e2e/login.spec.ts"]),
+    ("pytest tests/test_c.py && pytest tests/unit -k slow", ["tests/test_c.py"]),
+    # filtered or unresolved: nothing proven
+    ("pytest -k login", []),
+    ("pytest -m 'not slow' tests/unit", []),
+    ("npx jest -t 'renders name'", []),
+    ("npx vitest run app", []),
+    ("npx playwright test --grep @smoke", []),
+    ("npx playwright test e2e/login.spec.ts:12", []),
+    ("pytest tests/unit/test_a.py::test_a", []),
+    ("pytest --lf", []),
+    ("pytest --collect-only", []),
+    ("pytest scripts/run.py", []),
+    ("pytest scripts", []),
+    ("npx vitest run --shard=1/4", []),
+    ("cargo test parser", []),
+    ("echo npm test", []),
+]
+
+
+class TestRunScope(IsolatedCase):
+    def test_scopes(self):
+        repo = self.repo(FILES)
+        for command, expected in SCOPES:
+            with self.subTest(command=command):
+                self.assertEqual(impact.run_scope(command, repo), expected)
+
+    def test_empty_scope_covers_nothing(self):
+        repo = self.repo(FILES)
+        sel = impact.select(repo, ["src/app.ts"])
+        self.assertEqual(sel.tests, ["src/app.test.ts"])
+        self.assertTrue(impact.covers(["src/app.test.ts"], sel))
+        self.assertFalse(impact.covers([], sel))
+
+
+MONOREPO = {
+    "package.json": '{"name": "root", "workspaces": ["packages/*"]}\n',
+    "tsconfig.json": '{\n  // shared aliases\n  "compilerOptions": {"baseUrl": ".", '
+                     '"paths": {"@lib/*": ["packages/shared/src/*"],},},\n}\n',
+    "packages/shared/package.json": '{"name": "@acme/shared", "main": "src/index.ts"}\n',
+    "packages/shared/src/index.ts": "export * from './format'\n",
+    "packages/shared/src/format.ts": "export const format = (x) => x\n",
+    "packages/shared/src/unused.ts": "export const unused = 1\n",
+    "packages/api/package.json": '{"name": "api", "devDependencies": {"jest": "29"}}\n',
+    "packages/api/src/auth.ts": "import { format } from '@acme/shared'\n",
+    "packages/api/src/auth.test.ts": "import { login } from './auth.js'\n",
+    "packages/web/vitest.config.ts": "export default {}\n",
+    "packages/web/src/view.tsx": "const f = require('@lib/format')\n",
+    "packages/web/src/__tests__/view.ts": "vi.mock('../view')\n",
+    "e2e/login.spec.ts": ("import { test } from '@playwright/test'\n"
+                          "import '../packages/web/src/view'\n"),
+    "playwright.config.ts": "export default {}\n",
+    "app/__init__.py": "",
+    "app/db.py": "X = 1\n",
+    "app/models.py": "from . import db\n",
+    "tests/conftest.py": "import pytest\n",
+    "tests/test_models.py": "from app.models import (\n    db,  # the handle\n)\n",
+    "docs/guide.md": "# guide\n",
+}
+
+
+class TestSelect(IsolatedCase):
+    def setUp(self):
+        super().setUp()
+        self.root = self.repo(MONOREPO)
+
+    def test_tests_reached_through_the_graph(self):
+        for edited, tests in (
+                ("packages/shared/src/format.ts", ["e2e/login.spec.ts",
+                                                   "packages/api/src/auth.test.ts",
+                                                   "packages/web/src/__tests__/view.ts"]),
+                ("packages/api/src/auth.ts", ["packages/api/src/auth.test.ts"]),
+                ("app/db.py", ["tests/test_models.py"]),
+                ("tests/conftest.py", ["tests/test_models.py"])):
+            with self.subTest(edited=edited):
+                sel = impact.select(self.root, [edited, "docs/guide.md"])
+                self.assertEqual((sel.full, sel.tests), ("", tests))
+
+    def test_commands_per_runner_and_project(self):
+        sel = impact.select(self.root, ["packages/shared/src/format.ts", "app/db.py"])
+        self.assertEqual(sel.commands(), [
+            f"cd {self.root}/packages/api && npx jest --runTestsByPath src/auth.test.ts",
+            "npx playwright test e2e/login.spec.ts",
+            "pytest tests/test_models.py",
+            f"cd {self.root}/packages/web && npx vitest run src/__tests__/view.ts",
+        ])
+
+    def test_full_suite(self):
+        os.remove(os.path.join(self.root, "app", "db.py"))
+        self.write(self.root, {"Makefile": "test:\n\tpytest\n"})
+        for edited, reason in (
+                ("packages/api/package.json", "config/manifest"),
+                ("packages/web/vitest.config.ts", "config/manifest"),
+                ("app/db.py", "deleted"),
+                ("Makefile", "not a source file"),
+                ("packages/shared/src/unused.ts", "no test imports")):
+            with self.subTest(edited=edited):
+                sel = impact.select(self.root, [edited])
+                self.assertIn(reason, sel.full)
+                self.assertEqual(sel.commands(), [])
+
+    def test_graph_cache_rereads_changed_files_only(self):
+        first = impact.Graph.load(self.root)
+        self.assertEqual(first.rescanned, len(first.files))
+        self.assertEqual(impact.Graph.load(self.root).rescanned, 0)
+        self.write(self.root, {"packages/shared/src/unused.ts": "import './format'\n",
+                               "packages/shared/src/unused.test.ts": "import './unused'\n"})
+        graph = impact.Graph.load(self.root)
+        self.assertEqual(graph.rescanned, 2)
+        self.assertIn("packages/shared/src/unused.test.ts",
+                      graph.affected_tests(["packages/shared/src/format.ts"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,39 @@
+"""Session ledger: classified tool calls folded into the Stop hook's SOP verdict."""
+import unittest
+
+from hooktest import IsolatedCase
+
+from hooklib import devloop, ledger
+
+CODE_FILE = "/home/dev/project/src/app.py"
+
+
+class TestLedger(IsolatedCase):
+    def record(self, store, tool, **tool_input):
+        ledger.record({"session_id": "s1", "hook_event_name": "PostToolUse",
+                       "tool_name": tool, "tool_input": tool_input}, store)
+
+    def verdict(self, store):
+        session = ledger.replay("s1", store)
+        return devloop.Assessment(session.edits, session.flags())
+
+    def test_push_counts_as_deploy(self):
+        store = self.store()
+        self.record(store, "Edit", file_path=CODE_FILE)
+        self.record(store, "Bash", command="npm test")
+        self.record(store, "Bash", command="git commit -qam 'fix role dropdown'")
+        self.record(store, "Bash", command="git push origin main")
+        self.record(store, "Skill", skill="qa-submission")
+        self.assertEqual(self.verdict(store).missing, [])
+
+    def test_no_push_no_deploy(self):
+        store = self.store()
+        self.record(store, "Edit", file_path=CODE_FILE)
+        self.record(store, "Bash", command="npm test")
+        self.record(store, "Bash", command="git commit -qam 'fix role dropdown'")
+        self.record(store, "Skill", skill="qa-submission")
+        self.assertEqual(self.verdict(store).missing, ["deploy"])
+
+
+if __name__ == "__main__":
+    unittest.main()
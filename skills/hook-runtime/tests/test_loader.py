@@ -0,0 +1,108 @@
+"""Hook loader: cached bytecode reused until the source changes; hooks by name."""
+import marshal
+import os
+import sys
+import unittest
+from unittest import mock
+
+from hooktest import IsolatedCase
+
+import hooklib
+from hooklib import loader
+
+
+class TestLoadCode(IsolatedCase):
+    def setUp(self):
+        super().setUp()
+        self.path = os.path.join(self.tmp, "hook.py")
+        self.write(self.tmp, {"hook.py": "RESULT = 1\n"})
+        patcher = mock.patch.object(sys, "dont_write_bytecode", False)  # PYTHONDONTWRITEBYTECODE
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def result(self):
+        scope = {}
+        exec(loader.load_code(self.path), scope)
+        return scope["RESULT"]
+
+    def test_cache_written_and_reused(self):
+        self.assertEqual(self.result(), 1)
+        cache = loader.cache_path(self.path)
+        self.assertTrue(os.path.isfile(cache))
+        # A valid header is trusted: the cached code runs, not the source
+        with open(cache, "rb") as f:
+            header = f.read(loader._HEADER.size)
+        with open(cache, "wb") as f:
+            f.write(header + marshal.dumps(compile("RESULT = 'cached'", self.path, "exec")))
+        self.assertEqual(self.result(), "cached")
+
+    def test_recompiled_when_stale_or_broken(self):
+        self.result()
+        cache = loader.cache_path(self.path)
+        for name, files, expected in (("source edited", {"hook.py": "RESULT = 22\n"}, 22),
+                                      ("same size", {"hook.py": "RESULT = 33\n"}, 33),
+                                      ("cache truncated", {cache: "HKC1"}, 33),
+                                      ("cache garbage", {cache: "x" * 64}, 33)):
+            with self.subTest(name):
+                st = os.stat(self.path)
+                self.write(self.tmp, files)
+                if "hook.py" in files:  # a later mtime, even on a coarse clock
+                    os.utime(self.path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+                self.assertEqual(self.result(), expected)
+                self.assertEqual(self.result(), expected)  # and from the rewritten cache
+
+    def test_no_cache_without_bytecode_writes(self):
+        with mock.patch.object(sys, "dont_write_bytecode", True):
+            self.assertEqual(self.result(), 1)
+        self.assertFalse(os.path.exists(loader.cache_path(self.path)))
+
+
+class TestResolve(IsolatedCase):
+    def setUp(self):
+        super().setUp()
+        claude = os.path.join(self.tmp, ".claude")
+        self.write(claude, {
+            "skills/hook-runtime/scripts/hook-dispatch.py": "",
+            "skills/dev-loop/scripts/stop-dev-loop.py": "",
+            "skills/hook-runtime/scripts/report.py": "",
+            "skills/aaa/scripts/report.py": "",
+            "scripts/preToolUse-block-gh-issue.py": "",
+        })
+        for name, value in (("CLAUDE_DIR", claude),
+                            ("RUNTIME_DIR", os.path.join(claude, "skills", "hook-runtime"))):
+            patcher = mock.patch.object(hooklib, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.claude = claude
+
+    def test_by_name(self):
+        for name, expected in (
+                ("hook-dispatch", "skills/hook-runtime/scripts/hook-dispatch.py"),
+                ("stop-dev-loop.py", "skills/dev-loop/scripts/stop-dev-loop.py"),
+                ("report", "skills/hook-runtime/scripts/report.py"),  # hook-runtime first
+                ("preToolUse-block-gh-issue", "scripts/preToolUse-block-gh-issue.py")):
+            with self.subTest(name):
+                self.assertEqual(loader.resolve(name), os.path.join(self.claude, expected))
+        self.assertIsNone(loader.resolve("missing"))
+
+    def test_by_path(self):
+        path = os.path.join(self.claude, "scripts", "preToolUse-block-gh-issue.py")
+        self.assertEqual(loader.resolve(path), path)
+        self.assertIsNone(loader.resolve(os.path.join(self.tmp, "missing.py")))
+
+    def test_main_runs_as_main_with_argv(self):
+        out = os.path.join(self.tmp, "out")
+        self.write(self.claude, {"scripts/echo-hook.py": (
+            "import sys\n"
+            f"if __name__ == '__main__':\n    open({out!r}, 'w').write(' '.join(sys.argv[1:]))\n"
+            "    sys.exit(2)\n")})
+        with mock.patch.object(sys, "argv", list(sys.argv)):
+            with self.assertRaises(SystemExit) as raised:
+                loader.main(["echo-hook", "PreToolUse", "x"])
+        self.assertEqual(raised.exception.code, 2)
+        with open(out) as f:
+            self.assertEqual(f.read(), "PreToolUse x")
+
+
+if __name__ == "__main__":
+    unittest.main()
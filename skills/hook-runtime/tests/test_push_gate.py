@@ -0,0 +1,104 @@
+"""Push gate end to end: mark-code-edits, mark-tests-run, then block-push-without-tests."""
+import os
+import unittest
+
+from hooktest import IsolatedCase, git
+
+from hooklib import testruns
+
+EDITS = "dev-loop/scripts/postToolUse-mark-code-edits.py"
+TESTS_RUN = "dev-loop/scripts/postToolUse-mark-tests-run.py"
+GATE = "dev-loop/scripts/preToolUse-block-push-without-tests.py"
+
+
+class TestPushGate(IsolatedCase):
+    def setUp(self):
+        super().setUp()
+        self.cwd = self.repo({"app.py": "x = 1\n"})
+        self.write(self.cwd, {"app.py": "x = 2\n"})
+        self.event("PostToolUse", EDITS, "Edit", file_path=os.path.join(self.cwd, "app.py"))
+        git(self.cwd, "commit", "-qam", "change")
+
+    def event(self, name, script, tool, **tool_input):
+        return self.hook(script, {"session_id": "s1", "hook_event_name": name,
+                                  "tool_name": tool, "tool_input": tool_input}, self.cwd)
+
+    def push(self):
+        return self.event("PreToolUse", GATE, "Bash", command="git push origin main")
+
+    def test_untested_push_blocked(self):
+        proc = self.push()
+        self.assertEqual(proc.returncode, 2)
+        self.assertIn("no passing test run", proc.stderr)
+
+    def test_tested_push_allowed(self):
+        self.event("PostToolUse", TESTS_RUN, "Bash", command="npm test")
+        self.assertEqual(self.push().returncode, 0)
+
+    def test_filtered_run_blocks(self):
+        self.event("PostToolUse", TESTS_RUN, "Bash", command="pytest -k login")
+        proc = self.push()
+        self.assertEqual(proc.returncode, 2)
+        self.assertIn("was filtered by test name", proc.stderr)
+
+    def test_untracked_file_does_not_block(self):
+        self.write(self.cwd, {"notes.log": "scratch\n"})
+        self.event("PostToolUse", TESTS_RUN, "Bash", command="npm test")
+        self.assertEqual(self.push().returncode, 0)
+
+    def test_tracked_change_after_run_blocks(self):
+        self.event("PostToolUse", TESTS_RUN, "Bash", command="npm test")
+        self.write(self.cwd, {"app.py": "x = 3\n"})
+        git(self.cwd, "commit", "-qam", "untested")
+        self.assertEqual(self.push().returncode, 2)
+
+    def test_worktree_tree_ignores_untracked(self):
+        self.write(self.cwd, {"notes.log": "scratch\n"})
+        head = git(self.cwd, "rev-parse", "HEAD^{tree}")
+        self.assertEqual(testruns.worktree_tree(self.cwd), head)
+        self.write(self.cwd, {"app.py": "x = 4\n"})
+        self.assertNotEqual(testruns.worktree_tree(self.cwd), head)
+
+    def test_same_size_edit_in_index_second(self):
+        # The index and the file share a timestamp, so only git's racy-clean
+        # check sees the edit; a copied index with a fresh mtime hid it
+        stamp = 1_700_000_000
+        os.utime(os.path.join(self.cwd, "app.py"), (stamp, stamp))
+        git(self.cwd, "update-index", "-q", "--refresh")
+        os.utime(os.path.join(self.cwd, ".git", "index"), (stamp, stamp))
+        self.write(self.cwd, {"app.py": "x = 9\n"})
+        os.utime(os.path.join(self.cwd, "app.py"), (stamp, stamp))
+        self.assertNotEqual(testruns.worktree_tree(self.cwd),
+                            git(self.cwd, "rev-parse", "HEAD^{tree}"))
+
+
+class TestNarrowedPushGate(IsolatedCase):
+    """Narrowed runs are checked against what the pushed ref changes, not
+    against the session's Edit/Write calls."""
+
+    def setUp(self):
+        super().setUp()
+        origin = os.path.join(self.tmp, "origin.git")
+        git(self.tmp, "init", "-q", "--bare", origin)
+        self.cwd = self.repo({
+            "src/__init__.py": "", "src/a.py": "A = 1\n", "src/b.py": "B = 1\n",
+            "tests/test_a.py": "from src.a import A\n", "tests/test_b.py": "from src.b import B\n",
+        })
+        git(self.cwd, "remote", "add", "origin", origin)
+        git(self.cwd, "push", "-q", "-u", "origin", "main")
+        self.write(self.cwd, {"src/a.py": "A = 2\n", "src/b.py": "B = 2\n"})  # b: via sed
+        self.event("PostToolUse", EDITS, "Edit", file_path=os.path.join(self.cwd, "src/a.py"))
+        git(self.cwd, "commit", "-qam", "change a and b")
+
+    event = TestPushGate.event
+    push = TestPushGate.push
+
+    def test_file_changed_outside_edit_needs_its_tests(self):
+        self.event("PostToolUse", TESTS_RUN, "Bash", command="pytest tests/test_a.py")
+        self.assertEqual(self.push().returncode, 2)
+        self.event("PostToolUse", TESTS_RUN, "Bash", command="pytest tests/test_b.py")
+        self.assertEqual(self.push().returncode, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+"""rules.json: the guardrails it replaced still block and allow the same calls."""
+import os
+import unittest
+from unittest import mock
+
+from hooktest import SKILLS, IsolatedCase
+
+from hooklib import rules
+
+RULES_JSON = os.path.join(SKILLS, "hook-runtime", "rules.json")
+PROD_SCRIPT = "import { neon } from 'x'\nconst sql = neon(process.env.PROD_DATABASE_URL)\n"
+
+# (tool, tool_input) -> names of the rules that fire
+CASES = [
+    # raw-sql-writes
+    ("Bash", {"command": "psql \"$DB\" -c \"UPDATE org_hooks SET active = false\""},
+     ["raw-sql-writes"]),
+    ("Bash", {"command": "psql -c \"/* --sql-write-confirmed */ UPDATE t SET a = 1\""}, []),
+    ("Bash", {"command": "psql -c 'SELECT * FROM users'"}, []),
+    ("Bash", {"command": "git commit -m 'psql: UPDATE docs'"}, []),
+    # rclone
+    ("Bash", {"command": "rclone lsf gdrive:"}, ["rclone"]),
+    ("Bash", {"command": "cd /tmp && sudo rclone copy a gdrive:b"}, ["rclone"]),
+    ("Bash", {"command": "rclone lsf gdrive: #RCLONE-FALLBACK-APPROVED"}, []),
+    ("Bash", {"command": "echo 'rclone is a fallback'"}, []),
+    # prod-bypass
+    ("Write", {"file_path": "/r/scripts/fix.ts", "content": PROD_SCRIPT}, ["prod-bypass"]),
+    ("Edit", {"file_path": "/r/src/a.mjs", "old_string": "x", "new_string": PROD_SCRIPT},
+     ["prod-bypass"]),
+    ("Write", {"file_path": "/r/scripts/migrate.ts", "content": PROD_SCRIPT}, []),
+    ("Write", {"file_path": "/r/fix.py", "content": PROD_SCRIPT}, []),
+    ("Write", {"file_path": "/r/a.ts", "content": "const c = new Client()\n"}, []),
+    # knowledge-files (block_once: see TestBlockOnce)
+    ("Edit", {"file_path": "/r/CLAUDE.md", "old_string": "a", "new_string": "b"},
+     ["knowledge-files"]),
+    ("Write", {"file_path": "/r/skills/x/SKILL.md", "content": "x"}, ["knowledge-files"]),
+    ("Edit", {"file_path": "/r/README.md", "old_string": "a", "new_string": "b"}, []),
+    # message-drafting-reminder
+    ("mcp__gmail__send_email", {"to": "a@example.com"}, ["message-drafting-reminder"]),
+    ("mcp__google-workspace__gmail_createDraft", {}, ["message-drafting-reminder"]),
+    ("mcp__google-workspace__gmail_search", {"query": "x"}, []),
+    ("Read", {"file_path": "/r/CLAUDE.md"}, []),
+]
+
+
+class TestRules(IsolatedCase):
+    def setUp(self):
+        super().setUp()
+        self.ruleset = rules.load(RULES_JSON)
+
+    def test_baseline(self):
+        for tool, tool_input, expected in CASES:
+            with self.subTest(tool=tool, tool_input=tool_input):
+                fired = self.ruleset.evaluate({"tool_name": tool, "tool_input": tool_input,
+                                               "cwd": self.tmp})
+                self.assertEqual([rule.name for rule, _, _ in fired], expected)
+
+    def test_scan_file_finds_the_other_group(self):
+        # The edit adds only the client; the prod reference is already in the file
+        path = os.path.join(self.tmp, "seed.ts")
+        self.write(self.tmp, {"seed.ts": "const url = process.env.PROD_DATABASE_URL\n"})
+        data = {"tool_name": "Edit", "tool_input": {
+            "file_path": path, "old_string": "x", "new_string": "const sql = neon(url)"}}
+        self.assertEqual([r.name for r, _, _ in self.ruleset.evaluate(data)], ["prod-bypass"])
+
+    def test_block_message_and_warning(self):
+        code, message = rules.run({"tool_name": "Bash", "tool_input": {
+            "command": "psql -c 'DELETE FROM t'"}}, self.ruleset)
+        self.assertEqual(code, 2)
+        self.assertIn("DELETE statement", message)
+        self.assertIn("--sql-write-confirmed", message)
+        code, message = rules.run({"tool_name": "mcp__gmail__draft_email",
+                                   "tool_input": {}}, self.ruleset)
+        self.assertEqual(code, 0)
+        self.assertIn("message-drafting skill", message)
+
+
+class TestBlockOnce(IsolatedCase):
+    def setUp(self):
+        super().setUp()
+        self.ruleset = rules.load(RULES_JSON)
+        patcher = mock.patch("hooklib.state.open_store", return_value=self.store())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def edit(self, session, name="CLAUDE.md"):
+        return rules.run({"session_id": session, "tool_name": "Edit", "tool_input": {
+            "file_path": f"/r/{name}", "old_string": "a", "new_string": "b"}}, self.ruleset)
+
+    def test_blocks_first_attempt_per_session_and_file(self):
+        code, message = self.edit("s1")
+        self.assertEqual(code, 2)
+        self.assertIn("You are trying to edit CLAUDE.md", message)
+        self.assertEqual(self.edit("s1"), (0, ""))
+        self.assertEqual(self.edit("s1", "SKILL.md")[0], 2)
+        self.assertEqual(self.edit("s2")[0], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
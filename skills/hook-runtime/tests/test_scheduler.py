@@ -0,0 +1,79 @@
+"""Dispatch scheduler: handler templates, worktrees and branches per issue."""
+import os
+import unittest
+
+from hooktest import IsolatedCase, git
+
+from hooklib import scheduler
+
+VALUES = {"number": "71", "title": "Role dropdown's label", "branch": "issue/71-role",
+          "worktree": "/tmp/repo.worktrees/issue-71"}
+
+
+class TestHandlerCommand(unittest.TestCase):
+    def test_placeholders_quoted(self):
+        self.assertEqual(scheduler.handler_command("./fix.sh {number} {title}", VALUES),
+                         "./fix.sh 71 'Role dropdown'\"'\"'s label'")
+
+    def test_other_braces_untouched(self):
+        for template in ("echo ${ISSUE_NUMBER}", "awk '{print $1}' f", "find . -exec rm {} +",
+                         "echo {0} {missing}"):
+            self.assertEqual(scheduler.handler_command(template, VALUES), template)
+
+
+class TestScheduler(IsolatedCase):
+    def test_shell_braces_in_handler(self):
+        repo = self.repo({"README.md": "x\n"})
+        handler = ("echo ${ISSUE_NUMBER} > n-${ISSUE_NUMBER}.txt"
+                   " && awk '{print $1}' n-{number}.txt")
+        issues = [scheduler.Issue(1, "one", ["a"]), scheduler.Issue(2, "two", ["b"])]
+        sched = scheduler.Scheduler(repo, issues, handler, parallel=2)
+        sched.run()
+        for issue in sched.issues:
+            self.assertEqual(issue.status, "done", issue.note)
+            self.assertEqual(git(repo, "show", f"{issue.branch}:n-{issue.number}.txt"),
+                             str(issue.number))
+        scheduler.remove_worktrees(repo, scheduler.load_state(repo))
+        self.assertFalse(os.path.isdir(sched.issues[0].worktree))
+
+    def run_queue(self, handler, issues, parallel=2):
+        repo = self.repo({"lines.txt": "".join(f"line {n}\n" for n in range(1, 11))})
+        sched = scheduler.Scheduler(repo, issues, handler, parallel=parallel)
+        return repo, {i.number: i for i in sched.run(poll=0.05)}
+
+    def test_expected_overlap_stacked(self):
+        handler = 'echo "#$ISSUE_NUMBER" >> "$ISSUE_TITLE"'  # the title names the file
+        repo, done = self.run_queue(handler, [scheduler.Issue(1, "lines.txt", ["lines.txt"]),
+                                              scheduler.Issue(2, "lines.txt", ["lines.txt"]),
+                                              scheduler.Issue(3, "other.txt", ["other.txt"])])
+        self.assertEqual([done[n].status for n in (1, 2, 3)], ["done"] * 3)
+        self.assertEqual((done[2].after, done[3].after), ([1], []))
+        self.assertGreaterEqual(done[2].started, done[1].finished)
+        self.assertLess(done[3].started, done[1].finished)  # ran alongside #1
+        self.assertEqual(git(repo, "show", f"{done[2].branch}:lines.txt").splitlines()[-2:],
+                         ["#1", "#2"])
+
+    def test_late_overlap_rebased_in_finishing_order(self):
+        # Both touch lines.txt without saying so; #9 finishes second
+        handler = ('sed -i "${ISSUE_NUMBER}s/.*/issue ${ISSUE_NUMBER}/" lines.txt'
+                   ' && sleep 0.$ISSUE_NUMBER')
+        repo, done = self.run_queue(handler, [scheduler.Issue(9, "late"),
+                                              scheduler.Issue(1, "early")])
+        self.assertEqual((done[1].status, done[9].status), ("done", "done"))
+        self.assertEqual((done[1].after, done[9].after), ([], [1]))
+        lines = git(repo, "show", f"{done[9].branch}:lines.txt").splitlines()
+        self.assertEqual((lines[0], lines[8]), ("issue 1", "issue 9"))
+
+    def test_conflicting_overlap_and_failures(self):
+        handler = ('[ $ISSUE_NUMBER != 3 ] || exit 4; '
+                   'sed -i "1s/.*/issue ${ISSUE_NUMBER}/" lines.txt && sleep 0.$ISSUE_NUMBER')
+        repo, done = self.run_queue(handler, [scheduler.Issue(n) for n in (1, 2, 3)], 3)
+        self.assertEqual([done[n].status for n in (1, 2, 3)], ["done", "conflict", "failed"])
+        self.assertIn("#1", done[2].note)
+        self.assertEqual(done[3].note, "handler exited 4")
+        state = scheduler.load_state(repo)
+        self.assertEqual([i["status"] for i in state["issues"]], ["done", "conflict", "failed"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+"""Test shards: timing-balanced plans, history, and the run shard-tests.py records."""
+import json
+import os
+import unittest
+
+from hooktest import IsolatedCase
+
+from hooklib import shards, testruns
+
+SHARD_TESTS = "dev-loop/scripts/shard-tests.py"
+
+
+class TestShardRecord(IsolatedCase):
+    def test_whole_suite_recorded_as_its_files(self):
+        # pytest also collects check_*.py here, which the import graph does not
+        # know about: the run proves the files it ran, not the full suite
+        repo = self.repo({
+            "pytest.ini": "[pytest]\npython_files = test_*.py check_*.py\n",
+            "tests/test_a.py": "def test_a():\n    pass\n",
+            "tests/check_b.py": "def test_b():\n    pass\n",
+        })
+        proc = self.hook(SHARD_TESTS, {}, repo, "--shards", "1")
+        self.assertEqual(proc.returncode, 0, proc.stderr)
+        run = testruns.last_run(repo, testruns.worktree_tree(repo), self.store())
+        self.assertEqual((run["status"], run["scope"]), (0, ["tests/test_a.py"]))
+
+    def test_failing_shard_fails_the_run(self):
+        repo = self.repo({
+            "tests/test_a.py": "def test_a():\n    pass\n",
+            "tests/test_b.py": "def test_b():\n    assert False\n",
+            "tests/test_c.py": "def test_c():\n    pass\n",
+        })
+        proc = self.hook(SHARD_TESTS, {}, repo, "--shards", "2")
+        self.assertNotEqual(proc.returncode, 0)
+        run = testruns.last_run(repo, testruns.worktree_tree(repo), self.store())
+        self.assertNotEqual(run["status"], 0)
+        history = shards.History.load(repo)
+        self.assertEqual(sorted(history.files), [f"pytest:tests/test_{n}.py" for n in "abc"])
+
+
+class Graph:
+    """The one part of impact.Graph plan() uses."""
+
+    def __init__(self, runners):
+        self.runners = runners
+
+    def runner(self, rel):
+        return self.runners[rel]
+
+
+JEST, PYTEST = ("jest", "", None), ("pytest", "", None)
+
+
+class TestPlan(unittest.TestCase):
+    def history(self, files, startup=None):
+        return shards.History("/nonexistent", files, startup)
+
+    def test_longest_first_onto_the_earliest_shard(self):
+        seconds = {"a": 8, "b": 7, "c": 6, "d": 5, "e": 4, "f": 2}
+        history = self.history({f"pytest:{rel}": s for rel, s in seconds.items()})
+        planned = shards.plan(Graph(dict.fromkeys(seconds, PYTEST)), list(seconds), history, 3)
+        self.assertEqual([(s.files, s.estimate) for s in planned],
+                         [(["a", "f"], 10), (["b", "e"], 11), (["c", "d"], 11)])
+
+    def test_startup_counted_once_per_runner_and_shard(self):
+        # Both jest files cost a start-up on a second shard; together they fit on one
+        runners = {"j1": JEST, "j2": JEST, "p1": PYTEST}
+        history = self.history({"jest:j1": 1, "jest:j2": 1, "pytest:p1": 4}, {"jest": 3})
+        planned = shards.plan(Graph(runners), list(runners), history, 2)
+        self.assertEqual([(s.files, s.estimate) for s in planned],
+                         [(["p1"], 4), (["j1", "j2"], 5)])
+
+    def test_never_more_shards_than_files(self):
+        history = self.history({})
+        planned = shards.plan(Graph({"a": PYTEST}), ["a"], history, 8)
+        self.assertEqual([s.files for s in planned], [["a"]])
+
+    def test_unknown_files_estimated_from_their_runner(self):
+        history = self.history({"pytest:a": 2, "pytest:b": 4, "pytest:c": 9, "jest:j": 7})
+        self.assertEqual(history.estimate("pytest", "new"), 4)
+        self.assertEqual(history.estimate("vitest", "new"), shards.DEFAULT_SECONDS)
+
+
+class TestHistory(IsolatedCase):
+    def test_update_blends_and_saves(self):
+        path = os.path.join(self.tmp, shards.TIMINGS_NAME)
+        history = shards.History(path, {"pytest:a": 4.0})
+        command = {"runner": "pytest", "status": 0, "seconds": 7.0,
+                   "files": {"a": {"seconds": 2.0}, "b": {"seconds": 3.0}}}
+        history.update([{"commands": [command]}])
+        with open(path, encoding="utf-8") as f:
+            saved = json.load(f)
+        self.assertEqual(saved, {"version": shards.VERSION,
+                                 "files": {"pytest:a": 3.0, "pytest:b": 3.0},
+                                 "startup": {"pytest": 2.0}})
+        # A failed command's overhead says nothing about start-up
+        history.update([{"commands": [dict(command, status=1, seconds=60.0)]}])
+        self.assertEqual(history.startup, {"pytest": 2.0})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+"""Bash tokenizer: the programs a command would run, and their arguments."""
+import unittest
+
+import hooktest  # noqa: F401  (puts hooklib on sys.path)
+from hooklib import shell
+
+# command -> [(program, args)] in parse order (outer command before its substitutions)
+CASES = [
+    # quoting: programs named inside quotes are arguments, not invocations
+    ("git commit -m 'drop psql usage'", [("git", ["commit", "-m", "drop psql usage"])]),
+    ('git commit -m "run git push later"', [("git", ["commit", "-m", "run git push later"])]),
+    ("echo 'a'\"b\"c\\ d", [("echo", ["abc d"])]),
+    ("echo $'it\\'s'", [("echo", ["it's"])]),
+    ("echo 'git push' # git push", [("echo", ["git push"])]),
+    # substitutions run their commands
+    ("echo $(git push)", [("echo", ["$(git push)"]), ("git", ["push"])]),
+    ('echo "$(git push origin)"', [("echo", ["$(git push origin)"]), ("git", ["push", "origin"])]),
+    ("echo `git push`", [("echo", ["`git push`"]), ("git", ["push"])]),
+    ("diff <(git show a) <(git show b)",
+     [("diff", ["<(git show a)", "<(git show b)"]), ("git", ["show", "a"]),
+      ("git", ["show", "b"])]),
+    ("echo $((1 + 2))", [("echo", ["$((1 + 2))"])]),
+    # parameter expansions: text, but a substitution in the operand runs
+    ("echo ${x:-$(git push)}", [("echo", ["${x:-$(git push)}"]), ("git", ["push"])]),
+    ('echo "${x:-$(git push)}"', [("echo", ["${x:-$(git push)}"]), ("git", ["push"])]),
+    ("echo ${x:-`git push`}", [("echo", ["${x:-`git push`}"]), ("git", ["push"])]),
+    ("echo ${a:-${b:-$(rm x)}}", [("echo", ["${a:-${b:-$(rm x)}}"]), ("rm", ["x"])]),
+    ("echo ${x:-'$(rm x)'}", [("echo", ["${x:-'$(rm x)'}"])]),
+    ('echo "${x:-it\'s}" && ls', [("echo", ["${x:-it's}"]), ("ls", [])]),
+    ("echo ${#x} ${x//a/b}", [("echo", ["${#x}", "${x//a/b}"])]),
+    # heredocs: the body is stdin, substitutions in an unquoted body run
+    ("psql <<SQL\ndelete from t;\nSQL\nls", [("psql", []), ("ls", [])]),
+    ("cat <<EOF\n$(git push)\nEOF", [("cat", []), ("git", ["push"])]),
+    ("cat <<EOF\n`git push`\nEOF", [("cat", []), ("git", ["push"])]),
+    ("cat <<'EOF'\n$(git push)\nEOF", [("cat", [])]),
+    ("cat <<-EOF\n\tgit push\n\tEOF\necho", [("cat", []), ("echo", [])]),
+    ("psql <<< 'drop table t'", [("psql", [])]),
+    # prefixes and wrappers
+    ("env FOO=1 git push", [("git", ["push"])]),
+    ("command git push", [("git", ["push"])]),
+    ("A=1 B=2 git push", [("git", ["push"])]),
+    ("sudo -u deploy timeout 30 git push", [("git", ["push"])]),
+    ("bash -c 'git push origin'", [("bash", ["-c", "git push origin"]),
+                                   ("git", ["push", "origin"])]),
+    ("eval git push", [("eval", ["git", "push"]), ("git", ["push"])]),
+    # chains, pipes, groups and reserved words
+    ("npm test && git push", [("npm", ["test"]), ("git", ["push"])]),
+    ("npm test; git push", [("npm", ["test"]), ("git", ["push"])]),
+    ("git log | grep fix | head -1", [("git", ["log"]), ("grep", ["fix"]), ("head", ["-1"])]),
+    ("make || (cd x && git push)", [("make", []), ("cd", ["x"]), ("git", ["push"])]),
+    ("{ ls; pwd; } > out", [("ls", []), ("pwd", [])]),
+    ("if true; then git push; fi", [("true", []), ("git", ["push"])]),
+    ("git push \\\n  origin main", [("git", ["push", "origin", "main"])]),
+    ("sleep 1 & git push", [("sleep", ["1"]), ("git", ["push"])]),
+]
+
+
+class TestParse(unittest.TestCase):
+    def test_invocations(self):
+        for command, expected in CASES:
+            with self.subTest(command=command):
+                got = [(i.program, i.args) for i in shell.parse(command).invocations]
+                self.assertEqual(got, expected)
+
+    def test_pipeline_and_stdin(self):
+        script = shell.parse("printf 'x' | psql <<SQL\ndelete from t;\nSQL")
+        psql = script.find("psql")[0]
+        self.assertEqual([i.program for i in script.upstream(psql)], ["printf"])
+        self.assertEqual(psql.stdin, ["delete from t;"])
+
+    def test_env_and_depth(self):
+        script = shell.parse("PGHOST=prod psql -c \"$(cat q.sql)\"")
+        psql, cat = script.invocations
+        self.assertEqual((psql.env, psql.depth, cat.depth), ({"PGHOST": "prod"}, 0, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
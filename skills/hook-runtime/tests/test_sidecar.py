@@ -0,0 +1,117 @@
+"""Transcript sidecar: the same rows as decoding the JSONL, across appends and rewrites."""
+import json
+import os
+import unittest
+from unittest import mock
+
+from hooktest import IsolatedCase
+
+from hooklib import sidecar
+
+
+def turn(n):
+    return [
+        {"type": "user", "timestamp": f"t{n}", "message": {"content": f"prompt {n}"}},
+        {"type": "assistant", "message": {"content": [
+            {"type": "text", "text": f"editing {n}"},
+            {"type": "tool_use", "id": f"w{n}", "name": "Write",
+             "input": {"file_path": f"/r/f{n}.py", "content": "x" * 100}},
+            {"type": "tool_use", "id": f"b{n}", "name": "Bash",
+             "input": {"command": f"pytest -k {n}"}}]}},
+        {"type": "user", "message": {"content": [
+            {"type": "tool_result", "tool_use_id": f"w{n}", "content": "ok"},
+            {"type": "tool_result", "tool_use_id": f"b{n}", "is_error": True,
+             "content": [{"type": "text", "text": f"failed {n}"}]}]},
+         "toolUseResult": {"stdout": "y" * 1000}},
+    ]
+
+
+def reference(path):
+    """Rows from json.loads of every line."""
+    rows, names, offset = [], sidecar._ToolNames(), 0
+    with open(path, "rb") as f:
+        for seq, line in enumerate(f, 1):
+            rows += sidecar.entry_rows(json.loads(line), seq, offset, len(line), names)
+            offset += len(line)
+    return [sidecar.Row(*row) for row in rows]
+
+
+class TestSidecar(IsolatedCase):
+    def setUp(self):
+        super().setUp()
+        self.jsonl = os.path.join(self.tmp, "session.jsonl")
+        self.cols = sidecar.sidecar_path(self.jsonl)
+
+    def append(self, entries, mode="a"):
+        with open(self.jsonl, mode, encoding="utf-8") as f:
+            f.writelines(json.dumps(e) + "\n" for e in entries)
+
+    def check(self, groups):
+        with sidecar.load(self.jsonl, refresh=False) as sc:
+            self.assertEqual(list(sc.rows()), reference(self.jsonl))
+            self.assertEqual((len(sc.groups), sc.intact), (groups, True))
+
+    def test_rows_and_queries(self):
+        self.append(turn(1) + [{"type": "summary", "summary": "done"}])
+        with sidecar.load(self.jsonl) as sc:
+            self.assertEqual(list(sc.rows()), reference(self.jsonl))
+            self.assertEqual([r.command for r in sc.rows(kind="tool_use", tool="Bash")],
+                             ["pytest -k 1"])
+            self.assertEqual(list(sc.values("file_path", kind="tool_use")), ["/r/f1.py", ""])
+            self.assertEqual(list(sc.values("tool", "text", kind="tool_error")),
+                             [("Bash", "failed 1")])
+            self.assertEqual(sc.column("kind")[-1], "")
+            error = next(i for i, kind in enumerate(sc.column("kind")) if kind == "tool_error")
+            self.assertEqual(sc.payload(error)["toolUseResult"], {"stdout": "y" * 1000})
+            with self.assertRaises(KeyError):
+                list(sc.rows(nope=1))
+
+    def test_appends_add_groups(self):
+        self.append(turn(1))
+        self.assertEqual(sidecar.update(self.jsonl), 6)
+        # The result answering w1 comes in a later group than its tool_use
+        self.append(turn(2)[:2])
+        self.append([turn(1)[2]] + turn(2)[2:])
+        sidecar.update(self.jsonl)
+        self.assertEqual(sidecar.update(self.jsonl), 0)
+        self.check(groups=2)
+        with sidecar.load(self.jsonl) as sc:
+            self.assertEqual(list(sc.values("tool", tool_id="w1", kind="tool_result")),
+                             ["Write", "Write"])
+
+    def test_compacted_past_max_groups(self):
+        with mock.patch.object(sidecar, "MAX_GROUPS", 3):
+            for n in range(5):
+                self.append(turn(n))
+                sidecar.update(self.jsonl)
+        self.check(groups=2)
+
+    def test_rewritten_jsonl_rebuilt(self):
+        self.append(turn(1) + turn(2))
+        sidecar.update(self.jsonl)
+        self.append([{"type": "summary", "summary": "compacted"}] + turn(3), mode="w")
+        sidecar.update(self.jsonl)
+        self.check(groups=1)
+
+    def test_torn_write_rebuilt(self):
+        self.append(turn(1))
+        sidecar.update(self.jsonl)
+        with open(self.cols, "ab") as f:
+            f.write(b"CSRG\x05\x00")
+        with sidecar.load(self.jsonl, refresh=False) as sc:
+            self.assertFalse(sc.intact)
+        self.append(turn(2))
+        sidecar.update(self.jsonl)
+        self.check(groups=1)
+
+    def test_not_a_sidecar(self):
+        self.write(self.tmp, {"session.cols": "not a sidecar"})
+        with self.assertRaises(sidecar.SidecarError):
+            sidecar.Sidecar(self.cols)
+        self.append(turn(1))
+        sidecar.update(self.jsonl)
+        self.check(groups=1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+"""Single-pass phrase signals: same flags as a substring check per phrase."""
+import random
+import unittest
+
+import hooktest  # noqa: F401  (puts hooklib on sys.path)
+from hooklib import signals
+
+TABLE = {
+    "tests_run": ["npm test", "playwright", ("passed", "test")],
+    "committed": ["git commit", "committed"],
+    "deployed": ["vercel --prod", ("deploy", "succeeded")],
+    "qa": ["qa submission", "submitted for qa"],
+}
+# Enough phrases that scans take the combined regex rather than str.find
+WIDE = {f"s{n}": [f"phrase number {n}", (f"left {n}", f"right {n}")] for n in range(20)}
+
+
+def reference(table, text):
+    text = text.lower()
+    return {name: any(all(p.lower() in text for p in ((alt,) if isinstance(alt, str) else alt))
+                      for alt in alternatives)
+            for name, alternatives in table.items()}
+
+
+def flags(table, blocks):
+    scanner = signals.SignalSet(table).scanner()
+    for block in blocks:
+        scanner.scan(block)
+    return scanner.flags()
+
+
+class TestSignals(unittest.TestCase):
+    def test_phrases_and_groups(self):
+        for text, expected in (
+                ("Ran NPM TEST", {"tests_run"}),
+                ("12 passed in the test suite", {"tests_run"}),
+                ("12 passed", set()),
+                ("git committed the change", {"committed"}),
+                ("deploy succeeded", {"deployed"}),
+                ("Submitted for QA after git commit", {"qa", "committed"})):
+            with self.subTest(text=text):
+                got = flags(TABLE, [text])
+                self.assertEqual({k for k, v in got.items() if v}, expected)
+
+    def test_groups_across_blocks(self):
+        self.assertTrue(flags(TABLE, ["deploy started", "...", "Succeeded"])["deployed"])
+
+    def test_same_as_reference(self):
+        rng = random.Random(7)
+        words = ["phrase", "number", "left", "right", "passed", "test", "npm", "git", "commit",
+                 "committed", "deploy", "succeeded", "qa", "for"] + [str(n) for n in range(20)]
+        for table in (TABLE, WIDE, dict(TABLE, **WIDE)):
+            for _ in range(60):
+                text = " ".join(rng.choice(words) for _ in range(rng.randint(0, 40)))
+                with self.subTest(text=text):
+                    self.assertEqual(flags(table, [text]), reference(table, text))
+
+    def test_phrase_across_window_and_chunks(self):
+        # A phrase straddling the lowercasing window, or two separately read chunks
+        text = "x" * (signals.WINDOW - 4) + "Playwright" + "y" * signals.WINDOW
+        self.assertTrue(flags(TABLE, [text])["tests_run"])
+        scanner = signals.SignalSet(WIDE).scanner()
+        scanner.scan_chunks(["... phrase num", "ber 7 ..."])
+        self.assertTrue(scanner.flags()["s7"])
+
+    def test_resume_and_done(self):
+        table = signals.SignalSet(TABLE)
+        first = table.scanner()
+        first.scan("12 passed")
+        resumed = table.scanner(first.seen)
+        resumed.scan("test run")
+        self.assertTrue(resumed.flags()["tests_run"])
+        resumed.scan("git commit, vercel --prod, qa submission")
+        self.assertTrue(resumed.done)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+"""SQL reaching a SQL CLI: first_write classifies every source, reads vs writes."""
+import os
+import unittest
+
+from hooktest import IsolatedCase
+
+from hooklib import sql
+
+# command -> kind of the first write statement, or None
+CASES = [
+    # -c / -e text
+    ("psql -c 'UPDATE users SET a = 1'", "UPDATE"),
+    ("psql -c 'SELECT 1'", None),
+    ("mysql -e 'DELETE FROM t'", "DELETE"),
+    ("sqlite3 db.sqlite 'drop table t'", "DROP"),
+    ("psql -c 'select 1; insert into t values (1)'", "INSERT"),
+    # heredocs and here-strings
+    ("psql <<SQL\nSELECT 1;\nDELETE FROM t;\nSQL", "DELETE"),
+    ("psql <<'SQL'\nselect * from t;\nSQL", None),
+    ("psql \"$DB\" <<-EOF\n\tTRUNCATE audit;\n\tEOF", "TRUNCATE"),
+    ("psql <<< 'ALTER TABLE t ADD c int'", "ALTER"),
+    ("echo 'DELETE FROM t' | psql", "DELETE"),
+    # shell variables the command expands
+    ("SQL='UPDATE t SET a = 1'; psql -c \"$SQL\"", "UPDATE"),
+    ("export SQL=\"select 1\" && psql -c \"$SQL\"", None),
+    ("SQL='DELETE FROM t'; echo \"$SQL\"", None),
+    # \copy: a write only FROM a file
+    ("psql -c \"\\copy users FROM 'u.csv' CSV\"", "COPY"),
+    ("psql -c \"\\copy users TO 'u.csv' CSV\"", None),
+    ("psql -c \"COPY (SELECT * FROM t) TO STDOUT\"", None),
+    ("psql -c \"COPY t (a, b) FROM STDIN\"", "COPY"),
+    # SELECT ... FOR UPDATE and friends are reads
+    ("psql -c 'SELECT * FROM t FOR UPDATE'", None),
+    ("psql -c 'SELECT * FROM t FOR NO KEY UPDATE SKIP LOCKED'", None),
+    ("psql -c 'WITH x AS (SELECT 1) SELECT * FROM x'", None),
+    ("psql -c 'WITH d AS (DELETE FROM t RETURNING *) SELECT * FROM d'", "DELETE"),
+    ("psql -c 'EXPLAIN UPDATE t SET a = 1'", None),
+    ("psql -c 'EXPLAIN ANALYZE UPDATE t SET a = 1'", "UPDATE"),
+    # write keywords in strings, identifiers and comments are not statements
+    ("psql -c \"SELECT 'DELETE FROM t' AS s\"", None),
+    ("psql -c \"SELECT \\\"update\\\" FROM t\"", None),
+    ("psql -c \"SELECT E'it\\\\'s; DROP TABLE t' AS s\"", None),
+    ("psql -c 'SELECT $$; DELETE FROM t$$'", None),
+    ("psql -c 'SELECT $q$; DROP TABLE t$q$'", None),
+    ("psql -c 'SELECT 1 -- UPDATE later'", None),
+    ("psql -c 'SELECT /* DROP /* nested */ TABLE t */ 1'", None),
+    ("mysql -e \"SELECT 'it\\\\'s; DROP TABLE t' # DELETE\"", None),
+    ("psql -c '/* note */ UPDATE t SET a = 1'", "UPDATE"),
+    # a SQL CLI has to run: mentions in other commands do not count
+    ("git commit -m 'psql -c \"DROP TABLE t\"'", None),
+    ("grep -r 'DELETE FROM' src/", None),
+    ("python -c \"import subprocess; subprocess.run(['psql', '-c', 'DELETE FROM t'])\"",
+     "DELETE"),
+]
+
+
+class TestFirstWrite(unittest.TestCase):
+    def test_commands(self):
+        for command, expected in CASES:
+            with self.subTest(command=command):
+                self.assertEqual(sql.first_write(command, "/nonexistent"), expected)
+
+
+class TestFiles(IsolatedCase):
+    def setUp(self):
+        super().setUp()
+        self.write(self.tmp, {
+            "read.sql": "SELECT 'UPDATE' FROM t;\n-- DELETE FROM t;\n",
+            "write.sql": "SELECT 1;\nCREATE TABLE t (a int);\n",
+            "lib/inner.sql": "DROP TABLE t;\n",
+            "lib/outer.sql": "\\ir inner.sql\n",
+            "main.sql": "SELECT 1;\n\\i lib/outer.sql\n",
+            "load.sql": "\\copy t FROM 'data.csv' CSV\n",
+            "loop.sql": "\\i loop.sql\nSELECT 1;\n",
+        })
+
+    def first(self, command):
+        seen = set()
+        return sql.first_write(command, self.tmp, seen), seen
+
+    def test_file_sources(self):
+        for command, expected in (
+                ("psql -f read.sql", None),
+                ("psql -f write.sql", "CREATE"),
+                ("psql --file=write.sql", "CREATE"),
+                ("psql < write.sql", "CREATE"),
+                ("cat write.sql | psql", "CREATE"),
+                ("psql -f load.sql", "COPY"),
+                ("psql -f loop.sql", None),
+                ("psql -f missing.sql", None)):
+            with self.subTest(command=command):
+                self.assertEqual(self.first(command)[0], expected)
+
+    def test_includes_followed_and_recorded(self):
+        kind, seen = self.first("psql -f main.sql")
+        self.assertEqual(kind, "DROP")
+        self.assertEqual(seen, {os.path.join(self.tmp, p)
+                                for p in ("main.sql", "lib/outer.sql", "lib/inner.sql")})
+
+    def test_write_after_a_chunk_boundary(self):
+        # Statements and literals that straddle the CHUNK cut are carried over
+        filler = "SELECT 'x; DELETE FROM t';\n" * (sql.CHUNK // 26 + 10)
+        self.write(self.tmp, {"big.sql": filler + "UPDATE t SET a = 1;\n"})
+        self.assertEqual(self.first("psql -f big.sql")[0], "UPDATE")
+
+
+if __name__ == "__main__":
+    unittest.main()
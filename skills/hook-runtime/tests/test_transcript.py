@@ -0,0 +1,133 @@
+"""Transcript reader: cursors across appends and rewrites, selective decoding."""
+import json
+import os
+import unittest
+
+from hooktest import IsolatedCase
+
+from hooklib import transcript
+
+ENTRIES = [
+    {"type": "user", "message": {"role": "user", "content": "run the tests"}},
+    {"type": "assistant", "message": {"content": [
+        {"type": "text", "text": "Running \"npm test\" \\ now"},
+        {"type": "tool_use", "name": "Bash", "input": {"command": "npm test"}}]}},
+    {"type": "user", "message": {"content": [
+        {"type": "tool_result", "content": "x" * 300_000}]},
+     "toolUseResult": {"stdout": "y" * 300_000, "code": 0}},
+    {"type": "summary", "summary": "z" * 200_000},
+    {"type": "assistant", "message": {"content": [
+        {"type": "text", "text": "café \U0001f600", "extra": [1, 2.5, None, True]}]}},
+]
+
+
+def selected(entry, types, blocks, skip_keys):
+    """What entries() should yield for ``entry``: json.loads, then filtered."""
+    if types is not None and entry["type"] not in types:
+        return None
+    entry = json.loads(json.dumps(entry))
+    for key in skip_keys:
+        entry.pop(key, None)
+    content = entry.get("message", {}).get("content")
+    if blocks is not None and isinstance(content, list):
+        entry["message"]["content"] = [b for b in content if b.get("type") in blocks]
+    return entry
+
+
+class TranscriptCase(IsolatedCase):
+    def setUp(self):
+        super().setUp()
+        self.path = os.path.join(self.tmp, "session.jsonl")
+
+    def append(self, entries, raw=""):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.writelines(json.dumps(e) + "\n" for e in entries)
+            f.write(raw)
+
+
+class TestSelective(TranscriptCase):
+    def test_same_as_json_loads(self):
+        self.append(ENTRIES)
+        for types, blocks, skip_keys in (
+                (None, None, ()),
+                ({"assistant"}, {"text"}, ()),
+                ({"user", "assistant"}, {"tool_use"}, ("toolUseResult",)),
+                ({"user"}, {"tool_result"}, ())):
+            expected = [e for e in (selected(e, types, blocks, skip_keys) for e in ENTRIES) if e]
+            for max_line in (transcript.MAX_LINE, 1 << 30):  # streaming and whole-line
+                with self.subTest(types=types, blocks=blocks, max_line=max_line):
+                    got = list(transcript.IncrementalReader(self.path).entries(
+                        types, blocks, skip_keys, max_line=max_line, max_string=1 << 20))
+                    self.assertEqual(got, expected)
+
+    def test_long_strings_cut(self):
+        self.append(ENTRIES[2:3])
+        entry, = transcript.IncrementalReader(self.path).entries(max_string=1000)
+        self.assertEqual(entry["message"]["content"][0]["content"], "x" * 1000)
+        self.assertEqual(entry["toolUseResult"], {"stdout": "y" * 1000, "code": 0})
+
+    def test_line_numbers_and_offsets(self):
+        self.append(ENTRIES)
+        reader = transcript.IncrementalReader(self.path)
+        with open(self.path, "rb") as f:
+            lines = f.readlines()
+        for entry in reader.entries({"assistant"}):
+            start = sum(map(len, lines[:reader.count - 1]))
+            self.assertEqual((reader.line_start, reader.offset),
+                             (start, start + len(lines[reader.count - 1])))
+            self.assertEqual(json.loads(lines[reader.count - 1])["type"], entry["type"])
+
+    def test_peek_type(self):
+        for raw, expected in ((b'{"type": "user", "message": {}}', "user"),
+                              (b'{"message": {"type": "x"}, "type": "user"}', None),
+                              (b'{"uuid": "a", "type":"summary"}', "summary"),
+                              (b'{"message": "no type"}', None)):
+            with self.subTest(raw=raw):
+                self.assertEqual(transcript.peek_type(raw), expected)
+
+
+class TestCursor(TranscriptCase):
+    def read(self, cursor=None):
+        reader = transcript.IncrementalReader(self.path, cursor)
+        return reader, list(reader.entries(max_string=1 << 20))
+
+    def test_resumes_after_appends(self):
+        self.append(ENTRIES[:2])
+        reader, first = self.read()
+        self.assertTrue(reader.reset)
+        self.append(ENTRIES[2:])
+        reader, rest = self.read(reader.cursor())
+        self.assertFalse(reader.reset)
+        self.assertEqual((len(first), len(rest), reader.count), (2, 3, 3))
+        reader, more = self.read(reader.cursor())
+        self.assertEqual((more, reader.reset), ([], False))
+
+    def test_partial_last_line_left_for_the_next_run(self):
+        raw = json.dumps(ENTRIES[2])
+        for cut in (100, len(raw) - 1):  # a short tail, and one past the streaming limit
+            with self.subTest(cut=cut):
+                with open(self.path, "w", encoding="utf-8"):
+                    pass
+                self.append(ENTRIES[:1], raw[:cut])
+                reader, got = self.read()
+                self.assertEqual(len(got), 1)
+                self.append([], raw[cut:] + "\n")
+                reader, got = self.read(reader.cursor())
+                self.assertEqual(got, [ENTRIES[2]])
+
+    def test_rewritten_file_rescanned(self):
+        self.append(ENTRIES[:3])
+        cursor = self.read()[0].cursor()
+        for name, change in (("truncated", ENTRIES[:1]),
+                             ("compacted", [{"type": "summary", "summary": "compacted"}]
+                              + ENTRIES[:3])):
+            with self.subTest(name):
+                with open(self.path, "w", encoding="utf-8") as f:
+                    f.writelines(json.dumps(e) + "\n" for e in change)
+                reader, got = self.read(cursor)
+                self.assertTrue(reader.reset)
+                self.assertEqual(len(got), len(change))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+"""PreToolUse verdict cache: hits, hook versions, dependency stamps, eviction."""
+import json
+import os
+import unittest
+from unittest import mock
+
+from hooktest import IsolatedCase
+
+from hooklib import dispatch, verdicts
+
+PAYLOAD = {"tool_name": "Bash", "tool_input": {"command": "git status"}, "cwd": "/r"}
+OLD = 1_600_000_000  # mtime of files written by the test: not racy
+
+
+class TestVerdictCache(IsolatedCase):
+    def setUp(self):
+        super().setUp()
+        self.runs = os.path.join(self.tmp, "runs.log")
+        self.lib = os.path.join(self.tmp, "hooklib")
+        self.touch(os.path.join(self.lib, "core.py"), "X = 1\n")
+        patcher = mock.patch.object(verdicts, "HOOKLIB_DIR", self.lib)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def touch(self, path, text, stamp=OLD):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        if stamp is not None:
+            os.utime(path, (stamp, stamp))
+        return path
+
+    def script(self, body="", code=2, name="hook.py"):
+        return self.touch(os.path.join(self.tmp, name), (
+            "import sys\n"
+            "from hooklib import verdicts\n"
+            f"open({self.runs!r}, 'a').write('x')\n"
+            f"{body}\n"
+            "print('blocked', file=sys.stderr)\n"
+            f"sys.exit({code})\n"))
+
+    def call(self, script, tables=(), payload=PAYLOAD):
+        """One event in a fresh process: a new cache connection, nothing memoized."""
+        cache = verdicts.VerdictCache(os.path.join(self.tmp, "verdicts.sqlite"))
+        lookup = verdicts.Lookup(cache, verdicts.normalized_input(payload))
+        return dispatch.run_cached(script, json.dumps(payload), payload, list(tables), lookup)
+
+    def run_count(self):
+        with open(self.runs, encoding="utf-8") as f:
+            return len(f.read())
+
+    def test_hit_replays_the_verdict(self):
+        script = self.script()
+        first, second = self.call(script), self.call(script)
+        self.assertEqual((first.cached, second.cached), (False, True))
+        self.assertEqual((second.exit_code, second.stderr), (2, "blocked\n"))
+        self.assertEqual(self.run_count(), 1)
+        other = dict(PAYLOAD, tool_input={"command": "git push"})
+        self.assertFalse(self.call(script, payload=other).cached)
+        described = dict(PAYLOAD, tool_input={"command": "git status", "description": "x"})
+        self.assertTrue(self.call(script, payload=described).cached)
+
+    def test_new_hook_version_misses(self):
+        script = self.script()
+        table = self.touch(os.path.join(self.tmp, "rules.json"), '{"rules": []}')
+        self.call(script, [table])
+        self.assertTrue(self.call(script, [table]).cached)
+        for path, text, stamp in ((script, "# edited\n", OLD + 1),
+                                  (table, '{"rules": [] }', OLD + 2),
+                                  (os.path.join(self.lib, "core.py"), "X = 2\n", OLD + 3)):
+            with self.subTest(changed=os.path.basename(path)):
+                with open(path, "a", encoding="utf-8") as f:
+                    f.write(text)
+                os.utime(path, (stamp, stamp))
+                self.assertFalse(self.call(script, [table]).cached)
+                self.assertTrue(self.call(script, [table]).cached)
+
+    def test_dependency_going_stale(self):
+        dep = self.touch(os.path.join(self.tmp, "migrate.sql"), "DROP TABLE t;\n")
+        script = self.script(f"verdicts.depends_on({dep!r})")
+        self.call(script)
+        self.assertTrue(self.call(script).cached)
+        self.touch(dep, "SELECT 1;\n", OLD + 1)
+        self.assertFalse(self.call(script).cached)
+        self.assertTrue(self.call(script).cached)
+        os.remove(dep)
+        self.assertFalse(self.call(script).cached)
+
+    def test_racy_dependency_not_stored(self):
+        dep = self.touch(os.path.join(self.tmp, "migrate.sql"), "DROP TABLE t;\n", stamp=None)
+        script = self.script(f"verdicts.depends_on({dep!r})")
+        self.call(script)
+        self.assertFalse(self.call(script).cached)
+
+    def test_not_stored(self):
+        for name, body, code in (("once.py", "verdicts.uncacheable()", 2),
+                                 ("fails.py", "", 1)):
+            with self.subTest(script=name):
+                script = self.script(body, code, name)
+                self.call(script)
+                self.assertFalse(self.call(script).cached)
+
+
+class TestEviction(IsolatedCase):
+    def test_least_recently_used_evicted(self):
+        cache = verdicts.VerdictCache(os.path.join(self.tmp, "verdicts.sqlite"))
+        for n in range(5):
+            cache.put(f"k{n}", 0, "", "")
+            cache.db.execute("UPDATE verdicts SET used = ? WHERE key = ?", (1000 + n, f"k{n}"))
+        self.assertIsNotNone(cache.get("k0"))  # a hit long after the last use bumps it
+        self.assertEqual(cache.evict(max_rows=4), 2)
+        keys = [k for k, in cache.db.execute("SELECT key FROM verdicts ORDER BY key")]
+        self.assertEqual(keys, ["k0", "k3", "k4"])
+
+    def test_evicted_by_size(self):
+        cache = verdicts.VerdictCache(os.path.join(self.tmp, "verdicts.sqlite"))
+        for n in range(4):
+            cache.put(f"k{n}", 2, "", "x" * 1000)
+        self.assertEqual(cache.evict(max_bytes=3000), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""Run a triaged issue queue through parallel handler sessions, one worktree each.
+
+Takes the dispatcher's prioritized queue (Step 4), a JSON list of
+{"number", "title", "files"} where "files" lists the files or directories
+triage expects the issue to touch (may be empty). Then it runs up to
+--parallel handler sessions at once. Each session gets its own git worktree
+and branch, issue/<number>-<slug>, starting from --base. Issues expecting the
+same files are serialized: the later one starts after the earlier one
+finishes, from its branch. Issues that turn out to touch the same files
+while running side by side are rebased in finishing order
+(hooklib/scheduler.py).
+
+Nothing is pushed. Each finished issue leaves a branch with the handler's
+changes committed, for the orchestrator to audit and deploy. The state
+(status, branch, worktree, touched files, log per issue) is kept in the git
+common dir; --status prints it.
+
+Usage:
+  gh issue list --json number,title > queue.json      # then triage: order, add "files"
+  python ~/.claude/skills/issue-dispatcher/scripts/dispatch-queue.py queue.json --parallel 4
+  python .../dispatch-queue.py queue.json --handler './fix.sh {number}' --base origin/main
+  python .../dispatch-queue.py --status
+  python .../dispatch-queue.py --prune           # remove worktrees of done issues
+
+Exit codes:
+  0 = every issue finished with status done
+  1 = some issue failed or conflicted (see its log and note)
+  2 = bad queue, not a git repository, or unknown --base
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.expanduser("~/.claude/skills/hook-runtime/scripts"))
+from hooklib import scheduler  # noqa: E402
+
+# Handler session per issue: a headless Claude Code session in the worktree,
+# with the sub-CTO deployment rules of autonomous-issue-dispatch
+DEFAULT_HANDLER = (
+    "claude -p --permission-mode acceptEdits"
+    " \"Handle GitHub issue #$ISSUE_NUMBER ($ISSUE_TITLE): invoke the issue-handler skill,"
+    " then the CTO agent. You are in an isolated git worktree on branch $ISSUE_BRANCH."
+    " Do NOT push. Your DoD is 'ready for deployment': tests pass, report files modified.\""
+)
+
+
+def print_state(state):
+    print(f"{'issue':<7} {'status':<9} {'secs':>6}  {'branch':<40} touched")
+    for issue in state["issues"]:
+        secs = ""
+        if issue.get("started") and issue.get("finished"):
+            secs = f"{issue['finished'] - issue['started']:.0f}"
+        touched = ", ".join(issue["touched"][:4])
+        touched += f" (+{len(issue['touched']) - 4})" if len(issue["touched"]) > 4 else ""
+        print(f"#{issue['number']:<6} {issue['status']:<9} {secs:>6}  {issue['branch']:<40}"
+              f" {touched}")
+        for line in ([f"stacked on {', '.join(f'#{n}' for n in issue['after'])}"]
+                     if issue["after"] else []) + ([issue["note"]] if issue["note"] else []):
+            print(f"{'':<17}{line}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    ap.add_argument("queue", nargs="?", help="JSON queue file, - for stdin")
+    ap.add_argument("--parallel", type=int, default=os.cpu_count() or 1,
+                    help="concurrent handler sessions (default: one per core)")
+    ap.add_argument("--handler", default=DEFAULT_HANDLER,
+                    help="shell command per issue; {number} {title} {branch} {worktree}")
+    ap.add_argument("--base", default="HEAD", help="ref the issue branches start from")
+    ap.add_argument("--worktrees", help="directory for the worktrees (default: <repo>.worktrees)")
+    ap.add_argument("--cwd", default=os.getcwd())
+    ap.add_argument("--status", action="store_true", help="print the last run's state")
+    ap.add_argument("--prune", action="store_true", help="remove worktrees of done issues")
+    ap.add_argument("--json", action="store_true", help="print the state as JSON")
+    args = ap.parse_args()
+
+    if args.status or args.prune:
+        state = scheduler.load_state(args.cwd)
+        if state is None:
+            print("no dispatch state in this repository", file=sys.stderr)
+            sys.exit(2)
+        if args.prune:
+            for path in scheduler.remove_worktrees(args.cwd, state):
+                print(f"removed {path}")
+        elif args.json:
+            print(json.dumps(state, indent=2))
+        else:
+            print_state(state)
+        return
+    if not args.queue:
+        ap.error("a queue file is required")
+
+    try:
+        with (sys.stdin if args.queue == "-" else open(args.queue, "r", encoding="utf-8")) as f:
+            queue = [scheduler.Issue.from_json(item) for item in json.load(f)]
+        sched = scheduler.Scheduler(args.cwd, queue, args.handler, args.parallel,
+                                    args.base, args.worktrees)
+    except (OSError, ValueError, KeyError, TypeError) as exc:
+        print(f"dispatch-queue: {exc}", file=sys.stderr)
+        sys.exit(2)
+
+    start = time.time()
+    print(f"{len(queue)} issue(s), up to {sched.parallel} at a time, worktrees in"
+          f" {sched.worktrees}", file=sys.stderr)
+    issues = sched.run()
+    state = scheduler.load_state(args.cwd)
+    if args.json:
+        print(json.dumps(state, indent=2))
+    else:
+        print_state(state)
+        work = sum((i.finished or 0) - (i.started or 0) for i in issues if i.started)
+        print(f"{sum(i.status == 'done' for i in issues)}/{len(issues)} done in"
+              f" {time.time() - start:.0f}s ({work:.0f}s of handler time)")
+    sys.exit(0 if all(i.status == "done" for i in issues) else 1)
+
+
+if __name__ == "__main__":
+    main()
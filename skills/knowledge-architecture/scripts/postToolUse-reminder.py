@@ -5,13 +5,17 @@ every time a .md file is edited.
 
 Exit code 2 + stderr = feedback shown to Claude (not just the user).
 Exit code 0 = silent pass-through (non-.md files).
+
+Reads only tool_input.file_path (listed for it in hooks.json too).
 """
-import json
+import os
 import sys
 
-try:
-    input_data = json.load(sys.stdin)
-except (json.JSONDecodeError, EOFError):
+sys.path.insert(0, os.path.expanduser("~/.claude/skills/hook-runtime/scripts"))
+from hooklib import read_fields
+
+input_data = read_fields("tool_input.file_path")
+if input_data is None:
     sys.exit(0)
 
 file_path = input_data.get("tool_input", {}).get("file_path", "")